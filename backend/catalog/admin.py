@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Category, Instrument, Media, Expert, LearningContent, Contact, Tutorial, TunerConfiguration
+from .models import (
+    Category, Instrument, Media, Expert, LearningContent, Contact, Tutorial, TunerConfiguration, ModelVariant,
+    ProcessingJob, AudioAnalysis,
+)
 
 
 @admin.register(Category)
@@ -36,11 +39,34 @@ class LearningContentAdmin(admin.ModelAdmin):
     search_fields = ('title', 'content')
 
 
+class ModelVariantInline(admin.TabularInline):
+    model = ModelVariant
+    extra = 0
+    readonly_fields = ('level', 'file', 'byte_size', 'vertex_count', 'triangle_count', 'created_at')
+    exclude = ('source',)
+    can_delete = False
+
+
 @admin.register(Media)
 class MediaAdmin(admin.ModelAdmin):
     list_display = ('instrument', 'media_type', 'title', 'is_primary', 'uploaded_at')
     list_filter = ('media_type', 'is_primary')
     search_fields = ('instrument__name', 'title')
+    inlines = [ModelVariantInline]
+
+
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'content_type', 'object_id', 'status', 'attempts', 'duration', 'updated_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(AudioAnalysis)
+class AudioAnalysisAdmin(admin.ModelAdmin):
+    list_display = ('content_type', 'object_id', 'duration', 'loudness_db', 'peak_db', 'gain_db', 'created_at')
+    list_filter = ('content_type',)
+    readonly_fields = ('created_at',)
 
 
 @admin.register(Contact)
@@ -0,0 +1,262 @@
+"""
+Async read path for the public catalog endpoints.
+
+Under an ASGI server (``uvicorn nepali_platform.asgi:application``), GET and
+HEAD on the list and detail routes of instruments, experts, categories,
+learning content and tuner configurations are served by coroutines, so a slow
+client holds a suspended task rather than a worker thread.  Detail views load
+the object and each related set with ``aget`` / ``aiterator`` concurrently and
+fill the caches ``prefetch_related`` would, then render through the viewset's
+own serializers, so response bodies are identical to the sync ones.  Conditional
+GET and the response cache work as in ``catalog.conditional`` and
+``catalog.cache``.
+
+Everything else goes to the DRF viewset unchanged: writes, requests with an
+``Authorization`` header, other renderers (the browsable API), and any
+request DRF would answer with an error, so error bodies stay the same.  Django 4.2 runs async ORM calls on the request's sync
+thread, so sub-queries of one request overlap with other requests rather than
+with each other.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from rest_framework.exceptions import APIException
+
+from . import cache, conditional, recommendations
+from .cache import CachedResponseMixin
+from .models import Expert, Instrument, Media, ModelVariant, Tutorial
+from .serializers import InstrumentDetailSerializer
+from .views import (
+    CategoryViewSet,
+    ExpertViewSet,
+    InstrumentViewSet,
+    LearningContentViewSet,
+    RowListMixin,
+    TunerConfigurationViewSet,
+)
+
+READ_METHODS = ('GET', 'HEAD')
+
+# What the viewset answers itself; ``get_object_or_404`` treats the last
+# three as "not found" too.
+FALLBACK_ERRORS = (APIException, Http404, ObjectDoesNotExist, ValidationError, TypeError, ValueError)
+
+
+async def fetch(queryset) -> list:
+    return [obj async for obj in queryset.aiterator()]
+
+
+async def skip():
+    return None
+
+
+def attach(instance, name: str, objects) -> None:
+    """Make ``instance.<name>.all()`` return ``objects``, as ``prefetch_related`` would."""
+    queryset = getattr(instance, name).all()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    if not hasattr(instance, '_prefetched_objects_cache'):
+        instance._prefetched_objects_cache = {}
+    instance._prefetched_objects_cache[name] = queryset
+
+
+class AsyncReadView:
+    """
+    Async ``list`` and ``retrieve`` for ``viewset``.
+
+    The viewset instance still builds querysets, filters, paginates and
+    serializes; subclasses override ``get_object`` to load related rows.
+    """
+    viewset = None
+
+    def __init__(self, actions: dict, initkwargs: dict):
+        self.actions = actions
+        self.initkwargs = initkwargs
+
+    @classmethod
+    def as_view(cls, fallback):
+        """Wrap ``fallback``, the router's sync view for the same route."""
+        actions, initkwargs = fallback.actions, fallback.initkwargs
+        fallback = sync_to_async(fallback)
+
+        async def view(request, *args, **kwargs):
+            # Authenticated requests go through the viewset, which rejects bad tokens.
+            if request.method in READ_METHODS and 'Authorization' not in request.headers:
+                handler = cls(actions, initkwargs)
+                try:
+                    response = await getattr(handler, actions['get'])(request, kwargs)
+                except FALLBACK_ERRORS:
+                    response = None
+                if response is not None:
+                    return response
+            return await fallback(request, *args, **kwargs)
+
+        # The viewset runs its own CSRF check for session-authenticated writes.
+        view.csrf_exempt = True
+        return view
+
+    def setup(self, request, kwargs: dict):
+        """The viewset as its ``as_view`` would set it up, short of authentication."""
+        view = self.viewset(**self.initkwargs)
+        view.action_map = self.actions
+        for method, action in self.actions.items():
+            setattr(view, method, getattr(view, action))
+        view.head = view.get
+        view.action = self.actions['get']
+        view.start_timing()
+        view.args, view.kwargs, view.format_kwarg = (), kwargs, None
+        view.request = view.initialize_request(request)
+        view.headers = view.default_response_headers
+        view.request.accepted_renderer, view.request.accepted_media_type = (
+            view.perform_content_negotiation(view.request)
+        )
+        return view
+
+    async def list(self, request, kwargs):
+        view = self.setup(request, kwargs)
+        if view.request.accepted_renderer.format != 'json':
+            return None
+        queryset = view.filter_queryset(view.get_queryset())
+
+        async def validators():
+            state = await queryset.order_by().aaggregate(last=Max('updated_at'), count=Count('pk'))
+            return state['last'], f"{state['count']}"
+
+        return await self.respond(view, validators, lambda: self.list_data(view, queryset))
+
+    async def retrieve(self, request, kwargs):
+        view = self.setup(request, kwargs)
+        if view.request.accepted_renderer.format != 'json':
+            return None
+        pk = kwargs['pk']
+
+        async def validators():
+            last = await view.get_queryset().filter(pk=pk).values_list('updated_at', flat=True).afirst()
+            if last is None:
+                raise Http404
+            return last, ''
+
+        return await self.respond(view, validators, lambda: self.detail_data(view, pk))
+
+    async def list_data(self, view, queryset):
+        # The cursor paginator evaluates the page itself, and 4.2's aiterator
+        # can't prefetch, so the page is loaded on the ORM thread.
+        def paginate():
+            if isinstance(view, RowListMixin):
+                return view.list_response(queryset).data
+            page = view.paginate_queryset(queryset)
+            return view.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+        return await sync_to_async(paginate)()
+
+    async def detail_data(self, view, pk):
+        instance = await self.get_object(view, pk)
+        return view.get_serializer(instance).data
+
+    async def get_object(self, view, pk):
+        return await view.get_queryset().aget(pk=pk)
+
+    async def respond(self, view, validators, build):
+        """
+        ``CachedResponseMixin.cached_response`` around
+        ``ConditionalGetMixin.conditional_response``, for coroutines:
+        ``validators()`` only runs on a cache miss.
+        """
+        if not isinstance(view, CachedResponseMixin):
+            return self.finalize(view, await self.conditional_response(view, validators, build))
+
+        # One hop to the ORM thread for the whole lookup rather than one per cache call.
+        entry, response = await sync_to_async(self.probe)(view)
+        if response is None:
+            response = await self.conditional_response(view, validators, build)
+            if response.status_code == 200:
+                view.set_validators(response, entry.etag, entry.last_modified)
+                await sync_to_async(cache.store)(entry, response, view.get_cache_timeout())
+        return self.finalize(view, response)
+
+    @staticmethod
+    def probe(view):
+        entry = cache.lookup(view.request, view.cache_models, view.get_response_cache_key)
+        return entry, cache.cached(view.request, entry)
+
+    async def conditional_response(self, view, validators, build):
+        """``ConditionalGetMixin.conditional_response`` for coroutines."""
+        last_modified, extra = await validators()
+        if last_modified is None:
+            return await self.render(view, build)
+        etag, last_modified_ts = conditional.make_validators(view.request, last_modified, extra)
+        if conditional.is_not_modified(view.request, etag, last_modified_ts):
+            response = HttpResponseNotModified()
+        else:
+            response = await self.render(view, build)
+        conditional.set_validators(response, etag, last_modified_ts)
+        return response
+
+    @staticmethod
+    def finalize(view, response):
+        for name, value in view.headers.items():
+            response[name] = value
+        return response
+
+    async def render(self, view, build) -> HttpResponse:
+        request = view.request
+        data = await build()
+        renderer = request.accepted_renderer
+        content = renderer.render(data, request.accepted_media_type, view.get_renderer_context())
+        return HttpResponse(content, content_type=renderer.media_type)
+
+
+class CategoryReadView(AsyncReadView):
+    viewset = CategoryViewSet
+
+
+class InstrumentReadView(AsyncReadView):
+    viewset = InstrumentViewSet
+
+    async def get_object(self, view, pk):
+        includes = InstrumentDetailSerializer.requested_includes(view.request)
+        # As in the sync view, the tuner configuration comes with the instrument row.
+        related = ['category', 'tuner_config'] if 'tuner_config' in includes else ['category']
+        instrument, media, variants, experts, recommended, tutorials = await asyncio.gather(
+            Instrument.objects.select_related(*related).aget(pk=pk),
+            fetch(Media.objects.filter(instrument_id=pk)),
+            fetch(ModelVariant.objects.filter(media__instrument_id=pk)),
+            fetch(Expert.objects.filter(instruments=pk)),
+            fetch(recommendations.served().filter(instrument_id=pk)),
+            fetch(Tutorial.objects.filter(instrument_id=pk)) if 'tutorials' in includes else skip(),
+        )
+
+        variants_by_media = {}
+        for variant in variants:
+            variants_by_media.setdefault(variant.media_id, []).append(variant)
+        for item in media:
+            attach(item, 'variants', variants_by_media.get(item.pk, []))
+        attach(instrument, 'media', media)
+        attach(instrument, 'experts', experts)
+        attach(instrument, 'recommendations', recommended)
+        if 'tutorials' in includes:
+            attach(instrument, 'tutorials', tutorials)
+        return instrument
+
+
+class ExpertReadView(AsyncReadView):
+    viewset = ExpertViewSet
+
+    async def get_object(self, view, pk):
+        expert, instruments = await asyncio.gather(
+            Expert.objects.aget(pk=pk),
+            fetch(Instrument.objects.select_related('category').filter(experts=pk)),
+        )
+        attach(expert, 'instruments', instruments)
+        return expert
+
+
+class LearningContentReadView(AsyncReadView):
+    viewset = LearningContentViewSet
+
+
+class TunerConfigurationReadView(AsyncReadView):
+    viewset = TunerConfigurationViewSet
@@ -0,0 +1,299 @@
+"""
+Waveform peaks and loudness statistics for uploaded recordings.
+
+Audio is decoded from WAV (8/16/24/32-bit PCM and 32/64-bit float, plain or
+``WAVE_FORMAT_EXTENSIBLE``) with a small RIFF reader and ``numpy.memmap``, and
+processed in fixed-size blocks so memory stays flat for long recordings.
+
+Results are written as a binary sidecar the player can draw straight away:
+
+    header   '<4sIHHQffffI'  magic b'NPK1', sample rate, channels, reserved,
+                             frames, peak dBFS, RMS dBFS, loudness, gain dB,
+                             number of levels
+    level    '<II'           samples per peak, peak count
+             int8[count, 2]  (min, max) pairs of the mono mix, scaled by 127
+
+Loudness follows the ITU-R BS.1770 gating scheme (400 ms blocks, 75%
+overlap, -70 absolute and -10 relative gates) without the K-weighting
+filter, so it is an approximation of LUFS that is good enough to level
+recordings against each other.
+"""
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+# File field holding the recording, by model name.
+AUDIO_SOURCES = {
+    'media': 'file',
+    'expert': 'teaching_audio',
+}
+
+SUPPORTED_EXTENSIONS = ('.wav', '.wave')
+
+MAGIC = b'NPK1'
+HEADER = struct.Struct('<4sIHHQffffI')
+LEVEL_HEADER = struct.Struct('<II')
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+SILENCE_DB = -120.0
+
+
+class AudioError(ValueError):
+    pass
+
+
+@dataclass
+class WavInfo:
+    path: Path
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits: int
+    data_offset: int
+    frames: int
+
+
+@dataclass
+class AudioSummary:
+    sample_rate: int
+    channels: int
+    frames: int
+    peak_db: float
+    rms_db: float
+    loudness_db: float
+    gain_db: float
+    # (samples per peak, int8 array of shape (count, 2)) from finest to coarsest.
+    levels: list = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+
+def is_supported(name: str) -> bool:
+    return name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def get_levels() -> tuple[int, ...]:
+    levels = tuple(sorted(getattr(settings, 'AUDIO_PEAK_LEVELS', (512, 2048, 8192))))
+    if any(coarse % fine for fine, coarse in zip(levels, levels[1:])):
+        raise AudioError('Each AUDIO_PEAK_LEVELS entry must be a multiple of the previous one')
+    return levels
+
+
+def read_wav_info(path) -> WavInfo:
+    """
+    Parse the RIFF header of a WAV file.  Anything truncated, malformed or
+    unsupported raises ``AudioError``.
+    """
+    path = Path(path)
+    with open(path, 'rb') as handle:
+        header = handle.read(12)
+        if len(header) < 12:
+            raise AudioError('Truncated WAV header')
+        riff, _size, wave = struct.unpack('<4sI4s', header)
+        if riff not in (b'RIFF', b'RF64') or wave != b'WAVE':
+            raise AudioError('Not a RIFF/WAVE file')
+        fmt = None
+        while True:
+            chunk = handle.read(8)
+            if len(chunk) < 8:
+                raise AudioError('No data chunk')
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'fmt ':
+                body = handle.read(chunk_size)
+                if len(body) < 16:
+                    raise AudioError('Truncated fmt chunk')
+                format_tag, channels, sample_rate, _byte_rate, _align, bits = struct.unpack('<HHIIHH', body[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    format_tag = struct.unpack('<H', body[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, bits)
+                handle.seek(chunk_size % 2, 1)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise AudioError('data chunk before fmt chunk')
+                format_tag, channels, sample_rate, bits = fmt
+                if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) or not channels:
+                    raise AudioError(f'Unsupported WAV encoding {format_tag:#x}')
+                if not bits or bits % 8:
+                    raise AudioError(f'Unsupported sample width {bits}')
+                if not sample_rate:
+                    raise AudioError('Sample rate is zero')
+                frame_size = channels * bits // 8
+                # Streamed writers leave 0 or 0xFFFFFFFF; trust the file length instead.
+                available = path.stat().st_size - handle.tell()
+                if chunk_size in (0, 0xFFFFFFFF) or chunk_size > available:
+                    chunk_size = available
+                if chunk_size < frame_size:
+                    raise AudioError('No audio in the data chunk')
+                return WavInfo(path, format_tag, channels, sample_rate, bits, handle.tell(), chunk_size // frame_size)
+            else:
+                handle.seek(chunk_size + chunk_size % 2, 1)
+
+
+def _sample_view(info: WavInfo) -> np.ndarray:
+    """Map the data chunk as a ``(frames, channels)`` array without reading it."""
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        dtypes = {32: '<f4', 64: '<f8'}
+    else:
+        dtypes = {8: 'u1', 16: '<i2', 24: 'u1', 32: '<i4'}
+    if info.bits not in dtypes:
+        raise AudioError(f'Unsupported sample width {info.bits}')
+    width = 3 if info.bits == 24 else 1
+    return np.memmap(
+        info.path, dtype=dtypes[info.bits], mode='r', offset=info.data_offset,
+        shape=(info.frames, info.channels * width),
+    )
+
+
+def _to_float(raw: np.ndarray, info: WavInfo) -> np.ndarray:
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        return raw.astype(np.float32)
+    if info.bits == 8:
+        return (raw.astype(np.float32) - 128.0) / 128.0
+    if info.bits == 24:
+        triplets = raw.reshape(len(raw), info.channels, 3).astype(np.int32)
+        values = triplets[..., 0] | (triplets[..., 1] << 8) | (triplets[..., 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        return values.astype(np.float32) / float(1 << 23)
+    return raw.astype(np.float32) / float(1 << (info.bits - 1))
+
+
+def iter_blocks(info: WavInfo, block_frames: int):
+    """Yield float32 ``(frames, channels)`` blocks scaled to [-1, 1]."""
+    samples = _sample_view(info)
+    for start in range(0, info.frames, block_frames):
+        yield _to_float(np.asarray(samples[start:start + block_frames]), info)
+
+
+class LoudnessMeter:
+    """Accumulates gated block loudness across arbitrarily sized blocks."""
+
+    def __init__(self, sample_rate: int, channels: int):
+        self.hop = max(1, sample_rate // 10)
+        self.pending = np.zeros((0, channels), dtype=np.float32)
+        self.hops = []
+
+    def feed(self, block: np.ndarray) -> None:
+        data = np.concatenate([self.pending, block]) if len(self.pending) else block
+        whole = len(data) // self.hop * self.hop
+        if whole:
+            squares = np.square(data[:whole], dtype=np.float64)
+            # Mean square of every 100 ms hop, summed over channels.
+            self.hops.append(squares.reshape(-1, self.hop, data.shape[1]).mean(axis=1).sum(axis=1))
+        self.pending = data[whole:].copy()
+
+    def loudness(self) -> float:
+        hops = np.concatenate(self.hops) if self.hops else np.zeros(0)
+        if len(hops) < 4:
+            return SILENCE_DB
+        # 400 ms blocks with 75% overlap are the mean of 4 consecutive hops.
+        cumulative = np.concatenate([[0.0], np.cumsum(hops)])
+        blocks = (cumulative[4:] - cumulative[:-4]) / 4
+        with np.errstate(divide='ignore'):
+            block_loudness = -0.691 + 10 * np.log10(blocks)
+        gated = blocks[block_loudness > -70.0]
+        if not len(gated):
+            return SILENCE_DB
+        relative = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+        gated = blocks[block_loudness > max(relative, -70.0)]
+        return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def _reduce_peaks(mins: np.ndarray, maxs: np.ndarray, factor: int) -> tuple[np.ndarray, np.ndarray]:
+    count = -(-len(mins) // factor)
+    pad = count * factor - len(mins)
+    mins = np.pad(mins, (0, pad), constant_values=np.inf).reshape(count, factor).min(axis=1)
+    maxs = np.pad(maxs, (0, pad), constant_values=-np.inf).reshape(count, factor).max(axis=1)
+    return mins, maxs
+
+
+def _db(value: float) -> float:
+    return float(20 * np.log10(value)) if value > 0 else SILENCE_DB
+
+
+def analyze(path, levels: tuple[int, ...] | None = None, target_db: float | None = None) -> AudioSummary:
+    levels = levels or get_levels()
+    if target_db is None:
+        target_db = getattr(settings, 'AUDIO_TARGET_LOUDNESS', -16.0)
+    info = read_wav_info(path)
+    finest = levels[0]
+
+    meter = LoudnessMeter(info.sample_rate, info.channels)
+    mins, maxs = [], []
+    peak = 0.0
+    sum_squares = 0.0
+    # A multiple of the finest level, so only the final block is partial.
+    for block in iter_blocks(info, finest * 512):
+        meter.feed(block)
+        peak = max(peak, float(np.abs(block).max(initial=0.0)))
+        sum_squares += float(np.square(block, dtype=np.float64).sum())
+
+        mono = block.mean(axis=1)
+        count = -(-len(mono) // finest)
+        padded = np.pad(mono, (0, count * finest - len(mono)), mode='edge').reshape(count, finest)
+        mins.append(padded.min(axis=1))
+        maxs.append(padded.max(axis=1))
+
+    level_mins = np.concatenate(mins) if mins else np.zeros(0, dtype=np.float32)
+    level_maxs = np.concatenate(maxs) if maxs else np.zeros(0, dtype=np.float32)
+    quantized = []
+    previous = finest
+    for samples_per_peak in levels:
+        if samples_per_peak != previous:
+            level_mins, level_maxs = _reduce_peaks(level_mins, level_maxs, samples_per_peak // previous)
+            previous = samples_per_peak
+        pairs = np.stack([level_mins, level_maxs], axis=1)
+        quantized.append((samples_per_peak, np.clip(np.round(pairs * 127), -127, 127).astype(np.int8)))
+
+    samples = info.frames * info.channels
+    rms_db = 10 * np.log10(sum_squares / samples) if samples and sum_squares else SILENCE_DB
+    peak_db = _db(peak)
+    loudness_db = meter.loudness()
+    # Level towards the target, but never push the peaks above -1 dBFS.
+    gain_db = min(target_db - loudness_db, -1.0 - peak_db) if loudness_db > SILENCE_DB else 0.0
+
+    return AudioSummary(
+        sample_rate=info.sample_rate,
+        channels=info.channels,
+        frames=info.frames,
+        peak_db=round(peak_db, 2),
+        rms_db=round(float(rms_db), 2),
+        loudness_db=round(loudness_db, 2),
+        gain_db=round(float(gain_db), 2),
+        levels=quantized,
+    )
+
+
+def encode_peaks(summary: AudioSummary) -> bytes:
+    parts = [HEADER.pack(
+        MAGIC, summary.sample_rate, summary.channels, 0, summary.frames,
+        summary.peak_db, summary.rms_db, summary.loudness_db, summary.gain_db, len(summary.levels),
+    )]
+    for samples_per_peak, pairs in summary.levels:
+        parts.append(LEVEL_HEADER.pack(samples_per_peak, len(pairs)))
+        parts.append(pairs.tobytes())
+    return b''.join(parts)
+
+
+def decode_peaks(data: bytes) -> AudioSummary:
+    magic, sample_rate, channels, _reserved, frames, peak_db, rms_db, loudness_db, gain_db, count = (
+        HEADER.unpack_from(data)
+    )
+    if magic != MAGIC:
+        raise AudioError('Not a peaks sidecar')
+    offset = HEADER.size
+    levels = []
+    for _ in range(count):
+        samples_per_peak, length = LEVEL_HEADER.unpack_from(data, offset)
+        offset += LEVEL_HEADER.size
+        pairs = np.frombuffer(data, dtype=np.int8, count=length * 2, offset=offset).reshape(length, 2)
+        levels.append((samples_per_peak, pairs))
+        offset += length * 2
+    return AudioSummary(sample_rate, channels, frames, peak_db, rms_db, loudness_db, gain_db, levels)
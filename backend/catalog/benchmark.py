@@ -0,0 +1,85 @@
+"""
+Result format shared by ``manage.py micro_benchmark`` and ``manage.py load_test``.
+
+Both write JSON of the form ``{"environment": {...}, "config": {...},
+"benchmarks": {name: stats}}`` where ``stats`` comes from ``summarize``.
+Saving one run and passing it to the next with ``--compare`` turns the
+numbers into a regression check.
+"""
+import json
+import math
+import platform
+import statistics
+from datetime import datetime, timezone
+
+import django
+from django.db import connection
+
+from .models import Category, Expert, Instrument, Media, Tutorial, TunerConfiguration
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(math.ceil(len(ordered) * q / 100) - 1, 0)]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Statistics of durations in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'stddev_ms': round(statistics.pstdev(ordered) * 1000, 3),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def environment() -> dict:
+    return {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'database': connection.vendor,
+        'rows': {
+            model._meta.model_name: model.objects.count()
+            for model in (Category, Instrument, Media, Expert, Tutorial, TunerConfiguration)
+        },
+    }
+
+
+def write(results: dict, path: str | None, stdout) -> None:
+    text = json.dumps(results, indent=2)
+    if path:
+        with open(path, 'w') as output:
+            output.write(text + '\n')
+    else:
+        stdout.write(text)
+
+
+def compare(current: dict, baseline: dict, metric: str, tolerance: float) -> tuple[list[str], list[str]]:
+    """
+    Lines comparing ``metric`` of every benchmark in both runs, and the
+    benchmarks that got more than ``tolerance`` percent slower.
+    """
+    lines, regressions = [], []
+    for name, stats in current['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name, {}).get(metric)
+        now = stats.get(metric)
+        if before is None or now is None:
+            lines.append(f'{name}: {metric} {before} -> {now} (not compared)')
+            continue
+        change = (now - before) / before * 100 if before else 0.0
+        lines.append(f'{name}: {metric} {before} -> {now} ({change:+.1f}%)')
+        if change > tolerance:
+            regressions.append(f'{name}: {metric} {before} -> {now} ({change:+.1f}%)')
+    return lines, regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as source:
+        return json.load(source)
@@ -0,0 +1,183 @@
+"""
+Batch writes for admin curation.
+
+``POST <collection>/bulk/`` creates a list of objects and ``PATCH
+<collection>/bulk/`` partially updates a list of ``{"id": ..., ...}``
+objects.  The whole array is validated first; if any item fails nothing is
+written and the response is ``{"errors": [...]}`` with one entry per item
+(``{}`` for the valid ones).  Otherwise the batch is written in one
+transaction with ``bulk_create`` or a single batched UPDATE, retried if
+SQLite reports the database as locked.
+
+Bulk writes skip model signals, so ``after_bulk_write`` does what the
+handlers in ``catalog.signals`` would, once per batch instead of per row.
+"""
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import cache, search, static_api
+from .models import Expert, Instrument
+from .signals import queue_processing, queue_recommendations, touch
+from .transactions import retrying_atomic
+from .transfer import update_rows
+
+
+class PrefetchedObjects:
+    """Stands in for a related field's queryset, answering ``get(pk=...)`` from memory."""
+
+    def __init__(self, objects: dict):
+        self.objects = objects
+
+    def get(self, pk):
+        obj = self.objects.get(int(pk))
+        if obj is None:
+            raise ObjectDoesNotExist
+        return obj
+
+
+def prefetch_related_fields(serializer, items: list) -> None:
+    """
+    Resolve every primary key the batch mentions with one query per related
+    field, instead of one query per item and field.
+    """
+    for name, field in serializer.fields.items():
+        if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.read_only:
+            continue
+        pks = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            if isinstance(value, (int, str)) and not isinstance(value, bool) and str(value).isdigit():
+                pks.add(int(value))
+        field.queryset = PrefetchedObjects(field.get_queryset().in_bulk(pks))
+
+
+class BulkUpdateListSerializer(serializers.ListSerializer):
+    """
+    Validates ``{"id": ..., ...}`` items against ``instance``, a ``{pk: obj}``
+    dict, reusing one child serializer so its fields are built once.
+    ``validated_data`` is a list of ``(obj, attrs)`` pairs.
+    """
+
+    def to_internal_value(self, data):
+        self._seen = set()
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        pk = data.get('id') if isinstance(data, dict) else None
+        if not isinstance(pk, int) or pk not in self.instance:
+            raise serializers.ValidationError({'id': ['Unknown or missing id.']})
+        if pk in self._seen:
+            raise serializers.ValidationError({'id': ['Duplicate id in batch.']})
+        self._seen.add(pk)
+        self.child.instance = self.instance[pk]
+        self.child.initial_data = data
+        return self.child.instance, super().run_child_validation(data)
+
+
+class BulkWriteMixin:
+    bulk_serializer_class = None
+    bulk_methods = ('POST', 'PATCH')
+    bulk_max_items = 1000
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        if request.method not in self.bulk_methods:
+            return self.http_method_not_allowed(request)
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Expected a list of objects.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'detail': f'At most {self.bulk_max_items} objects per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == 'POST':
+            return self.bulk_create(request, items)
+        return self.bulk_update(request, items)
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', self.get_serializer_context())
+        return self.bulk_serializer_class(*args, **kwargs)
+
+    def bulk_create(self, request, items):
+        serializer = self.get_bulk_serializer(data=items, many=True)
+        prefetch_related_fields(serializer.child, items)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.bulk_serializer_class.Meta.model
+        objs = [model(**attrs) for attrs in serializer.validated_data]
+
+        @retrying_atomic
+        def write():
+            model.objects.bulk_create(objs)
+            self.after_bulk_write(objs, set())
+
+        write()
+        return Response(self.get_bulk_serializer(objs, many=True).data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, items):
+        model = self.bulk_serializer_class.Meta.model
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        instances = model.objects.in_bulk([pk for pk in ids if isinstance(pk, int)])
+        context = self.get_serializer_context()
+        serializer = BulkUpdateListSerializer(
+            instances,
+            data=items,
+            child=self.bulk_serializer_class(partial=True, context=context),
+            partial=True,
+            context=context,
+        )
+        prefetch_related_fields(serializer.child, items)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        objs, fields, previous_instruments = [], set(), set()
+        for instance, attrs in serializer.validated_data:
+            previous_instruments.add(getattr(instance, 'instrument_id', None))
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            objs.append(instance)
+
+        # The batched UPDATE skips auto_now, and conditional GET relies on it.
+        if fields and any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields.add('updated_at')
+
+        @retrying_atomic
+        def write():
+            if fields:
+                update_rows(model, objs, sorted(fields))
+            self.after_bulk_write(objs, previous_instruments - {None})
+
+        write()
+        return Response(self.get_bulk_serializer(objs, many=True).data)
+
+    def after_bulk_write(self, objs: list, previous_instruments: set) -> None:
+        """Cache, search, change tracking and processing jobs for the batch, once."""
+        model = self.bulk_serializer_class.Meta.model
+        cache.bump_generation(model._meta.label_lower)
+        if model in search.INDEXED_MODELS:
+            search.index_objects(objs)
+        # A media item re-typed as a GLB model or a WAV recording needs its job.
+        queue_processing(objs)
+        if model is Instrument:
+            pks = [obj.pk for obj in objs]
+            touch(Expert.objects.filter(instruments__in=pks).distinct())
+            # Their pages show these names and pictures among their recommendations.
+            touch(Instrument.objects.filter(recommendations__related_instrument__in=pks))
+            # As on save: the written instruments, and those sharing an expert with them.
+            linked = Instrument.objects.filter(experts__instruments__in=pks).values_list('pk', flat=True)
+            queue_recommendations([*pks, *linked])
+        elif hasattr(model, 'instrument'):
+            # Both the new and the old parent's representation changed.
+            instrument_ids = {obj.instrument_id for obj in objs} | previous_instruments
+            touch(Instrument.objects.filter(pk__in=instrument_ids))
+        if static_api.is_enabled():
+            static_api.schedule(static_api.affected_by(objs) | static_api.details('instruments', previous_instruments))
@@ -0,0 +1,224 @@
+"""
+Versioned response cache for the read-only catalog endpoints.
+
+Each catalog model has a generation stamp in the cache, bumped by the signal
+handlers in ``catalog.signals`` whenever a row changes.  Cached responses are
+keyed by scheme, host, path, normalized query string and the generations of
+every model the view depends on (the bodies hold absolute URLs), so a write
+simply makes the old keys unreachable instead of having to find and delete
+them.
+
+The cache alias is ``CATALOG_CACHE_ALIAS`` (``default`` unless configured).
+Under Passenger every worker has its own memory, so production needs a shared
+backend (file-based or Redis) for invalidation to reach all processes.  The
+generation stamps go to ``CATALOG_GENERATION_CACHE_ALIAS``, a store small
+enough never to cull: a culled stamp would orphan every entry of its model.
+
+Each entry keeps the body with the validators it was sent with, so a hit,
+conditional or not, is answered without touching the ORM.  Views that also
+use ``ConditionalGetMixin`` list it after ``CachedResponseMixin``: its
+``updated_at`` query then only runs on a miss, and its validators (which
+survive writes to unrelated rows) are the ones stored.
+
+Hits and misses are counted per process by ``catalog.metrics`` rather than in
+the shared cache, which would cost a read-modify-write on every request.
+Only invalidations, which happen on writes, are counted in the cache.
+"""
+import hashlib
+import time
+from typing import NamedTuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from . import metrics, timing
+
+KEY_PREFIX = 'catalog'
+# Part of the entry keys; bump it when the stored tuple changes shape.
+ENTRY_FORMAT = 2
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+INVALIDATIONS_KEY = f'{KEY_PREFIX}:stats:invalidations'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def get_generation_cache():
+    alias = getattr(settings, 'CATALOG_GENERATION_CACHE_ALIAS', None)
+    return caches[alias] if alias else get_cache()
+
+
+def _generation_key(label: str) -> str:
+    return f'{KEY_PREFIX}:generation:{label}'
+
+
+def get_generations(labels: list[str]) -> dict[str, int]:
+    """
+    Return the generation stamp (ns since the epoch) for each model label.
+
+    Missing stamps are initialised to "now", never to a fixed value, so an
+    evicted counter can't come back as a generation that old entries used.
+    """
+    cache = get_generation_cache()
+    keys = {_generation_key(label): label for label in labels}
+    found = cache.get_many(list(keys))
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, timeout=None)
+        found.update(cache.get_many(list(missing)))
+    return {label: found.get(key, missing.get(key)) for key, label in keys.items()}
+
+
+def bump_generation(label: str) -> None:
+    cache = get_generation_cache()
+    cache.set(_generation_key(label), time.time_ns(), timeout=None)
+    try:
+        cache.incr(INVALIDATIONS_KEY)
+    except ValueError:
+        cache.add(INVALIDATIONS_KEY, 1, timeout=None)
+
+
+def record(stat: str) -> None:
+    """Note a cache ``'hits'`` or ``'misses'`` on the request's timings, for the metrics."""
+    timings = timing.current()
+    if timings is not None:
+        timings.cache = stat
+
+
+class Lookup(NamedTuple):
+    key: str
+    etag: str
+    last_modified: int | None
+
+
+def lookup(request, models, digest) -> Lookup:
+    """
+    Cache key and validators of a response depending on ``models``;
+    ``digest(request, generations)`` hashes the request.
+    """
+    generations = get_generations([model._meta.label_lower for model in models])
+    hexdigest = digest(request, generations)
+    last_modified = max(generations.values()) // 1_000_000_000 if generations else None
+    return Lookup(f'{KEY_PREFIX}:response:{ENTRY_FORMAT}:{hexdigest}', quote_etag(hexdigest), last_modified)
+
+
+def is_not_modified(request, etag: str | None, last_modified: int | None) -> bool:
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or (
+            etag is not None and etag in [tag.strip() for tag in if_none_match.split(',')]
+        )
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return last_modified is not None and if_modified_since is not None and last_modified <= if_modified_since
+
+
+def cached(request, entry: Lookup) -> HttpResponse | None:
+    """The stored response for ``entry``, or a 304 if the client has it; ``None`` on a miss."""
+    found = get_cache().get(entry.key)
+    if found is None:
+        record('misses')
+        return None
+    record('hits')
+    content, content_type, validators = found
+    last_modified = parse_http_date_safe(validators.get('Last-Modified', ''))
+    if is_not_modified(request, validators.get('ETag'), last_modified):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    for name, value in validators.items():
+        response[name] = value
+    return response
+
+
+def store(entry: Lookup, response, timeout: int) -> None:
+    """Keep a rendered 200 ``response`` under ``entry``, with its validators."""
+    validators = {name: response[name] for name in VALIDATOR_HEADERS if response.has_header(name)}
+    get_cache().set(entry.key, (response.content, response['Content-Type'], validators), timeout=timeout)
+
+
+def stats(totals: dict | None = None) -> dict[str, int]:
+    """
+    Hits and misses of all workers from ``metrics.collect()`` (``totals``, if
+    already collected) and the shared invalidation count.
+    """
+    if totals is None:
+        totals = metrics.collect()
+    counts = {'hits': 0, 'misses': 0}
+    for (_, _, result), value in totals.get('catalog_response_cache_lookups_total', {}).items():
+        if result in counts:
+            counts[result] += value
+    counts['invalidations'] = get_generation_cache().get(INVALIDATIONS_KEY, 0)
+    lookups = counts['hits'] + counts['misses']
+    counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else 0.0
+    return counts
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list`` and ``retrieve`` from the response cache.
+
+    Views declare the models their output depends on in ``cache_models``.
+    Only JSON responses are cached, which keeps them independent of the
+    requesting user.  Responses carry ``ETag`` and ``Last-Modified`` (from
+    ``ConditionalGetMixin`` if the view has it, else from the generations) and
+    conditional requests that hit the cache are answered with 304 without
+    touching the ORM.
+    """
+    cache_models = ()
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_timeout(self) -> int:
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60 * 24)
+
+    def get_response_cache_key(self, request, generations: dict[str, int]) -> str:
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        versions = ','.join(f'{label}={generations[label]}' for label in sorted(generations))
+        # Pagination links and media URLs are absolute, so the origin is part of the key.
+        origin = f'{request.scheme}://{request.get_host()}'
+        raw = f'{origin}{request.path}?{query}|{request.accepted_renderer.format}|{versions}'
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        entry = lookup(request, self.cache_models, self.get_response_cache_key)
+        response = cached(request, entry)
+        if response is not None:
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.response_cache_pending = entry
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        pending = getattr(self, 'response_cache_pending', None)
+        if pending is not None:
+            self.response_cache_pending = None
+            response.render()
+            self.set_validators(response, pending.etag, pending.last_modified)
+            store(pending, response, self.get_cache_timeout())
+        return response
+
+    @staticmethod
+    def set_validators(response, etag: str, last_modified: int | None) -> None:
+        # setdefault: validators from ConditionalGetMixin take precedence.
+        response.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.setdefault('Last-Modified', http_date(last_modified))
+        response.setdefault('Cache-Control', 'no-cache')
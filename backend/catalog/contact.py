@@ -0,0 +1,215 @@
+"""
+Ingestion of public contact-form messages.
+
+The contact form is the only anonymous write, so a burst of submissions
+must not turn into a burst of database writes that lock out catalog readers:
+
+* ``ContactThrottle`` is a per-IP token bucket kept in a cache shared by all
+  workers (``CONTACT_INGEST['CACHE_ALIAS']``, the response cache by default);
+* ``spam_score`` and ``is_duplicate`` are cheap checks that drop obvious spam
+  and resubmissions without a reply that would tell a bot what happened;
+* accepted messages are appended to a per-process spool file instead of
+  being inserted, and ``flush`` (run by ``run_media_worker`` or
+  ``flush_contacts``) moves them into the database with ``bulk_create``.
+
+Spool writers lock the file and check that it is still the live spool
+before writing, and ``flush`` renames a spool before locking and reading
+it, so a message is never written into a file that was already read.
+``flush`` keeps the lock until the messages are saved and the file is
+removed, and skips files that are locked, so two flushers (the media
+worker and a cron ``flush_contacts --once``) never save a message twice.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.throttling import BaseThrottle
+
+from .models import Contact
+from .transactions import retrying_atomic
+from .transfer import update_rows
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'contact'
+SPOOL_SUFFIX = '.ndjson'
+FLUSHING_SUFFIX = '.flushing'
+
+URL_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+SPAM_TERMS = (
+    'viagra', 'cialis', 'casino', 'betting', 'crypto', 'bitcoin', 'forex', 'loan offer', 'seo service',
+    'backlink', 'web traffic', 'porn', 'escort', 'earn money', 'work from home',
+)
+
+
+def get_option(name: str, default):
+    return getattr(settings, 'CONTACT_INGEST', {}).get(name, default)
+
+
+def get_cache():
+    return caches[get_option('CACHE_ALIAS', getattr(settings, 'CATALOG_CACHE_ALIAS', 'default'))]
+
+
+def get_spool_dir() -> Path:
+    return Path(get_option('SPOOL_DIR', Path(settings.BASE_DIR) / 'spool' / 'contact'))
+
+
+class ContactThrottle(BaseThrottle):
+    """
+    Token bucket per client IP: ``BURST`` submissions at once, refilled at
+    ``PER_MINUTE``.  Bucket updates are not atomic across processes, so under
+    a flood each worker may let one extra request through per refill.
+    """
+
+    def allow_request(self, request, view):
+        burst = get_option('BURST', 5)
+        rate = get_option('PER_MINUTE', 2) / 60
+        key = f'{KEY_PREFIX}:bucket:{self.get_ident(request)}'
+        cache = get_cache()
+        now = time.time()
+
+        tokens, updated = cache.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.wait_seconds = (1 - tokens) / rate if not allowed else None
+        # Expire once the bucket would be full again anyway.
+        cache.set(key, (tokens, now), timeout=int((burst - tokens) / rate) + 1)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+def spam_score(data: dict) -> int:
+    """Rough spam likelihood; ``SPAM_THRESHOLD`` and above is dropped."""
+    text = f"{data.get('subject', '')}\n{data.get('message', '')}".lower()
+    links = len(URL_RE.findall(text))
+    score = 2 * max(0, links - 1)
+    if links and len(URL_RE.sub('', text).split()) < 5:
+        score += 3
+    score += 2 * sum(term in text for term in SPAM_TERMS)
+    if URL_RE.search(data.get('name', '')):
+        score += 3
+    letters = [char for char in data.get('message', '') if char.isalpha()]
+    if len(letters) > 20 and sum(char.isupper() for char in letters) > 0.8 * len(letters):
+        score += 1
+    return score
+
+
+def fingerprint(data: dict) -> str:
+    message = ' '.join(data.get('message', '').lower().split())
+    return hashlib.sha1(f"{data.get('email', '').lower()}\n{message}".encode()).hexdigest()
+
+
+def is_duplicate(data: dict) -> bool:
+    """True if the same sender sent the same message within ``DUPLICATE_WINDOW`` seconds."""
+    key = f'{KEY_PREFIX}:seen:{fingerprint(data)}'
+    return not get_cache().add(key, 1, timeout=get_option('DUPLICATE_WINDOW', 24 * 60 * 60))
+
+
+def submit(data: dict) -> bool:
+    """Spool a validated message; returns False if it was dropped as spam or a duplicate."""
+    if spam_score(data) >= get_option('SPAM_THRESHOLD', 4):
+        logger.info('Dropped contact message from %s as spam', data.get('email'))
+        return False
+    if is_duplicate(data):
+        return False
+    record = {**data, 'created_at': time.time()}
+    append(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b'\n')
+    return True
+
+
+def append(line: bytes) -> None:
+    spool_dir = get_spool_dir()
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f'{os.getpid()}{SPOOL_SUFFIX}'
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if is_live(path, fd):
+                os.write(fd, line)
+                return
+        finally:
+            os.close(fd)
+        # ``flush`` renamed the file between our open and lock; start a new one.
+
+
+def is_live(path: Path, fd: int) -> bool:
+    """True if ``path`` still names the file open as ``fd``."""
+    try:
+        return os.stat(path).st_ino == os.fstat(fd).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def flush(batch_size: int = 500) -> int:
+    """Move spooled messages into the database; returns how many were saved."""
+    spool_dir = get_spool_dir()
+    if not spool_dir.is_dir():
+        return 0
+    # Files left by an interrupted flush go first.
+    claimed = sorted(spool_dir.glob(f'*{FLUSHING_SUFFIX}'))
+    for path in sorted(spool_dir.glob(f'*{SPOOL_SUFFIX}')):
+        target = path.with_name(f'{path.name}.{time.time_ns()}{FLUSHING_SUFFIX}')
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            continue
+        claimed.append(target)
+
+    saved = 0
+    for path in claimed:
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            # Another flusher saved it since the glob.
+            continue
+        with handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another flusher has it, or a writer that opened it before the
+                # rename is about to find out; the next flush picks it up.
+                continue
+            if not is_live(path, handle.fileno()):
+                # Saved and removed by a flusher that held the lock while we opened it.
+                continue
+            contacts = []
+            for number, line in enumerate(handle, 1):
+                try:
+                    record = json.loads(line)
+                    created_at = record.pop('created_at')
+                    contact = Contact(**{field: record[field] for field in ('name', 'email', 'subject', 'message')})
+                except (ValueError, KeyError, TypeError):
+                    logger.warning('Skipped unreadable line %d of %s', number, path)
+                    continue
+                # Submission time, not flush time.
+                contact.created_at = datetime.fromtimestamp(created_at, tz=timezone.utc)
+                contacts.append(contact)
+            # Still locked, so no other flusher can read the file until it is gone.
+            _save(contacts, batch_size)
+            path.unlink()
+        saved += len(contacts)
+    return saved
+
+
+@retrying_atomic
+def _save(contacts: list, batch_size: int) -> None:
+    submitted = [contact.created_at for contact in contacts]
+    # auto_now_add overwrites created_at on insert; put the submission time back.
+    Contact.objects.bulk_create(contacts, batch_size=batch_size)
+    for contact, created_at in zip(contacts, submitted):
+        contact.created_at = created_at
+    update_rows(Contact, contacts, ['created_at'])
@@ -0,0 +1,276 @@
+"""
+Ranged, streaming delivery of uploaded media files.
+
+Large assets (``.glb`` models, audio, video) are served with byte-range
+support, strong ETags and constant memory per client.  When a front server
+is configured through ``MEDIA_SENDFILE_BACKEND`` the transfer is handed off
+to it with ``X-Sendfile`` (Apache/lighttpd) or ``X-Accel-Redirect`` (nginx)
+and Django only sends headers.
+
+The serializers link media and expert files here (``/files/...``) rather
+than to ``MEDIA_URL``.  The URLs end in the file's name, so the client can
+still tell a ``.glb`` from an ``.mp3``, and a replaced upload gets a new URL.
+"""
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from . import images, timing
+from .models import AudioAnalysis, Media, Expert
+
+CHUNK_SIZE = 64 * 1024
+
+mimetypes.add_type('model/gltf-binary', '.glb')
+mimetypes.add_type('model/gltf+json', '.gltf')
+mimetypes.add_type('application/octet-stream', '.peaks')
+mimetypes.add_type('audio/wav', '.wav')
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Return the inclusive ``(start, end)`` of a single-range ``Range`` header.
+
+    Multi-range requests return ``None`` and are answered with the full body,
+    which RFC 9110 allows.  Raises ``ValueError`` for unsatisfiable ranges.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError('empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('range not satisfiable')
+    return start, end
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def iter_file_range(path: Path, start: int, length: int, chunk_size: int = CHUNK_SIZE):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def offload_response(path: Path, content_type: str) -> HttpResponse | None:
+    backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', None)
+    if backend == 'xsendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(path)
+        return response
+    if backend == 'nginx':
+        location = accel_redirect_location(path)
+        if location is None:
+            return None
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = location
+        return response
+    return None
+
+
+def accel_redirect_location(path: Path) -> str | None:
+    """
+    The nginx internal location of ``path``: MEDIA_ROOT maps to
+    ``MEDIA_ACCEL_REDIRECT_PREFIX`` and ``MEDIA_ACCEL_REDIRECT_LOCATIONS``
+    adds ``{directory: prefix}`` for the caches that may live elsewhere.  The
+    deepest directory holding the file wins; files under none of them
+    (``None``) are streamed by Django.
+    """
+    locations = {
+        Path(settings.MEDIA_ROOT): settings.MEDIA_ACCEL_REDIRECT_PREFIX,
+        **{Path(root): prefix for root, prefix in getattr(settings, 'MEDIA_ACCEL_REDIRECT_LOCATIONS', {}).items()},
+    }
+    for root in sorted(locations, key=lambda root: len(root.parts), reverse=True):
+        if path.is_relative_to(root):
+            return f"{locations[root].rstrip('/')}/{path.relative_to(root).as_posix()}"
+    return None
+
+
+def serve_path(request, path: Path):
+    try:
+        stat = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not path.is_file():
+        raise Http404('File not found')
+
+    content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        not_modified = etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    else:
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        not_modified = since is not None and last_modified <= since
+    if not_modified:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    offloaded = offload_response(path, content_type)
+    if offloaded is not None:
+        response = offloaded
+        # The front server answers any Range itself; count the whole file.
+        sent = stat.st_size
+    else:
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        # A stale If-Range validator means "send the whole new file".
+        if range_header and (if_range is None or if_range.strip() in (etag, http_date(last_modified))):
+            try:
+                byte_range = parse_range(range_header, stat.st_size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return response
+
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+            # Used only when the server has no wsgi.file_wrapper; the default is 4 KiB.
+            response.block_size = CHUNK_SIZE
+            sent = stat.st_size
+        else:
+            start, end = byte_range
+            length = sent = end - start + 1
+            response = StreamingHttpResponse(
+                iter_file_range(path, start, length), status=206, content_type=content_type
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+
+    timings = timing.current()
+    if timings is not None and request.method != 'HEAD':
+        timings.media_bytes += sent
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def serve_field_file(request, field_file, name: str, url_name: str):
+    if not field_file:
+        raise Http404('No file attached')
+    current = os.path.basename(field_file.name)
+    if name != current:
+        # A URL of a replaced upload: send the client to the current file.
+        return redirect(url_name, pk=field_file.instance.pk, name=current)
+    return serve_path(request, Path(field_file.path))
+
+
+@require_safe
+def media_file(request, pk, name):
+    media = get_object_or_404(Media.objects.only('file'), pk=pk)
+    return serve_field_file(request, media.file, name, 'media-file')
+
+
+@require_safe
+def expert_performance_video(request, pk, name):
+    expert = get_object_or_404(Expert.objects.only('performance_video'), pk=pk)
+    return serve_field_file(request, expert.performance_video, name, 'expert-performance-video')
+
+
+@require_safe
+def expert_teaching_audio(request, pk, name):
+    expert = get_object_or_404(Expert.objects.only('teaching_audio'), pk=pk)
+    return serve_field_file(request, expert.teaching_audio, name, 'expert-teaching-audio')
+
+
+def serve_audio_peaks(request, obj, field_file):
+    """The waveform peaks sidecar of ``field_file``, once the worker has built it."""
+    analysis = AudioAnalysis.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk, source=field_file.name
+    ).first()
+    if analysis is None or not analysis.peaks:
+        raise Http404('Peaks not available')
+    return serve_path(request, Path(analysis.peaks.path))
+
+
+@require_safe
+def media_peaks(request, pk):
+    media = get_object_or_404(Media.objects.only('file'), pk=pk)
+    return serve_audio_peaks(request, media, media.file)
+
+
+@require_safe
+def expert_teaching_audio_peaks(request, pk):
+    expert = get_object_or_404(Expert.objects.only('teaching_audio'), pk=pk)
+    return serve_audio_peaks(request, expert, expert.teaching_audio)
+
+
+@require_safe
+def image_derivative(request, model, pk, digest, width, fmt):
+    """
+    A resized photo, rendered on first request.  The URL carries the source
+    digest, so responses can be cached forever; URLs of a replaced upload
+    redirect to the current image.
+    """
+    field = images.IMAGE_SOURCES.get(model)
+    if field is None or fmt not in images.available_formats():
+        raise Http404('Unknown image variant')
+    obj = get_object_or_404(apps.get_model('catalog', model).objects.only(field), pk=pk)
+    source = getattr(obj, field)
+    if not source:
+        raise Http404('No file attached')
+    try:
+        info = images.describe(source.path)
+    except OSError:
+        raise Http404('File not found')
+    if width not in images.variant_widths(info.width):
+        raise Http404('Unknown image variant')
+    if digest != info.digest:
+        return redirect('image-derivative', model=model, pk=pk, digest=info.digest, width=width, fmt=fmt)
+
+    path = images.build(source.path, width, fmt, info)
+    images.maybe_evict()
+    response = serve_path(request, path)
+    if response.status_code in (200, 304):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@require_safe
+def serve_media_root(request, path):
+    """Drop-in replacement for ``django.views.static.serve`` on MEDIA_URL."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    return serve_path(request, Path(full_path))
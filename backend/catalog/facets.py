@@ -0,0 +1,128 @@
+"""
+Facet counts for the instrument list: ``?facets=category,region,is_featured``.
+
+The counts come from one grouped query.  It groups the instruments that pass
+the non-facet filters (``?search=``) by every facet column in play.  Each
+facet is then counted from those groups with the *other* facets' filters
+applied but not its own.  So ``?region=Mustang&facets=region`` still lists
+every region, with the counts a click on each would give.
+
+Results are cached by filter signature (the facet names and the filtering
+parameters), so paging, ordering and ``?fields=`` reuse them.  The key carries
+the Instrument and Category generations (see ``catalog.cache``).
+"""
+import hashlib
+import json
+
+from django.db.models import Count
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter
+from rest_framework.settings import api_settings
+
+from . import cache
+from .models import Category, Instrument
+
+# Facet -> (grouped columns, the first being its value; filters that select on it)
+FACETS = {
+    'category': (('category__slug', 'category__name'), ('category', 'category__in')),
+    'region': (('region',), ('region', 'region__in')),
+    'is_featured': (('is_featured',), ('is_featured',)),
+}
+FACET_FILTERS = {name for _, filters in FACETS.values() for name in filters}
+
+
+def requested_facets(request) -> list[str]:
+    raw = request.query_params.get('facets', '') if request is not None else ''
+    requested = set(raw.split(','))
+    return [name for name in FACETS if name in requested]
+
+
+def _normalize(facet: str, value):
+    # The category and region filters are case-insensitive.
+    return value.lower() if facet in ('category', 'region') else value
+
+
+def selections(filterset) -> dict[str, list[set]]:
+    """Per facet, the value sets its active filters allow (all must match)."""
+    cleaned = filterset.form.cleaned_data
+    selected = {}
+    for facet, (_, filters) in FACETS.items():
+        for name in filters:
+            value = cleaned.get(name)
+            if value is None or value == '' or value == []:
+                continue
+            values = value if isinstance(value, list) else [value]
+            selected.setdefault(facet, []).append({_normalize(facet, item) for item in values})
+    return selected
+
+
+def base_queryset(view):
+    """Instruments passing every filter of ``view`` except the facet filters."""
+    request = view.request
+    queryset = Instrument.objects.all()
+    for backend in view.filter_backends:
+        if issubclass(backend, OrderingFilter):
+            continue
+        if issubclass(backend, DjangoFilterBackend):
+            data = request.query_params.copy()
+            for name in FACET_FILTERS:
+                data.pop(name, None)
+            queryset = view.filterset_class(data, queryset=queryset, request=request).qs
+            continue
+        queryset = backend().filter_queryset(request, queryset, view)
+    return queryset
+
+
+def signature(view, names: list[str]) -> str:
+    """What the counts depend on: the facet names and every filtering parameter."""
+    params = view.request.query_params
+    keys = {*view.filterset_class.base_filters, api_settings.SEARCH_PARAM}
+    return json.dumps([names, sorted((key, sorted(params.getlist(key))) for key in keys if key in params)])
+
+
+def compute(view, filterset, names: list[str]) -> dict:
+    selected = selections(filterset)
+    dimensions = [facet for facet in FACETS if facet in names or facet in selected]
+    columns = [column for facet in dimensions for column in FACETS[facet][0]]
+    groups = list(base_queryset(view).order_by().values(*columns).annotate(count=Count('pk')))
+
+    facets = {}
+    for facet in names:
+        value_column = FACETS[facet][0][0]
+        counts, labels = {}, {}
+        for group in groups:
+            if not all(
+                _normalize(other, group[FACETS[other][0][0]]) in allowed
+                for other, value_sets in selected.items() if other != facet
+                for allowed in value_sets
+            ):
+                continue
+            value = group[value_column]
+            counts[value] = counts.get(value, 0) + group['count']
+            if facet == 'category':
+                labels[value] = group['category__name']
+        entries = []
+        for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0]))):
+            entry = {'value': value, 'count': count}
+            if facet == 'category':
+                entry['label'] = labels[value]
+            entries.append(entry)
+        facets[facet] = entries
+    return facets
+
+
+def facet_counts(view, names: list[str]) -> dict:
+    """Counts of the ``names`` facets for ``view``'s request; its filters are already validated."""
+    generations = cache.get_generations([model._meta.label_lower for model in (Instrument, Category)])
+    versions = ','.join(f'{label}={generations[label]}' for label in sorted(generations))
+    digest = hashlib.sha1(f'{signature(view, names)}|{versions}'.encode()).hexdigest()
+    key = f'{cache.KEY_PREFIX}:facets:{digest}'
+    store = cache.get_cache()
+    facets = store.get(key)
+    if facets is None:
+        request = view.request
+        filterset = view.filterset_class(request.query_params, queryset=Instrument.objects.all(), request=request)
+        filterset.is_valid()
+        facets = compute(view, filterset, names)
+        store.set(key, facets, timeout=view.get_cache_timeout())
+    return facets
@@ -1,12 +1,59 @@
 import django_filters
+from django.db.models import Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+from rest_framework.filters import SearchFilter
+
+from . import search
 from .models import Instrument
 
 
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Comma-separated values, e.g. ``?region__in=Mustang,Karnali``."""
+
+
 class InstrumentFilter(django_filters.FilterSet):
-    category = django_filters.CharFilter(field_name='category__slug', lookup_expr='iexact')
-    region = django_filters.CharFilter(field_name='region', lookup_expr='iexact')
+    category = django_filters.CharFilter(method='filter_category')
+    category__in = CharInFilter(method='filter_category_in')
+    region = django_filters.CharFilter(method='filter_region')
+    region__in = CharInFilter(method='filter_region_in')
     is_featured = django_filters.BooleanFilter(field_name='is_featured')
 
     class Meta:
         model = Instrument
-        fields = ['category', 'region', 'is_featured']
+        fields = ['category', 'category__in', 'region', 'region__in', 'is_featured']
+
+    # ``iexact`` compiles to LIKE on SQLite and UPPER() on PostgreSQL, and
+    # neither can use an index.  Slugs are lowercase, so an exact match on the
+    # unique index does; regions are compared through the LOWER(region) index.
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug=value.lower())
+
+    def filter_region(self, queryset, name, value):
+        return queryset.alias(region_ci=Lower('region')).filter(region_ci=Lower(Value(value)))
+
+    def filter_category_in(self, queryset, name, value):
+        return queryset.filter(category__slug__in=[slug.lower() for slug in value])
+
+    def filter_region_in(self, queryset, name, value):
+        return queryset.alias(region_ci=Lower('region')).filter(region_ci__in=[Lower(Value(region)) for region in value])
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ``SearchFilter`` that answers ``?search=`` from the full-text index for
+    views declaring a ``search_index_kind``; other views keep the default
+    ``icontains`` behaviour over ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_index_kind', None)
+        if kind is None:
+            return super().filter_queryset(request, queryset, view)
+
+        terms = search.tokenize(' '.join(self.get_search_terms(request)))
+        if not terms:
+            return queryset
+        sql, params = search.get_backend().matching_ids_sql(kind, terms)
+        return queryset.filter(pk__in=RawSQL(sql, params))
@@ -0,0 +1,436 @@
+"""
+Binary glTF (GLB) reader/writer and mesh optimizer.
+
+``optimize_glb`` rewrites a GLB so it is cheaper to download and parse:
+
+* nodes that are unreachable from any scene, and empty leaf nodes, are
+  dropped together with the meshes and accessors only they used;
+* identical vertices are merged and every primitive gets tight indices;
+* positions, normals and texture coordinates are quantized to 16/8-bit
+  integers (``KHR_mesh_quantization``, supported by three.js' GLTFLoader);
+* with ``grid`` set, triangles are simplified by vertex clustering to
+  produce a lower level of detail.
+
+Files using features the optimizer doesn't understand (external buffers,
+sparse accessors, Draco/meshopt compression) raise ``GLTFError`` so the
+caller can keep the original.
+"""
+import copy
+import json
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+GLB_MAGIC = b'glTF'
+JSON_CHUNK = 0x4E4F534A
+BIN_CHUNK = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+TRIANGLES = 4
+
+QUANTIZATION_EXTENSION = 'KHR_mesh_quantization'
+UNSUPPORTED_EXTENSIONS = {'KHR_draco_mesh_compression', 'EXT_meshopt_compression'}
+
+COMPONENT_DTYPES = {
+    5120: np.dtype(np.int8),
+    5121: np.dtype(np.uint8),
+    5122: np.dtype(np.int16),
+    5123: np.dtype(np.uint16),
+    5125: np.dtype(np.uint32),
+    5126: np.dtype(np.float32),
+}
+DTYPE_COMPONENTS = {dtype: component for component, dtype in COMPONENT_DTYPES.items()}
+TYPE_WIDTHS = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+WIDTH_TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4'}
+
+
+class GLTFError(ValueError):
+    pass
+
+
+class OptimizeResult(NamedTuple):
+    data: bytes
+    vertex_count: int
+    triangle_count: int
+
+
+def read_glb(data: bytes) -> tuple[dict, bytes]:
+    """Split a GLB container into its JSON document and binary chunk."""
+    if len(data) < 20 or data[:4] != GLB_MAGIC:
+        raise GLTFError('Not a binary glTF file')
+    version, length = struct.unpack_from('<II', data, 4)
+    if version != 2:
+        raise GLTFError(f'Unsupported glTF version {version}')
+
+    document, binary = None, b''
+    offset = 12
+    while offset + 8 <= min(length, len(data)):
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == JSON_CHUNK and document is None:
+            document = json.loads(chunk)
+        elif chunk_type == BIN_CHUNK and not binary:
+            binary = bytes(chunk)
+        offset += 8 + chunk_length
+    if document is None:
+        raise GLTFError('GLB file has no JSON chunk')
+    return document, binary
+
+
+def write_glb(document: dict, binary: bytes) -> bytes:
+    json_bytes = json.dumps(document, separators=(',', ':')).encode()
+    json_bytes += b' ' * (-len(json_bytes) % 4)
+    body = struct.pack('<II', len(json_bytes), JSON_CHUNK) + json_bytes
+    if binary:
+        binary += b'\0' * (-len(binary) % 4)
+        body += struct.pack('<II', len(binary), BIN_CHUNK) + binary
+    return struct.pack('<4sII', GLB_MAGIC, 2, 12 + len(body)) + body
+
+
+def read_accessor(document: dict, binary: bytes, index: int) -> np.ndarray:
+    """Return accessor ``index`` as a ``(count, width)`` array."""
+    accessor = document['accessors'][index]
+    if 'sparse' in accessor:
+        raise GLTFError('Sparse accessors are not supported')
+    dtype = COMPONENT_DTYPES[accessor['componentType']]
+    width = TYPE_WIDTHS[accessor['type']]
+    count = accessor['count']
+    if 'bufferView' not in accessor:
+        return np.zeros((count, width), dtype=dtype)
+
+    view = document['bufferViews'][accessor['bufferView']]
+    offset = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    stride = view.get('byteStride') or dtype.itemsize * width
+    array = np.ndarray(
+        (count, width), dtype=dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize)
+    )
+    return array.copy()
+
+
+class BufferBuilder:
+    """Packs accessors and raw views into a single, 4-byte aligned buffer."""
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.length = 0
+        self.views: list[dict] = []
+        self.accessors: list[dict] = []
+
+    def add_view(self, data: bytes, target: int | None = None) -> int:
+        padding = -self.length % 4
+        if padding:
+            self.parts.append(b'\0' * padding)
+            self.length += padding
+        view = {'buffer': 0, 'byteOffset': self.length, 'byteLength': len(data)}
+        if target is not None:
+            view['target'] = target
+        self.parts.append(data)
+        self.length += len(data)
+        self.views.append(view)
+        return len(self.views) - 1
+
+    def add_accessor(self, array: np.ndarray, target: int | None = None, normalized: bool = False,
+                     accessor_type: str | None = None, min_max: bool = False) -> int:
+        array = np.ascontiguousarray(array)
+        if array.ndim == 1:
+            array = array.reshape(-1, 1)
+        # Vertex attributes need 4-byte aligned elements (e.g. int16 VEC3).
+        row_bytes = array.shape[1] * array.itemsize
+        data = array
+        if target == ARRAY_BUFFER and row_bytes % 4:
+            pad = (-row_bytes % 4) // array.itemsize
+            data = np.concatenate([array, np.zeros((len(array), pad), dtype=array.dtype)], axis=1)
+        view_index = self.add_view(data.tobytes(), target)
+        if data is not array:
+            self.views[view_index]['byteStride'] = data.shape[1] * data.itemsize
+
+        accessor = {
+            'bufferView': view_index,
+            'componentType': DTYPE_COMPONENTS[array.dtype],
+            'count': len(array),
+            'type': accessor_type or WIDTH_TYPES[array.shape[1]],
+        }
+        if normalized:
+            accessor['normalized'] = True
+        if min_max and len(array):
+            cast = float if array.dtype.kind == 'f' else int
+            accessor['min'] = [cast(value) for value in array.min(axis=0)]
+            accessor['max'] = [cast(value) for value in array.max(axis=0)]
+        self.accessors.append(accessor)
+        return len(self.accessors) - 1
+
+    def getvalue(self) -> bytes:
+        return b''.join(self.parts)
+
+
+def prune_nodes(document: dict) -> None:
+    """Drop unreachable nodes, empty leaves and meshes nobody uses, in place."""
+    nodes = document.get('nodes', [])
+    if not nodes:
+        return
+    pinned = set()
+    for skin in document.get('skins', []):
+        pinned.update(skin.get('joints', []))
+        if 'skeleton' in skin:
+            pinned.add(skin['skeleton'])
+    for animation in document.get('animations', []):
+        for channel in animation.get('channels', []):
+            if 'node' in channel.get('target', {}):
+                pinned.add(channel['target']['node'])
+
+    scenes = document.get('scenes')
+    if scenes:
+        keep = set()
+        stack = [node for scene in scenes for node in scene.get('nodes', [])]
+        stack.extend(pinned)
+        while stack:
+            index = stack.pop()
+            if index not in keep:
+                keep.add(index)
+                stack.extend(nodes[index].get('children', []))
+    else:
+        keep = set(range(len(nodes)))
+
+    content_keys = ('mesh', 'camera', 'skin', 'extensions')
+    changed = True
+    while changed:
+        changed = False
+        for index in list(keep):
+            node = nodes[index]
+            children = [child for child in node.get('children', []) if child in keep]
+            if not children and index not in pinned and not any(key in node for key in content_keys):
+                keep.discard(index)
+                changed = True
+
+    remap = {old: new for new, old in enumerate(sorted(keep))}
+    new_nodes = []
+    for old in sorted(keep):
+        node = nodes[old]
+        if 'children' in node:
+            node['children'] = [remap[child] for child in node['children'] if child in remap]
+            if not node['children']:
+                del node['children']
+        new_nodes.append(node)
+    document['nodes'] = new_nodes
+    for scene in scenes or []:
+        scene['nodes'] = [remap[node] for node in scene.get('nodes', []) if node in remap]
+    for skin in document.get('skins', []):
+        skin['joints'] = [remap[joint] for joint in skin.get('joints', [])]
+        if 'skeleton' in skin:
+            skin['skeleton'] = remap[skin['skeleton']]
+    for animation in document.get('animations', []):
+        for channel in animation.get('channels', []):
+            if 'node' in channel.get('target', {}):
+                channel['target']['node'] = remap[channel['target']['node']]
+
+    used_meshes = sorted({node['mesh'] for node in new_nodes if 'mesh' in node})
+    mesh_remap = {old: new for new, old in enumerate(used_meshes)}
+    document['meshes'] = [document['meshes'][old] for old in used_meshes]
+    for node in new_nodes:
+        if 'mesh' in node:
+            node['mesh'] = mesh_remap[node['mesh']]
+
+
+def deduplicate(attributes: dict[str, np.ndarray], indices: np.ndarray) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Merge byte-identical vertices, keeping first-occurrence order."""
+    count = len(next(iter(attributes.values())))
+    rows = np.concatenate(
+        [np.ascontiguousarray(array).view(np.uint8).reshape(count, -1) for array in attributes.values()],
+        axis=1,
+    )
+    keys = np.ascontiguousarray(rows).view(np.dtype((np.void, rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    remap = rank[inverse.ravel()]
+    kept = first[order]
+    return {name: array[kept] for name, array in attributes.items()}, remap[indices]
+
+
+def cluster_simplify(attributes: dict[str, np.ndarray], indices: np.ndarray, grid: int):
+    """
+    Vertex-clustering simplification: snap vertices to a ``grid``-cells-wide
+    lattice over the bounding box, keep one vertex per cell and drop the
+    triangles that collapse.
+    """
+    positions = attributes['POSITION'].astype(np.float64)
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    cell = float((high - low).max()) / grid
+    if cell <= 0:
+        return attributes, indices
+    cells = np.floor((positions - low) / cell).astype(np.int64)
+    side = grid + 1
+    keys = (cells[:, 0] * side + cells[:, 1]) * side + cells[:, 2]
+    _, representative, cluster = np.unique(keys, return_index=True, return_inverse=True)
+
+    triangles = cluster.ravel()[indices].reshape(-1, 3)
+    valid = (
+        (triangles[:, 0] != triangles[:, 1])
+        & (triangles[:, 1] != triangles[:, 2])
+        & (triangles[:, 0] != triangles[:, 2])
+    )
+    triangles = triangles[valid]
+    _, unique_first = np.unique(np.sort(triangles, axis=1), axis=0, return_index=True)
+    triangles = triangles[np.sort(unique_first)]
+    return {name: array[representative] for name, array in attributes.items()}, triangles.ravel()
+
+
+def _quantize_unit(array: np.ndarray, dtype) -> np.ndarray:
+    info = np.iinfo(dtype)
+    scale = info.max
+    return np.clip(np.round(array * scale), info.min if info.min < 0 else 0, info.max).astype(dtype)
+
+
+def _mesh_is_quantizable(document: dict, mesh_index: int) -> bool:
+    mesh = document['meshes'][mesh_index]
+    if any('targets' in primitive for primitive in mesh['primitives']):
+        return False
+    return not any(node.get('mesh') == mesh_index and 'skin' in node for node in document.get('nodes', []))
+
+
+def optimize_glb(data: bytes, grid: int | None = None, quantize: bool = True) -> OptimizeResult:
+    document, binary = read_glb(data)
+    for buffer in document.get('buffers', []):
+        if 'uri' in buffer:
+            raise GLTFError('GLB files with external buffers are not supported')
+    if UNSUPPORTED_EXTENSIONS & set(document.get('extensionsUsed', [])):
+        raise GLTFError('Compressed glTF files are not supported')
+
+    document = copy.deepcopy(document)
+    prune_nodes(document)
+    builder = BufferBuilder()
+    copied: dict[int, int] = {}
+
+    def copy_accessor(index: int) -> int:
+        if index not in copied:
+            original = document['accessors'][index]
+            array = read_accessor(document, binary, index)
+            new_index = builder.add_accessor(
+                array,
+                normalized=original.get('normalized', False),
+                accessor_type=original['type'],
+            )
+            for key in ('min', 'max', 'name'):
+                if key in original:
+                    builder.accessors[new_index][key] = original[key]
+            copied[index] = new_index
+        return copied[index]
+
+    used_quantization = False
+    vertex_total = triangle_total = 0
+    dequantize_nodes = {}
+
+    for mesh_index, mesh in enumerate(document.get('meshes', [])):
+        prepared = []
+        for primitive in mesh['primitives']:
+            if 'targets' in primitive:
+                prepared.append(None)
+                continue
+            attributes = {
+                name: read_accessor(document, binary, index) for name, index in primitive['attributes'].items()
+            }
+            count = len(next(iter(attributes.values())))
+            if 'indices' in primitive:
+                indices = read_accessor(document, binary, primitive['indices']).ravel().astype(np.uint32)
+            else:
+                indices = np.arange(count, dtype=np.uint32)
+            if grid and primitive.get('mode', TRIANGLES) == TRIANGLES and 'POSITION' in attributes:
+                attributes, indices = cluster_simplify(attributes, indices, grid)
+            prepared.append((attributes, indices))
+
+        quantize_positions = (
+            quantize
+            and _mesh_is_quantizable(document, mesh_index)
+            and all(item is not None and 'POSITION' in item[0] for item in prepared)
+        )
+        if quantize_positions:
+            positions = np.concatenate([item[0]['POSITION'] for item in prepared]).astype(np.float64)
+            low, high = positions.min(axis=0), positions.max(axis=0)
+            center = (low + high) / 2
+            scale = float((high - low).max()) / 2 / 32767 or 1.0
+            dequantize_nodes[mesh_index] = (center, scale)
+
+        for primitive, item in zip(mesh['primitives'], prepared):
+            if item is None:
+                primitive['attributes'] = {
+                    name: copy_accessor(index) for name, index in primitive['attributes'].items()
+                }
+                if 'indices' in primitive:
+                    primitive['indices'] = copy_accessor(primitive['indices'])
+                primitive['targets'] = [
+                    {name: copy_accessor(index) for name, index in target.items()}
+                    for target in primitive['targets']
+                ]
+                continue
+
+            attributes, indices = item
+            normalized = set()
+            if quantize:
+                for name, array in list(attributes.items()):
+                    if name == 'POSITION' and quantize_positions:
+                        attributes[name] = np.round((array - center) / scale).astype(np.int16)
+                    elif name == 'NORMAL' and array.dtype == np.float32:
+                        attributes[name] = _quantize_unit(array, np.int8)
+                        normalized.add(name)
+                    elif name.startswith('TEXCOORD_') and array.dtype == np.float32 \
+                            and len(array) and array.min() >= 0 and array.max() <= 1:
+                        attributes[name] = _quantize_unit(array, np.uint16)
+                        normalized.add(name)
+                used_quantization = used_quantization or quantize_positions or bool(normalized)
+
+            attributes, indices = deduplicate(attributes, indices)
+            vertex_count = len(next(iter(attributes.values())))
+            index_dtype = np.uint16 if vertex_count < 65535 else np.uint32
+
+            primitive['attributes'] = {
+                name: builder.add_accessor(
+                    array, ARRAY_BUFFER, normalized=name in normalized, min_max=name == 'POSITION'
+                )
+                for name, array in attributes.items()
+            }
+            primitive['indices'] = builder.add_accessor(indices.astype(index_dtype), ELEMENT_ARRAY_BUFFER)
+            vertex_total += vertex_count
+            if primitive.get('mode', TRIANGLES) == TRIANGLES:
+                triangle_total += len(indices) // 3
+
+    for skin in document.get('skins', []):
+        if 'inverseBindMatrices' in skin:
+            skin['inverseBindMatrices'] = copy_accessor(skin['inverseBindMatrices'])
+    for animation in document.get('animations', []):
+        for sampler in animation.get('samplers', []):
+            sampler['input'] = copy_accessor(sampler['input'])
+            sampler['output'] = copy_accessor(sampler['output'])
+
+    for image in document.get('images', []):
+        if 'bufferView' in image:
+            view = document['bufferViews'][image['bufferView']]
+            start = view.get('byteOffset', 0)
+            image['bufferView'] = builder.add_view(binary[start:start + view['byteLength']])
+
+    # Quantized positions are decoded by a child node carrying the mesh with
+    # a translate+scale matrix; the original node keeps its own transform.
+    nodes = document.get('nodes', [])
+    for index in range(len(nodes)):
+        node = nodes[index]
+        if node.get('mesh') in dequantize_nodes:
+            center, scale = dequantize_nodes[node['mesh']]
+            nodes.append({
+                'mesh': node.pop('mesh'),
+                'matrix': [scale, 0, 0, 0, 0, scale, 0, 0, 0, 0, scale, 0,
+                           float(center[0]), float(center[1]), float(center[2]), 1],
+            })
+            node.setdefault('children', []).append(len(nodes) - 1)
+
+    document['accessors'] = builder.accessors
+    document['bufferViews'] = builder.views
+    payload = builder.getvalue()
+    document['buffers'] = [{'byteLength': len(payload)}] if payload else []
+    if used_quantization:
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            extensions = document.setdefault(key, [])
+            if QUANTIZATION_EXTENSION not in extensions:
+                extensions.append(QUANTIZATION_EXTENSION)
+    return OptimizeResult(write_glb(document, payload), vertex_total, triangle_total)
@@ -0,0 +1,229 @@
+"""
+Responsive derivatives of instrument and expert photos.
+
+Each source image is resized to ``IMAGE_DERIVATIVE_WIDTHS`` in every format
+this Pillow build can write (AVIF needs libavif, WebP and JPEG are always
+there).  Derivatives live under ``IMAGE_DERIVATIVE_CACHE_DIR`` named by the
+SHA-256 of the source file, so a new upload gets new URLs and files of
+replaced uploads simply age out: serving a derivative refreshes its mtime,
+and ``evict`` removes the least recently used files once the directory grows
+past ``IMAGE_DERIVATIVE_CACHE_MAX_BYTES``.
+
+Hashing a photo is too slow for the request path, so the digest and width
+are saved with the row (``<field>_info``, see ``info_record``) when it is
+saved or its derivatives are built, and ``srcset`` renders from that.
+
+Nothing here touches the ORM, so ``build_all`` can run in a process pool.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+# Image field holding the source upload, by model name; ``<field>_info`` holds its ``info_record``.
+IMAGE_SOURCES = {
+    'instrument': 'primary_image',
+    'expert': 'photo',
+}
+
+# Most compact first, which is also the order browsers should try them in.
+FORMATS = ('avif', 'webp', 'jpeg')
+SAVE_OPTIONS = {
+    'avif': {'format': 'AVIF', 'quality': 60},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+# Serving refreshes a derivative's mtime at most this often (seconds).
+TOUCH_INTERVAL = 60 * 60
+EVICT_INTERVAL = 60
+_last_eviction = 0.0
+
+
+class SourceInfo(NamedTuple):
+    digest: str
+    width: int
+
+
+def get_widths() -> tuple[int, ...]:
+    return tuple(sorted(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 1024))))
+
+
+def get_cache_dir() -> Path:
+    return Path(getattr(settings, 'IMAGE_DERIVATIVE_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'derivatives'))
+
+
+@lru_cache(maxsize=1)
+def available_formats() -> tuple[str, ...]:
+    Image.init()
+    return tuple(fmt for fmt in FORMATS if SAVE_OPTIONS[fmt]['format'] in Image.SAVE)
+
+
+@lru_cache(maxsize=4096)
+def _describe(path: str, size: int, mtime_ns: int) -> SourceInfo:
+    with open(path, 'rb') as handle:
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        handle.seek(0)
+        with Image.open(handle) as image:
+            # Only the header is read; EXIF rotation may swap the axes.
+            width, height = image.size
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                width = height
+    return SourceInfo(digest[:32], width)
+
+
+def describe(path: str | os.PathLike) -> SourceInfo:
+    """Digest and display width of a source image, memoized on size and mtime."""
+    stat = os.stat(path)
+    return _describe(os.fspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def info_record(name: str, info: SourceInfo) -> dict:
+    """What a row stores about its image: the digest and width of the upload called ``name``."""
+    return {'source': name, 'digest': info.digest, 'width': info.width}
+
+
+def stored_info(record: dict | None, name: str | None) -> SourceInfo | None:
+    """The ``SourceInfo`` in ``record`` if it describes the current upload ``name``."""
+    if not record or not name or record.get('source') != name:
+        return None
+    return SourceInfo(record['digest'], record['width'])
+
+
+def variant_widths(source_width: int) -> list[int]:
+    """Configured widths, capped at the source width since images are never upscaled."""
+    return sorted({min(width, source_width) for width in get_widths()})
+
+
+def derivative_path(digest: str, width: int, fmt: str, cache_dir: Path | None = None) -> Path:
+    return (cache_dir or get_cache_dir()) / digest[:2] / f'{digest}-{width}.{fmt}'
+
+
+def render(source_path: str | os.PathLike, width: int, fmt: str) -> bytes:
+    with Image.open(source_path) as image:
+        # Lets the JPEG decoder downscale by a power of two while decoding.
+        image.draft('RGB', (width, width * 4))
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+        if fmt == 'jpeg' or not has_alpha:
+            if has_alpha:
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image.convert('RGBA'), mask=image.convert('RGBA'))
+                image = background
+            else:
+                image = image.convert('RGB')
+        else:
+            image = image.convert('RGBA')
+
+        output = io.BytesIO()
+        image.save(output, **SAVE_OPTIONS[fmt])
+        return output.getvalue()
+
+
+def build(source_path: str | os.PathLike, width: int, fmt: str, info: SourceInfo | None = None) -> Path:
+    """Return the derivative's path, rendering it first if it is not cached."""
+    info = info or describe(source_path)
+    path = derivative_path(info.digest, width, fmt)
+    if path.exists():
+        touch(path)
+        return path
+
+    data = render(source_path, width, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so concurrent requests never see a partial file.
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return path
+
+
+def build_all(source_path: str) -> tuple[SourceInfo, int]:
+    """Render every width and format of one source; returns its info and how many were new."""
+    info = describe(source_path)
+    built = 0
+    for width in variant_widths(info.width):
+        for fmt in available_formats():
+            if not derivative_path(info.digest, width, fmt).exists():
+                build(source_path, width, fmt, info)
+                built += 1
+    return info, built
+
+
+def is_built(source_path: str | os.PathLike, info: SourceInfo | None = None) -> bool:
+    info = info or describe(source_path)
+    return all(
+        derivative_path(info.digest, width, fmt).exists()
+        for width in variant_widths(info.width)
+        for fmt in available_formats()
+    )
+
+
+def touch(path: Path) -> None:
+    """Mark a derivative as recently used for ``evict``."""
+    try:
+        if time.time() - path.stat().st_mtime > TOUCH_INTERVAL:
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict(max_bytes: int | None = None) -> int:
+    """
+    Delete least recently used derivatives until the cache is under 90% of
+    ``max_bytes``.  Returns the number of files removed.
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'IMAGE_DERIVATIVE_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+    entries = []
+    total = 0
+    for root, _dirs, files in os.walk(get_cache_dir()):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    target = max_bytes * 0.9
+    for _mtime, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def maybe_evict() -> None:
+    """Run ``evict`` at most once per ``EVICT_INTERVAL`` in this process."""
+    global _last_eviction
+    now = time.monotonic()
+    if now - _last_eviction >= EVICT_INTERVAL:
+        _last_eviction = now
+        evict()
@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from catalog import pitch, tuning
+from catalog.models import Instrument, TunerConfiguration
+
+
+class Command(BaseCommand):
+    help = "Detect stable pitches in each instrument's recording and suggest tuner configurations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Size of the process pool.')
+        parser.add_argument('--apply', action='store_true', help='Save the suggestions as tuner configurations.')
+        parser.add_argument(
+            '--overwrite', action='store_true', help='With --apply, also replace existing tuner configurations.'
+        )
+
+    def handle(self, *args, **options):
+        configured = set(TunerConfiguration.objects.values_list('instrument_id', flat=True))
+        jobs = []
+        for instrument in Instrument.objects.prefetch_related('media'):
+            if options['apply'] and not options['overwrite'] and instrument.pk in configured:
+                continue
+            media = tuning.find_recording(instrument)
+            if media is not None:
+                jobs.append((instrument, media))
+
+        # Forked workers must not share the parent's database connection.
+        connections.close_all()
+        applied = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(pitch.analyze_file, media.file.path): (instrument, media) for instrument, media in jobs}
+            for future in as_completed(futures):
+                instrument, media = futures[future]
+                try:
+                    analysis = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{instrument.name} ({media.file.name}): {exc}')
+                    continue
+                notes, frequencies = pitch.suggest_tuning(analysis)
+                self.stdout.write(f"{instrument.name}: {', '.join(f'{n} {f:.2f} Hz' for n, f in zip(notes, frequencies)) or 'no stable pitches'}")
+                if options['apply'] and notes:
+                    tuning.apply_suggestion(instrument, analysis)
+                    applied += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Analyzed {len(jobs) - failed} recordings ({failed} failed, {applied} configurations saved).'
+        ))
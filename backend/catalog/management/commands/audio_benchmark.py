@@ -0,0 +1,95 @@
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from catalog import audio, benchmark
+
+MIB = 1024 * 1024
+
+
+def write_recording(path: Path, minutes: float, rate: int, channels: int) -> None:
+    """16-bit PCM of a plucked-note melody over noise, written ten seconds at a time."""
+    rng = np.random.default_rng(0)
+    notes = 220 * 2 ** (np.arange(12) / 12)
+    total = int(minutes * 60 * rate)
+    with wave.open(str(path), 'wb') as output:
+        output.setnchannels(channels)
+        output.setsampwidth(2)
+        output.setframerate(rate)
+        for start in range(0, total, 10 * rate):
+            t = np.arange(start, min(start + 10 * rate, total)) / rate
+            note = notes[(t * 2).astype(int) % len(notes)]
+            envelope = np.exp(-4 * (t % 0.5))
+            mono = 0.5 * envelope * np.sin(2 * np.pi * note * t) + 0.01 * rng.standard_normal(len(t))
+            frames = np.repeat(mono[:, None], channels, axis=1)
+            output.writeframes((np.clip(frames, -1, 1) * 32767).astype('<i2').tobytes())
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the audio worker job (catalog.audio.analyze plus encode_peaks) on a generated WAV recording '
+        '(10 minutes of 44.1 kHz stereo by default) or the given file, and report its speed against real '
+        'time, peak Python allocations and sidecar size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, default=10.0, help='Length of the generated recording.')
+        parser.add_argument('--rate', type=int, default=44100, help='Sample rate of the generated recording.')
+        parser.add_argument('--channels', type=int, default=2, help='Channels of the generated recording.')
+        parser.add_argument('--path', help='Analyze this WAV file instead of a generated one.')
+        parser.add_argument('--rounds', type=int, default=3, help='Timed analyses.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as scratch:
+            if options['path']:
+                path = Path(options['path'])
+            else:
+                path = Path(scratch) / 'recording.wav'
+                write_recording(path, options['minutes'], options['rate'], options['channels'])
+            info = audio.read_wav_info(path)
+            duration = info.frames / info.sample_rate
+            size = path.stat().st_size
+
+            samples = []
+            for _ in range(options['rounds']):
+                started = time.perf_counter()
+                sidecar = audio.encode_peaks(audio.analyze(path))
+                samples.append(time.perf_counter() - started)
+
+            # Separately: tracing NumPy's allocations slows the analysis down.
+            tracemalloc.start()
+            summary = audio.analyze(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        stats = benchmark.summarize(samples)
+        seconds = stats['p50_ms'] / 1000
+        self.stderr.write(
+            f'{duration / 60:.1f} min, {info.sample_rate} Hz, {info.channels} ch, {info.bits}-bit, '
+            f'{size / MIB:.1f} MiB\n'
+            f'analyze + encode_peaks: {seconds:.2f}s ({duration / seconds:.0f}x real time, '
+            f'{size / MIB / seconds:.0f} MiB/s)\n'
+            f'peak Python allocations {peak / MIB:.1f} MiB; sidecar {len(sidecar) / 1024:.0f} KiB '
+            f'({len(summary.levels)} levels); loudness {summary.loudness_db} dB, gain {summary.gain_db} dB'
+        )
+        results = {
+            'analyze': stats,
+            'realtime_factor': round(duration / seconds, 1),
+            'peak_alloc_mib': round(peak / MIB, 2),
+            'sidecar_bytes': len(sidecar),
+        }
+        config = {
+            'seconds': round(duration, 2), 'sample_rate': info.sample_rate, 'channels': info.channels,
+            'bits': info.bits, 'bytes': size, 'rounds': options['rounds'],
+        }
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
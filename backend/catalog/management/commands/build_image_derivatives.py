@@ -0,0 +1,48 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from catalog import images, processing
+from catalog.models import Instrument, Expert
+
+
+class Command(BaseCommand):
+    help = (
+        'Render responsive image sizes for every instrument image and expert photo, and store the digest '
+        'and width their srcset is built from.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Size of the process pool.')
+
+    def handle(self, *args, **options):
+        owners = {}
+        for model in (Instrument, Expert):
+            field = images.IMAGE_SOURCES[model._meta.model_name]
+            objs = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).only(field, f'{field}_info')
+            for obj in objs:
+                owners.setdefault(getattr(obj, field).path, []).append(obj)
+
+        # Forked workers must not share the parent's database connection.
+        connections.close_all()
+        built = failed = stored = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(images.build_all, path): path for path in sorted(owners)}
+            for future in as_completed(futures):
+                try:
+                    info, count = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{futures[future]}: {exc}')
+                    continue
+                built += count
+                for obj in owners[futures[future]]:
+                    stored += processing.store_image_info(obj, info)
+
+        removed = images.evict()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {built} derivatives from {len(owners)} images ({failed} failed, {removed} evicted); '
+            f'stored the digest of {stored}.'
+        ))
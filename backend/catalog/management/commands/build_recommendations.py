@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the similar instruments and recommended experts of every instrument. Changes in between '
+        'are applied incrementally by run_media_worker; a full rebuild also refreshes the word weights.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Instruments per write transaction.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f'{done}/{total} instruments ({time.perf_counter() - started:.1f}s)')
+
+        total, changed = recommendations.rebuild(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recommendations of {total} instruments rebuilt in {time.perf_counter() - started:.1f}s; '
+            f'{changed} lists changed.'
+        ))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import static_api
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the public catalog endpoints to STATIC_API_ROOT as JSON files with .gz/.br siblings. '
+        'Later changes rebuild only the affected files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help='Files to rebuild, e.g. "instruments" or "experts/3" (default: everything, removing stale files).',
+        )
+        parser.add_argument('--root', help='Output directory (default: STATIC_API_ROOT).')
+
+    def handle(self, *args, **options):
+        names = options['names'] or None
+        for name in names or ():
+            kind, _, pk = name.partition('/')
+            if (kind not in static_api.DETAILS if pk else kind not in static_api.LISTS) or (pk and not pk.isdigit()):
+                raise CommandError(f'Unknown file "{name}".')
+
+        started = time.perf_counter()
+        try:
+            stats = static_api.build(names, root=static_api.Path(options['root']) if options['root'] else None)
+        except static_api.StaticAPIError as exc:
+            raise CommandError(str(exc))
+        if static_api.brotli is None:
+            self.stderr.write('brotli is not installed; only .gz siblings were written.')
+        self.stdout.write(
+            f"{stats['written']} files written ({stats['bytes'] / 1024:.0f} KiB with siblings), "
+            f"{stats['removed']} removed, {stats['failed']} failed in {time.perf_counter() - started:.1f}s."
+        )
+        if stats['failed']:
+            raise CommandError('Some files could not be rendered; see the log.')
@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from catalog import benchmark
+from catalog.models import Category, Instrument, Tutorial
+
+
+class Command(BaseCommand):
+    help = (
+        'Update --items tutorials with one PATCH /tutorials/bulk/ against one PATCH /tutorials/<pk>/ each, '
+        'and create them with one POST /tutorials/bulk/, through the full middleware stack as a staff user. '
+        'Everything runs in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000, help='Tutorials per batch (at most bulk_max_items).')
+        parser.add_argument('--rounds', type=int, default=3, help='Repetitions of each case.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        # Cached responses and their invalidation would only add noise.
+        dummy = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        results = {}
+        with override_settings(CACHES=dummy), transaction.atomic():
+            self.run(options['items'], options['rounds'], options['host'], results)
+            transaction.set_rollback(True)
+
+        config = {'items': options['items'], 'rounds': options['rounds']}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
+
+    def run(self, items: int, rounds: int, host: str, results: dict) -> None:
+        client = Client(HTTP_HOST=host)
+        client.force_login(User.objects.create_user('bulk-benchmark', is_staff=True))
+        category = Category.objects.create(name='Bulk benchmark', slug='bulk-benchmark')
+        instrument = Instrument.objects.create(name='Bulk benchmark', category=category, region='', description='')
+        new = [
+            {
+                'instrument': instrument.pk,
+                'title': f'Lesson {index}',
+                'description': 'The first rhythm cycles.',
+                'video_url': 'https://example.com/video',
+                'instructor_name': 'Ram Shrestha',
+            }
+            for index in range(items)
+        ]
+        bulk_url = reverse('tutorial-bulk')
+
+        def send(method, url, data, expected):
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data, content_type='application/json')
+            elapsed = time.perf_counter() - started
+            if response.status_code != expected:
+                raise CommandError(f'{method.upper()} {url} answered {response.status_code}.')
+            return elapsed, response
+
+        cases = {'batch POST': [], 'batch PATCH': [], 'single PATCH': []}
+        for round_number in range(rounds):
+            elapsed, response = send('post', bulk_url, new, 201)
+            cases['batch POST'].append(elapsed)
+            pks = [item['id'] for item in response.json()]
+
+            elapsed, _ = send(
+                'patch', bulk_url, [{'id': pk, 'description': f'Batch edit {round_number}'} for pk in pks], 200
+            )
+            cases['batch PATCH'].append(elapsed)
+
+            total = 0.0
+            for pk in pks:
+                elapsed, _ = send(
+                    'patch', reverse('tutorial-detail', args=[pk]), {'description': f'Single edit {round_number}'}, 200
+                )
+                total += elapsed
+            cases['single PATCH'].append(total)
+            Tutorial.objects.filter(pk__in=pks).delete()
+
+        self.stderr.write(f"{items} tutorials\n{'case':<14}{'p50':>10}{'per item':>12}")
+        for label, samples in cases.items():
+            stats = results[label] = benchmark.summarize(samples)
+            self.stderr.write(f"{label:<14}{stats['p50_ms']:>8.0f}ms{stats['p50_ms'] * 1000 / items:>10.0f}us")
+        speedup = results['single PATCH']['p50_ms'] / results['batch PATCH']['p50_ms']
+        results['batch PATCH speedup'] = round(speedup, 1)
+        self.stderr.write(f'batch PATCH is {speedup:.0f}x faster than single PATCHes')
@@ -0,0 +1,64 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from catalog import timing
+from catalog.management.commands.explain_queries import endpoints
+
+
+class Collector(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.entries = []
+
+    def emit(self, record):
+        self.entries.append(json.loads(record.getMessage()))
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the catalog's read endpoints with a cold cache and fail when one runs more queries than "
+        "the query_budgets its viewset declares."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Endpoints to check (default: the built-in list).')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--strict', action='store_true', help='Also fail on endpoints without a budget.')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'])
+        collector = Collector()
+        logger = logging.getLogger(timing.__name__)
+        previous_handlers, previous_level = logger.handlers, logger.level
+        logger.handlers = [collector]
+        logger.setLevel(logging.INFO)
+        failures = []
+        # Cached responses would skip the queries being counted.
+        dummy = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        try:
+            with override_settings(CACHES=dummy):
+                for path in options['paths'] or endpoints():
+                    collector.entries.clear()
+                    client.get(path)
+                    entry = collector.entries[-1]
+                    budget = entry.get('query_budget')
+                    self.stdout.write(
+                        f"{entry['status']} {path} {entry['view'] or '-'}: {entry['queries']} queries"
+                        f"{f' (budget {budget})' if budget is not None else ' (no budget)'}"
+                    )
+                    if budget is not None and entry['queries'] > budget:
+                        failures.append(f"{path}: {entry['queries']} queries, budget {budget}")
+                    elif budget is None and options['strict']:
+                        failures.append(f'{path}: no query budget')
+        finally:
+            logger.handlers = previous_handlers
+            logger.setLevel(previous_level)
+
+        if failures:
+            raise CommandError('\n'.join(['Over budget:', *failures]))
+        self.stdout.write(self.style.SUCCESS('All endpoints within their query budgets.'))
@@ -0,0 +1,102 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def request(host: str, port: int, path: str, host_header: str, header_delay: float = 0.0, extra_headers: int = 0):
+    """One ``Connection: close`` GET; slow clients trickle ``extra_headers`` header lines first."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host_header}\r\nAccept: application/json\r\n'.encode())
+        for number in range(extra_headers):
+            await writer.drain()
+            await asyncio.sleep(header_delay)
+            writer.write(f'X-Slow-{number}: 1\r\n'.encode())
+        writer.write(b'Connection: close\r\n\r\n')
+        await writer.drain()
+        data = await reader.read()
+    finally:
+        writer.close()
+    status = data.split(b' ', 2)[1] if data.startswith(b'HTTP/') else b'0'
+    return int(status)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure how many concurrent connections a running server keeps serving: slow clients trickle their '
+        'request headers while fast clients time plain GETs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='e.g. http://127.0.0.1:8000/api/instruments/')
+        parser.add_argument('--slow', type=int, default=50, help='Clients that take --hold seconds to send a request.')
+        parser.add_argument('--hold', type=float, default=5.0)
+        parser.add_argument('--fast', type=int, default=4, help='Clients sending requests back to back.')
+        parser.add_argument('--seconds', type=float, default=15.0)
+        parser.add_argument('--timeout', type=float, default=10.0, help='A fast request slower than this failed.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Give an http:// URL.')
+        target = (url.hostname, url.port or 80, url.path + (f'?{url.query}' if url.query else ''), options['host'])
+        results = asyncio.run(self.run(target, options))
+
+        slow, fast, timeouts, errors = results
+        self.stdout.write(
+            f"slow clients: {len(slow)} requests finished, "
+            f"{sum(status == 200 for status in slow)} OK, {options['slow']} connections held"
+        )
+        if fast:
+            latencies = sorted(fast)
+            p95 = latencies[int(len(latencies) * 0.95)] if len(latencies) > 1 else latencies[0]
+            self.stdout.write(
+                f"fast clients: {len(fast)} OK ({len(fast) / options['seconds']:.1f}/s), "
+                f"p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+                f"max {latencies[-1] * 1000:.1f} ms"
+            )
+        self.stdout.write(f'fast clients: {timeouts} timed out, {errors} failed')
+
+    async def run(self, target, options):
+        host, port, path, host_header = target
+        deadline = time.monotonic() + options['seconds']
+        steps = 10
+        slow, fast = [], []
+        failures = {'timeouts': 0, 'errors': 0}
+
+        async def slow_client():
+            while time.monotonic() < deadline:
+                try:
+                    slow.append(await request(host, port, path, host_header, options['hold'] / steps, steps))
+                except OSError:
+                    await asyncio.sleep(0.1)
+
+        async def fast_client():
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    status = await asyncio.wait_for(request(host, port, path, host_header), options['timeout'])
+                except asyncio.TimeoutError:
+                    failures['timeouts'] += 1
+                    continue
+                except OSError:
+                    failures['errors'] += 1
+                    await asyncio.sleep(0.1)
+                    continue
+                if status == 200:
+                    fast.append(time.monotonic() - started)
+                else:
+                    failures['errors'] += 1
+
+        slow_tasks = [asyncio.create_task(slow_client()) for _ in range(options['slow'])]
+        # Let the slow clients take their connections first.
+        await asyncio.sleep(0.5)
+        await asyncio.gather(*(fast_client() for _ in range(options['fast'])))
+        for task in slow_tasks:
+            task.cancel()
+        await asyncio.gather(*slow_tasks, return_exceptions=True)
+        return slow, fast, failures['timeouts'], failures['errors']
@@ -0,0 +1,120 @@
+import multiprocessing
+import statistics
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+
+from catalog import contact
+from catalog.models import Contact
+
+SUBJECT = 'flood test'
+
+
+def reader(deadline: float, host: str, results) -> None:
+    connections.close_all()
+    client = Client(HTTP_HOST=host)
+    timings = []
+    while time.time() < deadline:
+        started = time.perf_counter()
+        client.get('/api/instruments/')
+        timings.append(time.perf_counter() - started)
+        time.sleep(0.01)
+    results.put(('reader', timings))
+
+
+def flooder(index: int, rate: float, deadline: float, host: str, distinct_ips: bool, results) -> None:
+    connections.close_all()
+    client = Client(HTTP_HOST=host)
+    sent = accepted = 0
+    started = time.time()
+    while time.time() < deadline:
+        sent += 1
+        address = f'10.{index}.{sent // 250 % 250}.{sent % 250}' if distinct_ips else '10.0.0.1'
+        response = client.post('/api/contact/', {
+            'name': 'Flood', 'email': f'flood{index}@example.com', 'subject': SUBJECT,
+            'message': f'Message {index}-{sent} about learning the madal.',
+        }, content_type='application/json', REMOTE_ADDR=address)
+        accepted += response.status_code < 300
+        # Pace towards the target rate; a saturated machine simply falls behind.
+        delay = started + sent / rate - time.time()
+        if delay > 0:
+            time.sleep(delay)
+    results.put(('flooder', (sent, accepted)))
+
+
+def flusher(deadline: float, results) -> None:
+    connections.close_all()
+    saved = 0
+    while time.time() < deadline:
+        saved += contact.flush()
+        time.sleep(1)
+    results.put(('flusher', saved))
+
+
+class Command(BaseCommand):
+    help = 'Measure /api/instruments/ latency without and then during a flood of contact-form posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=float, default=1000.0, help='Target contact posts per second in total.')
+        parser.add_argument('--flooders', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=10.0, help='Length of each phase.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument(
+            '--same-ip', action='store_true', help='Flood from one address, so the throttle rejects most posts.'
+        )
+
+    def run_phase(self, options, flood: bool) -> dict:
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.time() + options['seconds']
+        processes = [context.Process(target=reader, args=(deadline, options['host'], results))]
+        if flood:
+            processes.append(context.Process(target=flusher, args=(deadline, results)))
+            processes += [
+                context.Process(
+                    target=flooder,
+                    args=(index, options['rate'] / options['flooders'], deadline, options['host'],
+                          not options['same_ip'], results),
+                )
+                for index in range(options['flooders'])
+            ]
+        for process in processes:
+            process.start()
+        collected = {'reader': [], 'sent': 0, 'accepted': 0, 'saved': 0}
+        for _ in processes:
+            role, value = results.get()
+            if role == 'reader':
+                collected['reader'] = value
+            elif role == 'flooder':
+                collected['sent'] += value[0]
+                collected['accepted'] += value[1]
+            else:
+                collected['saved'] = value
+        for process in processes:
+            process.join()
+        if flood:
+            # Whatever the flooders spooled after the flusher's last pass.
+            collected['saved'] += contact.flush()
+        return collected
+
+    def report(self, label: str, result: dict, seconds: float) -> None:
+        timings = sorted(result['reader'])
+        p50 = statistics.median(timings) * 1000
+        p95 = timings[int(len(timings) * 0.95)] * 1000
+        line = f'{label}: /api/instruments/ p50 {p50:.1f} ms, p95 {p95:.1f} ms ({len(timings)} requests)'
+        if result['sent']:
+            line += (
+                f'; {result["sent"] / seconds:.0f} contact posts/s, {result["accepted"]} accepted,'
+                f' {result["saved"]} saved by the flusher'
+            )
+        self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        caches['default'].clear()
+        self.report('idle', self.run_phase(options, flood=False), options['seconds'])
+        self.report('flood', self.run_phase(options, flood=True), options['seconds'])
+        Contact.objects.filter(subject=SUBJECT).delete()
@@ -0,0 +1,104 @@
+import os
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from catalog import benchmark, delivery
+
+MIB = 1024 * 1024
+
+
+def rss_mib() -> float:
+    """Peak resident set size of this process so far (``ru_maxrss`` is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream a large file through catalog.delivery to concurrent clients, whole and as byte ranges, and '
+        'report the peak Python allocations and RSS against the file size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=200, help='File size in MiB.')
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent downloads per case.')
+        parser.add_argument('--path', help='Stream this file instead of a generated one.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as scratch:
+            if options['path']:
+                path = Path(options['path'])
+            else:
+                path = Path(scratch) / 'benchmark.glb'
+                block = os.urandom(MIB)
+                with open(path, 'wb') as handle:
+                    for _ in range(options['size']):
+                        handle.write(block)
+            size = path.stat().st_size
+            factory = RequestFactory()
+            half = size // 2
+            cases = {
+                'whole file': {},
+                'range from the middle': {'HTTP_RANGE': f'bytes={half}-'},
+                'suffix range': {'HTTP_RANGE': f'bytes=-{half}'},
+            }
+
+            results = {}
+            baseline = rss_mib()
+            self.stderr.write(
+                f"{size / MIB:.0f} MiB x {options['clients']} clients, RSS {baseline:.1f} MiB before streaming\n"
+                f"{'case':<24}{'sent MiB':>10}{'seconds':>9}{'py peak MiB':>13}{'RSS peak MiB':>14}"
+            )
+            # No X-Sendfile: measure Django doing the transfer itself.
+            with override_settings(MEDIA_SENDFILE_BACKEND=None):
+                for label, headers in cases.items():
+                    sent = [0] * options['clients']
+
+                    def download(index, headers=headers):
+                        response = delivery.serve_path(factory.get('/', **headers), path)
+                        # What a WSGI server without wsgi.file_wrapper does with the body.
+                        for chunk in response:
+                            sent[index] += len(chunk)
+                        response.close()
+
+                    tracemalloc.start()
+                    started = time.perf_counter()
+                    threads = [threading.Thread(target=download, args=(i,)) for i in range(options['clients'])]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    elapsed = time.perf_counter() - started
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                    results[label] = {
+                        'clients': options['clients'],
+                        'bytes_sent': sum(sent),
+                        'seconds': round(elapsed, 3),
+                        'python_peak_bytes': peak,
+                        'rss_peak_mib': round(rss_mib(), 1),
+                    }
+                    self.stderr.write(
+                        f'{label:<24}{sum(sent) / MIB:>10.0f}{elapsed:>9.2f}{peak / MIB:>13.2f}{rss_mib():>14.1f}'
+                    )
+
+        config = {
+            'file_bytes': size,
+            'clients': options['clients'],
+            'chunk_size': delivery.CHUNK_SIZE,
+            'rss_before_mib': round(baseline, 1),
+        }
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
@@ -0,0 +1,120 @@
+import json
+import re
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from catalog.models import Category, Expert, Instrument, Tutorial
+
+# A plain table scan; "SCAN t USING [COVERING] INDEX i" walks an index instead.
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\S+)$')
+
+
+def url(name: str, *args, **params) -> str:
+    path = reverse(name, args=args)
+    return f'{path}?{urlencode(params)}' if params else path
+
+
+def endpoints() -> list[str]:
+    """The catalog's read paths, with real values from the database where a path needs one."""
+    paths = [
+        url('instrument-list'),
+        url('instrument-list', is_featured='true'),
+        url('instrument-list', expand='media'),
+        url('instrument-list', facets='category,region,is_featured'),
+        url('instrument-list', search='drum'),
+        url('instrument-list', ordering='-created_at'),
+        url('expert-list'),
+        url('tutorial-list'),
+        url('media-list'),
+        url('tunerconfiguration-list'),
+        url('category-list'),
+        url('learningcontent-list'),
+        url('search-list', q='music'),
+    ]
+    instrument = Instrument.objects.order_by('pk').first()
+    if instrument is not None:
+        paths += [
+            url('instrument-list', region=instrument.region.upper()),
+            url('instrument-list', region__in=instrument.region),
+            url('instrument-list', region__in=instrument.region, facets='category,region'),
+            url('instrument-detail', instrument.pk),
+            url('instrument-detail', instrument.pk, include='tutorials,tuner_config'),
+            url('instrument-tutorials', instrument.pk),
+            url('instrument-tuner-config', instrument.pk),
+        ]
+    category = Category.objects.order_by('pk').first()
+    if category is not None:
+        paths.append(url('instrument-list', category=category.slug))
+        paths.append(url('instrument-list', category__in=category.slug, facets='region'))
+    expert = Expert.objects.order_by('pk').first()
+    if expert is not None:
+        paths.append(url('expert-detail', expert.pk))
+    tutorial = Tutorial.objects.order_by('pk').first()
+    if tutorial is not None:
+        paths.append(url('tutorial-detail', tutorial.pk))
+    return paths
+
+
+def explain(sql: str) -> tuple[list[str], list[str]]:
+    """Return ``(plan lines, full scans)`` for one SELECT."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            lines = [row[-1] for row in cursor.fetchall()]
+            scans = [match.group(1) for match in map(SQLITE_FULL_SCAN.match, lines) if match]
+            return lines, scans
+        if connection.vendor == 'postgresql':
+            # On small tables the planner prefers a sequential scan anyway; ask whether it has a choice.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes, lines, scans = [plan[0]['Plan']], [], []
+            while nodes:
+                node = nodes.pop()
+                lines.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+                if node['Node Type'] == 'Seq Scan':
+                    scans.append(node['Relation Name'])
+                nodes.extend(node.get('Plans', []))
+            return lines, scans
+    raise CommandError(f'EXPLAIN is not supported for {connection.vendor}')
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on every query of the catalog's read endpoints and fail on full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Endpoints to check (default: the built-in list).')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--plans', action='store_true', help='Print the plan of every query.')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'])
+        failures = []
+        # Cached responses would skip the queries being checked.
+        dummy = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        with override_settings(CACHES=dummy):
+            for path in options['paths'] or endpoints():
+                with CaptureQueriesContext(connection) as captured:
+                    status = client.get(path).status_code
+                selects = [query['sql'] for query in captured if query['sql'].lstrip().upper().startswith('SELECT')]
+                self.stdout.write(f'{status} {path} ({len(selects)} queries)')
+                for sql in selects:
+                    lines, scans = explain(sql)
+                    if options['plans'] or scans:
+                        self.stdout.write(f'    {sql}')
+                        for line in lines:
+                            self.stdout.write(f'      {line}')
+                    for table in scans:
+                        failures.append(f'{path}: full scan of {table}')
+
+        if failures:
+            raise CommandError('\n'.join(['Full table scans:', *failures]))
+        self.stdout.write(self.style.SUCCESS('No full table scans.'))
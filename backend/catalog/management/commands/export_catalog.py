@@ -0,0 +1,50 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import transfer
+
+
+class Command(BaseCommand):
+    help = 'Stream the catalog as NDJSON with natural keys (gzip-compressed when the path ends in .gz).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, or '-' for stdout.")
+        parser.add_argument(
+            '--models', help=f"Comma-separated subset of: {', '.join(transfer.SPECS_BY_NAME)}."
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        specs = transfer.SPECS
+        if options['models']:
+            names = options['models'].split(',')
+            unknown = set(names) - set(transfer.SPECS_BY_NAME)
+            if unknown:
+                raise CommandError(f"Unknown models: {', '.join(sorted(unknown))}")
+            specs = [spec for spec in transfer.SPECS if spec.name in names]
+
+        path = options['path']
+        if path == '-':
+            output = sys.stdout
+        elif path.endswith('.gz'):
+            output = gzip.open(path, 'wt', encoding='utf-8')
+        else:
+            output = open(path, 'w', encoding='utf-8')
+
+        started = time.perf_counter()
+        count = 0
+        try:
+            for line in transfer.export_records(specs, batch_size=options['batch_size']):
+                output.write(line)
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        seconds = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {count} records in {seconds:.1f}s ({count / seconds if seconds else 0:.0f}/s).'
+        ))
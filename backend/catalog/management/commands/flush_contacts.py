@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog import contact
+
+
+class Command(BaseCommand):
+    help = 'Save spooled contact-form messages to the database in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Flush once and exit (e.g. from cron).')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between flushes.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            saved = contact.flush(options['batch_size'])
+            if saved:
+                self.stdout.write(f'Saved {saved} contact messages.')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
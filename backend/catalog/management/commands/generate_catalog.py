@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import cache, recommendations, search, static_api, synthetic
+from catalog.signals import CACHED_MODELS
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-insert a seeded synthetic catalog (categories, instruments, media, tutorials, tuner '
+        'configurations, experts) for benchmarks and load tests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('instruments', type=int, help='Catalog size in instruments, e.g. 1000 to 1000000.')
+        parser.add_argument('--seed', type=int, default=0, help='The same seed and size give the same rows.')
+        parser.add_argument('--experts', type=int, help='Number of experts (default: one per 10 instruments).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Instruments per bulk insert and transaction.')
+        parser.add_argument('--clear', action='store_true', help='Delete earlier synthetic rows first.')
+        parser.add_argument('--skip-search-index', action='store_true', help='Do not rebuild the search index.')
+        parser.add_argument(
+            '--skip-recommendations', action='store_true', help='Do not rebuild the similar instruments and experts.'
+        )
+
+    def handle(self, *args, **options):
+        if options['instruments'] < 1:
+            raise CommandError('Generate at least one instrument.')
+        if options['clear']:
+            deleted = synthetic.clear()
+            self.stdout.write('Deleted ' + (', '.join(f'{count} {label}' for label, count in deleted.items()) or 'nothing'))
+
+        def progress(done, total, seconds):
+            self.stdout.write(f'{done}/{total} instruments ({done / seconds:.0f}/s)')
+
+        counts = synthetic.generate(
+            options['instruments'], seed=options['seed'], batch_size=options['batch_size'],
+            experts=options['experts'], progress=progress,
+        )
+        self.stdout.write('Created ' + ', '.join(f'{count} {name}' for name, count in counts.items()))
+
+        # Bulk writes bypass the signal handlers that normally do this.
+        for model in CACHED_MODELS:
+            cache.bump_generation(model._meta.label_lower)
+        if not options['skip_search_index']:
+            indexed = search.rebuild_index()
+            self.stdout.write(f'Reindexed {indexed} search documents.')
+        if not options['skip_recommendations']:
+            total, changed = recommendations.rebuild(snapshots=False)
+            self.stdout.write(f'Rebuilt recommendations: {changed} of {total} instruments changed.')
+        if static_api.is_enabled():
+            stats = static_api.build()
+            self.stdout.write(f"Rebuilt the static API: {stats['written']} files written, {stats['removed']} removed.")
+        self.stdout.write(self.style.SUCCESS('Synthetic catalog generated.'))
@@ -0,0 +1,58 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import cache, recommendations, search, static_api, transfer
+from catalog.signals import CACHED_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Upsert catalog NDJSON (as written by export_catalog) using natural keys and bulk writes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file (.gz is decompressed), or '-' for stdin.")
+        parser.add_argument('--batch-size', type=int, default=1000, help='Records per bulk write and transaction.')
+        parser.add_argument('--skip-search-index', action='store_true', help='Do not rebuild the search index.')
+        parser.add_argument(
+            '--skip-recommendations', action='store_true', help='Do not rebuild the similar instruments and experts.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if path == '-':
+            source = sys.stdin
+        elif path.endswith('.gz'):
+            source = gzip.open(path, 'rt', encoding='utf-8')
+        else:
+            source = open(path, encoding='utf-8')
+
+        try:
+            stats = transfer.import_lines(source, batch_size=options['batch_size'])
+        except transfer.TransferError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        for name, counts in stats.items():
+            if counts.created or counts.updated or counts.unchanged or counts.skipped:
+                self.stdout.write(
+                    f'{name}: {counts.created} created, {counts.updated} updated, {counts.unchanged} unchanged, '
+                    f'{counts.skipped} skipped '
+                    f'in {counts.seconds:.1f}s ({counts.rate:.0f}/s)'
+                )
+
+        # Bulk writes bypass the signal handlers that normally do this.
+        for model in CACHED_MODELS:
+            cache.bump_generation(model._meta.label_lower)
+        if not options['skip_search_index']:
+            indexed = search.rebuild_index()
+            self.stdout.write(f'Reindexed {indexed} search documents.')
+        if not options['skip_recommendations']:
+            total, changed = recommendations.rebuild(snapshots=False)
+            self.stdout.write(f'Rebuilt recommendations: {changed} of {total} instruments changed.')
+        if static_api.is_enabled():
+            stats = static_api.build()
+            self.stdout.write(f"Rebuilt the static API: {stats['written']} files written, {stats['removed']} removed.")
+        self.stdout.write(self.style.SUCCESS('Import finished.'))
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from catalog import benchmark
+from catalog.models import Instrument
+
+
+class Command(BaseCommand):
+    help = (
+        'Time an instrument page built from one /instruments/<pk>/?include=tutorials,tuner_config request '
+        'against the detail, tutorials and tuner_config requests it replaces, through the full middleware '
+        'stack with a cold cache. Network round trips come on top of the three-request numbers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--instruments', type=int, default=50, help='Instruments to request, in pk order.')
+        parser.add_argument('--rounds', type=int, default=5, help='Passes over the instruments.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        pks = list(
+            Instrument.objects.filter(tutorials__isnull=False, tuner_config__isnull=False)
+            .distinct().order_by('pk').values_list('pk', flat=True)[:options['instruments']]
+        )
+        if not pks:
+            raise CommandError('No instruments with tutorials and a tuner configuration; run generate_catalog first.')
+        client = Client(HTTP_HOST=options['host'])
+
+        def get(url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url} answered {response.status_code}.')
+            return len(response.content)
+
+        sequences = {
+            'include': lambda pk: [f"{reverse('instrument-detail', args=[pk])}?include=tutorials,tuner_config"],
+            'three requests': lambda pk: [
+                reverse('instrument-detail', args=[pk]),
+                reverse('instrument-tutorials', args=[pk]),
+                reverse('instrument-tuner-config', args=[pk]),
+            ],
+        }
+        # Cached responses would skip the work being measured.
+        dummy = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        results = {}
+        with override_settings(CACHES=dummy):
+            self.stderr.write(f"{len(pks)} instruments\n{'sequence':<18}{'bytes':>8}{'p50':>10}{'p95':>10}")
+            for label, urls in sequences.items():
+                size = sum(get(url) for url in urls(pks[0]))
+                samples = []
+                for _ in range(options['rounds']):
+                    for pk in pks:
+                        started = time.perf_counter()
+                        for url in urls(pk):
+                            get(url)
+                        samples.append(time.perf_counter() - started)
+                stats = results[label] = {**benchmark.summarize(samples), 'bytes': size}
+                self.stderr.write(f"{label:<18}{size:>8,}{stats['p50_ms']:>8.2f}ms{stats['p95_ms']:>8.2f}ms")
+
+        config = {key: options[key] for key in ('instruments', 'rounds')}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
@@ -0,0 +1,196 @@
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import benchmark, contact, synthetic
+from catalog.models import Category, Contact, Expert, Instrument
+
+SUBJECT = 'load test'
+# Share of each kind of traffic, roughly that of the public site.
+DEFAULT_MIX = {'list': 45, 'detail': 35, 'search': 15, 'contact': 5}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in DEFAULT_MIX or not weight:
+            raise argparse.ArgumentTypeError(f'expected e.g. list=45,detail=35,search=15,contact=5, got {part!r}')
+        mix[kind] = float(weight)
+    return mix
+
+
+class Traffic:
+    """Seeded stream of (kind, method, path, body) drawn from the current catalog."""
+
+    def __init__(self, seed: int, mix: dict[str, float], instruments: list, experts: list, categories: list):
+        self.random = random.Random(seed)
+        self.kinds, self.weights = zip(*[(kind, weight) for kind, weight in mix.items() if weight > 0])
+        self.instruments, self.experts, self.categories = instruments, experts, categories
+
+    def next(self) -> tuple[str, str, str, bytes | None]:
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        return (kind, *getattr(self, kind)())
+
+    def list(self):
+        paths = [
+            '/instruments/',
+            f'/instruments/?category={self.random.choice(self.categories)}' if self.categories else '/instruments/',
+            f'/instruments/?region={quote(self.random.choice(synthetic.REGIONS))}',
+            '/instruments/?is_featured=true',
+            '/instruments/?ordering=-created_at',
+            '/experts/',
+            '/tutorials/',
+            '/categories/',
+        ]
+        return 'GET', self.random.choice(paths), None
+
+    def detail(self):
+        instrument = self.random.choice(self.instruments)
+        paths = [f'/instruments/{instrument}/', f'/instruments/{instrument}/?include=tutorials,tuner_config']
+        if self.experts:
+            paths.append(f'/experts/{self.random.choice(self.experts)}/')
+        return 'GET', self.random.choice(paths), None
+
+    def search(self):
+        terms = '+'.join(self.random.sample(synthetic.WORDS, self.random.randint(1, 2)))
+        return 'GET', self.random.choice([f'/search/?q={terms}', f'/instruments/?search={terms}']), None
+
+    def contact(self):
+        body = json.dumps({
+            'name': 'Load Test', 'email': 'load@example.com', 'subject': SUBJECT,
+            'message': f'Load test message {self.random.random()} about learning the madal.',
+        })
+        return 'POST', '/contact/', body.encode()
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a seeded mix of list, detail, search and contact-form traffic against a running server and '
+        'report latency percentiles and throughput per kind as JSON. Reads ids from the same database as '
+        'the server; contact posts it made are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='API root of the server, e.g. http://127.0.0.1:8000/api')
+        parser.add_argument('--concurrency', type=int, default=8, help='Clients sending requests back to back.')
+        parser.add_argument('--seconds', type=float, default=30.0)
+        parser.add_argument('--warmup', type=float, default=3.0, help='Seconds of traffic before measuring.')
+        parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help='e.g. list=45,detail=35,search=15,contact=5')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+        parser.add_argument('--compare', help='Earlier --output to compare p95 latencies with.')
+        parser.add_argument('--tolerance', type=float, default=20.0, help='Percent slowdown that fails --compare.')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Give an http:// URL.')
+        self.target = (url.hostname, url.port or 80, url.path.rstrip('/'))
+        self.options = options
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+
+        instruments = list(Instrument.objects.values_list('pk', flat=True))
+        if not instruments:
+            raise CommandError('No instruments in the database; run generate_catalog first.')
+        experts = list(Expert.objects.values_list('pk', flat=True))
+        categories = list(Category.objects.values_list('slug', flat=True))
+        measure_from = time.monotonic() + options['warmup']
+        deadline = measure_from + options['seconds']
+        clients = []
+        for number in range(options['concurrency']):
+            traffic = Traffic(options['seed'] + number, options['mix'], instruments, experts, categories)
+            clients.append(threading.Thread(target=self.client, args=(traffic, measure_from, deadline)))
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        self.cleanup()
+
+        benchmarks = {}
+        everything = []
+        for kind in sorted(self.statuses):
+            samples = self.samples.get(kind, [])
+            everything += samples
+            benchmarks[kind] = self.describe(samples, self.statuses[kind])
+        benchmarks['all'] = self.describe(everything, self.merged_statuses())
+        config = {
+            key: options[key] for key in ('url', 'concurrency', 'seconds', 'warmup', 'mix', 'seed', 'host')
+        }
+        output = {'environment': benchmark.environment(), 'config': config, 'benchmarks': benchmarks}
+        benchmark.write(output, options['output'], self.stdout)
+        for kind, stats in benchmarks.items():
+            self.stderr.write(
+                f"{kind:>8}: {stats['throughput']:.1f}/s, p50 {stats.get('p50_ms', '-')} ms, "
+                f"p95 {stats.get('p95_ms', '-')} ms, p99 {stats.get('p99_ms', '-')} ms, statuses {stats['statuses']}"
+            )
+        if options['compare']:
+            lines, regressions = benchmark.compare(
+                output, benchmark.load(options['compare']), 'p95_ms', options['tolerance']
+            )
+            self.stderr.write('\n'.join(lines))
+            if regressions:
+                raise CommandError('\n'.join([f"Slower by more than {options['tolerance']}%:", *regressions]))
+
+    def describe(self, samples: list[float], statuses: dict) -> dict:
+        stats = benchmark.summarize(samples) if samples else {'count': 0}
+        stats['throughput'] = round(len(samples) / self.options['seconds'], 2)
+        stats['statuses'] = dict(sorted(statuses.items()))
+        return stats
+
+    def merged_statuses(self) -> dict:
+        merged = {}
+        for statuses in self.statuses.values():
+            for status, count in statuses.items():
+                merged[status] = merged.get(status, 0) + count
+        return merged
+
+    def client(self, traffic: Traffic, measure_from: float, deadline: float) -> None:
+        host, port, prefix = self.target
+        connection = http.client.HTTPConnection(host, port, timeout=self.options['timeout'])
+        headers = {'Host': self.options['host'], 'Accept': 'application/json', 'Content-Type': 'application/json'}
+        samples, statuses = {}, {}
+        while (now := time.monotonic()) < deadline:
+            kind, method, path, body = traffic.next()
+            started = time.perf_counter()
+            try:
+                connection.request(method, prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                status = type(exc).__name__
+            elapsed = time.perf_counter() - started
+            if now < measure_from:
+                continue
+            counts = statuses.setdefault(kind, {})
+            counts[status] = counts.get(status, 0) + 1
+            # Throttled contact posts (429) are answered but measure the throttle, not the form.
+            if status.isdigit() and int(status) < 500 and status != '429':
+                samples.setdefault(kind, []).append(elapsed)
+        connection.close()
+        with self.lock:
+            for kind, values in samples.items():
+                self.samples.setdefault(kind, []).extend(values)
+            for kind, counts in statuses.items():
+                merged = self.statuses.setdefault(kind, {})
+                for status, count in counts.items():
+                    merged[status] = merged.get(status, 0) + count
+
+    def cleanup(self) -> None:
+        # Accepted posts may still sit in the contact spool.
+        contact.flush()
+        deleted, _ = Contact.objects.filter(subject=SUBJECT).delete()
+        if deleted:
+            self.stderr.write(f'Deleted {deleted} load-test contact messages.')
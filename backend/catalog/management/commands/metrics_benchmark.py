@@ -0,0 +1,87 @@
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from catalog import benchmark, metrics, timing
+
+
+class Command(BaseCommand):
+    help = (
+        'Time what catalog.metrics adds to a request (metric_labels plus observe), a flush of the '
+        "process's registry and a scrape (collect plus render) over --workers worker files. Uses a "
+        'private registry and a scratch METRICS_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200000, help='Observations per round.')
+        parser.add_argument('--views', type=int, default=20, help='Distinct views, times 3 actions and 2 statuses.')
+        parser.add_argument('--workers', type=int, default=8, help='Worker files a scrape sums.')
+        parser.add_argument('--rounds', type=int, default=5, help='Repetitions of each measurement.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/instruments/')
+        observations = []
+        for index in range(options['views']):
+            for action in ('list', 'retrieve', 'search'):
+                for status in (200, 304):
+                    timings = timing.Timings()
+                    timings.view = f'view{index}.{action}'
+                    timings.cache = 'hits' if status == 304 else 'misses'
+                    observations.append((timings, status))
+        calls, rounds = options['calls'], options['rounds']
+        cases = {'observe': [], 'flush': [], 'scrape': []}
+
+        with tempfile.TemporaryDirectory() as scratch, override_settings(METRICS_DIR=Path(scratch)):
+            # A file name of our own also keeps observe() from starting the flush thread.
+            registry = mock.patch.multiple(
+                metrics, _series={name: {} for name in metrics.METRICS}, _changed=False,
+                _file=Path(scratch) / f'{os.getpid()}-0.json',
+            )
+            with registry:
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    for call in range(calls):
+                        timings, status = observations[call % len(observations)]
+                        view, action = timing.metric_labels(request, timings)
+                        metrics.observe(view, action, status, 0.012, 0.003, timings.cache, 0)
+                    cases['observe'].append((time.perf_counter() - started) / calls)
+                series = sum(len(values) for values in metrics._series.values())
+
+                for _ in range(rounds):
+                    metrics._changed = True
+                    started = time.perf_counter()
+                    metrics.flush()
+                    cases['flush'].append(time.perf_counter() - started)
+
+                # Other live workers with the same series.
+                for worker in range(1, options['workers']):
+                    metrics._write(Path(scratch) / f'{os.getpid()}-{worker}.json', metrics._dump(metrics._series))
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    size = len(metrics.render(metrics.collect()))
+                    cases['scrape'].append(time.perf_counter() - started)
+
+        results = {label: benchmark.summarize(samples) for label, samples in cases.items()}
+        # Too small for summarize's millisecond rounding.
+        results['observe'] = {'rounds': rounds, 'median_us': round(statistics.median(cases['observe']) * 1e6, 3)}
+        self.stderr.write(
+            f"{series} series, {options['workers']} worker files, {size / 1024:.0f} KiB exposition\n"
+            f"per request (metric_labels + observe): {results['observe']['median_us']:.2f} us\n"
+            f"flush: {results['flush']['p50_ms']:.2f} ms\n"
+            f"scrape (collect + render): {results['scrape']['p50_ms']:.2f} ms"
+        )
+        config = {key: options[key] for key in ('calls', 'views', 'workers', 'rounds')}
+        config['series'] = series
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
@@ -0,0 +1,150 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from catalog import benchmark, synthetic
+from catalog.models import Category, Expert, Instrument, Media, Tutorial, TunerConfiguration
+from catalog.serializers import ContactSerializer
+from catalog.views import (
+    CategoryViewSet,
+    ExpertViewSet,
+    InstrumentViewSet,
+    LearningContentViewSet,
+    MediaViewSet,
+    RowListMixin,
+    TunerConfigurationViewSet,
+    TutorialViewSet,
+)
+
+# (viewset, query strings of the list serializers, query strings of the detail serializer)
+SERIALIZED = [
+    (CategoryViewSet, [''], ['']),
+    (InstrumentViewSet, ['', 'expand=media', 'fields=id,name'], ['', 'include=tutorials,tuner_config']),
+    (MediaViewSet, [''], ['']),
+    (ExpertViewSet, [''], ['']),
+    (LearningContentViewSet, [''], ['']),
+    (TutorialViewSet, [''], ['']),
+    (TunerConfigurationViewSet, [''], ['']),
+]
+
+
+def filter_cases() -> list[tuple]:
+    """(viewset, query string) of every filter, search and ordering the list endpoints accept."""
+    category = Category.objects.order_by('pk').values_list('slug', flat=True).first() or 'none'
+    region = Instrument.objects.order_by('pk').values_list('region', flat=True).first() or 'none'
+    word = synthetic.WORDS[0]
+    return [
+        (InstrumentViewSet, f'category={category}'),
+        (InstrumentViewSet, f'region={region}'),
+        (InstrumentViewSet, 'is_featured=true'),
+        (InstrumentViewSet, f'search={word}'),
+        (InstrumentViewSet, f'category={category}&is_featured=false&ordering=-created_at'),
+        (InstrumentViewSet, 'ordering=region'),
+        (InstrumentViewSet, 'ordering=-created_at'),
+        (CategoryViewSet, f'search={word}'),
+        (ExpertViewSet, f'search={synthetic.LAST_NAMES[0]}'),
+        (LearningContentViewSet, 'ordering=title'),
+        (TutorialViewSet, f'search={synthetic.FIRST_NAMES[0]}'),
+        (TutorialViewSet, 'ordering=instructor_name'),
+        (TunerConfigurationViewSet, 'ordering=tuning_name'),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every catalog serializer on a page of the current database and every list filter, search and '
+        'ordering on its first page; write the results as JSON for --compare on a later run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=30, help='Timed runs per benchmark.')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed runs first.')
+        parser.add_argument('--rows', type=int, default=24, help='Objects per list serializer run (a page).')
+        parser.add_argument('--only', help='Run the benchmarks whose name contains this.')
+        parser.add_argument('--host', default='localhost', help='Host the serialized URLs are built for.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+        parser.add_argument('--compare', help='Earlier --output to compare medians with.')
+        parser.add_argument('--tolerance', type=float, default=20.0, help='Percent slowdown that fails --compare.')
+
+    def handle(self, *args, **options):
+        if not Instrument.objects.exists():
+            raise CommandError('No instruments in the database; run generate_catalog first.')
+        self.factory = RequestFactory()
+        self.options = options
+        results = {}
+        for name, function in self.benchmarks():
+            if options['only'] and options['only'] not in name:
+                continue
+            for _ in range(options['warmup']):
+                function()
+            samples = []
+            for _ in range(options['rounds']):
+                started = time.perf_counter()
+                function()
+                samples.append(time.perf_counter() - started)
+            results[name] = benchmark.summarize(samples)
+            self.stderr.write(f"{name}: median {results[name]['p50_ms']} ms")
+
+        config = {key: options[key] for key in ('rounds', 'warmup', 'rows')}
+        output = {'environment': benchmark.environment(), 'config': config, 'benchmarks': results}
+        benchmark.write(output, options['output'], self.stdout)
+        if options['compare']:
+            lines, regressions = benchmark.compare(
+                output, benchmark.load(options['compare']), 'p50_ms', options['tolerance']
+            )
+            self.stderr.write('\n'.join(lines))
+            if regressions:
+                raise CommandError('\n'.join([f"Slower by more than {options['tolerance']}%:", *regressions]))
+
+    def view(self, viewset, action: str, query: str = ''):
+        request = Request(self.factory.get(f'/api/benchmark/?{query}', HTTP_HOST=self.options['host']))
+        view = viewset(action=action, request=request, format_kwarg=None, args=(), kwargs={})
+        request.parser_context = {'view': view}
+        return view
+
+    def benchmarks(self):
+        rows = self.options['rows']
+        for viewset, list_queries, detail_queries in SERIALIZED:
+            model = viewset.queryset.model
+            first = model.objects.order_by('pk').values_list('pk', flat=True).first()
+            if first is None:
+                self.stderr.write(f'No {model._meta.verbose_name_plural}; skipping its serializers.')
+                continue
+            for query in list_queries:
+                view = self.view(viewset, 'list', query)
+                serializer_class = view.get_serializer_class()
+                objects = list(view.filter_queryset(view.get_queryset())[:rows])
+                context = view.get_serializer_context()
+                label = f"serializer:{serializer_class.__name__}[{len(objects)}{f' {query}' if query else ''}]"
+                yield label, lambda: serializer_class(objects, many=True, context=context).data
+
+                row_serializer = view.get_row_serializer() if isinstance(view, RowListMixin) else None
+                if row_serializer is not None:
+                    values = list(row_serializer.values(view.filter_queryset(view.get_queryset())[:rows]))
+                    yield (
+                        f"rows:{type(row_serializer).__name__}[{len(values)}{f' {query}' if query else ''}]",
+                        lambda: row_serializer.to_representation(values),
+                    )
+            for query in detail_queries:
+                view = self.view(viewset, 'retrieve', query)
+                serializer_class = view.get_serializer_class()
+                obj = view.get_queryset().get(pk=first)
+                context = view.get_serializer_context()
+                yield (
+                    f"serializer:{serializer_class.__name__}[1{f' {query}' if query else ''}]",
+                    lambda: serializer_class(obj, context=context).data,
+                )
+
+        payload = {
+            'name': 'Benchmark', 'email': 'benchmark@example.com', 'subject': 'Lessons',
+            'message': 'I would like to learn the sarangi from one of your experts.',
+        }
+        yield 'serializer:ContactSerializer[validate]', lambda: ContactSerializer(data=payload).is_valid()
+
+        for viewset, query in filter_cases():
+            def first_page(viewset=viewset, query=query):
+                view = self.view(viewset, 'list', query)
+                return view.paginate_queryset(view.filter_queryset(view.get_queryset()))
+            yield f'filter:{viewset.__name__}?{query}', first_page
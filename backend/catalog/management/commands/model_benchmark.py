@@ -0,0 +1,84 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import benchmark, gltf, processing
+
+
+def decode(data: bytes) -> tuple[int, int]:
+    """
+    What a loader does before the GPU upload: split the GLB and read every
+    mesh accessor.  Returns the vertex and triangle counts.
+    """
+    document, binary = gltf.read_glb(data)
+    vertices = triangles = 0
+    for mesh in document.get('meshes', []):
+        for primitive in mesh['primitives']:
+            counts = [len(gltf.read_accessor(document, binary, index)) for index in primitive['attributes'].values()]
+            vertices += counts[0]
+            if 'indices' in primitive:
+                counts.append(len(gltf.read_accessor(document, binary, primitive['indices'])))
+            if primitive.get('mode', gltf.TRIANGLES) == gltf.TRIANGLES:
+                triangles += counts[-1] // 3
+    return vertices, triangles
+
+
+class Command(BaseCommand):
+    help = (
+        'Optimize GLB files the way run_media_worker does and report the size, vertex and triangle counts, '
+        'optimization time and decode time of every level against the original.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', help='GLB files (default: the models in the frontend public/models directory).'
+        )
+        parser.add_argument('--rounds', type=int, default=5, help='Timed runs per file and level.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        paths = [Path(path) for path in options['paths']] or sorted(
+            (Path(settings.BASE_DIR).parent / 'public' / 'models').glob('*.glb')
+        )
+        if not paths:
+            raise CommandError('No GLB files given.')
+
+        results = {}
+        self.stderr.write(f"{'file':<28}{'level':<10}{'bytes':>12}{'vertices':>10}{'triangles':>11}{'decode p50':>12}")
+        for path in paths:
+            data = path.read_bytes()
+            samples = []
+            for _ in range(options['rounds']):
+                started = time.perf_counter()
+                levels = processing.build_levels(data)
+                samples.append(time.perf_counter() - started)
+            results[f'{path.name} optimize'] = benchmark.summarize(samples)
+
+            payloads = [('original', data)] + [(f'lod{level}', result.data) for level, result in enumerate(levels)]
+            for label, payload in payloads:
+                vertices, triangles = decode(payload)
+                samples = []
+                for _ in range(options['rounds']):
+                    started = time.perf_counter()
+                    decode(payload)
+                    samples.append(time.perf_counter() - started)
+                stats = results[f'{path.name} {label} decode'] = {
+                    **benchmark.summarize(samples),
+                    'bytes': len(payload),
+                    'vertices': vertices,
+                    'triangles': triangles,
+                }
+                self.stderr.write(
+                    f"{path.name:<28}{label:<10}{len(payload):>12,}{vertices:>10}{triangles:>11}"
+                    f"{stats['p50_ms']:>10.2f}ms"
+                )
+            self.stderr.write(f"{path.name:<28}optimized in {results[f'{path.name} optimize']['p50_ms']:.0f} ms (p50)")
+
+        config = {'rounds': options['rounds'], 'lod_grids': list(getattr(settings, 'MODEL_LOD_GRIDS', (96, 32)))}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
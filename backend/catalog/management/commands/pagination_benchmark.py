@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from catalog import benchmark
+from catalog.models import Expert, Instrument
+from catalog.views import ExpertViewSet, InstrumentViewSet
+
+VIEWSETS = {'instruments': (InstrumentViewSet, Instrument), 'experts': (ExpertViewSet, Expert)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Payload size and latency of a list endpoint unpaginated (the whole table, as before cursor '
+        'pagination) against its first page, a deep cursor page and ?fields= projections, with a cold cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(VIEWSETS), default='instruments')
+        parser.add_argument('--rounds', type=int, default=30, help='Timed requests per paginated case.')
+        parser.add_argument('--full-rounds', type=int, default=5, help='Timed requests per unpaginated case.')
+        parser.add_argument('--depth', type=int, default=100, help='Pages to follow for the deep cursor case.')
+        parser.add_argument('--fields', default='id,name', help='The ?fields= projection to compare.')
+        parser.add_argument('--host', default='localhost', help='Host the links and image URLs are built for.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        viewset, model = VIEWSETS[options['kind']]
+        if not model.objects.exists():
+            raise CommandError(f"No {options['kind']} in the database; run generate_catalog first.")
+        self.factory = APIRequestFactory()
+        self.host = options['host']
+        paged = viewset.as_view({'get': 'list'})
+        unpaged = viewset.as_view({'get': 'list'}, pagination_class=None)
+        path = f"/api/{options['kind']}/"
+
+        # Cached responses would skip the work being measured.
+        dummy = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        with override_settings(CACHES=dummy):
+            deep = path
+            for _ in range(options['depth']):
+                following = self.get(paged, deep).data.get('next')
+                if not following:
+                    break
+                deep = following
+            fields = f"fields={options['fields']}"
+            cases = [
+                ('unpaginated', unpaged, path, options['full_rounds']),
+                (f'unpaginated ?{fields}', unpaged, f'{path}?{fields}', options['full_rounds']),
+                ('first page', paged, path, options['rounds']),
+                (f'first page ?{fields}', paged, f'{path}?{fields}', options['rounds']),
+                (f'cursor page {options["depth"]}', paged, deep, options['rounds']),
+            ]
+            results = {}
+            self.stderr.write(f"{model.objects.count()} {options['kind']}")
+            self.stderr.write(f"{'case':<32}{'bytes':>12}{'p50':>11}{'p95':>11}")
+            for label, view, url, rounds in cases:
+                size = len(self.get(view, url).content)
+                samples = []
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    self.get(view, url)
+                    samples.append(time.perf_counter() - started)
+                stats = results[label] = {**benchmark.summarize(samples), 'bytes': size}
+                self.stderr.write(f"{label:<32}{size:>12,}{stats['p50_ms']:>9.1f}ms{stats['p95_ms']:>9.1f}ms")
+
+        config = {key: options[key] for key in ('kind', 'rounds', 'full_rounds', 'depth', 'fields')}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
+
+    def get(self, view, url):
+        response = view(self.factory.get(url, HTTP_HOST=self.host))
+        response.render()
+        return response
@@ -0,0 +1,137 @@
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from catalog import benchmark, pitch
+
+
+def naive_yin(frame: list[float], sample_rate: int, fmin: float, fmax: float, threshold: float) -> float:
+    """The textbook per-frame YIN in pure Python: the loop ``pitch.yin`` replaces."""
+    window = len(frame) // 2
+    tau_min = max(2, int(sample_rate / fmax))
+    tau_max = min(window - 1, int(np.ceil(sample_rate / fmin)))
+    difference = [0.0] * window
+    for tau in range(1, window):
+        total = 0.0
+        for j in range(window):
+            delta = frame[j] - frame[j + tau]
+            total += delta * delta
+        difference[tau] = total
+
+    normalized = [1.0] * window
+    cumulative = 0.0
+    for tau in range(1, window):
+        cumulative += difference[tau]
+        normalized[tau] = difference[tau] * tau / cumulative if cumulative else 1.0
+
+    for tau in range(tau_min + 1, tau_max):
+        if normalized[tau] < threshold and normalized[tau] <= normalized[tau - 1] and normalized[tau] <= normalized[tau + 1]:
+            before, at, after = normalized[tau - 1], normalized[tau], normalized[tau + 1]
+            denominator = before - 2 * at + after
+            shift = 0.5 * (before - after) / denominator if abs(denominator) > 1e-12 else 0.0
+            return sample_rate / (tau + max(-1.0, min(1.0, shift)))
+    return 0.0
+
+
+def write_tuning(path: Path, frequencies: list[float], seconds: float, rate: int) -> None:
+    """A 16-bit mono recording of each note in turn, plucked, with a little noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = np.exp(-1.5 * t)
+    notes = [
+        envelope * (0.5 * np.sin(2 * np.pi * f * t) + 0.2 * np.sin(4 * np.pi * f * t)) for f in frequencies
+    ]
+    signal = np.concatenate(notes) + 0.005 * rng.standard_normal(len(notes) * len(t))
+    with wave.open(str(path), 'wb') as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(rate)
+        output.writeframes((np.clip(signal, -1, 1) * 32767).astype('<i2').tobytes())
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the frame throughput of the batched YIN in catalog.pitch against a naive pure-Python '
+        'per-frame loop on the same frames, check that they agree, and time analyze_file on a generated '
+        '12-note tuning recording.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=pitch.BATCH_FRAMES, help='Frames per batched call.')
+        parser.add_argument('--naive-frames', type=int, default=50, help='Frames given to the pure-Python loop.')
+        parser.add_argument('--seconds', type=float, default=0.7, help='Length of each note of the tuning.')
+        parser.add_argument('--rounds', type=int, default=5, help='Repetitions of each measurement.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        fmin = pitch.get_option('FMIN', 50.0)
+        fmax = pitch.get_option('FMAX', 2000.0)
+        threshold = pitch.get_option('THRESHOLD', 0.15)
+        rate = pitch.ANALYSIS_RATE
+        window = 1 << int(np.ceil(np.log2(rate / fmin + 2)))
+        tuning = [float(440 * 2 ** ((midi - 69) / 12)) for midi in range(57, 69)]
+        rounds = options['rounds']
+
+        # Voiced frames across the tuning's range, as analyze_file would batch them.
+        rng = np.random.default_rng(1)
+        t = np.arange(2 * window) / rate
+        f0 = rng.choice(tuning, options['frames'])
+        phase = rng.uniform(0, 2 * np.pi, (options['frames'], 1))
+        batch = np.sin(2 * np.pi * f0[:, None] * t + phase) + 0.01 * rng.standard_normal((options['frames'], 2 * window))
+
+        batched = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            frequencies, _aperiodicity = pitch.yin(batch, rate, fmin, fmax, threshold)
+            batched.append(time.perf_counter() - started)
+
+        naive_frames = min(options['naive_frames'], len(batch))
+        rows = [row.tolist() for row in batch[:naive_frames]]
+        started = time.perf_counter()
+        naive = [naive_yin(row, rate, fmin, fmax, threshold) for row in rows]
+        naive_seconds = time.perf_counter() - started
+        # Within 5 cents of each other.
+        agree = sum(
+            abs(1200 * np.log2(a / b)) < 5 if a and b else a == b for a, b in zip(frequencies[:naive_frames], naive)
+        )
+
+        with tempfile.TemporaryDirectory() as scratch:
+            path = Path(scratch) / 'tuning.wav'
+            write_tuning(path, tuning, options['seconds'], 44100)
+            analyzed = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                analysis = pitch.analyze_file(path)
+                analyzed.append(time.perf_counter() - started)
+        notes, _frequencies = pitch.suggest_tuning(analysis)
+
+        results = {'batched yin': benchmark.summarize(batched), 'analyze_file': benchmark.summarize(analyzed)}
+        batched_fps = len(batch) / (results['batched yin']['p50_ms'] / 1000)
+        naive_fps = naive_frames / naive_seconds
+        results['frames_per_second'] = {'batched': round(batched_fps), 'naive': round(naive_fps, 1)}
+        results['speedup'] = round(batched_fps / naive_fps)
+        results['agreement'] = round(agree / naive_frames, 3)
+        results['notes_found'] = len(notes)
+        duration = len(tuning) * options['seconds']
+
+        self.stderr.write(
+            f'{2 * window}-sample frames at {rate} Hz\n'
+            f'batched yin: {batched_fps:,.0f} frames/s ({len(batch)} per call)\n'
+            f'naive loop:  {naive_fps:,.1f} frames/s ({naive_frames} frames), '
+            f'{results["speedup"]}x slower; {agree}/{naive_frames} frames agree within 5 cents\n'
+            f'analyze_file: {results["analyze_file"]["p50_ms"]:.0f} ms for a {duration:.1f}s tuning, '
+            f'{len(notes)}/{len(tuning)} notes found'
+        )
+        config = {
+            'frame_size': 2 * window, 'sample_rate': rate, 'frames': len(batch), 'naive_frames': naive_frames,
+            'tuning_seconds': round(duration, 2), 'rounds': rounds,
+        }
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog import contact, processing
+
+
+class Command(BaseCommand):
+    help = 'Process queued media jobs (3D model optimization and other derived assets) and spooled contact messages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        requeued = processing.requeue_stale()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale jobs.')
+
+        while True:
+            saved = contact.flush()
+            if saved:
+                self.stdout.write(f'Saved {saved} contact messages.')
+            processed = processing.run_pending()
+            if processed:
+                self.stdout.write(f'Processed {processed} jobs.')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
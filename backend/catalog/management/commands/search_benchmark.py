@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+
+from catalog import benchmark
+from catalog.filters import FullTextSearchFilter
+from catalog.models import Instrument, SearchEntry
+from catalog.views import InstrumentViewSet
+
+# On a generate_catalog database: a word of the description text (in most
+# rows), name syllables in about 3% and 0.1% of the names, a name and a word
+# no row contains.
+DEFAULT_TERMS = ['drum', 'dham', 'phokhin', 'Malak 3', 'xylophone']
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the first page of /instruments/?search= through the full-text index (FullTextSearchFilter) and "
+        "through DRF's SearchFilter (icontains over search_fields) on the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', default=DEFAULT_TERMS)
+        parser.add_argument('--rounds', type=int, default=20, help='Timed runs per term and path.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        total = Instrument.objects.count()
+        if not total:
+            raise CommandError('No instruments in the database; run generate_catalog first.')
+        indexed = SearchEntry.objects.filter(kind=SearchEntry.INSTRUMENT).count()
+        if indexed != total:
+            self.stderr.write(f'Only {indexed} of {total} instruments are indexed; run rebuild_search_index.')
+        factory = RequestFactory()
+
+        results = {}
+        self.stderr.write(f"{total} instruments\n{'term':<20}{'path':<16}{'rows':>6}{'p50':>10}{'p95':>10}")
+        for term in options['terms']:
+            for label, backend in (('fts', FullTextSearchFilter), ('SearchFilter', SearchFilter)):
+                request = Request(factory.get('/api/instruments/', {'search': term}, HTTP_HOST='localhost'))
+                view = InstrumentViewSet(action='list', request=request, format_kwarg=None, args=(), kwargs={})
+                request.parser_context = {'view': view}
+
+                def first_page(view=view, backend=backend):
+                    queryset = backend().filter_queryset(view.request, view.get_queryset(), view)
+                    return view.paginate_queryset(queryset.order_by(*view.ordering))
+
+                rows = len(first_page())
+                samples = []
+                for _ in range(options['rounds']):
+                    started = time.perf_counter()
+                    first_page()
+                    samples.append(time.perf_counter() - started)
+                stats = results[f'{label}?search={term}'] = benchmark.summarize(samples)
+                self.stderr.write(f"{term:<20}{label:<16}{rows:>6}{stats['p50_ms']:>8.1f}ms{stats['p95_ms']:>8.1f}ms")
+
+        config = {'rounds': options['rounds'], 'terms': options['terms']}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
@@ -0,0 +1,98 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from catalog.models import Expert, Instrument
+from catalog.renderers import FastJSONRenderer, orjson
+from catalog.rows import ExpertListRows, InstrumentListRows
+from catalog.serializers import ExpertListSerializer, InstrumentListSerializer
+
+KINDS = {
+    # The querysets the list views use.
+    'instruments': (
+        lambda: Instrument.objects.select_related('category').order_by('name', 'id'),
+        InstrumentListSerializer,
+        InstrumentListRows,
+    ),
+    'experts': (
+        lambda: Expert.objects.prefetch_related(
+            Prefetch('instruments', queryset=Instrument.objects.only('id', 'name'))
+        ).order_by('name', 'id'),
+        ExpertListSerializer,
+        ExpertListRows,
+    ),
+}
+
+
+def measure(function, repeat: int) -> tuple[float, int, object]:
+    """Best wall time over ``repeat`` runs, then peak traced memory of one more run."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    del result
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the list serializers and JSON renderers with the row serializers (catalog.rows) and the '
+        'orjson renderer: time and peak allocated memory at several row counts of the current database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(KINDS), default='instruments')
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement; the best counts.')
+        parser.add_argument('--host', default='localhost', help='Host the image URLs are built for.')
+
+    def handle(self, *args, **options):
+        get_queryset, serializer_class, rows_class = KINDS[options['kind']]
+        available = get_queryset().count()
+        if not available:
+            raise CommandError(f"No {options['kind']} in the database.")
+        request = Request(RequestFactory().get(f"/api/{options['kind']}/", HTTP_HOST=options['host']))
+        if orjson is None:
+            self.stderr.write('orjson is not installed; FastJSONRenderer falls back to the stdlib encoder.')
+
+        self.stdout.write(f"{'rows':>7}  {'path':<28}{'serialize':>11}{'peak':>10}{'render':>10}{'peak':>10}")
+        for count in options['rows']:
+            if count > available:
+                self.stderr.write(f"Only {available} {options['kind']}; skipping {count}.")
+                continue
+            queryset = get_queryset()[:count]
+
+            def model_serializer():
+                return serializer_class(queryset.all(), many=True, context={'request': request}).data
+
+            def row_serializer():
+                rows = rows_class(request)
+                return rows.to_representation(rows.values(queryset.all()))
+
+            paths = [
+                ('ModelSerializer + json', model_serializer, JSONRenderer()),
+                ('rows + orjson', row_serializer, FastJSONRenderer()),
+            ]
+            outputs = []
+            for label, serialize, renderer in paths:
+                serialize_time, serialize_peak, data = measure(serialize, options['repeat'])
+                render_time, render_peak, content = measure(lambda: renderer.render(data), options['repeat'])
+                outputs.append(content)
+                self.stdout.write(
+                    f'{count:>7}  {label:<28}{serialize_time * 1000:>9.0f}ms{serialize_peak / 2**20:>7.1f}MiB'
+                    f'{render_time * 1000:>8.0f}ms{render_peak / 2**20:>7.1f}MiB'
+                )
+            if outputs[0] != outputs[1]:
+                self.stderr.write(f'{count} rows: the two paths rendered different JSON.')
@@ -0,0 +1,97 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test import Client
+
+from django.contrib.auth import get_user_model
+
+from catalog.models import Contact, Tutorial
+from catalog.transactions import is_locked
+
+READ_PATHS = ['/api/tutorials/', '/api/media/', '/api/tuner-configurations/']
+SUBJECT = 'load test'
+USERNAME = 'sqlite-load-test'
+
+
+def worker(role: str, deadline: float, host: str, tutorials: list, results) -> None:
+    connections.close_all()
+    client = Client(HTTP_HOST=host)
+    if role == 'editor':
+        client.force_login(get_user_model().objects.get(username=USERNAME))
+    counts = {'role': role, 'ok': 0, 'locked': 0, 'errors': 0}
+    number = 0
+    while time.time() < deadline:
+        number += 1
+        try:
+            if role == 'reader':
+                response = client.get(READ_PATHS[number % len(READ_PATHS)])
+            elif role == 'editor':
+                # Saving a tutorial re-indexes it with update_or_create: a read-then-write transaction.
+                response = client.patch(
+                    f'/api/tutorials/{tutorials[number % len(tutorials)]}/',
+                    {'duration': f'{number % 60} min'}, content_type='application/json',
+                )
+            else:
+                response = client.post('/api/contact/', {
+                    'name': 'Load Test', 'email': 'load@example.com', 'subject': SUBJECT, 'message': f'#{number}',
+                }, content_type='application/json')
+        except OperationalError as exc:
+            counts['locked' if is_locked(exc) else 'errors'] += 1
+            continue
+        counts['ok' if response.status_code < 500 else 'errors'] += 1
+    connections.close_all()
+    results.put(counts)
+
+
+class Command(BaseCommand):
+    help = 'Hammer the API with reader and writer processes and count "database is locked" failures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4, help='Processes posting contact messages.')
+        parser.add_argument('--editors', type=int, default=2, help='Staff processes editing tutorials.')
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        self.stdout.write(f'{connection.settings_dict["ENGINE"]}, journal_mode={journal_mode}')
+
+        tutorials = list(Tutorial.objects.values_list('pk', flat=True)[:50])
+        if options['editors'] and not tutorials:
+            self.stderr.write('No tutorials to edit; running without editors.')
+            options['editors'] = 0
+        get_user_model().objects.update_or_create(username=USERNAME, defaults={'is_staff': True})
+
+        # Forked workers must not share the parent's database connection.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.time() + options['seconds']
+        roles = ['reader'] * options['readers'] + ['writer'] * options['writers'] + ['editor'] * options['editors']
+        processes = [
+            context.Process(target=worker, args=(role, deadline, options['host'], tutorials, results))
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+        totals = {}
+        for _ in processes:
+            counts = results.get()
+            total = totals.setdefault(counts.pop('role'), {'ok': 0, 'locked': 0, 'errors': 0})
+            for key, value in counts.items():
+                total[key] += value
+        for process in processes:
+            process.join()
+
+        for role, total in sorted(totals.items()):
+            self.stdout.write(
+                f'{role}s: {total["ok"] / options["seconds"]:.0f} ok/s, '
+                f'{total["locked"]} locked, {total["errors"]} other errors'
+            )
+        Contact.objects.filter(subject=SUBJECT).delete()
+        get_user_model().objects.filter(username=USERNAME).delete()
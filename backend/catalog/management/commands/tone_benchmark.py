@@ -0,0 +1,91 @@
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from catalog import benchmark, synth, tuning
+from catalog.models import Category, Instrument, TunerConfiguration
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every reference tone of a chromatic tuning through /instruments/<pk>/tuner_config/tones/<n>/, '
+        'cold (the first request renders the whole tuning) and warm (served from TONE_CACHE_DIR), per timbre. '
+        'The instrument is created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=12, help='Semitones in the tuning, from A3.')
+        parser.add_argument('--rounds', type=int, default=10, help='Cold and warm passes per timbre.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'])
+        frequencies = [round(220 * 2 ** (step / 12), 2) for step in range(options['notes'])]
+        dummy = {alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES}
+        results = {}
+        with tempfile.TemporaryDirectory() as scratch, override_settings(CACHES=dummy, TONE_CACHE_DIR=scratch):
+            self.run(client, frequencies, options['rounds'], results)
+
+        config = {'notes': len(frequencies), 'rounds': options['rounds']}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
+
+    def run(self, client, frequencies: list[float], rounds: int, results: dict) -> None:
+        with transaction.atomic():
+            category = Category.objects.create(name='Tone benchmark', slug='tone-benchmark')
+            instrument = Instrument.objects.create(name='Tone benchmark', category=category)
+            config = TunerConfiguration.objects.create(
+                instrument=instrument, notes=[f'n{index}' for index in range(len(frequencies))], frequencies=frequencies
+            )
+            self.stderr.write(
+                f"{len(frequencies)} notes, {synth.DURATION} s at {synth.SAMPLE_RATE} Hz\n"
+                f"{'timbre':<10}{'cold first':>12}{'cold tuning':>13}{'warm note':>11}{'warm tuning':>13}"
+            )
+            for timbre in synth.TIMBRES:
+                urls = [
+                    f"{reverse('instrument-tuner-tone', args=[instrument.pk, index])}?timbre={timbre}"
+                    for index in range(len(frequencies))
+                ]
+                cold_notes, cold_tunings, warm_notes, warm_tunings = [], [], [], []
+                for _ in range(rounds):
+                    tuning.clear_reference_tones(config)
+                    cold_tunings.append(self.fetch(client, urls, cold_notes))
+                    warm_tunings.append(self.fetch(client, urls, warm_notes))
+                row = {
+                    # The first request of a cold pass renders the whole tuning.
+                    'cold first note': cold_notes[::len(urls)],
+                    'cold tuning': cold_tunings,
+                    'warm note': warm_notes,
+                    'warm tuning': warm_tunings,
+                }
+                line = f'{timbre:<10}'
+                for (label, samples), width in zip(row.items(), (10, 11, 9, 11)):
+                    stats = results[f'{timbre} {label}'] = benchmark.summarize(samples)
+                    line += f"{stats['p50_ms']:>{width}.1f}ms"
+                self.stderr.write(line)
+            transaction.set_rollback(True)
+
+    def fetch(self, client, urls: list[str], samples: list[float]) -> float:
+        """GET every URL in turn, appending each request's duration to ``samples``; returns the total."""
+        total = 0.0
+        for url in urls:
+            started = time.perf_counter()
+            response = client.get(url)
+            # The test client closes the response once the body is consumed.
+            b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f'{url} answered {response.status_code}.')
+            samples.append(elapsed)
+            total += elapsed
+        return total
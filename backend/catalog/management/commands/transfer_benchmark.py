@@ -0,0 +1,115 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from catalog import benchmark, search, transfer
+
+# Fields rewritten for the "changed" pass, one per model.
+CHANGED = {
+    'category': 'description',
+    'instrument': 'description',
+    'expert': 'bio',
+    'tutorial': 'description',
+    'tuner_configuration': 'tuning_name',
+    'media': 'title',
+}
+
+
+def renamed(record: dict) -> dict:
+    """The same record under a natural key that does not exist yet, so importing it creates a row."""
+    record = dict(record)
+    model = record['model']
+    if model == 'category':
+        record['slug'] += '-copy'
+        record['name'] += ' copy'
+    elif model == 'instrument':
+        record['name'] += ' copy'
+        record['category'] += '-copy'
+    elif model == 'expert':
+        record['name'] += ' copy'
+        record['instruments'] = [f'{name} copy' for name in record['instruments']]
+    else:
+        record['instrument'] += ' copy'
+    return record
+
+
+def changed(record: dict) -> dict:
+    record = dict(record)
+    field = CHANGED[record['model']]
+    record[field] = f'{record[field] or ""} (revised)'
+    return record
+
+
+class Command(BaseCommand):
+    help = (
+        'Export the catalog to NDJSON, then import it back unchanged, with every row changed and as new rows, '
+        'reporting rows/s per model. The imports run in a transaction that is rolled back; use a catalog from '
+        'generate_catalog in a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Records per bulk write, as import_catalog.')
+        parser.add_argument('--output', help='Write the JSON here instead of stdout.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        lines = list(transfer.export_records())
+        exported = time.perf_counter() - started
+        if not lines:
+            raise CommandError('The catalog is empty; run generate_catalog first.')
+        records = [json.loads(line) for line in lines]
+        self.stderr.write(f'Exported {len(lines)} records in {exported:.2f}s ({len(lines) / exported:.0f}/s)')
+
+        results = {'export': {'records': len(lines), 'seconds': round(exported, 3)}}
+        passes = {
+            'unchanged': lines,
+            'changed': [json.dumps(changed(record)) for record in records],
+            'new': [json.dumps(renamed(record)) for record in records],
+        }
+        self.stderr.write(
+            f"{'pass':<11}{'model':<21}{'created':>9}{'updated':>9}{'unchanged':>11}{'skipped':>9}{'rows/s':>10}"
+        )
+        with transaction.atomic():
+            for label, batch in passes.items():
+                # Each pass starts from the exported catalog.
+                with transaction.atomic():
+                    results[label] = self.run(label, batch, batch_size)
+                    transaction.set_rollback(True)
+
+            started = time.perf_counter()
+            indexed = search.rebuild_index()
+            results['search index'] = {'documents': indexed, 'seconds': round(time.perf_counter() - started, 3)}
+            self.stderr.write(f"Rebuilt {indexed} search documents in {results['search index']['seconds']:.2f}s")
+            transaction.set_rollback(True)
+
+        config = {'records': len(lines), 'batch_size': batch_size}
+        benchmark.write(
+            {'environment': benchmark.environment(), 'config': config, 'benchmarks': results},
+            options['output'],
+            self.stdout,
+        )
+
+    def run(self, label: str, lines: list[str], batch_size: int) -> dict:
+        started = time.perf_counter()
+        stats = transfer.import_lines(lines, batch_size=batch_size)
+        total = time.perf_counter() - started
+        result = {}
+        for name, counts in stats.items():
+            result[name] = {
+                'created': counts.created,
+                'updated': counts.updated,
+                'unchanged': counts.unchanged,
+                'skipped': counts.skipped,
+                'seconds': round(counts.seconds, 3),
+                'rows_per_second': round(counts.rate),
+            }
+            self.stderr.write(
+                f'{label:<11}{name:<21}{counts.created:>9}{counts.updated:>9}{counts.unchanged:>11}'
+                f'{counts.skipped:>9}{counts.rate:>10.0f}'
+            )
+        result['total'] = {'seconds': round(total, 3), 'rows_per_second': round(len(lines) / total)}
+        self.stderr.write(f"{label:<11}{'total':<21}{'':>38}{len(lines) / total:>10.0f}")
+        return result
@@ -0,0 +1,264 @@
+"""
+Request metrics in the Prometheus text format.
+
+``catalog.timing.report`` hands every finished request to ``observe``, which
+updates this process's registry:
+
+- ``catalog_request_duration_seconds``: latency histogram per view, action and status
+- ``catalog_request_db_seconds``: histogram of time spent in database queries per view and action
+- ``catalog_response_cache_lookups_total``: response cache hits and misses per view and action
+- ``catalog_media_bytes_served_total``: bytes of media files handed out per view
+
+Passenger runs several worker processes and a scrape reaches only one of
+them, so each process writes its registry to ``METRICS_DIR/<pid>-<start>.json``
+from a background thread every ``METRICS_FLUSH_INTERVAL`` seconds and at
+exit.  ``collect`` sums all of those files.  Files of workers that have exited
+are folded into ``archive.json``, so counters don't go backwards when
+Passenger recycles a worker.  Folding needs ``fcntl`` and is skipped on
+Windows, where the files simply accumulate.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from django.conf import settings
+
+# Upper bounds in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# name -> (type, help, label names, histogram buckets)
+METRICS = {
+    'catalog_request_duration_seconds': (
+        'histogram', 'Time to answer a request.', ('view', 'action', 'status'), LATENCY_BUCKETS,
+    ),
+    'catalog_request_db_seconds': (
+        'histogram', 'Time a request spent in database queries.', ('view', 'action'), DB_BUCKETS,
+    ),
+    'catalog_response_cache_lookups_total': (
+        'counter', 'Response cache lookups.', ('view', 'action', 'result'), None,
+    ),
+    'catalog_media_bytes_served_total': (
+        'counter', 'Bytes of media files sent or handed to the front server.', ('view',), None,
+    ),
+}
+
+ARCHIVE = 'archive.json'
+
+_lock = threading.Lock()
+# name -> {label values: value}; a histogram's value is its per-bucket counts,
+# the +Inf count and the sum.
+_series = {name: {} for name in METRICS}
+_changed = False
+_file = None
+
+
+def get_metrics_dir() -> Path:
+    return Path(getattr(settings, 'METRICS_DIR', Path(settings.BASE_DIR) / 'metrics'))
+
+
+def _observe_histogram(series: dict, labels: tuple, buckets: tuple, value: float) -> None:
+    values = series.get(labels)
+    if values is None:
+        values = series[labels] = [0] * (len(buckets) + 1) + [0.0]
+    values[bisect_left(buckets, value)] += 1
+    values[-1] += value
+
+
+def _increment(series: dict, labels: tuple, amount) -> None:
+    series[labels] = series.get(labels, 0) + amount
+
+
+def observe(view: str, action: str, status: int, total: float, db: float, cache: str | None, media_bytes: int) -> None:
+    """Record one finished request."""
+    global _changed
+    if _file is None:
+        _start()
+    with _lock:
+        _observe_histogram(
+            _series['catalog_request_duration_seconds'], (view, action, str(status)), LATENCY_BUCKETS, total
+        )
+        _observe_histogram(_series['catalog_request_db_seconds'], (view, action), DB_BUCKETS, db)
+        if cache is not None:
+            _increment(_series['catalog_response_cache_lookups_total'], (view, action, cache), 1)
+        if media_bytes:
+            _increment(_series['catalog_media_bytes_served_total'], (view,), media_bytes)
+        _changed = True
+
+
+def _start() -> None:
+    """Name this process's file and start flushing to it."""
+    global _file
+    with _lock:
+        if _file is not None:
+            return
+        _file = get_metrics_dir() / f'{os.getpid()}-{time.time_ns()}.json'
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    threading.Thread(target=_flush_loop, args=(interval,), name='metrics-flush', daemon=True).start()
+
+
+def _flush_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        flush()
+
+
+def _after_fork() -> None:
+    # A worker forked from a preloaded app starts with its own file and thread.
+    global _lock, _series, _changed, _file
+    _lock = threading.Lock()
+    _series = {name: {} for name in METRICS}
+    _changed = False
+    _file = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _dump(series: dict) -> dict:
+    return {name: [[*labels, value] for labels, value in values.items()] for name, values in series.items()}
+
+
+def _write(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f'.{path.name}.tmp')
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def flush() -> None:
+    """Write this process's registry to its file if anything changed."""
+    global _changed
+    if _file is None:
+        return
+    with _lock:
+        if not _changed:
+            return
+        data = _dump(_series)
+        _changed = False
+    _write(_file, data)
+
+
+atexit.register(flush)
+
+
+def _load(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _merge(totals: dict, data: dict) -> None:
+    for name, rows in data.items():
+        if name not in METRICS:
+            continue
+        series = totals.setdefault(name, {})
+        for *labels, value in rows:
+            labels = tuple(labels)
+            current = series.get(labels)
+            if current is None:
+                series[labels] = value
+            elif isinstance(value, list):
+                series[labels] = [a + b for a, b in zip(current, value)]
+            else:
+                series[labels] = current + value
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def compact(directory: Path) -> int:
+    """Fold the files of exited workers into the archive; returns how many were folded."""
+    if fcntl is None:
+        return 0
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        dead = [
+            path for path in directory.glob('*-*.json')
+            if path.stem.split('-')[0].isdigit() and not _is_alive(int(path.stem.split('-')[0]))
+        ]
+        if not dead:
+            return 0
+        archive = {}
+        _merge(archive, _load(directory / ARCHIVE))
+        for path in dead:
+            _merge(archive, _load(path))
+        _write(directory / ARCHIVE, _dump(archive))
+        for path in dead:
+            path.unlink(missing_ok=True)
+    return len(dead)
+
+
+def collect() -> dict:
+    """Totals of every worker, including exited ones."""
+    flush()
+    directory = get_metrics_dir()
+    compact(directory)
+    totals = {}
+    for path in directory.glob('*.json'):
+        _merge(totals, _load(path))
+    return totals
+
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra: str = '') -> str:
+    pairs = [f'{name}="{_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals: dict, cache_stats: dict | None = None) -> str:
+    """The Prometheus text exposition (version 0.0.4) of ``collect()`` output."""
+    lines = []
+    for name, (kind, help_text, label_names, buckets) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for labels, value in sorted(totals.get(name, {}).items()):
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(label_names, labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), value[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                bucket_labels = _labels(label_names, labels, f'le="{le}"')
+                lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{name}_sum{_labels(label_names, labels)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_labels(label_names, labels)} {cumulative}')
+    if cache_stats is not None:
+        # Invalidations are counted in the shared cache; the hit ratio sums the lookups above.
+        lines += [
+            '# HELP catalog_response_cache_invalidations_total Response cache generation bumps.',
+            '# TYPE catalog_response_cache_invalidations_total counter',
+            f"catalog_response_cache_invalidations_total {cache_stats['invalidations']}",
+            '# HELP catalog_response_cache_hit_ratio Response cache hits over lookups since the counters started.',
+            '# TYPE catalog_response_cache_hit_ratio gauge',
+            f"catalog_response_cache_hit_ratio {_number(float(cache_stats['hit_ratio']))}",
+        ]
+    return '\n'.join(lines) + '\n'
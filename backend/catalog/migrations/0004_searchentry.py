@@ -0,0 +1,123 @@
+from django.db import migrations, models
+
+
+FTS_TABLE = 'catalog_searchentry_fts'
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, body,
+        content='catalog_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER catalog_searchentry_ai AFTER INSERT ON catalog_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER catalog_searchentry_ad AFTER DELETE ON catalog_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER catalog_searchentry_au AFTER UPDATE ON catalog_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS catalog_searchentry_au',
+    'DROP TRIGGER IF EXISTS catalog_searchentry_ad',
+    'DROP TRIGGER IF EXISTS catalog_searchentry_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX catalog_searchentry_document_gin ON catalog_searchentry USING gin (
+        (setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B'))
+    )
+    """,
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS catalog_searchentry_document_gin',
+]
+
+
+def backfill(apps, schema_editor):
+    """Index the rows that already exist; the signals only see later saves."""
+    SearchEntry = apps.get_model('catalog', 'SearchEntry')
+    documents = {
+        'instrument': (
+            apps.get_model('catalog', 'Instrument'),
+            lambda obj: (obj.name, [
+                obj.region, obj.description, obj.history, obj.materials,
+                obj.playing_technique, obj.cultural_significance,
+            ]),
+        ),
+        'expert': (
+            apps.get_model('catalog', 'Expert'),
+            lambda obj: (obj.name, [obj.expertise, obj.bio, obj.detailed_bio]),
+        ),
+        'tutorial': (
+            apps.get_model('catalog', 'Tutorial'),
+            lambda obj: (obj.title, [obj.instructor_name, obj.description]),
+        ),
+    }
+    # Same documents as catalog.search.build_document.
+    for kind, (model, document) in documents.items():
+        batch = []
+        for obj in model.objects.order_by('pk').iterator(chunk_size=500):
+            title, parts = document(obj)
+            body = '\n'.join(part for part in parts if part)
+            batch.append(SearchEntry(kind=kind, object_id=obj.pk, title=title[:200], body=body))
+            if len(batch) >= 500:
+                SearchEntry.objects.bulk_create(batch)
+                batch = []
+        SearchEntry.objects.bulk_create(batch)
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_tutorial_and_tuner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('instrument', 'Instrument'), ('expert', 'Expert'), ('tutorial', 'Tutorial')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'search entries',
+                'ordering': ['kind', 'object_id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='catalog_searchentry_kind_object'),
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
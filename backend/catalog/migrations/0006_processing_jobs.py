@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('catalog', '0005_change_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField(default=0)),
+                ('file', models.FileField(upload_to='instruments/media/variants/')),
+                ('source', models.CharField(help_text='Name of the upload this variant was built from', max_length=255)),
+                ('byte_size', models.PositiveIntegerField(default=0)),
+                ('vertex_count', models.PositiveIntegerField(default=0)),
+                ('triangle_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('media', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='catalog.media')),
+            ],
+            options={
+                'ordering': ['media', 'level'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('model_3d', '3D model optimization')], max_length=30)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='catalog_job_status_created')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='modelvariant',
+            constraint=models.UniqueConstraint(fields=('media', 'level'), name='catalog_modelvariant_media_level'),
+        ),
+    ]
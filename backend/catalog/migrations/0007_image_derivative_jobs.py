@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_processing_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingjob',
+            name='kind',
+            field=models.CharField(choices=[('model_3d', '3D model optimization'), ('image_derivatives', 'Responsive image derivatives')], max_length=30),
+        ),
+    ]
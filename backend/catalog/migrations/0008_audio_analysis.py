@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('catalog', '0007_image_derivative_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingjob',
+            name='kind',
+            field=models.CharField(choices=[('model_3d', '3D model optimization'), ('image_derivatives', 'Responsive image derivatives'), ('audio_analysis', 'Audio peaks and loudness')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='AudioAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('source', models.CharField(help_text='Name of the upload this analysis was built from', max_length=255)),
+                ('peaks', models.FileField(upload_to='audio/peaks/')),
+                ('duration', models.FloatField(default=0)),
+                ('sample_rate', models.PositiveIntegerField(default=0)),
+                ('channels', models.PositiveSmallIntegerField(default=0)),
+                ('peak_db', models.FloatField(default=0)),
+                ('rms_db', models.FloatField(default=0)),
+                ('loudness_db', models.FloatField(default=0)),
+                ('gain_db', models.FloatField(default=0, help_text='Gain that levels the recording to AUDIO_TARGET_LOUDNESS')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'audio analyses',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='audioanalysis',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='catalog_audioanalysis_target'),
+        ),
+    ]
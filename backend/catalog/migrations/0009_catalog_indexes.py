@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:43
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_audio_analysis'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='media',
+            options={'ordering': ['media_type', '-is_primary', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['updated_at'], name='catalog_category_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='expert',
+            index=models.Index(fields=['name', 'id'], name='catalog_expert_name'),
+        ),
+        migrations.AddIndex(
+            model_name='expert',
+            index=models.Index(fields=['updated_at'], name='catalog_expert_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='instrument',
+            index=models.Index(fields=['name', 'id'], name='catalog_instrument_name'),
+        ),
+        migrations.AddIndex(
+            model_name='instrument',
+            index=models.Index(fields=['category', 'name', 'id'], name='catalog_instrument_category'),
+        ),
+        migrations.AddIndex(
+            model_name='instrument',
+            index=models.Index(django.db.models.functions.text.Lower('region'), models.F('name'), models.F('id'), name='catalog_instrument_region_ci'),
+        ),
+        migrations.AddIndex(
+            model_name='instrument',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['name', 'id'], name='catalog_instrument_featured'),
+        ),
+        migrations.AddIndex(
+            model_name='instrument',
+            index=models.Index(fields=['updated_at'], name='catalog_instrument_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='learningcontent',
+            index=models.Index(fields=['order', 'id'], name='catalog_learning_order'),
+        ),
+        migrations.AddIndex(
+            model_name='learningcontent',
+            index=models.Index(fields=['updated_at'], name='catalog_learning_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['instrument', 'media_type', '-is_primary', 'id'], name='catalog_media_instrument_type'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['media_type', 'id'], name='catalog_media_type'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['updated_at'], name='catalog_media_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='tunerconfiguration',
+            index=models.Index(fields=['tuning_name', 'id'], name='catalog_tuner_name'),
+        ),
+        migrations.AddIndex(
+            model_name='tunerconfiguration',
+            index=models.Index(fields=['updated_at'], name='catalog_tuner_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(fields=['instrument', '-created_at'], name='catalog_tutorial_instrument'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(fields=['-created_at', 'id'], name='catalog_tutorial_created'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(fields=['updated_at'], name='catalog_tutorial_updated'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_instrument_facets_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingjob',
+            name='kind',
+            field=models.CharField(choices=[('model_3d', '3D model optimization'), ('image_derivatives', 'Responsive image derivatives'), ('audio_analysis', 'Audio peaks and loudness'), ('recommendations', 'Similar instruments and experts')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('instrument', 'Similar instrument'), ('expert', 'Recommended expert')], max_length=20)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('expert', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.expert')),
+                ('instrument', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='catalog.instrument')),
+                ('related_instrument', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.instrument')),
+            ],
+            options={
+                'ordering': ['instrument', 'kind', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recommendation',
+            constraint=models.UniqueConstraint(fields=('instrument', 'kind', 'rank'), name='catalog_recommendation_rank'),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendation',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('expert__isnull', True), ('kind', 'instrument'), ('related_instrument__isnull', False)), models.Q(('expert__isnull', False), ('kind', 'expert'), ('related_instrument__isnull', True)), _connector='OR'), name='catalog_recommendation_target'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expert',
+            name='photo_info',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='instrument',
+            name='primary_image_info',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
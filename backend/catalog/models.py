@@ -1,4 +1,8 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 
 
 class Category(models.Model):
@@ -6,9 +10,13 @@ class Category(models.Model):
     slug = models.SlugField(max_length=140, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['updated_at'], name='catalog_category_updated'),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -24,12 +32,28 @@ class Instrument(models.Model):
     playing_technique = models.TextField(blank=True)
     cultural_significance = models.TextField(blank=True)
     primary_image = models.ImageField(upload_to='instruments/images/', blank=True, null=True)
+    # Digest and width of primary_image for its srcset, saved by catalog.processing.store_image_info.
+    primary_image_info = models.JSONField(null=True, blank=True, editable=False)
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        # Matched to the list endpoint: filters (``InstrumentFilter``) lead,
+        # then the (name, id) cursor ordering so pages need no sort.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='catalog_instrument_name'),
+            models.Index(fields=['category', 'name', 'id'], name='catalog_instrument_category'),
+            models.Index(Lower('region'), 'name', 'id', name='catalog_instrument_region_ci'),
+            # Partial, since Django renders ``is_featured=True`` as a bare
+            # ``WHERE is_featured`` that no index on the column can serve.
+            models.Index(fields=['name', 'id'], condition=Q(is_featured=True), name='catalog_instrument_featured'),
+            # Covers MAX(updated_at) / COUNT(*) of the conditional GET validators.
+            models.Index(fields=['updated_at'], name='catalog_instrument_updated'),
+            # Covers the grouped ``?facets=`` count, which then needs no sort.
+            models.Index(fields=['category', 'region', 'is_featured'], name='catalog_instrument_facets'),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -54,9 +78,16 @@ class Media(models.Model):
     title = models.CharField(max_length=150, blank=True)
     is_primary = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['media_type', 'id']
+        # Primary assets first within a type, as ``resolve_primary_media`` picks them.
+        ordering = ['media_type', '-is_primary', 'id']
+        indexes = [
+            models.Index(fields=['instrument', 'media_type', '-is_primary', 'id'], name='catalog_media_instrument_type'),
+            models.Index(fields=['media_type', 'id'], name='catalog_media_type'),
+            models.Index(fields=['updated_at'], name='catalog_media_updated'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.instrument.name} - {self.media_type}'
@@ -69,14 +100,20 @@ class Expert(models.Model):
     detailed_bio = models.TextField(blank=True)
     contact_email = models.EmailField(blank=True)
     photo = models.ImageField(upload_to='experts/photos/', blank=True, null=True)
+    photo_info = models.JSONField(null=True, blank=True, editable=False)
     achievements = models.JSONField(default=list, blank=True)
     instruments = models.ManyToManyField(Instrument, related_name='experts', blank=True)
     performance_video = models.FileField(upload_to='experts/videos/', blank=True, null=True)
     teaching_audio = models.FileField(upload_to='experts/audio/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='catalog_expert_name'),
+            models.Index(fields=['updated_at'], name='catalog_expert_updated'),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -92,6 +129,10 @@ class LearningContent(models.Model):
 
     class Meta:
         ordering = ['order', 'title']
+        indexes = [
+            models.Index(fields=['order', 'id'], name='catalog_learning_order'),
+            models.Index(fields=['updated_at'], name='catalog_learning_updated'),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -124,6 +165,11 @@ class Tutorial(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['instrument', '-created_at'], name='catalog_tutorial_instrument'),
+            models.Index(fields=['-created_at', 'id'], name='catalog_tutorial_created'),
+            models.Index(fields=['updated_at'], name='catalog_tutorial_updated'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} - {self.instructor_name}"
@@ -140,6 +186,168 @@ class TunerConfiguration(models.Model):
 
     class Meta:
         ordering = ['-is_default', 'tuning_name']
+        indexes = [
+            models.Index(fields=['tuning_name', 'id'], name='catalog_tuner_name'),
+            models.Index(fields=['updated_at'], name='catalog_tuner_updated'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.instrument.name} - {self.tuning_name}"
+
+
+class SearchEntry(models.Model):
+    INSTRUMENT = 'instrument'
+    EXPERT = 'expert'
+    TUTORIAL = 'tutorial'
+
+    KIND_CHOICES = [
+        (INSTRUMENT, 'Instrument'),
+        (EXPERT, 'Expert'),
+        (TUTORIAL, 'Tutorial'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['kind', 'object_id']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='catalog_searchentry_kind_object'),
+        ]
+        verbose_name_plural = 'search entries'
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.object_id} - {self.title}"
+
+
+class Recommendation(models.Model):
+    """A precomputed similar instrument or expert of an instrument, kept by ``catalog.recommendations``."""
+    INSTRUMENT = 'instrument'
+    EXPERT = 'expert'
+
+    KIND_CHOICES = [
+        (INSTRUMENT, 'Similar instrument'),
+        (EXPERT, 'Recommended expert'),
+    ]
+
+    instrument = models.ForeignKey(Instrument, on_delete=models.CASCADE, related_name='recommendations')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    related_instrument = models.ForeignKey(Instrument, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    expert = models.ForeignKey(Expert, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['instrument', 'kind', 'rank']
+        constraints = [
+            # Also the index the detail view's prefetch reads in order.
+            models.UniqueConstraint(fields=['instrument', 'kind', 'rank'], name='catalog_recommendation_rank'),
+            models.CheckConstraint(
+                check=(
+                    Q(kind='instrument', related_instrument__isnull=False, expert__isnull=True)
+                    | Q(kind='expert', expert__isnull=False, related_instrument__isnull=True)
+                ),
+                name='catalog_recommendation_target',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        target = self.related_instrument_id if self.kind == self.INSTRUMENT else self.expert_id
+        return f"{self.instrument_id} -> {self.kind} #{target} ({self.score:.3f})"
+
+
+class ModelVariant(models.Model):
+    """Optimized copy of a ``Media.MODEL_3D`` upload; level 0 is full detail."""
+    media = models.ForeignKey(Media, on_delete=models.CASCADE, related_name='variants')
+    level = models.PositiveSmallIntegerField(default=0)
+    file = models.FileField(upload_to='instruments/media/variants/')
+    source = models.CharField(max_length=255, help_text='Name of the upload this variant was built from')
+    byte_size = models.PositiveIntegerField(default=0)
+    vertex_count = models.PositiveIntegerField(default=0)
+    triangle_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['media', 'level']
+        constraints = [
+            models.UniqueConstraint(fields=['media', 'level'], name='catalog_modelvariant_media_level'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.media} - LOD {self.level}"
+
+
+class AudioAnalysis(models.Model):
+    """Waveform peaks and loudness of a ``Media.AUDIO`` file or expert teaching audio."""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey('content_type', 'object_id')
+    source = models.CharField(max_length=255, help_text='Name of the upload this analysis was built from')
+    peaks = models.FileField(upload_to='audio/peaks/')
+    duration = models.FloatField(default=0)
+    sample_rate = models.PositiveIntegerField(default=0)
+    channels = models.PositiveSmallIntegerField(default=0)
+    peak_db = models.FloatField(default=0)
+    rms_db = models.FloatField(default=0)
+    loudness_db = models.FloatField(default=0)
+    gain_db = models.FloatField(default=0, help_text='Gain that levels the recording to AUDIO_TARGET_LOUDNESS')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'audio analyses'
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='catalog_audioanalysis_target'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_type.model} #{self.object_id} ({self.duration:.1f}s)"
+
+
+class ProcessingJob(models.Model):
+    """Background work on an uploaded file, picked up by ``run_media_worker``."""
+    MODEL_3D = 'model_3d'
+    IMAGE_DERIVATIVES = 'image_derivatives'
+    AUDIO_ANALYSIS = 'audio_analysis'
+    RECOMMENDATIONS = 'recommendations'
+
+    KIND_CHOICES = [
+        (MODEL_3D, '3D model optimization'),
+        (IMAGE_DERIVATIVES, 'Responsive image derivatives'),
+        (AUDIO_ANALYSIS, 'Audio peaks and loudness'),
+        (RECOMMENDATIONS, 'Similar instruments and experts'),
+    ]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey('content_type', 'object_id')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    duration = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='catalog_job_status_created'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} #{self.object_id} ({self.status})"
@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -6,3 +9,17 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         return request.user and request.user.is_staff
+
+
+class IsStaffOrMetricsToken(permissions.BasePermission):
+    """
+    Staff users, or a scraper sending ``Authorization: Token <METRICS_TOKEN>``
+    (Prometheus can't log in for a JWT).
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        return bool(token) and scheme == 'Token' and hmac.compare_digest(credentials.strip(), token)
@@ -0,0 +1,183 @@
+"""
+Pitch analysis of instrument recordings, used to suggest tuner configurations.
+
+Frames are analyzed in batches with the YIN estimator (de Cheveigné and
+Kawahara, 2002).  The difference function of every frame in a batch comes
+from one FFT cross-correlation, so throughput does not depend on a Python
+loop over lags.  Stable runs of voiced frames become note segments, and
+segments on the same semitone are merged into one suggested note.
+
+Like ``catalog.audio`` this module does not touch the ORM, so
+``analyze_file`` can run in a process pool.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.conf import settings
+
+from . import audio
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+# Analysis runs on the recording decimated to roughly this rate.
+ANALYSIS_RATE = 16000
+BATCH_FRAMES = 1024
+
+
+@dataclass
+class NoteSuggestion:
+    note: str
+    frequency: float
+    cents: float
+    duration: float
+
+
+@dataclass
+class PitchAnalysis:
+    frames: int
+    voiced_frames: int
+    notes: list[NoteSuggestion] = field(default_factory=list)
+
+    @property
+    def voiced_ratio(self) -> float:
+        return self.voiced_frames / self.frames if self.frames else 0.0
+
+
+def get_option(name: str, default):
+    return getattr(settings, 'PITCH_ANALYSIS', {}).get(name, default)
+
+
+def note_name(frequency: float) -> tuple[str, float]:
+    """Nearest equal-tempered note (A4 = 440 Hz) and the offset from it in cents."""
+    midi = 69 + 12 * np.log2(frequency / 440.0)
+    nearest = int(round(midi))
+    return f'{NOTE_NAMES[nearest % 12]}{nearest // 12 - 1}', round(float(midi - nearest) * 100, 1)
+
+
+def yin(frames: np.ndarray, sample_rate: int, fmin: float, fmax: float, threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate f0 for a batch of ``(n, 2 * window)`` frames.
+
+    Returns ``(frequencies, aperiodicity)``; unvoiced frames get frequency 0.
+    """
+    count, size = frames.shape
+    window = size // 2
+    tau_min = max(2, int(sample_rate / fmax))
+    tau_max = min(window - 1, int(np.ceil(sample_rate / fmin)))
+
+    # d(tau) = sum(x[j]^2) + sum(x[j + tau]^2) - 2 * sum(x[j] * x[j + tau]) over j < window.
+    n_fft = 1 << int(np.ceil(np.log2(size + window)))
+    head = frames[:, :window]
+    correlation = np.fft.irfft(
+        np.conj(np.fft.rfft(head, n_fft)) * np.fft.rfft(frames, n_fft), n_fft
+    )[:, :window]
+    energy = np.concatenate([np.zeros((count, 1)), np.cumsum(np.square(frames, dtype=np.float64), axis=1)], axis=1)
+    lagged_energy = energy[:, window:window + window] - energy[:, :window]
+    difference = np.maximum(energy[:, window:window + 1] + lagged_energy - 2 * correlation, 0.0)
+
+    # Cumulative mean normalized difference.
+    cumulative = np.cumsum(difference[:, 1:], axis=1)
+    normalized = np.ones_like(difference)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized[:, 1:] = difference[:, 1:] * np.arange(1, window) / cumulative
+    normalized = np.nan_to_num(normalized, nan=1.0, posinf=1.0)
+
+    # First dip below the threshold, followed down to its local minimum.
+    search = normalized[:, tau_min:tau_max + 1]
+    is_minimum = np.zeros_like(search, dtype=bool)
+    is_minimum[:, 1:-1] = (search[:, 1:-1] <= search[:, :-2]) & (search[:, 1:-1] <= search[:, 2:])
+    candidates = is_minimum & (search < threshold)
+    has_candidate = candidates.any(axis=1)
+    tau = np.where(has_candidate, candidates.argmax(axis=1), search.argmin(axis=1)) + tau_min
+
+    rows = np.arange(count)
+    tau = np.clip(tau, 1, window - 2)
+    before, at, after = normalized[rows, tau - 1], normalized[rows, tau], normalized[rows, tau + 1]
+    denominator = before - 2 * at + after
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.where(np.abs(denominator) > 1e-12, 0.5 * (before - after) / denominator, 0.0)
+    refined = tau + np.clip(shift, -1, 1)
+
+    voiced = has_candidate & (refined > 0)
+    frequencies = np.where(voiced, sample_rate / np.where(refined > 0, refined, 1), 0.0)
+    return frequencies, at
+
+
+def iter_frames(path, frame_size: int, hop: int):
+    """Yield ``(sample_rate, frames)`` batches of the decimated mono signal."""
+    info = audio.read_wav_info(path)
+    factor = max(1, info.sample_rate // ANALYSIS_RATE)
+    rate = info.sample_rate / factor
+    carry = np.zeros(0, dtype=np.float32)
+    for block in audio.iter_blocks(info, factor * hop * BATCH_FRAMES):
+        mono = block.mean(axis=1)
+        usable = len(mono) // factor * factor
+        # Averaging ``factor`` samples doubles as a crude anti-aliasing filter.
+        mono = mono[:usable].reshape(-1, factor).mean(axis=1)
+        signal = np.concatenate([carry, mono])
+        if len(signal) < frame_size:
+            carry = signal
+            continue
+        frames = np.lib.stride_tricks.sliding_window_view(signal, frame_size)[::hop]
+        yield rate, frames
+        carry = signal[len(frames) * hop:]
+
+
+def segment_notes(frequencies: np.ndarray, frame_seconds: float, min_duration: float) -> list[NoteSuggestion]:
+    """Merge stable runs of voiced frames into one suggestion per semitone."""
+    voiced = frequencies > 0
+    midi = np.where(voiced, 69 + 12 * np.log2(np.where(voiced, frequencies, 440.0) / 440.0), np.nan)
+
+    # A run ends at an unvoiced frame or a jump of more than a third of a semitone.
+    jumps = np.abs(np.diff(midi)) > 0.33
+    breaks = np.flatnonzero(np.concatenate([[True], jumps | ~voiced[1:] | ~voiced[:-1]]))
+    bounds = np.append(breaks, len(frequencies))
+
+    by_note = {}
+    min_frames = max(1, int(min_duration / frame_seconds))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end - start < min_frames or not voiced[start]:
+            continue
+        run = midi[start:end]
+        nearest = int(round(float(np.median(run))))
+        by_note.setdefault(nearest, []).append(run)
+
+    notes = []
+    for nearest, runs in sorted(by_note.items()):
+        values = np.concatenate(runs)
+        frequency = float(440.0 * 2 ** ((np.median(values) - 69) / 12))
+        name, cents = note_name(frequency)
+        notes.append(NoteSuggestion(name, round(frequency, 2), cents, round(len(values) * frame_seconds, 2)))
+    return notes
+
+
+def analyze_file(path) -> PitchAnalysis:
+    fmin = get_option('FMIN', 50.0)
+    fmax = get_option('FMAX', 2000.0)
+    threshold = get_option('THRESHOLD', 0.15)
+    silence = 10 ** (get_option('SILENCE_DB', -45.0) / 20)
+
+    info = audio.read_wav_info(path)
+    rate = info.sample_rate / max(1, info.sample_rate // ANALYSIS_RATE)
+    window = 1 << int(np.ceil(np.log2(rate / fmin + 2)))
+    hop = window // 2
+
+    results = []
+    for rate, frames in iter_frames(path, 2 * window, hop):
+        for start in range(0, len(frames), BATCH_FRAMES):
+            batch = np.asarray(frames[start:start + BATCH_FRAMES], dtype=np.float64)
+            frequencies, _aperiodicity = yin(batch, rate, fmin, fmax, threshold)
+            rms = np.sqrt(np.square(batch[:, :window]).mean(axis=1))
+            results.append(np.where(rms >= silence, frequencies, 0.0))
+
+    frequencies = np.concatenate(results) if results else np.zeros(0)
+    notes = segment_notes(frequencies, hop / rate, get_option('MIN_NOTE_SECONDS', 0.25))
+    return PitchAnalysis(frames=len(frequencies), voiced_frames=int((frequencies > 0).sum()), notes=notes)
+
+
+def suggest_tuning(analysis: PitchAnalysis, max_notes: int | None = None) -> tuple[list[str], list[float]]:
+    """The most sustained notes, low to high, as ``(notes, frequencies)``."""
+    max_notes = max_notes or get_option('MAX_NOTES', 12)
+    kept = sorted(analysis.notes, key=lambda note: note.duration, reverse=True)[:max_notes]
+    kept.sort(key=lambda note: note.frequency)
+    return [note.note for note in kept], [note.frequency for note in kept]
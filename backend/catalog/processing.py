@@ -0,0 +1,212 @@
+"""
+Background processing of uploaded files.
+
+Work is queued as ``ProcessingJob`` rows once the uploading transaction
+commits, and the ``run_media_worker`` management command claims and runs
+them in a local process, so no broker or external service is needed.
+Handlers register per job kind with ``@handler``.
+"""
+import logging
+import time
+import traceback
+from datetime import timedelta
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import audio, cache, gltf, images, recommendations
+from .models import AudioAnalysis, Instrument, Media, ModelVariant, ProcessingJob
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def handler(kind: str):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind: str, obj) -> None:
+    """Queue ``kind`` for ``obj`` after commit, unless it is already pending."""
+    content_type = ContentType.objects.get_for_model(obj)
+
+    def create():
+        ProcessingJob.objects.get_or_create(
+            kind=kind,
+            content_type=content_type,
+            object_id=obj.pk,
+            status=ProcessingJob.PENDING,
+        )
+
+    transaction.on_commit(create)
+
+
+def claim_next() -> ProcessingJob | None:
+    """Atomically move the oldest pending job to RUNNING and return it."""
+    while True:
+        job = ProcessingJob.objects.filter(status=ProcessingJob.PENDING).order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        claimed = ProcessingJob.objects.filter(pk=job.pk, status=ProcessingJob.PENDING).update(
+            status=ProcessingJob.RUNNING, attempts=F('attempts') + 1, updated_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def requeue_stale(older_than: timedelta = timedelta(hours=1)) -> int:
+    """Put back jobs left RUNNING by a worker that died."""
+    return ProcessingJob.objects.filter(
+        status=ProcessingJob.RUNNING, updated_at__lt=timezone.now() - older_than
+    ).update(status=ProcessingJob.PENDING)
+
+
+def run_job(job: ProcessingJob) -> None:
+    started = time.perf_counter()
+    target = job.target
+    try:
+        if target is None:
+            raise LookupError('Target object no longer exists')
+        HANDLERS[job.kind](target)
+    except Exception:
+        logger.exception('Processing job %s failed', job.pk)
+        job.status = ProcessingJob.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = ProcessingJob.DONE
+        job.error = ''
+    job.duration = time.perf_counter() - started
+    job.save(update_fields=['status', 'error', 'duration', 'updated_at'])
+
+
+def run_pending(limit: int | None = None) -> int:
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def build_levels(data: bytes) -> list[gltf.OptimizeResult]:
+    """The optimized full-detail GLB, then each coarser ``MODEL_LOD_GRIDS`` level worth keeping."""
+    results = [gltf.optimize_glb(data)]
+    for grid in getattr(settings, 'MODEL_LOD_GRIDS', (96, 32)):
+        result = gltf.optimize_glb(data, grid=grid)
+        # Only keep a level if it is meaningfully lighter than the last one.
+        if result.triangle_count < results[-1].triangle_count * 0.8:
+            results.append(result)
+    return results
+
+
+@handler(ProcessingJob.MODEL_3D)
+def optimize_model(media: Media) -> None:
+    """Write an optimized full-detail GLB plus coarser LODs for ``media``."""
+    with media.file.open('rb') as source:
+        data = source.read()
+
+    results = build_levels(data)
+    stem = PurePosixPath(media.file.name).stem
+    with transaction.atomic():
+        for variant in media.variants.all():
+            variant.file.delete(save=False)
+            variant.delete()
+        for level, result in enumerate(results):
+            variant = ModelVariant(
+                media=media,
+                level=level,
+                source=media.file.name,
+                byte_size=len(result.data),
+                vertex_count=result.vertex_count,
+                triangle_count=result.triangle_count,
+            )
+            variant.file.save(f'{stem}_lod{level}.glb', ContentFile(result.data), save=False)
+            variant.save()
+        # Fires post_save so cached and conditional responses pick up the variants.
+        media.save(update_fields=['updated_at'])
+
+
+def store_image_info(obj, info: images.SourceInfo) -> bool:
+    """
+    Save ``info`` as the ``<field>_info`` the srcset fields read, unless it is
+    already there or the upload changed meanwhile.  Bumps ``updated_at`` and
+    the cache generation since the rendered srcset changes; returns whether
+    the row changed.
+    """
+    field = images.IMAGE_SOURCES[obj._meta.model_name]
+    name = getattr(obj, field).name
+    record = images.info_record(name, info)
+    if getattr(obj, f'{field}_info') == record:
+        return False
+    model = type(obj)
+    updated = model.objects.filter(pk=obj.pk, **{field: name}).update(
+        **{f'{field}_info': record}, updated_at=timezone.now()
+    )
+    setattr(obj, f'{field}_info', record)
+    if updated:
+        cache.bump_generation(model._meta.label_lower)
+    return bool(updated)
+
+
+@handler(ProcessingJob.IMAGE_DERIVATIVES)
+def build_image_derivatives(obj) -> None:
+    """Render the responsive sizes of an instrument's or expert's photo."""
+    source = getattr(obj, images.IMAGE_SOURCES[obj._meta.model_name])
+    if source:
+        info, _built = images.build_all(source.path)
+        store_image_info(obj, info)
+        images.evict()
+
+
+@handler(ProcessingJob.AUDIO_ANALYSIS)
+def analyze_audio(obj) -> None:
+    """Write the waveform peaks sidecar and loudness stats of a recording."""
+    source = getattr(obj, audio.AUDIO_SOURCES[obj._meta.model_name])
+    summary = audio.analyze(source.path)
+
+    content_type = ContentType.objects.get_for_model(obj)
+    with transaction.atomic():
+        analysis, _created = AudioAnalysis.objects.get_or_create(content_type=content_type, object_id=obj.pk)
+        if analysis.peaks:
+            analysis.peaks.delete(save=False)
+        analysis.source = source.name
+        analysis.duration = summary.duration
+        analysis.sample_rate = summary.sample_rate
+        analysis.channels = summary.channels
+        analysis.peak_db = summary.peak_db
+        analysis.rms_db = summary.rms_db
+        analysis.loudness_db = summary.loudness_db
+        analysis.gain_db = summary.gain_db
+        stem = PurePosixPath(source.name).stem
+        analysis.peaks.save(f'{stem}.peaks', ContentFile(audio.encode_peaks(summary)), save=False)
+        analysis.save()
+
+
+@handler(ProcessingJob.RECOMMENDATIONS)
+def update_recommendations(instrument: Instrument) -> None:
+    """
+    Recompute the similar instruments and experts around ``instrument``.
+    Other pending recommendation jobs (up to ``recommendations.CHUNK``) are
+    folded in, since each would build the same index.
+    """
+    pending = ProcessingJob.objects.filter(kind=ProcessingJob.RECOMMENDATIONS, status=ProcessingJob.PENDING)
+    folded = dict(pending.order_by('created_at', 'id').values_list('pk', 'object_id')[:recommendations.CHUNK])
+    jobs = ProcessingJob.objects.filter(pk__in=list(folded))
+    jobs.filter(status=ProcessingJob.PENDING).update(status=ProcessingJob.RUNNING, updated_at=timezone.now())
+    try:
+        recommendations.update([instrument.pk, *folded.values()])
+    except Exception:
+        jobs.filter(status=ProcessingJob.RUNNING).update(status=ProcessingJob.PENDING, updated_at=timezone.now())
+        raise
+    jobs.filter(status=ProcessingJob.RUNNING).update(status=ProcessingJob.DONE, error='', updated_at=timezone.now())
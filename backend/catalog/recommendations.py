@@ -0,0 +1,339 @@
+"""
+Similar instruments and recommended experts, computed offline.
+
+Every instrument becomes one sparse vector of four blocks, each TF-IDF
+weighted and scaled to unit length before the block weights
+(``RECOMMENDATIONS['WEIGHTS']``) apply:
+
+* text: the words of ``TEXT_FIELDS``, with sublinear term frequency;
+* category, region (case-folded) and experts: one feature per value.
+
+Features of a single instrument cannot relate two instruments and are
+dropped, as are words in more than ``MAX_DF`` of the catalog.  Similarity is
+the cosine of two rows.  ``Index`` keeps the rows both by instrument (CSR)
+and by feature (postings), so one instrument's similarity to all others is a
+``bincount`` over the postings of its own features rather than a pass over
+the whole matrix.
+
+The best ``INSTRUMENTS`` neighbours and ``EXPERTS`` experts (scored by their
+closest instrument, leaving out the instrument's own experts) are stored as
+``Recommendation`` rows, which the detail view reads with one prefetch.
+``rebuild`` recomputes every list (``manage.py build_recommendations``).
+When an instrument or its experts change, the media worker runs ``update``,
+which recomputes that instrument and the lists it joins or leaves.  Feature
+weights come from the catalog as it is then, so the scores of other lists,
+and the order of near ties, drift slightly until the next rebuild.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from . import cache, static_api
+from .models import Expert, Instrument, Recommendation
+
+TEXT_FIELDS = ('description', 'materials', 'playing_technique', 'cultural_significance')
+BLOCKS = ('text', 'category', 'region', 'experts')
+DEFAULT_WEIGHTS = {'text': 1.0, 'category': 0.5, 'region': 0.3, 'experts': 0.4}
+
+STOP_WORDS = frozenset(
+    'about after also and are been but can for from has have into its made more most not one only other over '
+    'such than that the their them then there these they this through used was were when where which while '
+    'who with'.split()
+)
+_WORD_RE = re.compile(r'[^\W\d_]{3,}')
+
+# Instruments per query when reading, deleting or touching lists, well
+# within SQLite's limit on query parameters.
+CHUNK = 500
+# Decimal places of stored scores.
+PRECISION = 4
+
+
+def get_option(name: str, default):
+    return getattr(settings, 'RECOMMENDATIONS', {}).get(name, default)
+
+
+def words(text: str) -> list[str]:
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def chunked(items: list, size: int = CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@dataclass
+class Index:
+    """Unit-length vectors of every instrument, by row (CSR) and by feature (postings)."""
+    ids: np.ndarray
+    indptr: np.ndarray
+    features: np.ndarray
+    values: np.ndarray
+    postings_ptr: np.ndarray
+    posting_rows: np.ndarray
+    posting_values: np.ndarray
+    expert_ids: np.ndarray
+    # Expert links by instrument row; ``links_ptr`` delimits each row's.
+    links_ptr: np.ndarray
+    link_rows: np.ndarray
+    link_experts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, pk: int) -> int | None:
+        row = int(np.searchsorted(self.ids, pk))
+        return row if row < len(self.ids) and self.ids[row] == pk else None
+
+    def similarities(self, row: int) -> np.ndarray:
+        """Cosine similarity of ``row`` to every row, 0 to itself."""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        features, weights = self.features[start:end], self.values[start:end]
+        first = self.postings_ptr[features]
+        lengths = self.postings_ptr[features + 1] - first
+        # Positions of the postings of all the row's features, run after run.
+        offsets = np.repeat(first - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        scores = np.bincount(
+            self.posting_rows[offsets],
+            weights=self.posting_values[offsets] * np.repeat(weights, lengths),
+            minlength=len(self.ids),
+        )
+        scores[row] = 0.0
+        return scores
+
+    def expert_scores(self, row: int, scores: np.ndarray, min_score: float) -> np.ndarray:
+        """Per expert, the similarity of their closest instrument; 0 for ``row``'s own experts."""
+        result = np.zeros(len(self.expert_ids))
+        close = np.flatnonzero(scores[self.link_rows] >= min_score)
+        np.maximum.at(result, self.link_experts[close], scores[self.link_rows[close]])
+        result[self.link_experts[self.links_ptr[row]:self.links_ptr[row + 1]]] = 0.0
+        return result
+
+
+def build_index() -> Index:
+    weights = {**DEFAULT_WEIGHTS, **get_option('WEIGHTS', {})}
+    max_df = get_option('MAX_DF', 0.5)
+
+    experts_of = {}
+    for instrument_id, expert_id in Expert.instruments.through.objects.order_by().values_list(
+        'instrument_id', 'expert_id'
+    ):
+        experts_of.setdefault(instrument_id, []).append(expert_id)
+
+    vocabulary, feature_blocks = {}, []
+    ids, rows, features, counts = [], [], [], []
+
+    def add(row: int, block: int, key, count: int) -> None:
+        feature = vocabulary.get((block, key))
+        if feature is None:
+            feature = vocabulary[(block, key)] = len(feature_blocks)
+            feature_blocks.append(block)
+        rows.append(row)
+        features.append(feature)
+        counts.append(count)
+
+    queryset = Instrument.objects.order_by('pk').values_list('pk', 'category_id', 'region', *TEXT_FIELDS)
+    for row, (pk, category_id, region, *texts) in enumerate(queryset.iterator(chunk_size=2000)):
+        ids.append(pk)
+        for word, count in Counter(words(' '.join(texts))).items():
+            add(row, 0, word, count)
+        add(row, 1, category_id, 1)
+        if region.strip():
+            add(row, 2, region.strip().lower(), 1)
+        for expert_id in experts_of.get(pk, ()):
+            add(row, 3, expert_id, 1)
+
+    n = len(ids)
+    rows = np.array(rows, dtype=np.int64)
+    features = np.array(features, dtype=np.int64)
+    counts = np.array(counts, dtype=np.float64)
+    feature_blocks = np.array(feature_blocks, dtype=np.int64)
+
+    df = np.bincount(features, minlength=len(feature_blocks))
+    useful = (df >= 2) & ((feature_blocks != 0) | (df <= max_df * n))
+    block_weights = np.array([weights.get(name, 0.0) for name in BLOCKS])
+    keep = useful[features] & (block_weights[feature_blocks[features]] > 0)
+    rows, features, counts = rows[keep], features[keep], counts[keep]
+
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    values = (1.0 + np.log(counts)) * idf[features]
+    # Unit length per block, then the block weights, then unit length per row.
+    blocks = feature_blocks[features]
+    cells = rows * len(BLOCKS) + blocks
+    block_norms = np.sqrt(np.bincount(cells, weights=values ** 2, minlength=n * len(BLOCKS)))
+    values *= np.sqrt(block_weights[blocks]) / block_norms[cells]
+    values /= np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n))[rows]
+
+    order = np.argsort(features, kind='stable')
+    expert_ids = np.array(sorted({expert for linked in experts_of.values() for expert in linked}), dtype=np.int64)
+    link_counts = np.array([len(experts_of.get(pk, ())) for pk in ids], dtype=np.int64)
+    linked = [expert for pk in ids for expert in experts_of.get(pk, ())]
+    return Index(
+        ids=np.array(ids, dtype=np.int64),
+        indptr=np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))]),
+        features=features,
+        values=values,
+        postings_ptr=np.concatenate([[0], np.cumsum(np.bincount(features, minlength=len(feature_blocks)))]),
+        posting_rows=rows[order],
+        posting_values=values[order],
+        expert_ids=expert_ids,
+        links_ptr=np.concatenate([[0], np.cumsum(link_counts)]),
+        link_rows=np.repeat(np.arange(n), link_counts),
+        link_experts=np.searchsorted(expert_ids, np.array(linked, dtype=np.int64)),
+    )
+
+
+def top(scores: np.ndarray, ids: np.ndarray, count: int, min_score: float) -> list[tuple[int, float]]:
+    """The ``count`` best ``(id, score)`` pairs scoring at least ``min_score``; ties go to the lower id."""
+    candidates = np.flatnonzero((scores >= min_score) & (scores > 0))
+    if len(candidates) > count:
+        cut = len(candidates) - count
+        candidates = candidates[scores[candidates] >= np.partition(scores[candidates], cut)[cut]]
+    order = np.lexsort((ids[candidates], -scores[candidates]))[:count]
+    return [(int(ids[position]), float(scores[position])) for position in candidates[order]]
+
+
+def recommend(index: Index, row: int) -> list[Recommendation]:
+    min_score = get_option('MIN_SCORE', 0.05)
+    scores = index.similarities(row)
+    source = int(index.ids[row])
+    instruments = top(scores, index.ids, get_option('INSTRUMENTS', 6), min_score)
+    experts = top(index.expert_scores(row, scores, min_score), index.expert_ids, get_option('EXPERTS', 4), min_score)
+    return [
+        Recommendation(
+            instrument_id=source, kind=Recommendation.INSTRUMENT, related_instrument_id=pk, rank=rank,
+            score=round(score, PRECISION),
+        )
+        for rank, (pk, score) in enumerate(instruments)
+    ] + [
+        Recommendation(
+            instrument_id=source, kind=Recommendation.EXPERT, expert_id=pk, rank=rank, score=round(score, PRECISION),
+        )
+        for rank, (pk, score) in enumerate(experts)
+    ]
+
+
+def _entry(kind: str, related_instrument_id, expert_id, rank: int, score: float) -> tuple:
+    return kind, related_instrument_id or expert_id, rank, score
+
+
+def save(lists: dict[int, list[Recommendation]], snapshots: bool = True) -> tuple[int, set[int]]:
+    """
+    Store ``lists`` (instrument pk -> its recommendations) where they differ
+    from the stored ones.  Returns how many did, and the instruments whose
+    pages now show something else rather than just other scores.
+    """
+    stored = {}
+    for pks in chunked(list(lists)):
+        for source, *entry in Recommendation.objects.filter(instrument__in=pks).values_list(
+            'instrument_id', 'kind', 'related_instrument_id', 'expert_id', 'rank', 'score'
+        ):
+            stored.setdefault(source, []).append(_entry(*entry))
+
+    changed, shown = [], set()
+    for pk, recommendations in lists.items():
+        entries = sorted(
+            _entry(item.kind, item.related_instrument_id, item.expert_id, item.rank, item.score)
+            for item in recommendations
+        )
+        before = sorted(stored.get(pk, []))
+        if entries != before:
+            changed.append(pk)
+            if [entry[:3] for entry in entries] != [entry[:3] for entry in before]:
+                shown.add(pk)
+
+    with transaction.atomic():
+        for pks in chunked(changed):
+            Recommendation.objects.filter(instrument__in=pks).delete()
+        Recommendation.objects.bulk_create([item for pk in changed for item in lists[pk]], batch_size=CHUNK)
+    publish(shown, snapshots)
+    return len(changed), shown
+
+
+def publish(pks: set[int], snapshots: bool = True) -> None:
+    """Let conditional and cached responses (and static snapshots) of ``pks`` pick up their new lists."""
+    if not pks:
+        return
+    now = timezone.now()
+    for chunk in chunked(sorted(pks)):
+        Instrument.objects.filter(pk__in=chunk).update(updated_at=now)
+    cache.bump_generation(Instrument._meta.label_lower)
+    if snapshots:
+        static_api.schedule(static_api.details('instruments', pks))
+
+
+def rebuild(batch_size: int = 2000, progress=None, snapshots: bool = True) -> tuple[int, int]:
+    """
+    Recompute the lists of every instrument; returns (instruments, lists
+    changed).  Pass ``snapshots=False`` when the whole static API is rebuilt
+    afterwards anyway.
+    """
+    index = build_index()
+    changed = 0
+    for start in range(0, len(index), batch_size):
+        rows = range(start, min(start + batch_size, len(index)))
+        changed += save({int(index.ids[row]): recommend(index, row) for row in rows}, snapshots)[0]
+        if progress is not None:
+            progress(rows.stop, len(index))
+    return len(index), changed
+
+
+def floors(index: Index, kind: str, count: int) -> np.ndarray:
+    """Per row, the lowest stored score of its full ``kind`` list, or ``MIN_SCORE`` while it is not full."""
+    result = np.full(len(index), get_option('MIN_SCORE', 0.05))
+    full = (
+        Recommendation.objects.filter(kind=kind).order_by().values('instrument')
+        .annotate(count=Count('pk'), lowest=Min('score')).filter(count__gte=count)
+        .values_list('instrument', 'lowest')
+    )
+    for pk, lowest in full:
+        row = index.row(pk)
+        if row is not None:
+            # Stored scores are rounded, so a score just below ``lowest`` may tie with it.
+            result[row] = max(result[row], lowest - 0.5 * 10 ** -PRECISION)
+    return result
+
+
+def update(pks) -> int:
+    """
+    Recompute the lists of the instruments ``pks`` and of every instrument
+    whose neighbours or experts they can change; returns how many lists did.
+    """
+    pks = list(pks)
+    index = build_index()
+    rows = [row for row in map(index.row, pks) if row is not None]
+    if not rows:
+        return 0
+
+    # A list can change if it holds one of ``pks`` or one of their experts,
+    # or if one of ``pks`` now scores above its weakest entry.
+    experts = Expert.instruments.through.objects.filter(instrument_id__in=pks).values('expert_id')
+    listing = Recommendation.objects.filter(
+        Q(kind=Recommendation.INSTRUMENT, related_instrument__in=pks)
+        | Q(kind=Recommendation.EXPERT, expert__in=experts)
+    ).values_list('instrument_id', flat=True)
+    affected = set(rows) | {row for row in map(index.row, listing) if row is not None}
+    instrument_floors = floors(index, Recommendation.INSTRUMENT, get_option('INSTRUMENTS', 6))
+    expert_floors = floors(index, Recommendation.EXPERT, get_option('EXPERTS', 4))
+    for row in rows:
+        scores = index.similarities(row)
+        has_experts = index.links_ptr[row + 1] > index.links_ptr[row]
+        limits = np.minimum(instrument_floors, expert_floors) if has_experts else instrument_floors
+        affected.update(np.flatnonzero((scores >= limits) & (scores > 0)).tolist())
+    return save({int(index.ids[row]): recommend(index, row) for row in sorted(affected)})[0]
+
+
+def served():
+    """Recommendations with just the columns the instrument detail renders, in order."""
+    return Recommendation.objects.select_related('related_instrument__category', 'expert').only(
+        'instrument', 'kind', 'rank', 'related_instrument', 'expert',
+        'related_instrument__name', 'related_instrument__region', 'related_instrument__primary_image',
+        'related_instrument__primary_image_info', 'related_instrument__category', 'related_instrument__category__name',
+        'expert__name', 'expert__expertise', 'expert__photo', 'expert__photo_info',
+    )
@@ -0,0 +1,41 @@
+"""
+JSON renderer backed by orjson, for views that list ``FastJSONRenderer`` in
+their ``renderer_classes``.
+
+Output matches DRF's ``JSONRenderer`` with the default settings (compact,
+UTF-8, ``\\u2028``/``\\u2029`` escaped), so cached bodies and snapshots do not
+change.  The one difference is how floats with exponents are spelled
+(``1e16`` rather than ``1e+16``).  Without orjson, for indented output (``; indent=4``, the browsable
+API), with non-default ``COMPACT_JSON``/``UNICODE_JSON``, or for data orjson
+can't encode, it is the stdlib renderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                # Datetimes, Decimals, lazy strings etc. go through DRF's encoder.
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, recursion limits...
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,138 @@
+"""
+Read serializers over ``.values()`` rows for the hot list endpoints.
+
+On a large page, ``InstrumentListSerializer`` and ``ExpertListSerializer``
+spend most of their time in per-field ``ModelSerializer`` machinery. That
+covers building model instances, resolving ``source`` paths, and calling
+``reverse`` and ``build_absolute_uri`` for every image URL. The row
+serializers here build the same dicts from plain ``.values()`` rows. They
+resolve the host and route prefixes once per request.
+
+Views opt in with ``row_serializer_class`` (``views.RowListMixin``). A
+request whose serializer class is not the one a row serializer reproduces,
+such as ``?expand=media``, uses the regular serializer.
+"""
+from operator import itemgetter
+
+from django.urls import reverse
+
+from . import images
+from .models import Expert, Instrument
+from .serializers import ExpertListSerializer, InstrumentListSerializer
+
+
+class URLBuilder:
+    """Absolute URLs for one request, with the scheme, host and route prefixes resolved once."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.origin = request.build_absolute_uri('/')[:-1] if request is not None else ''
+        self.derivative_prefixes = {}
+
+    def absolute(self, url: str) -> str:
+        # ``build_absolute_uri`` takes the same shortcut for plain root-relative paths.
+        if self.request is None or not url.startswith('/') or url.startswith('//') or '/.' in url:
+            return url if self.request is None else self.request.build_absolute_uri(url)
+        return self.origin + url
+
+    def file(self, field, name: str | None) -> str | None:
+        """``ImageField``/``FileField`` representation of the stored ``name``."""
+        if not name:
+            return None
+        return self.absolute(field.storage.url(name))
+
+    def derivative(self, model_name: str, pk: int, digest: str, width: int, fmt: str) -> str:
+        prefix = self.derivative_prefixes.get(model_name)
+        if prefix is None:
+            tail = '0/-/0.-'
+            url = reverse('image-derivative', kwargs={'model': model_name, 'pk': 0, 'digest': '-', 'width': 0, 'fmt': '-'})
+            prefix = self.derivative_prefixes[model_name] = self.absolute(url)[:-len(tail)]
+        return f'{prefix}{pk}/{digest}/{width}.{fmt}'
+
+    def srcset(self, model_name: str, pk: int, name: str | None, record: dict | None) -> dict | None:
+        """``ImageSrcsetField`` representation of the stored ``name`` and its ``<field>_info`` ``record``."""
+        info = images.stored_info(record, name)
+        if info is None:
+            return None
+        widths = images.variant_widths(info.width)
+        return {
+            fmt: ', '.join(f'{self.derivative(model_name, pk, info.digest, width, fmt)} {width}w' for width in widths)
+            for fmt in images.available_formats()
+        }
+
+
+class RowSerializer:
+    """
+    Builds the list representation of ``serializer_class`` from ``.values()`` rows.
+
+    ``columns`` maps an output field to the lookups it reads (default: the
+    field itself).  A ``to_<field>(row)`` method converts the value; other
+    fields are copied.  ``?fields=`` works as it does on the serializer.
+    """
+    serializer_class = None
+    columns = {}
+
+    def __init__(self, request=None):
+        self.request = request
+        self.urls = URLBuilder(request)
+        self.fields = self.serializer_class.requested_fields(request) or self.serializer_class.Meta.fields
+
+    def values(self, queryset, extra=()):
+        """``queryset`` as rows with the columns of the rendered fields plus ``extra``, e.g. ordering."""
+        lookups = {'id', *extra}
+        for name in self.fields:
+            lookups.update(self.columns.get(name, [name]))
+        return queryset.prefetch_related(None).values(*sorted(lookups))
+
+    def to_representation(self, rows) -> list[dict]:
+        getters = [(name, getattr(self, f'to_{name}', None) or itemgetter(name)) for name in self.fields]
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+
+class InstrumentListRows(RowSerializer):
+    serializer_class = InstrumentListSerializer
+    columns = {
+        'category': ['category__name'],
+        'image': ['primary_image'],
+        'image_srcset': ['primary_image', 'primary_image_info'],
+    }
+    image_field = Instrument._meta.get_field('primary_image')
+
+    def to_category(self, row) -> str:
+        return row['category__name']
+
+    def to_image(self, row) -> str | None:
+        return self.urls.file(self.image_field, row['primary_image'])
+
+    def to_image_srcset(self, row) -> dict | None:
+        return self.urls.srcset('instrument', row['id'], row['primary_image'], row['primary_image_info'])
+
+
+class ExpertListRows(RowSerializer):
+    serializer_class = ExpertListSerializer
+    columns = {
+        'photo_srcset': ['photo', 'photo_info'],
+        'instruments': [],
+    }
+    photo_field = Expert._meta.get_field('photo')
+
+    def to_photo(self, row) -> str | None:
+        return self.urls.file(self.photo_field, row['photo'])
+
+    def to_photo_srcset(self, row) -> dict | None:
+        return self.urls.srcset('expert', row['id'], row['photo'], row['photo_info'])
+
+    def to_instruments(self, row) -> list[str]:
+        return self.instrument_names.get(row['id'], [])
+
+    def to_representation(self, rows) -> list[dict]:
+        rows = list(rows)
+        if 'instruments' in self.fields:
+            # One query for the page, in the order the ``instruments`` prefetch returns.
+            links = Expert.instruments.through.objects.filter(expert_id__in=[row['id'] for row in rows])
+            self.instrument_names = {}
+            for expert_id, name in links.order_by('instrument__name', 'instrument_id').values_list(
+                'expert_id', 'instrument__name'
+            ):
+                self.instrument_names.setdefault(expert_id, []).append(name)
+        return super().to_representation(rows)
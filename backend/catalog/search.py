@@ -0,0 +1,196 @@
+"""
+Full-text search over instruments, experts and tutorials.
+
+Every searchable object has one ``SearchEntry`` row (kept current by the
+signal handlers in ``catalog.signals``).  Migration 0004 builds the database
+specific index on top of that table: an FTS5 virtual table with sync triggers
+on SQLite, or a GIN expression index on PostgreSQL.
+"""
+import re
+from typing import NamedTuple
+
+from django.db import connection, transaction
+
+from .models import Instrument, Expert, Tutorial, SearchEntry
+
+FTS_TABLE = 'catalog_searchentry_fts'
+MAX_TERMS = 8
+
+# Must match the expression of the GIN index created in migration 0004,
+# otherwise PostgreSQL cannot use the index.
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B')"
+)
+
+INDEXED_MODELS = {
+    Instrument: SearchEntry.INSTRUMENT,
+    Expert: SearchEntry.EXPERT,
+    Tutorial: SearchEntry.TUTORIAL,
+}
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    object_id: int
+    rank: float
+
+
+def _join(*parts: str) -> str:
+    return '\n'.join(part for part in parts if part)
+
+
+def build_document(obj) -> tuple[str, str]:
+    """Return the ``(title, body)`` pair indexed for ``obj``."""
+    if isinstance(obj, Instrument):
+        return obj.name, _join(
+            obj.region,
+            obj.description,
+            obj.history,
+            obj.materials,
+            obj.playing_technique,
+            obj.cultural_significance,
+        )
+    if isinstance(obj, Expert):
+        return obj.name, _join(obj.expertise, obj.bio, obj.detailed_bio)
+    if isinstance(obj, Tutorial):
+        return obj.title, _join(obj.instructor_name, obj.description)
+    raise TypeError(f'{type(obj).__name__} is not searchable')
+
+
+def index_object(obj) -> None:
+    title, body = build_document(obj)
+    SearchEntry.objects.update_or_create(
+        kind=INDEXED_MODELS[type(obj)],
+        object_id=obj.pk,
+        defaults={'title': title[:200], 'body': body},
+    )
+
+
+def index_objects(objs) -> None:
+    """``index_object`` for a batch of one model, in two queries."""
+    objs = list(objs)
+    if not objs:
+        return
+    kind = INDEXED_MODELS[type(objs[0])]
+    entries = []
+    for obj in objs:
+        title, body = build_document(obj)
+        entries.append(SearchEntry(kind=kind, object_id=obj.pk, title=title[:200], body=body))
+    with transaction.atomic():
+        SearchEntry.objects.filter(kind=kind, object_id__in=[obj.pk for obj in objs]).delete()
+        SearchEntry.objects.bulk_create(entries)
+
+
+def unindex_object(obj) -> None:
+    SearchEntry.objects.filter(kind=INDEXED_MODELS[type(obj)], object_id=obj.pk).delete()
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Recreate every search entry from the catalog tables."""
+    total = 0
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        for model, kind in INDEXED_MODELS.items():
+            batch = []
+            for obj in model.objects.order_by('pk').iterator(chunk_size=batch_size):
+                title, body = build_document(obj)
+                batch.append(SearchEntry(kind=kind, object_id=obj.pk, title=title[:200], body=body))
+                if len(batch) >= batch_size:
+                    SearchEntry.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                SearchEntry.objects.bulk_create(batch)
+                total += len(batch)
+    get_backend().optimize()
+    return total
+
+
+def tokenize(query: str) -> list[str]:
+    return _TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+
+
+class SQLiteBackend:
+    """FTS5 with bm25 ranking; every term is matched as a prefix."""
+
+    def match_expression(self, terms: list[str]) -> str:
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, terms: list[str], kinds: list[str], limit: int) -> list[SearchHit]:
+        placeholders = ', '.join(['%s'] * len(kinds))
+        sql = (
+            f'SELECT e.kind, e.object_id, bm25({FTS_TABLE}, 10.0, 1.0) AS score '
+            f'FROM {FTS_TABLE} JOIN catalog_searchentry e ON e.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND e.kind IN ({placeholders}) '
+            f'ORDER BY score LIMIT %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.match_expression(terms), *kinds, limit])
+            # bm25() is lower-is-better; flip it so rank reads naturally.
+            return [SearchHit(kind, object_id, -score) for kind, object_id, score in cursor.fetchall()]
+
+    def matching_ids_sql(self, kind: str, terms: list[str]) -> tuple[str, list]:
+        # CROSS JOIN pins the FTS table as the outer loop; with a plain JOIN
+        # inside IN (...) SQLite loops over the entries of ``kind`` and runs
+        # the MATCH once per entry.
+        sql = (
+            f'SELECT e.object_id FROM {FTS_TABLE} '
+            f'CROSS JOIN catalog_searchentry e ON e.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND e.kind = %s'
+        )
+        return sql, [self.match_expression(terms), kind]
+
+    def optimize(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+class PostgresBackend:
+    """tsvector/ts_rank over the weighted title and body columns."""
+
+    def ts_query(self, terms: list[str]) -> str:
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, terms: list[str], kinds: list[str], limit: int) -> list[SearchHit]:
+        placeholders = ', '.join(['%s'] * len(kinds))
+        sql = (
+            f"SELECT kind, object_id, ts_rank({PG_VECTOR}, to_tsquery('simple', %s)) AS score "
+            f"FROM catalog_searchentry "
+            f"WHERE {PG_VECTOR} @@ to_tsquery('simple', %s) AND kind IN ({placeholders}) "
+            f"ORDER BY score DESC LIMIT %s"
+        )
+        query = self.ts_query(terms)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [query, query, *kinds, limit])
+            return [SearchHit(*row) for row in cursor.fetchall()]
+
+    def matching_ids_sql(self, kind: str, terms: list[str]) -> tuple[str, list]:
+        sql = (
+            f"SELECT object_id FROM catalog_searchentry "
+            f"WHERE {PG_VECTOR} @@ to_tsquery('simple', %s) AND kind = %s"
+        )
+        return sql, [self.ts_query(terms), kind]
+
+    def optimize(self) -> None:
+        pass
+
+
+def get_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteBackend()
+    raise NotImplementedError(f'Full-text search is not supported on {connection.vendor}')
+
+
+def search(query: str, kinds: list[str] | None = None, limit: int = 20) -> list[SearchHit]:
+    """Return ranked hits for ``query`` across the requested kinds."""
+    terms = tokenize(query)
+    if kinds is None:
+        kinds = [kind for kind, _ in SearchEntry.KIND_CHOICES]
+    if not terms or not kinds:
+        return []
+    return get_backend().search(terms, kinds, limit)
@@ -1,26 +1,167 @@
+import os
+
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Category, Instrument, Media, Expert, LearningContent, Contact, Tutorial, TunerConfiguration
+from . import audio, images
+from .models import (
+    Category, Instrument, Media, Expert, LearningContent, Contact, Tutorial, TunerConfiguration, ModelVariant,
+    Recommendation,
+)
+
+
+def get_file_url(url_name: str, field_file, request=None) -> str | None:
+    """
+    The ranged delivery URL (``catalog.delivery``) of ``field_file``.
+
+    A ``.gltf`` keeps its ``MEDIA_URL``: it names its ``.bin`` buffers
+    relative to its own URL, and they are stored beside it.
+    """
+    if not field_file:
+        return None
+    if field_file.name.lower().endswith('.gltf'):
+        url = field_file.url
+    else:
+        url = reverse(url_name, kwargs={'pk': field_file.instance.pk, 'name': os.path.basename(field_file.name)})
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
 
 
 def get_media_url(media_obj: Media | None, request=None) -> str | None:
-    if not media_obj or not media_obj.file:
+    if not media_obj:
+        return None
+    return get_file_url('media-file', media_obj.file, request)
+
+
+def get_peaks_url(url_name: str, pk: int, field_file, request=None) -> str | None:
+    """Where the player can fetch waveform peaks for ``field_file``, if it can be analyzed."""
+    if not field_file or not audio.is_supported(field_file.name):
         return None
-    url = media_obj.file.url
+    url = reverse(url_name, kwargs={'pk': pk})
     if request is not None:
         return request.build_absolute_uri(url)
     return url
 
 
+def resolve_primary_media(instrument: Instrument) -> dict[str, Media]:
+    """
+    Pick the primary asset of each media type in one pass over
+    ``instrument.media.all()``, so a ``prefetch_related('media')`` on the
+    queryset is reused instead of issuing a query per type.
+    """
+    resolved = getattr(instrument, '_primary_media', None)
+    if resolved is None:
+        resolved = {}
+        for media in instrument.media.all():
+            current = resolved.get(media.media_type)
+            if current is None or (not media.is_primary, media.id) < (not current.is_primary, current.id):
+                resolved[media.media_type] = media
+        instrument._primary_media = resolved
+    return resolved
+
+
+class ImageSrcsetField(serializers.Field):
+    """
+    ``srcset`` strings per format for an image field, most compact format
+    first, e.g. ``{"webp": ".../320.webp 320w, .../640.webp 640w", ...}``.
+    Built from the row's ``<field>_info``, so ``None`` until the image's
+    digest has been stored; the derivatives themselves are rendered on
+    first request.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        instance = value.instance
+        info = images.stored_info(getattr(instance, f'{value.field.name}_info'), value.name)
+        if info is None:
+            return None
+        request = self.context.get('request')
+        srcset = {}
+        for fmt in images.available_formats():
+            candidates = []
+            for width in images.variant_widths(info.width):
+                url = reverse('image-derivative', kwargs={
+                    'model': instance._meta.model_name,
+                    'pk': instance.pk,
+                    'digest': info.digest,
+                    'width': width,
+                    'fmt': fmt,
+                })
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                candidates.append(f'{url} {width}w')
+            srcset[fmt] = ', '.join(candidates)
+        return srcset
+
+
+class DeliveryFileField(serializers.FileField):
+    """A writable file field rendered as its ``url_name`` delivery URL instead of ``MEDIA_URL``."""
+
+    def __init__(self, url_name: str, **kwargs):
+        self.url_name = url_name
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return get_file_url(self.url_name, value, self.context.get('request'))
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients request a subset of fields with ``?fields=id,name``.
+
+    ``Meta.field_sources`` maps serializer fields onto the model columns they
+    read (defaulting to the field's own name) so views can ``.only()`` the
+    projected columns.
+    """
+
+    @classmethod
+    def requested_fields(cls, request) -> list[str] | None:
+        raw = request.query_params.get('fields') if request is not None else None
+        if not raw:
+            return None
+        requested = set(raw.split(','))
+        return [name for name in cls.Meta.fields if name in requested] or None
+
+    @classmethod
+    def projected_columns(cls, fields: list[str]) -> list[str]:
+        sources = getattr(cls.Meta, 'field_sources', {})
+        columns = ['id']
+        for name in fields:
+            columns.extend(sources.get(name, [name]))
+        return columns
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description']
 
 
+class ModelVariantSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ModelVariant
+        fields = ['level', 'file', 'byte_size', 'vertex_count', 'triangle_count']
+
+
 class MediaSerializer(serializers.ModelSerializer):
+    file = DeliveryFileField('media-file')
+    variants = ModelVariantSerializer(many=True, read_only=True)
+
     class Meta:
         model = Media
-        fields = ['id', 'media_type', 'file', 'title', 'is_primary']
+        fields = ['id', 'media_type', 'file', 'title', 'is_primary', 'variants']
     
     def validate_file(self, value):
         """Validate file uploads based on media type"""
@@ -46,9 +187,18 @@ class MediaSerializer(serializers.ModelSerializer):
         return value
 
 
-class InstrumentListSerializer(serializers.ModelSerializer):
+class MediaBulkSerializer(serializers.ModelSerializer):
+    """Metadata only: files cannot travel in a JSON batch."""
+
+    class Meta:
+        model = Media
+        fields = ['id', 'instrument', 'media_type', 'title', 'is_primary']
+
+
+class InstrumentListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = serializers.CharField(source='category.name')
     image = serializers.ImageField(source='primary_image', allow_null=True, required=False)
+    image_srcset = ImageSrcsetField(source='primary_image')
 
     class Meta:
         model = Instrument
@@ -58,17 +208,53 @@ class InstrumentListSerializer(serializers.ModelSerializer):
             'category',
             'region',
             'image',
+            'image_srcset',
             'description',
             'is_featured',
         ]
+        field_sources = {
+            'category': ['category', 'category__name'],
+            'image': ['primary_image'],
+            'image_srcset': ['primary_image', 'primary_image_info'],
+        }
+
+
+class InstrumentListMediaSerializer(InstrumentListSerializer):
+    """List representation with primary assets, used for ``?expand=media``."""
+    audio_sample = serializers.SerializerMethodField()
+    model_3d = serializers.SerializerMethodField()
+
+    class Meta(InstrumentListSerializer.Meta):
+        fields = InstrumentListSerializer.Meta.fields + ['audio_sample', 'model_3d']
+        field_sources = {
+            **InstrumentListSerializer.Meta.field_sources,
+            'audio_sample': [],
+            'model_3d': [],
+        }
+
+    def get_audio_sample(self, obj: Instrument) -> str | None:
+        return get_media_url(resolve_primary_media(obj).get(Media.AUDIO), self.context.get('request'))
+
+    def get_model_3d(self, obj: Instrument) -> str | None:
+        return get_media_url(resolve_primary_media(obj).get(Media.MODEL_3D), self.context.get('request'))
+
+
+class InstrumentBulkSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Instrument
+        fields = [
+            'id', 'name', 'category', 'region', 'description', 'history', 'materials',
+            'playing_technique', 'cultural_significance', 'is_featured',
+        ]
 
 
 class ExpertPreviewSerializer(serializers.ModelSerializer):
     photo = serializers.ImageField(allow_null=True, required=False)
+    photo_srcset = ImageSrcsetField(source='photo')
 
     class Meta:
         model = Expert
-        fields = ['id', 'name', 'expertise', 'photo']
+        fields = ['id', 'name', 'expertise', 'photo', 'photo_srcset']
 
 
 class InstrumentDetailSerializer(serializers.ModelSerializer):
@@ -76,8 +262,17 @@ class InstrumentDetailSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(source='primary_image', allow_null=True, required=False)
     media = MediaSerializer(many=True, read_only=True)
     audio_sample = serializers.SerializerMethodField()
+    audio_sample_peaks = serializers.SerializerMethodField()
     model_3d = serializers.SerializerMethodField()
+    model_3d_variants = serializers.SerializerMethodField()
     experts = ExpertPreviewSerializer(many=True, read_only=True)
+    similar_instruments = serializers.SerializerMethodField()
+    recommended_experts = serializers.SerializerMethodField()
+    tutorials = serializers.SerializerMethodField()
+    tuner_config = serializers.SerializerMethodField()
+
+    # Only rendered when requested with ``?include=tutorials,tuner_config``.
+    OPTIONAL_INCLUDES = ('tutorials', 'tuner_config')
 
     class Meta:
         model = Instrument
@@ -93,41 +288,99 @@ class InstrumentDetailSerializer(serializers.ModelSerializer):
             'playing_technique',
             'cultural_significance',
             'audio_sample',
+            'audio_sample_peaks',
             'model_3d',
+            'model_3d_variants',
             'media',
             'experts',
+            'similar_instruments',
+            'recommended_experts',
+            'tutorials',
+            'tuner_config',
         ]
 
+    @classmethod
+    def requested_includes(cls, request) -> list[str]:
+        raw = request.query_params.get('include', '') if request is not None else ''
+        return [name for name in cls.OPTIONAL_INCLUDES if name in raw.split(',')]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        includes = self.requested_includes(self.context.get('request'))
+        for name in self.OPTIONAL_INCLUDES:
+            if name not in includes:
+                self.fields.pop(name)
+
+    def get_similar_instruments(self, obj: Instrument) -> list:
+        # Precomputed by ``catalog.recommendations``; prefetched in rank order.
+        related = [
+            item.related_instrument for item in obj.recommendations.all() if item.kind == Recommendation.INSTRUMENT
+        ]
+        return InstrumentMiniSerializer(related, many=True, context=self.context).data
+
+    def get_recommended_experts(self, obj: Instrument) -> list:
+        experts = [item.expert for item in obj.recommendations.all() if item.kind == Recommendation.EXPERT]
+        return ExpertPreviewSerializer(experts, many=True, context=self.context).data
+
+    def get_tutorials(self, obj: Instrument) -> list:
+        return TutorialSerializer(obj.tutorials.all(), many=True, context=self.context).data
+
+    def get_tuner_config(self, obj: Instrument) -> dict | None:
+        try:
+            config = obj.tuner_config
+        except TunerConfiguration.DoesNotExist:
+            return None
+        return TunerConfigurationSerializer(config, context=self.context).data
+
     def get_audio_sample(self, obj: Instrument) -> str | None:
-        audio = obj.media.filter(media_type=Media.AUDIO).order_by('-is_primary', 'id').first()
-        return get_media_url(audio, self.context.get('request'))
+        return get_media_url(resolve_primary_media(obj).get(Media.AUDIO), self.context.get('request'))
 
     def get_model_3d(self, obj: Instrument) -> str | None:
-        model = obj.media.filter(media_type=Media.MODEL_3D).order_by('-is_primary', 'id').first()
-        return get_media_url(model, self.context.get('request'))
+        return get_media_url(resolve_primary_media(obj).get(Media.MODEL_3D), self.context.get('request'))
+
+    def get_audio_sample_peaks(self, obj: Instrument) -> str | None:
+        media = resolve_primary_media(obj).get(Media.AUDIO)
+        if media is None:
+            return None
+        return get_peaks_url('media-peaks', media.pk, media.file, self.context.get('request'))
 
+    def get_model_3d_variants(self, obj: Instrument) -> list:
+        model = resolve_primary_media(obj).get(Media.MODEL_3D)
+        if model is None:
+            return []
+        return ModelVariantSerializer(model.variants.all(), many=True, context=self.context).data
 
-class ExpertListSerializer(serializers.ModelSerializer):
+
+class ExpertListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     photo = serializers.ImageField(allow_null=True, required=False)
+    photo_srcset = ImageSrcsetField(source='photo')
     instruments = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
 
     class Meta:
         model = Expert
-        fields = ['id', 'name', 'expertise', 'photo', 'bio', 'instruments']
+        fields = ['id', 'name', 'expertise', 'photo', 'photo_srcset', 'bio', 'instruments']
+        field_sources = {
+            'photo_srcset': ['photo', 'photo_info'],
+            'instruments': [],
+        }
 
 
 class InstrumentMiniSerializer(serializers.ModelSerializer):
     category = serializers.CharField(source='category.name')
     image = serializers.ImageField(source='primary_image', allow_null=True, required=False)
+    image_srcset = ImageSrcsetField(source='primary_image')
 
     class Meta:
         model = Instrument
-        fields = ['id', 'name', 'category', 'region', 'image']
+        fields = ['id', 'name', 'category', 'region', 'image', 'image_srcset']
 
 
 class ExpertDetailSerializer(serializers.ModelSerializer):
     photo = serializers.ImageField(allow_null=True, required=False)
     instruments = InstrumentMiniSerializer(many=True, read_only=True)
+    performance_video = DeliveryFileField('expert-performance-video', allow_null=True, required=False)
+    teaching_audio = DeliveryFileField('expert-teaching-audio', allow_null=True, required=False)
+    teaching_audio_peaks = serializers.SerializerMethodField()
 
     class Meta:
         model = Expert
@@ -142,9 +395,13 @@ class ExpertDetailSerializer(serializers.ModelSerializer):
             'contact_email',
             'performance_video',
             'teaching_audio',
+            'teaching_audio_peaks',
             'instruments',
         ]
 
+    def get_teaching_audio_peaks(self, obj: Expert) -> str | None:
+        return get_peaks_url('expert-teaching-audio-peaks', obj.pk, obj.teaching_audio, self.context.get('request'))
+
 
 class LearningContentSerializer(serializers.ModelSerializer):
     class Meta:
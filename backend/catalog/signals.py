@@ -0,0 +1,276 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import audio, cache, images, processing, search, static_api, tuning
+from .models import (
+    Category, Instrument, Media, Expert, LearningContent, Tutorial, TunerConfiguration, ModelVariant, ProcessingJob,
+    AudioAnalysis, Recommendation,
+)
+
+CACHED_MODELS = (Category, Instrument, Media, Expert, LearningContent, Tutorial, TunerConfiguration)
+
+
+@receiver(post_save, sender=Instrument)
+@receiver(post_save, sender=Expert)
+@receiver(post_save, sender=Tutorial)
+def update_search_entry(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_object(instance)
+
+
+@receiver(post_delete, sender=Instrument)
+@receiver(post_delete, sender=Expert)
+@receiver(post_delete, sender=Tutorial)
+def remove_search_entry(sender, instance, **kwargs):
+    search.unindex_object(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, **kwargs):
+    if sender in CACHED_MODELS:
+        cache.bump_generation(sender._meta.label_lower)
+
+
+@receiver(m2m_changed, sender=Expert.instruments.through)
+def invalidate_expert_instruments(sender, action, **kwargs):
+    if action.startswith('post_'):
+        cache.bump_generation(Expert._meta.label_lower)
+        cache.bump_generation(Instrument._meta.label_lower)
+
+
+def touch(queryset) -> None:
+    """Bump ``updated_at`` without firing signals, for conditional GET."""
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+@receiver(post_save, sender=Tutorial)
+@receiver(post_delete, sender=Tutorial)
+@receiver(post_save, sender=TunerConfiguration)
+@receiver(post_delete, sender=TunerConfiguration)
+def touch_parent_instrument(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    touch(Instrument.objects.filter(pk=instance.instrument_id))
+
+
+@receiver(post_save, sender=Category)
+def touch_category_instruments(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    touch(Instrument.objects.filter(category=instance))
+    touch(Expert.objects.filter(instruments__category=instance))
+    touch(Instrument.objects.filter(recommendations__related_instrument__category=instance))
+
+
+@receiver(post_save, sender=Instrument)
+@receiver(pre_delete, sender=Instrument)
+def touch_instrument_experts(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    touch(Expert.objects.filter(instruments=instance))
+
+
+@receiver(post_save, sender=Expert)
+@receiver(pre_delete, sender=Expert)
+def touch_expert_instruments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    touch(Instrument.objects.filter(experts=instance))
+
+
+@receiver(post_save, sender=Instrument)
+@receiver(post_save, sender=Expert)
+def touch_recommending_instruments(sender, instance, raw=False, created=False, **kwargs):
+    # Their pages show this one's name and picture among their recommendations.
+    if raw or created:
+        return
+    field = 'related_instrument' if sender is Instrument else 'expert'
+    touch(Instrument.objects.filter(**{f'recommendations__{field}': instance}))
+
+
+@receiver(m2m_changed, sender=Expert.instruments.through)
+def touch_linked_experts_and_instruments(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    touch(type(instance).objects.filter(pk=instance.pk))
+    if action == 'pre_clear':
+        linked = Expert.objects.filter(instruments=instance) if reverse else Instrument.objects.filter(experts=instance)
+    else:
+        linked = (Expert.objects if reverse else Instrument.objects).filter(pk__in=pk_set)
+    touch(linked)
+
+
+@receiver(post_save)
+@receiver(pre_delete)
+def rebuild_static_api(sender, instance, raw=False, **kwargs):
+    # pre_delete: the relations that decide which files change are still there.
+    # is_enabled() first: affected_by() costs queries even when nothing is rebuilt.
+    if raw or sender not in static_api.SNAPSHOT_MODELS or not static_api.is_enabled():
+        return
+    static_api.schedule(static_api.affected_by([instance]))
+
+
+@receiver(m2m_changed, sender=Expert.instruments.through)
+def rebuild_linked_static_api(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear') or not static_api.is_enabled():
+        return
+    if action == 'pre_clear':
+        linked = Expert.objects.filter(instruments=instance) if reverse else Instrument.objects.filter(experts=instance)
+        pk_set = set(linked.values_list('pk', flat=True))
+    experts, instruments = (pk_set, {instance.pk}) if reverse else ({instance.pk}, pk_set)
+    static_api.schedule({'experts'} | static_api.details('experts', experts) | static_api.details('instruments', instruments))
+
+
+@receiver(post_save, sender=Media)
+def queue_model_optimization(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    queue_model_optimizations([instance])
+
+
+@receiver(post_save, sender=Instrument)
+@receiver(post_save, sender=Expert)
+def queue_image_derivatives(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    queue_image_derivative_jobs([instance])
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_save, sender=Expert)
+def queue_audio_analysis(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    queue_audio_analyses([instance])
+
+
+def queue_processing(objs: list) -> None:
+    """The jobs saving each of ``objs`` would queue, for writes that skip ``post_save``."""
+    queue_model_optimizations(objs)
+    queue_image_derivative_jobs(objs)
+    queue_audio_analyses(objs)
+
+
+def queue_model_optimizations(objs: list) -> None:
+    models = [
+        obj for obj in objs
+        if isinstance(obj, Media) and obj.media_type == Media.MODEL_3D and obj.file.name.lower().endswith('.glb')
+    ]
+    if not models:
+        return
+    built = set(ModelVariant.objects.filter(media__in=models).values_list('media_id', 'source'))
+    for media in models:
+        if (media.pk, media.file.name) not in built:
+            processing.enqueue(ProcessingJob.MODEL_3D, media)
+
+
+def queue_image_derivative_jobs(objs: list) -> None:
+    for obj in objs:
+        field = images.IMAGE_SOURCES.get(obj._meta.model_name)
+        source = getattr(obj, field) if field else None
+        if not source:
+            continue
+        try:
+            info = images.describe(source.path)
+        except OSError:
+            continue
+        # The srcset fields read this instead of hashing the file per request.
+        processing.store_image_info(obj, info)
+        if not images.is_built(source.path, info):
+            processing.enqueue(ProcessingJob.IMAGE_DERIVATIVES, obj)
+
+
+def queue_audio_analyses(objs: list) -> None:
+    sources = {}
+    for obj in objs:
+        field = audio.AUDIO_SOURCES.get(obj._meta.model_name)
+        if not field or (isinstance(obj, Media) and obj.media_type != Media.AUDIO):
+            continue
+        source = getattr(obj, field)
+        if source and audio.is_supported(source.name):
+            sources[obj] = source.name
+    if not sources:
+        return
+    analyzed = set()
+    for model in {type(obj) for obj in sources}:
+        analyzed |= {
+            (model, pk, source)
+            for pk, source in AudioAnalysis.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id__in=[obj.pk for obj in sources if type(obj) is model],
+            ).values_list('object_id', 'source')
+        }
+    for obj, source in sources.items():
+        if (type(obj), obj.pk, source) not in analyzed:
+            processing.enqueue(ProcessingJob.AUDIO_ANALYSIS, obj)
+
+
+@receiver(post_delete, sender=Media)
+@receiver(post_delete, sender=Expert)
+def remove_audio_analysis(sender, instance, **kwargs):
+    for analysis in AudioAnalysis.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance), object_id=instance.pk
+    ):
+        analysis.peaks.delete(save=False)
+        analysis.delete()
+
+
+def queue_recommendations(pks) -> None:
+    for pk in set(pks):
+        processing.enqueue(ProcessingJob.RECOMMENDATIONS, Instrument(pk=pk))
+
+
+@receiver(post_save, sender=Instrument)
+def queue_instrument_recommendations(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    queue_recommendations([instance.pk])
+
+
+@receiver(pre_delete, sender=Instrument)
+@receiver(pre_delete, sender=Expert)
+def queue_orphaned_recommendations(sender, instance, **kwargs):
+    # The delete cascades to the lists that recommend it, so refill those;
+    # an expert's instruments also lose a shared-expert feature.
+    if sender is Instrument:
+        # Its experts lose an instrument too, as on unlinking them.
+        experts = Expert.objects.filter(instruments=instance)
+        sources = Recommendation.objects.filter(Q(related_instrument=instance) | Q(expert__in=experts))
+        linked = Instrument.objects.filter(experts__in=experts)
+    else:
+        sources = Recommendation.objects.filter(expert=instance)
+        linked = Instrument.objects.filter(experts=instance)
+    pks = {*sources.values_list('instrument_id', flat=True), *linked.values_list('pk', flat=True)}
+    queue_recommendations(pks - {instance.pk} if sender is Instrument else pks)
+
+
+@receiver(m2m_changed, sender=Expert.instruments.through)
+def queue_linked_recommendations(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if action == 'pre_clear':
+        linked = Expert.objects.filter(instruments=instance) if reverse else Instrument.objects.filter(experts=instance)
+        pk_set = set(linked.values_list('pk', flat=True))
+    experts, instruments = (pk_set, {instance.pk}) if reverse else ({instance.pk}, set(pk_set))
+    # The experts' other instruments now share a feature with one more or one
+    # fewer instrument.
+    instruments |= set(Instrument.objects.filter(experts__in=experts).values_list('pk', flat=True))
+    if action != 'post_add':
+        # Lists recommending an unlinked expert may have had it through these instruments.
+        instruments |= set(Recommendation.objects.filter(expert__in=experts).values_list('instrument_id', flat=True))
+    queue_recommendations(instruments)
+
+
+@receiver(post_save, sender=TunerConfiguration)
+@receiver(post_delete, sender=TunerConfiguration)
+def clear_reference_tones(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    tuning.clear_reference_tones(instance)
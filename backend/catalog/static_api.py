@@ -0,0 +1,273 @@
+"""
+Pre-rendered JSON snapshot of the public catalog endpoints.
+
+``build_static_api`` renders the responses the frontend reads on every visit
+into ``STATIC_API_ROOT``, one file per URL:
+
+    categories.json         /categories/
+    instruments.json        /instruments/ (first page)
+    instruments/<id>.json   /instruments/<id>/?include=tutorials,tuner_config
+    experts.json            /experts/
+    experts/<id>.json       /experts/<id>/
+    learning.json           /learning/
+
+each with precompressed ``.gz`` and ``.br`` siblings (Brotli needs the
+``brotli`` package).  ``public/.htaccess`` answers plain GETs of those URLs
+from the files, so Passenger and Django are not involved.
+
+Responses are rendered through the regular URLs and views with the test
+client, so they match the live API byte for byte.  After the first build,
+the signal handlers in ``catalog.signals`` rebuild just the files a change
+affects once its transaction commits.  Each file is written to a temporary
+name and renamed into place, so readers never see a partial file, and a file
+that fails to render is removed so its URL falls through to Django.
+
+Those rebuilds run in the process that made the change, inside the admin or
+API request that committed it: every affected file is a full request through
+the middleware stack plus gzip and Brotli (quality 11).  On the 50,000
+instrument catalog an instrument save rewrites four files in about 50 ms and
+a tutorial save one detail file in about 13 ms; a bulk write or a category
+change can touch hundreds of detail files.  Nothing is computed until
+``build_static_api`` has created the root (``is_enabled``).
+"""
+import fcntl
+import gzip
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.test import Client
+from django.urls import get_script_prefix, reverse, set_script_prefix
+
+from .models import Category, Expert, Instrument, LearningContent, Media, Recommendation, Tutorial, TunerConfiguration
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Snapshot name -> (URL name, query parameters).
+LISTS = {
+    'categories': ('category-list', {}),
+    'instruments': ('instrument-list', {}),
+    'experts': ('expert-list', {}),
+    'learning': ('learningcontent-list', {}),
+}
+DETAILS = {
+    'instruments': ('instrument-detail', {'include': 'tutorials,tuner_config'}),
+    'experts': ('expert-detail', {}),
+}
+SNAPSHOT_MODELS = (Category, Instrument, Media, Expert, LearningContent, Tutorial, TunerConfiguration)
+SUFFIXES = ('.json', '.json.gz', '.json.br')
+
+# When each name was last rendered in this process (monotonic seconds).
+_built_at = {}
+
+
+class StaticAPIError(RuntimeError):
+    pass
+
+
+def get_root() -> Path | None:
+    root = getattr(settings, 'STATIC_API_ROOT', None)
+    return Path(root) if root else None
+
+
+def is_enabled() -> bool:
+    """Incremental rebuilds only run once ``build_static_api`` has created the root."""
+    root = get_root()
+    return root is not None and root.is_dir()
+
+
+def details(kind: str, ids) -> set[str]:
+    return {f'{kind}/{pk}' for pk in ids}
+
+
+def all_names() -> set[str]:
+    return (
+        set(LISTS)
+        | details('instruments', Instrument.objects.values_list('pk', flat=True))
+        | details('experts', Expert.objects.values_list('pk', flat=True))
+    )
+
+
+def recommending_instruments(**lookups):
+    """Instruments whose recommendations (see ``catalog.recommendations``) match ``lookups``."""
+    return Recommendation.objects.filter(**lookups).values_list('instrument_id', flat=True).distinct()
+
+
+def affected_by(objs: list) -> set[str]:
+    """Snapshot names whose content depends on ``objs``, all of one model."""
+    if not objs:
+        return set()
+    model = type(objs[0])
+    pks = [obj.pk for obj in objs]
+    if model is Category:
+        instruments = Instrument.objects.filter(category__in=pks).values_list('pk', flat=True)
+        experts = Expert.objects.filter(instruments__category__in=pks).values_list('pk', flat=True).distinct()
+        recommending = recommending_instruments(related_instrument__category__in=pks)
+        return (
+            {'categories', 'instruments'} | details('instruments', {*instruments, *recommending})
+            | details('experts', experts)
+        )
+    if model is Instrument:
+        experts = Expert.objects.filter(instruments__in=pks).values_list('pk', flat=True).distinct()
+        recommending = recommending_instruments(related_instrument__in=pks)
+        return {'instruments', 'experts'} | details('instruments', {*pks, *recommending}) | details('experts', experts)
+    if model is Expert:
+        instruments = Instrument.objects.filter(experts__in=pks).values_list('pk', flat=True).distinct()
+        recommending = recommending_instruments(expert__in=pks)
+        return {'experts'} | details('experts', pks) | details('instruments', {*instruments, *recommending})
+    if model is LearningContent:
+        return {'learning'}
+    if model in (Media, Tutorial, TunerConfiguration):
+        return details('instruments', {obj.instrument_id for obj in objs})
+    return set()
+
+
+def url_for(name: str) -> tuple[str, dict]:
+    kind, _, pk = name.partition('/')
+    if pk:
+        url_name, params = DETAILS[kind]
+        return reverse(url_name, kwargs={'pk': pk}), params
+    url_name, params = LISTS[kind]
+    return reverse(url_name), params
+
+
+def file_path(root: Path, name: str, suffix: str = '.json') -> Path:
+    return root / f'{name}{suffix}'
+
+
+def _replace(path: Path, data: bytes) -> None:
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def write(root: Path, name: str, content: bytes) -> int:
+    """Write ``name`` and its compressed siblings; returns the bytes written."""
+    path = file_path(root, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Siblings first: a reader choosing .br or .gz never gets an older version
+    # than the plain file.
+    variants = [('.json.gz', gzip.compress(content, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.json.br', brotli.compress(content, quality=11)))
+    else:
+        file_path(root, name, '.json.br').unlink(missing_ok=True)
+    variants.append(('.json', content))
+    for suffix, data in variants:
+        _replace(file_path(root, name, suffix), data)
+    return sum(len(data) for _suffix, data in variants)
+
+
+def remove(root: Path, name: str) -> None:
+    # Plain file first, so .htaccess stops matching before the siblings go.
+    for suffix in SUFFIXES:
+        file_path(root, name, suffix).unlink(missing_ok=True)
+
+
+@contextmanager
+def _locked(root: Path):
+    """Serialize rebuilds across processes, so the last rename is from the last render."""
+    with open(root / '.lock', 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def render(client: Client, name: str, prefix: str, secure: bool):
+    # Requests go to the URL path Django routes on; links in the responses
+    # carry the public prefix, as under Passenger, where the handler sets
+    # the script prefix from SCRIPT_NAME (the test client doesn't).
+    set_script_prefix('/')
+    path, params = url_for(name)
+    set_script_prefix(prefix)
+    return client.get(path, params, secure=secure, SCRIPT_NAME=prefix.rstrip('/'), HTTP_ACCEPT='application/json')
+
+
+def build(names=None, root: Path | None = None) -> dict:
+    """
+    Render ``names`` (default: everything) into the snapshot root.  A full
+    build also removes files of objects that no longer exist.
+    """
+    root = root or get_root()
+    if root is None:
+        raise StaticAPIError('STATIC_API_ROOT is not set')
+    prune = names is None
+    names = all_names() if names is None else set(names)
+
+    base = urlsplit(getattr(settings, 'STATIC_API_BASE_URL', 'http://localhost:8000'))
+    prefix = base.path.rstrip('/') + '/'
+    client = Client(HTTP_HOST=base.netloc)
+    stats = {'written': 0, 'removed': 0, 'failed': 0, 'bytes': 0}
+
+    root.mkdir(parents=True, exist_ok=True)
+    previous_prefix = get_script_prefix()
+    try:
+        with _locked(root):
+            for name in sorted(names):
+                started = time.monotonic()
+                try:
+                    response = render(client, name, prefix, base.scheme == 'https')
+                except Exception:
+                    logger.exception('Could not render static API file %s', name)
+                    response = None
+
+                if response is not None and response.status_code == 200:
+                    stats['bytes'] += write(root, name, response.content)
+                    stats['written'] += 1
+                else:
+                    remove(root, name)
+                    if response is not None and response.status_code == 404:
+                        stats['removed'] += 1
+                    else:
+                        if response is not None:
+                            logger.error('Static API file %s got HTTP %s', name, response.status_code)
+                        stats['failed'] += 1
+                _built_at[name] = started
+
+            if prune:
+                for path in root.rglob('*.json'):
+                    name = path.relative_to(root).as_posix()[:-len('.json')]
+                    if name not in names:
+                        remove(root, name)
+                        stats['removed'] += 1
+    finally:
+        set_script_prefix(previous_prefix)
+    return stats
+
+
+def schedule(names: set[str]) -> None:
+    """Rebuild ``names`` once the current transaction commits."""
+    if not names or not is_enabled():
+        return
+    scheduled_at = time.monotonic()
+
+    def rebuild():
+        # Several signals of one save schedule overlapping names; whatever
+        # was rendered after this was scheduled already includes the change.
+        stale = {name for name in names if _built_at.get(name, -1.0) < scheduled_at}
+        if stale:
+            try:
+                build(stale)
+            except Exception:
+                logger.exception('Static API rebuild failed')
+
+    transaction.on_commit(rebuild)
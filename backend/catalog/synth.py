@@ -0,0 +1,76 @@
+"""
+Additive synthesis of tuner reference tones.
+
+Every note of a tuning is rendered in one NumPy pass: a ``(notes, partials,
+samples)`` grid of sine partials with per-partial decay, summed over the
+partials axis.  Timbres only shape the partial amplitudes and envelopes, so
+all of them share that code path.
+"""
+import io
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+
+SAMPLE_RATE = 22050
+DURATION = 1.5
+
+
+@dataclass(frozen=True)
+class Timbre:
+    amplitudes: tuple[float, ...]
+    # Exponential decay per second of the fundamental; partial k decays k**decay_tilt times faster.
+    decay: float
+    decay_tilt: float = 0.0
+    attack: float = 0.01
+    release: float = 0.05
+
+
+TIMBRES = {
+    'sine': Timbre(amplitudes=(1.0,), decay=0.0),
+    # Bright onset that mellows out, like a plucked sarangi or sitar string.
+    'plucked': Timbre(amplitudes=(1.0, 0.6, 0.45, 0.3, 0.2, 0.14, 0.1, 0.07), decay=1.2, decay_tilt=0.8, attack=0.004),
+    # Sustained sawtooth-like spectrum with a soft bow attack.
+    'bowed': Timbre(amplitudes=tuple(1 / k for k in range(1, 11)), decay=0.1, attack=0.08, release=0.12),
+    # Mostly odd partials with a strong fundamental, as in the bansuri.
+    'wind': Timbre(amplitudes=(1.0, 0.08, 0.3, 0.04, 0.12, 0.02, 0.05), decay=0.05, attack=0.06, release=0.1),
+    # Short, fast-decaying tone for percussion.
+    'struck': Timbre(amplitudes=(1.0, 0.5, 0.25, 0.12), decay=4.0, decay_tilt=1.0, attack=0.002),
+}
+
+# Default timbre for an instrument, by category slug.
+CATEGORY_TIMBRES = {
+    'string': 'plucked',
+    'wind': 'wind',
+    'percussion': 'struck',
+}
+
+
+def render(frequencies, timbre: str = 'sine', sample_rate: int = SAMPLE_RATE, duration: float = DURATION) -> np.ndarray:
+    """Return a ``(len(frequencies), samples)`` float32 array peaking at 0.8."""
+    spec = TIMBRES[timbre]
+    t = np.arange(int(sample_rate * duration), dtype=np.float64) / sample_rate
+    f0 = np.asarray(frequencies, dtype=np.float64)[:, None, None]
+    k = np.arange(1, len(spec.amplitudes) + 1, dtype=np.float64)[None, :, None]
+    amplitudes = np.asarray(spec.amplitudes)[None, :, None]
+
+    # Drop partials at or above 0.45 * sample_rate instead of letting them alias.
+    audible = (f0 * k) < 0.45 * sample_rate
+    decay = np.exp(-spec.decay * k ** spec.decay_tilt * t)
+    tones = (np.where(audible, amplitudes, 0.0) * decay * np.sin(2 * np.pi * f0 * k * t)).sum(axis=1)
+
+    envelope = np.minimum(1.0, np.minimum(t / spec.attack, (duration - t) / spec.release))
+    tones *= np.clip(envelope, 0.0, 1.0)
+    peaks = np.abs(tones).max(axis=1, keepdims=True)
+    return (tones * (0.8 / np.where(peaks > 0, peaks, 1.0))).astype(np.float32)
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """16-bit mono PCM WAV."""
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(sample_rate)
+        handle.writeframes((np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+    return output.getvalue()
@@ -0,0 +1,213 @@
+"""
+Seeded synthetic catalog for benchmarks and load tests.
+
+``generate(instruments)`` bulk-inserts a catalog of that many instruments,
+with these per-instrument proportions:
+
+- about 2.2 media rows (an image and an audio clip, plus a 3D model for
+  every fifth instrument); only the names are stored, no files
+- 0 to 2 tutorials (1 on average)
+- a tuner configuration for every other instrument
+- one expert per 10 instruments, each linked to 1 to 4 of them
+- one category per 2000 instruments (at least 4, at most 500)
+
+The same seed and size always produce the same rows.  Generated rows are
+marked (``synthetic-`` category slugs, ``@synthetic.example`` expert emails)
+so ``clear()`` removes them without touching real content.  Bulk inserts skip
+the model signals, so callers bump cache generations and rebuild the search
+index afterwards, as ``manage.py generate_catalog`` does.
+"""
+import random
+import time
+
+from django.db import transaction
+
+from .models import Category, Expert, Instrument, Media, Tutorial, TunerConfiguration
+
+SLUG_PREFIX = 'synthetic-'
+EMAIL_DOMAIN = 'synthetic.example'
+
+REGIONS = [
+    'Kathmandu Valley', 'Central Nepal', 'Western Nepal', 'Eastern Nepal', 'Far-Western Nepal',
+    'Mustang', 'Karnali', 'Gandaki', 'Koshi', 'Madhesh', 'Lumbini', 'Sudurpashchim', 'Throughout Nepal',
+]
+SYLLABLES = [
+    'ma', 'dal', 'sa', 'ran', 'gi', 'ban', 'su', 'ri', 'dham', 'pho', 'khin', 'jhya', 'li', 'tung',
+    'na', 'ku', 'ha', 'ne', 'ta', 'bi', 'nai', 'shan', 'kha', 'dho', 'lak', 'mu', 'ru', 'chu',
+]
+# Vocabulary of the generated text, so searches for these words find rows.
+WORDS = [
+    'drum', 'flute', 'string', 'bamboo', 'wood', 'skin', 'brass', 'bowed', 'plucked', 'festival', 'temple',
+    'wedding', 'harvest', 'folk', 'ritual', 'rhythm', 'melody', 'village', 'mountain', 'procession',
+    'dance', 'song', 'carved', 'tuned', 'resonant', 'ancient', 'sacred', 'Newar', 'Gurung', 'Tamang',
+    'Magar', 'Sherpa', 'Tharu', 'Gandharva', 'Damai', 'Panche', 'Baja', 'Dashain', 'Tihar', 'Indra',
+]
+FIRST_NAMES = ['Ram', 'Sita', 'Hari', 'Gita', 'Bishnu', 'Maya', 'Krishna', 'Laxmi', 'Arjun', 'Sarita', 'Nabin']
+LAST_NAMES = ['Gandharva', 'Shrestha', 'Gurung', 'Tamang', 'Magar', 'Sherpa', 'Thapa', 'Rai', 'Limbu', 'Pariyar']
+NOTES = [('C4', 261.63), ('D4', 293.66), ('E4', 329.63), ('F4', 349.23), ('G4', 392.0), ('A4', 440.0), ('B4', 493.88)]
+
+
+class Generator:
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+
+    def words(self, low: int, high: int) -> str:
+        return ' '.join(self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def sentence(self) -> str:
+        return self.words(8, 20).capitalize() + '.'
+
+    def paragraph(self, sentences: int = 3) -> str:
+        return ' '.join(self.sentence() for _ in range(sentences))
+
+    def instrument_name(self) -> str:
+        return ''.join(self.random.choices(SYLLABLES, k=self.random.randint(2, 3))).capitalize()
+
+    def person(self) -> str:
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def category(self, number: int) -> Category:
+        return Category(
+            name=f'{self.random.choice(WORDS).capitalize()} instruments {number}',
+            slug=f'{SLUG_PREFIX}{number}',
+            description=self.sentence(),
+        )
+
+    def instrument(self, category_id: int, number: int) -> Instrument:
+        return Instrument(
+            name=f'{self.instrument_name()} {number}',
+            category_id=category_id,
+            region=self.random.choice(REGIONS),
+            description=self.paragraph(2),
+            history=self.paragraph(),
+            materials=self.sentence(),
+            playing_technique=self.sentence(),
+            cultural_significance=self.sentence(),
+            is_featured=self.random.random() < 0.05,
+        )
+
+    def media(self, instrument: Instrument, number: int) -> list[Media]:
+        rows = [
+            Media(instrument=instrument, media_type=Media.IMAGE, file=f'synthetic/{instrument.pk}.jpg',
+                  title=instrument.name, is_primary=True),
+            Media(instrument=instrument, media_type=Media.AUDIO, file=f'synthetic/{instrument.pk}.mp3',
+                  title=f'{instrument.name} sample', is_primary=True),
+        ]
+        if number % 5 == 0:
+            rows.append(Media(instrument=instrument, media_type=Media.MODEL_3D, file=f'synthetic/{instrument.pk}.glb',
+                              title=f'{instrument.name} model', is_primary=True))
+        return rows
+
+    def tutorials(self, instrument: Instrument) -> list[Tutorial]:
+        return [
+            Tutorial(
+                instrument=instrument,
+                title=f'{instrument.name}: {self.words(2, 5)}',
+                description=self.paragraph(2),
+                video_url=f'https://video.{EMAIL_DOMAIN}/{instrument.pk}/{lesson}',
+                instructor_name=self.person(),
+                duration=f'{self.random.randint(3, 45)}:{self.random.randint(0, 59):02d}',
+            )
+            for lesson in range(self.random.randint(0, 2))
+        ]
+
+    def tuner(self, instrument: Instrument) -> TunerConfiguration:
+        notes = sorted(self.random.sample(NOTES, self.random.randint(2, 6)), key=lambda note: note[1])
+        return TunerConfiguration(
+            instrument=instrument,
+            tuning_name=self.random.choice(['Standard', 'Folk', 'Festival', 'Temple']),
+            notes=[name for name, _ in notes],
+            frequencies=[frequency for _, frequency in notes],
+        )
+
+    def expert(self, number: int) -> Expert:
+        return Expert(
+            name=f'{self.person()} {number}',
+            expertise=f'{self.random.choice(WORDS).capitalize()} player',
+            bio=self.sentence(),
+            detailed_bio=self.paragraph(4),
+            contact_email=f'expert{number}@{EMAIL_DOMAIN}',
+            achievements=[self.words(3, 6) for _ in range(self.random.randint(0, 3))],
+        )
+
+
+def category_count(instruments: int) -> int:
+    return min(max(instruments // 2000, 4), 500)
+
+
+def generate(instruments: int, seed: int = 0, batch_size: int = 2000, experts: int | None = None,
+             progress=None) -> dict[str, int]:
+    """Insert a synthetic catalog; returns rows created per model."""
+    generator = Generator(seed)
+    counts = dict.fromkeys(['categories', 'instruments', 'media', 'tutorials', 'tuner_configurations',
+                            'experts', 'expert_links'], 0)
+    started = time.perf_counter()
+    offset = Category.objects.filter(slug__startswith=SLUG_PREFIX).count()
+    with transaction.atomic():
+        categories = Category.objects.bulk_create(
+            [generator.category(offset + number) for number in range(category_count(instruments))]
+        )
+    category_ids = [category.pk for category in categories]
+    counts['categories'] = len(categories)
+
+    instrument_ids = []
+    for start in range(0, instruments, batch_size):
+        with transaction.atomic():
+            batch = Instrument.objects.bulk_create([
+                generator.instrument(generator.random.choice(category_ids), number)
+                for number in range(start, min(start + batch_size, instruments))
+            ])
+            media, tutorials, tuners = [], [], []
+            for number, instrument in enumerate(batch, start):
+                media += generator.media(instrument, number)
+                tutorials += generator.tutorials(instrument)
+                if number % 2 == 0:
+                    tuners.append(generator.tuner(instrument))
+            Media.objects.bulk_create(media)
+            Tutorial.objects.bulk_create(tutorials)
+            TunerConfiguration.objects.bulk_create(tuners)
+        instrument_ids += [instrument.pk for instrument in batch]
+        counts['instruments'] += len(batch)
+        counts['media'] += len(media)
+        counts['tutorials'] += len(tutorials)
+        counts['tuner_configurations'] += len(tuners)
+        if progress is not None:
+            progress(counts['instruments'], instruments, time.perf_counter() - started)
+
+    total_experts = max(instruments // 10, 1) if experts is None else experts
+    offset = Expert.objects.filter(contact_email__endswith=f'@{EMAIL_DOMAIN}').count()
+    Link = Expert.instruments.through
+    for start in range(0, total_experts, batch_size):
+        with transaction.atomic():
+            batch = Expert.objects.bulk_create([
+                generator.expert(offset + number) for number in range(start, min(start + batch_size, total_experts))
+            ])
+            links = [
+                Link(expert_id=expert.pk, instrument_id=instrument_id)
+                for expert in batch
+                for instrument_id in generator.random.sample(instrument_ids, min(generator.random.randint(1, 4),
+                                                                                 len(instrument_ids)))
+            ]
+            Link.objects.bulk_create(links)
+        counts['experts'] += len(batch)
+        counts['expert_links'] += len(links)
+    return counts
+
+
+def clear() -> dict[str, int]:
+    """
+    Delete every synthetic row; returns rows deleted per model label.
+
+    This goes through the ORM so the delete signals keep the search index and
+    caches right, which takes minutes at the largest sizes; a scratch database
+    (``DJANGO_DB_NAME``) is quicker to throw away.
+    """
+    with transaction.atomic():
+        _, instruments = Instrument.objects.filter(category__slug__startswith=SLUG_PREFIX).delete()
+        _, experts = Expert.objects.filter(contact_email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        _, categories = Category.objects.filter(slug__startswith=SLUG_PREFIX).delete()
+    deleted = {}
+    for counts in (instruments, experts, categories):
+        for label, count in counts.items():
+            deleted[label] = deleted.get(label, 0) + count
+    return deleted
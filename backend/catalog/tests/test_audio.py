@@ -0,0 +1,74 @@
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from catalog import audio
+
+
+def wav_bytes(samples=None, rate=8000, channels=1, bits=16, format_tag=audio.WAVE_FORMAT_PCM,
+              fmt_size=16, data_size=None, fmt_first=True) -> bytes:
+    """A RIFF/WAVE file whose header fields can each be broken on purpose."""
+    if samples is None:
+        samples = (np.sin(np.arange(rate // 4) * 2 * np.pi * 440 / rate) * 16000).astype('<i2')
+    data = np.asarray(samples).tobytes()
+    block_align = channels * bits // 8
+    fmt = struct.pack('<HHIIHH', format_tag, channels, rate, rate * block_align, block_align, bits)
+    fmt = fmt.ljust(fmt_size, b'\0')[:fmt_size]
+    fmt_chunk = b'fmt ' + struct.pack('<I', fmt_size) + fmt
+    data_chunk = b'data' + struct.pack('<I', len(data) if data_size is None else data_size) + data
+    body = b'WAVE' + (fmt_chunk + data_chunk if fmt_first else data_chunk + fmt_chunk)
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+class ReadWavInfoTests(SimpleTestCase):
+    def setUp(self):
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        self.path = Path(scratch.name) / 'clip.wav'
+
+    def read(self, data: bytes) -> audio.WavInfo:
+        self.path.write_bytes(data)
+        return audio.read_wav_info(self.path)
+
+    def test_reads_pcm(self):
+        info = self.read(wav_bytes())
+        self.assertEqual((info.format_tag, info.channels, info.sample_rate, info.bits), (1, 1, 8000, 16))
+        self.assertEqual(info.frames, 2000)
+        self.assertEqual(info.data_offset, 44)
+        summary = audio.analyze(self.path, levels=(512,))
+        self.assertAlmostEqual(summary.duration, 0.25)
+        self.assertLess(summary.peak_db, 0)
+
+    def test_streamed_data_size_uses_the_file_length(self):
+        for size in (0, 0xFFFFFFFF):
+            with self.subTest(size=size):
+                self.assertEqual(self.read(wav_bytes(data_size=size)).frames, 2000)
+
+    def test_malformed_headers_raise_audio_error(self):
+        valid = wav_bytes()
+        cases = {
+            'empty file': b'',
+            'truncated RIFF header': valid[:7],
+            'not WAVE': b'RIFF\0\0\0\0AVI ' + valid[12:],
+            'fmt chunk under 16 bytes': wav_bytes(fmt_size=12),
+            'file ends inside fmt': valid[:30],
+            'no data chunk': valid[:36],
+            'data before fmt': wav_bytes(fmt_first=False),
+            'zero bits per sample': wav_bytes(bits=0),
+            'bits not whole bytes': wav_bytes(bits=12),
+            'zero sample rate': wav_bytes(rate=0, samples=np.zeros(16, dtype='<i2')),
+            'zero channels': wav_bytes(channels=0),
+            'compressed encoding': wav_bytes(format_tag=0x55),
+            'empty data chunk': wav_bytes(samples=np.zeros(0, dtype='<i2')),
+        }
+        for label, data in cases.items():
+            with self.subTest(label), self.assertRaises(audio.AudioError):
+                self.read(data)
+
+    def test_unsupported_width_raises_audio_error_when_decoded(self):
+        info = self.read(wav_bytes(bits=40, samples=np.zeros(20, dtype='u1')))
+        with self.assertRaises(audio.AudioError):
+            next(audio.iter_blocks(info, 16))
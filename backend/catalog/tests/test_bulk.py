@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Expert, Instrument, Media, ProcessingJob, Recommendation
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+class InstrumentBulkWriteTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.edited, self.linked, self.recommending, self.unrelated = make_catalog(instruments=4, experts=0)['instruments']
+        self.expert = Expert.objects.create(name='Hari Gandharva', expertise='Sarangi')
+        self.expert.instruments.set([self.edited, self.linked])
+        Recommendation.objects.create(
+            instrument=self.recommending, kind=Recommendation.INSTRUMENT, related_instrument=self.edited, rank=1, score=0.5
+        )
+        ProcessingJob.objects.all().delete()
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+
+    def stamps(self) -> dict:
+        return {
+            **dict(Instrument.objects.values_list('name', 'updated_at')),
+            'expert': Expert.objects.get(pk=self.expert.pk).updated_at,
+        }
+
+    def test_patch_does_what_the_save_signals_would(self):
+        before = self.stamps()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('instrument-bulk'), [{'id': self.edited.pk, 'region': 'Karnali'}], content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+        after = self.stamps()
+        changed = {name for name, stamp in after.items() if stamp != before[name]}
+        self.assertEqual(changed, {self.edited.name, self.recommending.name, 'expert'})
+        queued = ProcessingJob.objects.filter(kind=ProcessingJob.RECOMMENDATIONS, status=ProcessingJob.PENDING)
+        self.assertEqual(set(queued.values_list('object_id', flat=True)), {self.edited.pk, self.linked.pk})
+
+    def test_create_queues_the_new_instruments(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('instrument-bulk'),
+                [
+                    {'name': f'Damaha {index}', 'category': self.edited.category_id, 'region': 'Gandaki',
+                     'description': 'A large kettle drum.'}
+                    for index in range(2)
+                ],
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 201)
+        queued = ProcessingJob.objects.filter(kind=ProcessingJob.RECOMMENDATIONS)
+        self.assertEqual(set(queued.values_list('object_id', flat=True)), {item['id'] for item in response.json()})
+
+
+class MediaBulkWriteTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        instrument = make_catalog(instruments=1, experts=0)['instruments'][0]
+        self.model = Media.objects.get(instrument=instrument, media_type=Media.MODEL_3D)
+        self.recording = Media.objects.get(instrument=instrument, media_type=Media.AUDIO)
+        # Mislabelled uploads, as a curator would find them; update() skips the save signals.
+        Media.objects.filter(pk=self.model.pk).update(media_type=Media.IMAGE)
+        Media.objects.filter(pk=self.recording.pk).update(media_type=Media.IMAGE, file='instruments/media/take.wav')
+        ProcessingJob.objects.all().delete()
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+
+    def patch(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse('media-bulk'), items, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return set(ProcessingJob.objects.values_list('kind', 'object_id'))
+
+    def test_retyped_media_get_the_jobs_a_save_would_queue(self):
+        queued = self.patch([
+            {'id': self.model.pk, 'media_type': Media.MODEL_3D},
+            {'id': self.recording.pk, 'media_type': Media.AUDIO},
+        ])
+        self.assertEqual(queued, {
+            (ProcessingJob.MODEL_3D, self.model.pk),
+            (ProcessingJob.AUDIO_ANALYSIS, self.recording.pk),
+        })
+
+    def test_metadata_edits_queue_nothing(self):
+        self.assertEqual(self.patch([{'id': self.model.pk, 'title': 'Front view'}]), set())
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog import cache
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+class ResponseCacheTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog()
+        self.url = reverse('instrument-list')
+
+    def test_cached_links_keep_the_requesting_origin(self):
+        self.client.get(self.url, {'page_size': 1}, HTTP_HOST='localhost')
+        response = self.client.get(self.url, {'page_size': 1}, HTTP_HOST='127.0.0.1', secure=True)
+        self.assertTrue(response.json()['next'].startswith('https://127.0.0.1/'))
+
+    def test_a_write_invalidates_cached_lists(self):
+        self.client.get(self.url)
+        instrument = self.catalog['instruments'][0]
+        instrument.name = 'Dhimay'
+        instrument.save()
+        names = [row['name'] for row in self.client.get(self.url).json()['results']]
+        self.assertIn('Dhimay', names)
+
+    def test_generation_stamps_survive_clearing_the_response_cache(self):
+        before = cache.get_generations(['catalog.instrument'])
+        caches['default'].clear()
+        self.assertEqual(cache.get_generations(['catalog.instrument']), before)
+
+    def test_lookups_are_not_counted_in_the_shared_cache(self):
+        self.client.get(self.url)
+        with mock.patch.object(LocMemCache, 'incr') as incr:
+            self.client.get(self.url)
+            self.client.get(self.url)
+        incr.assert_not_called()
+
+    def test_stats_count_lookups_from_the_metrics(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        with self.settings(METRICS_ENABLED=True):
+            self.client.force_login(admin)
+            before = self.client.get(reverse('cache-stats-list')).json()
+            self.client.logout()
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.catalog['category'].save()
+            self.client.force_login(admin)
+            after = self.client.get(reverse('cache-stats-list')).json()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['invalidations'] - before['invalidations'], 1)
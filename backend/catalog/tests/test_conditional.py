@@ -0,0 +1,98 @@
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from catalog import async_views
+from catalog.urls import router
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+class ConditionalGetTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog()
+        self.instrument, self.other = self.catalog['instruments'][:2]
+        self.detail = reverse('instrument-detail', args=[self.instrument.pk])
+        self.list = reverse('instrument-list')
+
+    def test_cache_hits_run_no_queries(self):
+        for url in (self.list, self.detail):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_unrelated_writes_keep_the_etag(self):
+        etag = self.client.get(self.detail)['ETag']
+        self.other.name = 'Dhimay'
+        self.other.save()
+        # The write orphaned the cached copy; updated_at still validates.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_a_change_replaces_the_etag(self):
+        etag = self.client.get(self.detail)['ETag']
+        self.instrument.name = 'Dhimay'
+        self.instrument.save()
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['name'], 'Dhimay')
+
+    def test_etag_depends_on_scheme_and_host(self):
+        etag = self.client.get(self.detail)['ETag']
+        for headers in ({'HTTP_HOST': 'localhost'}, {'secure': True}):
+            with self.subTest(**headers):
+                response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag, **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertNotIn('http://testserver/', response.content.decode())
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.detail)['Last-Modified']
+        response = self.client.get(self.detail, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_uncached_views_answer_from_updated_at(self):
+        url = reverse('tutorial-detail', args=[self.instrument.tutorials.get().pk])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class AsyncConditionalGetTests(CatalogTestMixin, TestCase):
+    """The async read path shares the cache entries and validators."""
+
+    def setUp(self):
+        super().setUp()
+        self.instrument = make_catalog()['instruments'][0]
+        routes = {pattern.name: pattern.callback for pattern in router.urls}
+        self.view = async_to_sync(async_views.InstrumentReadView.as_view(routes['instrument-detail']))
+        self.url = reverse('instrument-detail', args=[self.instrument.pk])
+
+    def get(self, **headers):
+        return self.view(RequestFactory().get(self.url, **headers), pk=str(self.instrument.pk))
+
+    def test_same_body_and_validators_as_the_sync_view(self):
+        synchronous = self.client.get(self.url)
+        asynchronous = self.get()
+        self.assertEqual(asynchronous.content, synchronous.content)
+        self.assertEqual(asynchronous['ETag'], synchronous['ETag'])
+
+    def test_cache_hits_run_no_queries(self):
+        etag = self.get()['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_missing_objects_fall_back_to_the_viewset(self):
+        response = self.view(RequestFactory().get('/instruments/0/'), pk='0')
+        self.assertEqual(response.status_code, 404)
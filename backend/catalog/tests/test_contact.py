@@ -0,0 +1,81 @@
+import fcntl
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog import contact
+from catalog.models import Contact
+
+from .utils import CatalogTestMixin
+
+
+def message(**overrides) -> dict:
+    return {
+        'name': 'Sita Rai',
+        'email': 'sita@example.com',
+        'subject': 'Madal lessons',
+        'message': 'Do any of your experts teach madal in Pokhara on weekends?',
+        **overrides,
+    }
+
+
+class ContactSubmitTests(CatalogTestMixin, TestCase):
+    def test_resubmissions_are_dropped(self):
+        self.assertTrue(contact.submit(message()))
+        # Same sender and text, up to case and spacing.
+        self.assertFalse(contact.submit(message(subject='Again', message=message()['message'].upper() + '  ')))
+        self.assertTrue(contact.submit(message(email='ram@example.com')))
+        self.assertEqual(contact.flush(), 2)
+        self.assertEqual(Contact.objects.count(), 2)
+
+    def test_spam_is_dropped(self):
+        spam = message(message='Cheap casino bonus https://a.example https://b.example https://c.example')
+        self.assertFalse(contact.submit(spam))
+        self.assertEqual(contact.flush(), 0)
+
+    def test_post_is_spooled_until_flushed(self):
+        response = self.client.post(reverse('contact-list'), message(), content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Contact.objects.exists())
+        self.assertEqual(contact.flush(), 1)
+        saved = Contact.objects.get()
+        self.assertEqual(saved.email, 'sita@example.com')
+        self.assertEqual(contact.flush(), 0)
+
+
+class ContactFlushTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        contact.submit(message())
+        self.spool = contact.get_spool_dir()
+
+    def test_locked_spool_is_left_for_the_next_flush(self):
+        (path,) = self.spool.glob(f'*{contact.SPOOL_SUFFIX}')
+        with open(path, 'rb') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            self.assertEqual(contact.flush(), 0)
+        self.assertEqual(len(list(self.spool.glob(f'*{contact.FLUSHING_SUFFIX}'))), 1)
+        self.assertEqual(contact.flush(), 1)
+        self.assertEqual(list(self.spool.iterdir()), [])
+
+    def test_concurrent_flush_does_not_save_twice(self):
+        save = contact._save
+        nested = []
+
+        def save_during_another_flush(contacts, batch_size):
+            # A second flusher starts while the first is saving.
+            nested.append(contact.flush())
+            save(contacts, batch_size)
+
+        with mock.patch.object(contact, '_save', side_effect=save_during_another_flush):
+            self.assertEqual(contact.flush(), 1)
+        self.assertEqual(nested, [0])
+        self.assertEqual(Contact.objects.count(), 1)
+        self.assertEqual(contact.flush(), 0)
+
+    def test_new_messages_after_a_flush_go_to_a_new_spool(self):
+        self.assertEqual(contact.flush(), 1)
+        contact.submit(message(email='ram@example.com'))
+        self.assertEqual(contact.flush(), 1)
+        self.assertEqual(Contact.objects.count(), 2)
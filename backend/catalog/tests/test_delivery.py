@@ -0,0 +1,137 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from catalog import delivery
+from catalog.models import Media
+
+from .utils import CatalogTestMixin, make_catalog
+
+CONTENT = bytes(range(256)) * 40
+
+
+def file_url(url_name, field_file):
+    # Storage adds a suffix when the scratch MEDIA_ROOT already has the name.
+    return reverse(url_name, kwargs={'pk': field_file.instance.pk, 'name': os.path.basename(field_file.name)})
+
+
+class DeliveryTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog(instruments=1, experts=1)
+        self.instrument = self.catalog['instruments'][0]
+        self.media = Media.objects.get(instrument=self.instrument, media_type=Media.AUDIO)
+        self.media.file.save('clip.mp3', ContentFile(CONTENT))
+        self.url = file_url('media-file', self.media.file)
+
+    def get(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def test_serializers_link_the_delivery_routes(self):
+        expert = self.catalog['experts'][0]
+        expert.teaching_audio.save('lesson.wav', ContentFile(b'RIFF'))
+        expert.performance_video.save('concert.mp4', ContentFile(b'\0'))
+
+        detail = self.client.get(reverse('instrument-detail', args=[self.instrument.pk])).json()
+        self.assertEqual(detail['audio_sample'], f'http://testserver{self.url}')
+        media = self.client.get(reverse('media-detail', args=[self.media.pk])).json()
+        self.assertEqual(media['file'], f'http://testserver{self.url}')
+        expanded = self.client.get(reverse('instrument-list'), {'expand': 'media'}).json()['results'][0]
+        self.assertEqual(expanded['audio_sample'], f'http://testserver{self.url}')
+        row = self.client.get(reverse('expert-detail', args=[expert.pk])).json()
+        teaching_audio = file_url('expert-teaching-audio', expert.teaching_audio)
+        self.assertEqual(row['teaching_audio'], f'http://testserver{teaching_audio}')
+        performance_video = file_url('expert-performance-video', expert.performance_video)
+        self.assertEqual(row['performance_video'], f'http://testserver{performance_video}')
+        self.assertEqual(self.get(row['teaching_audio'])[1], b'RIFF')
+
+    def test_gltf_keeps_its_media_url(self):
+        # Its .bin buffers are resolved relative to the .gltf.
+        model = Media.objects.get(instrument=self.instrument, media_type=Media.MODEL_3D)
+        model.file.save('scene.gltf', ContentFile(b'{}'))
+        detail = self.client.get(reverse('instrument-detail', args=[self.instrument.pk])).json()
+        self.assertEqual(detail['model_3d'], f'http://testserver{model.file.url}')
+
+    def test_full_body(self):
+        response, body = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_ranges(self):
+        size = len(CONTENT)
+        for header, start, end in (
+            ('bytes=2-5', 2, 5),
+            ('bytes=10-', 10, size - 1),
+            ('bytes=-3', size - 3, size - 1),
+            ('bytes=100-999999', 100, size - 1),
+        ):
+            with self.subTest(header):
+                response, body = self.get(self.url, range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(body, CONTENT[start:end + 1])
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(self.url, range=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_multiple_ranges_get_the_whole_file(self):
+        response, body = self.get(self.url, range='bytes=0-1,4-5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT)
+
+    def test_if_range(self):
+        etag = self.get(self.url)[0]['ETag']
+        response, body = self.get(self.url, range='bytes=0-9', if_range=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, CONTENT[:10])
+        response, body = self.get(self.url, range='bytes=0-9', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT)
+
+    def test_not_modified(self):
+        first, _ = self.get(self.url)
+        response, _ = self.get(self.url, if_none_match=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+        response, _ = self.get(self.url, if_modified_since=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_replaced_upload_redirects_to_the_current_name(self):
+        self.media.file.save('take-2.mp3', ContentFile(b'new'))
+        response = self.client.get(self.url)
+        self.assertRedirects(response, file_url('media-file', self.media.file), fetch_redirect_response=False)
+
+    def test_missing_file(self):
+        self.assertEqual(self.client.get(reverse('media-file', kwargs={'pk': 0, 'name': 'x.mp3'})).status_code, 404)
+        self.media.file.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='nginx', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_nginx_offload(self):
+        response, body = self.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.media.file.name}')
+        self.assertEqual(body, b'')
+
+        # A cache directory outside MEDIA_ROOT is streamed unless it has a location.
+        path = self.scratch / 'tone-cache' / 'a4.wav'
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(CONTENT)
+        request = RequestFactory().get('/')
+        response = delivery.serve_path(request, path)
+        self.assertNotIn('X-Accel-Redirect', response)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        response.close()
+        with override_settings(MEDIA_ACCEL_REDIRECT_LOCATIONS={path.parent: '/protected-tones'}):
+            response = delivery.serve_path(request, path)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-tones/a4.wav')
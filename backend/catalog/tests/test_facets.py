@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog import facets
+from catalog.models import Category, Instrument
+
+from .utils import CatalogTestMixin, add_instruments, make_catalog
+
+
+class FacetTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # Percussion: two in the Kathmandu Valley, two in Mustang, one of each
+        # featured.  Strings: one in each region.
+        catalog = make_catalog(instruments=4, experts=0)
+        self.strings = Category.objects.create(name='Strings', slug='strings', description='Sarangi and more')
+        add_instruments(self.strings, 2)
+        Instrument.objects.filter(pk__in=[instrument.pk for instrument in catalog['instruments'][:2]]).update(
+            is_featured=True
+        )
+
+    def facets(self, **params) -> dict:
+        response = self.client.get(reverse('instrument-list'), params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        counts = {
+            facet: {entry['value']: entry['count'] for entry in entries} for facet, entries in data['facets'].items()
+        }
+        return {'count': len(data['results']), **counts}
+
+    def test_counts_without_filters(self):
+        self.assertEqual(self.facets(facets='category,region,is_featured,bogus'), {
+            'count': 6,
+            'category': {'percussion': 4, 'strings': 2},
+            'region': {'Kathmandu Valley': 3, 'Mustang': 3},
+            'is_featured': {False: 4, True: 2},
+        })
+
+    def test_a_facet_ignores_its_own_filter(self):
+        self.assertEqual(self.facets(region='mustang', facets='category,region'), {
+            'count': 3,
+            # Every region, with the count a click on it would give.
+            'region': {'Kathmandu Valley': 3, 'Mustang': 3},
+            'category': {'percussion': 2, 'strings': 1},
+        })
+
+    def test_in_filters_combine_with_facets(self):
+        counts = self.facets(
+            region__in='Mustang,Kathmandu Valley', category__in='strings', is_featured='false',
+            facets='category,region,is_featured',
+        )
+        self.assertEqual(counts, {
+            'count': 2,
+            'category': {'percussion': 2, 'strings': 2},
+            'region': {'Kathmandu Valley': 1, 'Mustang': 1},
+            'is_featured': {False: 2},
+        })
+        self.assertEqual(self.facets(category__in='strings,percussion', region__in='mustang', facets='category'), {
+            'count': 3, 'category': {'percussion': 2, 'strings': 1},
+        })
+
+    def test_counts_are_cached_until_a_write(self):
+        with mock.patch.object(facets, 'compute', wraps=facets.compute) as compute:
+            self.assertEqual(self.facets(facets='region')['region']['Mustang'], 3)
+            # Paging and ordering share the counts.
+            self.assertEqual(self.facets(facets='region', ordering='-created_at')['region']['Mustang'], 3)
+            self.assertEqual(compute.call_count, 1)
+
+            add_instruments(self.strings, 2)
+            self.assertEqual(self.facets(facets='region', ordering='name')['region']['Mustang'], 4)
+            self.assertEqual(compute.call_count, 2)
+
+            self.strings.name = 'Bowed strings'
+            self.strings.save()
+            self.facets(facets='category', ordering='region')
+            self.assertEqual(compute.call_count, 3)
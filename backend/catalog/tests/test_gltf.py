@@ -0,0 +1,123 @@
+import numpy as np
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from catalog import gltf, processing
+from catalog.models import Media, ModelVariant, ProcessingJob
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+def make_glb(cells: int = 16, extensions: list | None = None) -> bytes:
+    """
+    A ``cells`` x ``cells`` grid of quads with normals and UVs, written as
+    unindexed triangles (every shared corner repeated), plus a node outside
+    the scene that carries its own mesh.
+    """
+    corners = np.array([(0, 0), (1, 0), (1, 1), (0, 0), (1, 1), (0, 1)])
+    quads = np.array([(x, y) for y in range(cells) for x in range(cells)])
+    grid = (quads[:, None, :] + corners[None, :, :]).reshape(-1, 2).astype(np.float32)
+    positions = np.column_stack([grid * 0.5, np.zeros(len(grid))]).astype(np.float32)
+    normals = np.tile(np.array([0, 0, 1], dtype=np.float32), (len(grid), 1))
+    uvs = (grid / cells).astype(np.float32)
+
+    builder = gltf.BufferBuilder()
+    attributes = {
+        'POSITION': builder.add_accessor(positions, gltf.ARRAY_BUFFER, min_max=True),
+        'NORMAL': builder.add_accessor(normals, gltf.ARRAY_BUFFER),
+        'TEXCOORD_0': builder.add_accessor(uvs, gltf.ARRAY_BUFFER),
+    }
+    hidden = builder.add_accessor(positions[:3], gltf.ARRAY_BUFFER)
+    document = {
+        'asset': {'version': '2.0'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0, 'translation': [1, 2, 3]}, {'mesh': 1}],
+        'meshes': [
+            {'primitives': [{'attributes': attributes}]},
+            {'primitives': [{'attributes': {'POSITION': hidden}}]},
+        ],
+        'accessors': builder.accessors,
+        'bufferViews': builder.views,
+        'buffers': [{'byteLength': builder.length}],
+    }
+    if extensions:
+        document['extensionsUsed'] = extensions
+    return gltf.write_glb(document, builder.getvalue())
+
+
+def decoded_positions(data: bytes) -> np.ndarray:
+    """POSITION of the only mesh, through the dequantizing node matrix when there is one."""
+    document, binary = gltf.read_glb(data)
+    (primitive,) = document['meshes'][0]['primitives']
+    positions = gltf.read_accessor(document, binary, primitive['attributes']['POSITION']).astype(np.float64)
+    node = next(node for node in document['nodes'] if 'mesh' in node)
+    if 'matrix' in node:
+        matrix = np.array(node['matrix']).reshape(4, 4)
+        positions = positions @ matrix[:3, :3] + matrix[3, :3]
+    return positions
+
+
+class OptimizeGLBTests(SimpleTestCase):
+    def test_merges_vertices_and_drops_unreachable_meshes(self):
+        source = make_glb(cells=16)
+        result = gltf.optimize_glb(source)
+        self.assertEqual(result.vertex_count, 17 * 17)
+        self.assertEqual(result.triangle_count, 2 * 16 * 16)
+        self.assertLess(len(result.data), len(source) / 3)
+
+        document, _ = gltf.read_glb(result.data)
+        self.assertEqual(len(document['meshes']), 1)
+        self.assertIn(gltf.QUANTIZATION_EXTENSION, document['extensionsRequired'])
+        # The original node keeps its transform; a child decodes the positions.
+        self.assertEqual(document['nodes'][0]['translation'], [1, 2, 3])
+
+    def test_quantized_positions_decode_to_the_originals(self):
+        positions = decoded_positions(gltf.optimize_glb(make_glb(cells=16)).data)
+        expected = np.array([(x * 0.5, y * 0.5, 0) for y in range(17) for x in range(17)])
+        self.assertEqual(len(positions), len(expected))
+        found = {tuple(np.round(row, 3)) for row in positions}
+        self.assertEqual(found, {tuple(row) for row in expected})
+
+    def test_unquantized_output_is_lossless(self):
+        result = gltf.optimize_glb(make_glb(cells=4), quantize=False)
+        document, _ = gltf.read_glb(result.data)
+        self.assertNotIn('extensionsUsed', document)
+        self.assertEqual(result.vertex_count, 25)
+        found = {tuple(row) for row in decoded_positions(result.data)}
+        self.assertEqual(found, {(x * 0.5, y * 0.5, 0.0) for y in range(5) for x in range(5)})
+
+    def test_clustering_builds_a_coarser_level(self):
+        source = make_glb(cells=16)
+        full, coarse = gltf.optimize_glb(source), gltf.optimize_glb(source, grid=4)
+        self.assertEqual(coarse.vertex_count, 5 * 5)
+        self.assertEqual(coarse.triangle_count, 2 * 4 * 4)
+        self.assertLess(len(coarse.data), len(full.data))
+
+    @override_settings(MODEL_LOD_GRIDS=(8, 8, 4))
+    def test_build_levels_keeps_only_lighter_levels(self):
+        levels = processing.build_levels(make_glb(cells=16))
+        self.assertEqual([level.triangle_count for level in levels], [2 * 16 * 16, 2 * 8 * 8, 2 * 4 * 4])
+
+    def test_rejects_what_it_cannot_rewrite(self):
+        with self.assertRaises(gltf.GLTFError):
+            gltf.optimize_glb(b'not a model at all')
+        with self.assertRaises(gltf.GLTFError):
+            gltf.optimize_glb(make_glb(cells=2, extensions=['KHR_draco_mesh_compression']))
+
+
+class ModelWorkerTests(CatalogTestMixin, TestCase):
+    @override_settings(MODEL_LOD_GRIDS=(4,))
+    def test_uploaded_glb_gets_variants(self):
+        catalog = make_catalog(instruments=1, experts=0)
+        media = Media.objects.get(instrument=catalog['instruments'][0], media_type=Media.MODEL_3D)
+        with self.captureOnCommitCallbacks(execute=True):
+            media.file.save('grid.glb', ContentFile(make_glb(cells=16)))
+        pending = ProcessingJob.objects.filter(kind=ProcessingJob.MODEL_3D, status=ProcessingJob.PENDING)
+        self.assertEqual(pending.count(), 1)
+
+        self.assertEqual(processing.run_pending(), 1)
+        variants = list(ModelVariant.objects.filter(media=media).order_by('level'))
+        self.assertEqual([variant.vertex_count for variant in variants], [17 * 17, 5 * 5])
+        self.assertTrue(all(variant.source == media.file.name for variant in variants))
+        self.assertEqual(variants[0].byte_size, variants[0].file.size)
@@ -0,0 +1,138 @@
+import io
+import os
+import time
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from catalog import images, processing
+from catalog.models import Instrument, ProcessingJob
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+def jpeg(width: int = 800, height: int = 600, color=(180, 40, 40)) -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(output, format='JPEG')
+    return output.getvalue()
+
+
+def srcset_urls(srcset: str) -> dict[int, str]:
+    """``{width: path}`` of one format's srcset string."""
+    urls = {}
+    for candidate in srcset.split(', '):
+        url, width = candidate.split(' ')
+        urls[int(width[:-1])] = urlsplit(url).path
+    return urls
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=(320, 640, 1024))
+class ImageSrcsetTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.instrument = make_catalog(instruments=1, experts=0)['instruments'][0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.instrument.primary_image.save('dhime.jpg', ContentFile(jpeg()))
+        self.instrument.refresh_from_db()
+        self.info = images.describe(self.instrument.primary_image.path)
+
+    def srcset(self) -> dict:
+        response = self.client.get(reverse('instrument-list'))
+        return response.json()['results'][0]['image_srcset']
+
+    def test_saving_stores_the_digest_and_queues_the_derivatives(self):
+        self.assertEqual(self.instrument.primary_image_info, {
+            'source': self.instrument.primary_image.name, 'digest': self.info.digest, 'width': 800,
+        })
+        self.assertTrue(ProcessingJob.objects.filter(
+            kind=ProcessingJob.IMAGE_DERIVATIVES, object_id=self.instrument.pk
+        ).exists())
+
+    def test_serializers_do_not_read_the_file(self):
+        with mock.patch.object(images, 'describe', side_effect=AssertionError('hashed in a request')):
+            listed = self.srcset()
+        self.assertEqual(set(listed), set(images.available_formats()))
+        self.assertEqual(list(srcset_urls(listed['jpeg'])), [320, 640, 800])
+        self.assertIn(self.info.digest, listed['jpeg'])
+
+    def test_stale_info_renders_no_srcset(self):
+        # As after an import that replaced the file name without a save.
+        Instrument.objects.filter(pk=self.instrument.pk).update(primary_image='instruments/images/other.jpg')
+        self.assertIsNone(self.srcset())
+
+    def test_worker_builds_every_size_and_restores_the_info(self):
+        Instrument.objects.filter(pk=self.instrument.pk).update(primary_image_info=None)
+        before = Instrument.objects.get(pk=self.instrument.pk).updated_at
+        processing.run_pending()
+        self.assertTrue(images.is_built(self.instrument.primary_image.path))
+        instrument = Instrument.objects.get(pk=self.instrument.pk)
+        self.assertEqual(instrument.primary_image_info['digest'], self.info.digest)
+        self.assertGreater(instrument.updated_at, before)
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=(320, 640, 1024))
+class ImageDerivativeRouteTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.instrument = make_catalog(instruments=1, experts=0)['instruments'][0]
+        self.instrument.primary_image.save('dhime.jpg', ContentFile(jpeg()))
+        self.digest = images.describe(self.instrument.primary_image.path).digest
+
+    def url(self, digest=None, width=320, fmt='jpeg', model='instrument'):
+        return reverse('image-derivative', kwargs={
+            'model': model, 'pk': self.instrument.pk, 'digest': digest or self.digest, 'width': width, 'fmt': fmt,
+        })
+
+    def test_renders_and_caches_forever(self):
+        response = self.client.get(self.url(width=640))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (640, 480))
+        self.assertTrue(images.derivative_path(self.digest, 640, 'jpeg').exists())
+
+    def test_source_width_is_the_largest_variant(self):
+        self.assertEqual(self.client.get(self.url(width=800)).status_code, 200)
+        self.assertEqual(self.client.get(self.url(width=1024)).status_code, 404)
+
+    def test_old_digest_redirects_to_the_current_image(self):
+        response = self.client.get(self.url(digest='0' * 32))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], self.url())
+
+    def test_unknown_variants_are_not_found(self):
+        for url in (self.url(width=500), self.url(fmt='gif'), self.url(model='media')):
+            with self.subTest(url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        Instrument.objects.filter(pk=self.instrument.pk).update(primary_image='')
+        self.assertEqual(self.client.get(self.url()).status_code, 404)
+
+
+class EvictionTests(CatalogTestMixin, TestCase):
+    def test_removes_least_recently_used_until_under_ninety_percent(self):
+        now = time.time()
+        paths = []
+        for age in range(5):
+            path = images.derivative_path(f'{age:02d}' + 'a' * 30, 320, 'jpeg')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'x' * 100)
+            os.utime(path, (now - age * 60, now - age * 60))
+            paths.append(path)
+
+        self.assertEqual(images.evict(max_bytes=500), 0)
+        # 500 bytes against a 360 byte target: the two oldest go.
+        self.assertEqual(images.evict(max_bytes=400), 2)
+        self.assertEqual([path.exists() for path in paths], [True, True, True, False, False])
+
+    def test_serving_refreshes_old_files(self):
+        path = images.derivative_path('b' * 32, 320, 'jpeg')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x')
+        old = time.time() - images.TOUCH_INTERVAL - 60
+        os.utime(path, (old, old))
+        images.touch(path)
+        self.assertGreater(path.stat().st_mtime, old + 60)
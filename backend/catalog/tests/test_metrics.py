@@ -0,0 +1,118 @@
+import json
+import os
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog import metrics
+
+from .utils import CatalogTestMixin
+
+
+class MetricsTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = self.scratch / 'metrics' / self._testMethodName
+        settings = override_settings(METRICS_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # A registry of our own, with a file name so observe() starts no flush thread.
+        registry = mock.patch.multiple(
+            metrics,
+            _series={name: {} for name in metrics.METRICS},
+            _changed=False,
+            _file=self.directory / f'{os.getpid()}-1.json',
+        )
+        registry.start()
+        self.addCleanup(registry.stop)
+
+    def worker_file(self, pid: int, start: int, requests: int, media_bytes: int = 0) -> None:
+        data = {
+            'catalog_request_duration_seconds': [
+                ['instrument', 'list', '200', [requests] + [0] * len(metrics.LATENCY_BUCKETS) + [requests * 0.004]],
+            ],
+            'catalog_media_bytes_served_total': [['media-file', media_bytes]] if media_bytes else [],
+        }
+        metrics._write(self.directory / f'{pid}-{start}.json', data)
+
+    def test_render_is_prometheus_text(self):
+        metrics.observe('instrument', 'list', 200, 0.003, 0.0015, 'hits', 0)
+        metrics.observe('instrument', 'list', 200, 0.02, 0.004, 'misses', 0)
+        metrics.observe('media-file', '', 206, 0.3, 0.0, None, 4096)
+        metrics.observe('search "q"\n', 'list', 500, 20.0, 0.0, None, 0)
+        text = metrics.render(metrics.collect(), {'invalidations': 7, 'hit_ratio': 0.5})
+        lines = text.splitlines()
+
+        self.assertTrue(text.endswith('\n'))
+        self.assertIn('# TYPE catalog_request_duration_seconds histogram', lines)
+        labels = 'view="instrument",action="list",status="200"'
+        # Buckets are cumulative and end in +Inf, which equals _count.
+        self.assertIn(f'catalog_request_duration_seconds_bucket{{{labels},le="0.005"}} 1', lines)
+        self.assertIn(f'catalog_request_duration_seconds_bucket{{{labels},le="0.01"}} 1', lines)
+        self.assertIn(f'catalog_request_duration_seconds_bucket{{{labels},le="0.025"}} 2', lines)
+        self.assertIn(f'catalog_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', lines)
+        self.assertIn(f'catalog_request_duration_seconds_count{{{labels}}} 2', lines)
+        self.assertIn(f'catalog_request_duration_seconds_sum{{{labels}}} {0.003 + 0.02!r}', lines)
+        self.assertIn('catalog_response_cache_lookups_total{view="instrument",action="list",result="hits"} 1', lines)
+        self.assertIn('catalog_media_bytes_served_total{view="media-file"} 4096', lines)
+        # Label values are escaped; 20 s lands only in +Inf.
+        escaped = 'view="search \\"q\\"\\n",action="list",status="500"'
+        self.assertIn(f'catalog_request_duration_seconds_bucket{{{escaped},le="10.0"}} 0', lines)
+        self.assertIn(f'catalog_request_duration_seconds_bucket{{{escaped},le="+Inf"}} 1', lines)
+        self.assertIn('catalog_response_cache_invalidations_total 7', lines)
+        self.assertIn('catalog_response_cache_hit_ratio 0.5', lines)
+
+    def test_collect_sums_every_worker(self):
+        metrics.observe('instrument', 'list', 200, 0.003, 0.001, None, 100)
+        self.worker_file(os.getpid(), 2, requests=5, media_bytes=50)
+        self.worker_file(os.getpid(), 3, requests=7)
+        totals = metrics.collect()
+
+        histogram = totals['catalog_request_duration_seconds'][('instrument', 'list', '200')]
+        self.assertEqual(histogram[0], 13)
+        self.assertAlmostEqual(histogram[-1], 0.003 + 12 * 0.004)
+        self.assertEqual(totals['catalog_media_bytes_served_total'][('media-file',)], 50)
+        self.assertEqual(totals['catalog_media_bytes_served_total'][('instrument',)], 100)
+        # The scrape flushed this process's registry.
+        self.assertTrue(metrics._file.exists())
+
+    def test_exited_workers_are_archived_without_losing_counts(self):
+        self.worker_file(101, 1, requests=3)
+        self.worker_file(102, 1, requests=5)
+        self.worker_file(os.getpid(), 2, requests=7)
+        with mock.patch.object(metrics, '_is_alive', side_effect=lambda pid: pid == os.getpid()):
+            before = metrics.collect()
+            self.assertEqual({path.name for path in self.directory.glob('*.json')}, {
+                metrics.ARCHIVE, f'{os.getpid()}-2.json',
+            })
+            self.worker_file(103, 1, requests=11)
+            self.assertEqual(metrics.compact(self.directory), 1)
+            self.assertEqual(metrics.compact(self.directory), 0)
+            after = metrics.collect()
+
+        counts = lambda totals: totals['catalog_request_duration_seconds'][('instrument', 'list', '200')][0]
+        self.assertEqual((counts(before), counts(after)), (15, 26))
+        archive = json.loads((self.directory / metrics.ARCHIVE).read_text())
+        self.assertEqual(archive['catalog_request_duration_seconds'][0][3][0], 19)
+
+    def test_unreadable_files_are_ignored(self):
+        self.directory.mkdir(parents=True)
+        (self.directory / f'{os.getpid()}-9.json').write_text('{"truncated')
+        self.worker_file(os.getpid(), 2, requests=2)
+        totals = metrics.collect()
+        self.assertEqual(totals['catalog_request_duration_seconds'][('instrument', 'list', '200')][0], 2)
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_endpoint_access(self):
+        url = reverse('metrics-list')
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+        self.assertIn(self.client.get(url, HTTP_AUTHORIZATION='Token wrong').status_code, (401, 403))
+        response = self.client.get(url, HTTP_AUTHORIZATION='Token scrape-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn(b'# TYPE catalog_media_bytes_served_total counter', response.content)
+
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
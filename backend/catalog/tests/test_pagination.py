@@ -0,0 +1,129 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Instrument, TunerConfiguration
+
+from .utils import CatalogTestMixin, add_instruments, make_catalog
+
+
+class CursorPaginationTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog(instruments=7)
+        # Ties on name: the cursor must fall back to id.
+        Instrument.objects.filter(pk__in=[obj.pk for obj in self.catalog['instruments'][:4]]).update(name='Dhime')
+        self.url = reverse('instrument-list')
+
+    def walk(self, url, **params):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            data = response.json()
+            ids += [row['id'] for row in data['results']]
+            if not data['next']:
+                return ids, pages
+            response = self.client.get(data['next'])
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids, pages = self.walk(self.url, page_size=2)
+        expected = list(Instrument.objects.order_by('name', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 4)
+
+    def test_descending_ordering(self):
+        ids, _ = self.walk(self.url, page_size=3, ordering='-created_at')
+        expected = list(Instrument.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_rows_added_behind_the_cursor_do_not_shift_pages(self):
+        first = self.client.get(self.url, {'page_size': 3}).json()
+        seen = [row['id'] for row in first['results']]
+        # Sorts before every existing name, so it lands on a page already read.
+        Instrument.objects.create(
+            name='Anandalahari', category=self.catalog['category'], region='Terai', description='A plucked drum.'
+        )
+        response = self.client.get(first['next'])
+        while True:
+            data = response.json()
+            seen += [row['id'] for row in data['results']]
+            if not data['next']:
+                break
+            response = self.client.get(data['next'])
+        self.assertEqual(sorted(seen), sorted(obj.pk for obj in self.catalog['instruments']))
+
+    def test_previous_links_walk_back(self):
+        first = self.client.get(self.url, {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_orderings_without_id_get_it_appended(self):
+        ids, _ = self.walk(self.url, page_size=2, ordering='region')
+        expected = list(Instrument.objects.order_by('region', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_malformed_cursors_are_not_found(self):
+        response = self.client.get(self.url, {'cursor': 'cD1EaGltZQ=='})  # "p=Dhime", a single-column cursor
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_size_is_capped(self):
+        add_instruments(self.catalog['category'], 100)
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.json()['results']), 100)
+
+
+class SparseFieldsetTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog()
+        self.instrument = self.catalog['instruments'][0]
+
+    def test_fields_projects_rows_and_columns(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('instrument-list'), {'fields': 'id,name'})
+        self.assertEqual({tuple(row) for row in response.json()['results']}, {('id', 'name')})
+        page_query = captured.captured_queries[-1]['sql']
+        self.assertNotIn('description', page_query)
+        self.assertNotIn('catalog_category', page_query)
+
+    def test_unknown_field_names_are_ignored(self):
+        response = self.client.get(reverse('instrument-list'), {'fields': 'name,bogus,category.name'})
+        self.assertEqual({tuple(row) for row in response.json()['results']}, {('name',)})
+
+    def test_only_unknown_field_names_give_full_rows(self):
+        full = self.client.get(reverse('instrument-list')).json()['results']
+        response = self.client.get(reverse('instrument-list'), {'fields': 'bogus'})
+        self.assertEqual(response.json()['results'], full)
+
+    def test_expert_fields(self):
+        response = self.client.get(reverse('expert-list'), {'fields': 'name,instruments'})
+        rows = response.json()['results']
+        self.assertEqual({tuple(row) for row in rows}, {('name', 'instruments')})
+        self.assertEqual(len(rows[0]['instruments']), 3)
+
+    def test_includes(self):
+        url = reverse('instrument-detail', args=[self.instrument.pk])
+        plain = self.client.get(url).json()
+        self.assertNotIn('tutorials', plain)
+        self.assertNotIn('tuner_config', plain)
+
+        data = self.client.get(url, {'include': 'tutorials'}).json()
+        self.assertEqual([item['title'] for item in data['tutorials']], ['Dhime basics 0'])
+        self.assertNotIn('tuner_config', data)
+
+        data = self.client.get(url, {'include': 'tutorials,tuner_config'}).json()
+        self.assertEqual(data['tuner_config']['frequencies'], [261.63, 392.0])
+
+    def test_unknown_and_nested_includes_are_ignored(self):
+        url = reverse('instrument-detail', args=[self.instrument.pk])
+        plain = self.client.get(url).json()
+        data = self.client.get(url, {'include': 'tutorials.instrument,experts.instruments,bogus'}).json()
+        self.assertEqual(data, plain)
+
+    def test_missing_tuner_config_is_null(self):
+        TunerConfiguration.objects.filter(instrument=self.instrument).delete()
+        url = reverse('instrument-detail', args=[self.instrument.pk])
+        self.assertIsNone(self.client.get(url, {'include': 'tuner_config'}).json()['tuner_config'])
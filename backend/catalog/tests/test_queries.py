@@ -0,0 +1,121 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.management.commands.explain_queries import explain
+from catalog.models import Media
+
+from .utils import CatalogTestMixin, add_instruments, make_catalog
+
+
+class QueryCountTests(CatalogTestMixin, TestCase):
+    """
+    List and detail endpoints run a fixed number of queries whatever the
+    number of instruments (cold cache: validators, rows, prefetches).
+    """
+
+    def assertQueriesFor(self, expected: dict):
+        for sizes in ('few', 'many'):
+            if sizes == 'many':
+                add_instruments(self.catalog['category'], 5)
+                for expert in self.catalog['experts']:
+                    expert.instruments.add(*self.catalog['category'].instruments.all())
+            for (name, args, query), count in expected.items():
+                caches['default'].clear()
+                with self.subTest(sizes=sizes, url=name, query=query), self.assertNumQueries(count):
+                    response = self.client.get(f'{reverse(name, args=args)}?{query}')
+                    self.assertEqual(response.status_code, 200)
+
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog(instruments=2)
+        self.instrument = self.catalog['instruments'][0]
+
+    def test_instrument_endpoints(self):
+        pk = self.instrument.pk
+        self.assertQueriesFor({
+            ('instrument-list', (), ''): 2,
+            ('instrument-list', (), 'expand=media'): 3,
+            ('instrument-detail', (pk,), ''): 6,
+            ('instrument-detail', (pk,), 'include=tutorials'): 7,
+            ('instrument-detail', (pk,), 'include=tutorials,tuner_config'): 7,
+            ('instrument-tutorials', (pk,), ''): 2,
+            ('instrument-tuner-config', (pk,), ''): 2,
+        })
+
+    def test_include_replaces_the_nested_requests(self):
+        pk = self.instrument.pk
+        included = self.client.get(reverse('instrument-detail', args=[pk]), {'include': 'tutorials,tuner_config'})
+        caches['default'].clear()
+        tutorials = self.client.get(reverse('instrument-tutorials', args=[pk]))
+        tuner_config = self.client.get(reverse('instrument-tuner-config', args=[pk]))
+        self.assertEqual(included.json()['tutorials'], tutorials.json())
+        self.assertEqual(included.json()['tuner_config'], tuner_config.json())
+
+    def test_expert_endpoints(self):
+        self.assertQueriesFor({
+            ('expert-list', (), ''): 3,
+            ('expert-detail', (self.catalog['experts'][0].pk,), ''): 3,
+        })
+
+    def test_other_catalog_endpoints(self):
+        media = Media.objects.filter(instrument=self.instrument).first()
+        self.assertQueriesFor({
+            ('category-list', (), ''): 2,
+            ('media-list', (), ''): 3,
+            ('media-detail', (media.pk,), ''): 3,
+            ('tutorial-list', (), ''): 2,
+            ('tunerconfiguration-list', (), ''): 2,
+        })
+
+    def test_expanded_media_come_from_the_prefetch(self):
+        response = self.client.get(reverse('instrument-list'), {'expand': 'media'})
+        row = next(row for row in response.json()['results'] if row['id'] == self.instrument.pk)
+        self.assertTrue(row['audio_sample'].endswith('/0.mp3'))
+        self.assertTrue(row['model_3d'].endswith('/0.glb'))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are read from SQLite EXPLAIN QUERY PLAN.')
+class IndexUsageTests(CatalogTestMixin, TestCase):
+    """The list endpoints keep using the indexes declared on the models."""
+
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog()
+
+    def plan(self, url: str, **params) -> list[str]:
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        return [
+            line for query in captured if query['sql'].lstrip().upper().startswith('SELECT')
+            for line in explain(query['sql'])[0]
+        ]
+
+    def test_no_full_table_scans(self):
+        call_command('explain_queries', stdout=StringIO())
+
+    def test_list_pages_walk_their_indexes(self):
+        instruments = reverse('instrument-list')
+        cases = [
+            (instruments, {}, 'catalog_instrument_name'),
+            (instruments, {'is_featured': 'true'}, 'catalog_instrument_featured'),
+            (instruments, {'region': 'MUSTANG'}, 'catalog_instrument_region_ci'),
+            (instruments, {'category': 'percussion'}, 'catalog_instrument_category'),
+            (instruments, {'facets': 'category,region'}, 'catalog_instrument_facets'),
+            (reverse('expert-list'), {}, 'catalog_expert_name'),
+            (reverse('tutorial-list'), {}, 'catalog_tutorial_created'),
+            (reverse('learningcontent-list'), {}, 'catalog_learning_order'),
+            (reverse('tunerconfiguration-list'), {}, 'catalog_tuner_name'),
+        ]
+        pk = self.catalog['instruments'][0].pk
+        cases.append((reverse('instrument-tutorials', args=[pk]), {}, 'catalog_tutorial_instrument'))
+        for url, params, index in cases:
+            with self.subTest(url=url, params=params):
+                caches['default'].clear()
+                self.assertRegex('\n'.join(self.plan(url, **params)), rf'INDEX {index}\b')
@@ -0,0 +1,89 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from catalog import search
+from catalog.models import SearchEntry
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+class SearchTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.catalog = make_catalog()
+
+    def test_signals_keep_the_index_current(self):
+        instrument = self.catalog['instruments'][0]
+        self.assertEqual(SearchEntry.objects.filter(kind=SearchEntry.INSTRUMENT).count(), 3)
+
+        instrument.description = 'A damaru shaken in tantric rituals.'
+        instrument.save()
+        hits = search.search('damaru')
+        self.assertEqual([(hit.kind, hit.object_id) for hit in hits], [(SearchEntry.INSTRUMENT, instrument.pk)])
+
+        instrument.delete()
+        self.assertEqual(search.search('damaru'), [])
+
+    def test_prefix_matching_across_kinds(self):
+        kinds = {hit.kind for hit in search.search('gandh')}
+        self.assertEqual(kinds, {SearchEntry.EXPERT})
+        kinds = {hit.kind for hit in search.search('dhim')}
+        self.assertEqual(kinds, {SearchEntry.INSTRUMENT, SearchEntry.TUTORIAL})
+
+    def test_search_endpoint(self):
+        response = self.client.get(reverse('search-list'), {'q': 'newar festival', 'type': 'instrument'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual({result['type'] for result in response.json()['results']}, {'instrument'})
+
+    def test_search_endpoint_rejects_bad_parameters(self):
+        url = reverse('search-list')
+        for params in ({'type': 'bogus'}, {'type': 'instrument,bogus'}, {'type': ','},
+                       {'limit': 0}, {'limit': -5}, {'limit': 'ten'}):
+            with self.subTest(params):
+                response = self.client.get(url, {'q': 'dhime', **params})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+        self.assertEqual(search.search('dhime', []), [])
+
+    def test_search_endpoint_limits(self):
+        url = reverse('search-list')
+        self.assertEqual(self.client.get(url, {'q': 'dhime', 'limit': 2}).json()['count'], 2)
+        self.assertEqual(self.client.get(url, {'q': 'dhime', 'limit': 500}).json()['count'], 6)
+
+    def test_instrument_list_search_uses_the_index(self):
+        response = self.client.get(reverse('instrument-list'), {'search': 'goat'})
+        self.assertEqual(len(response.json()['results']), 3)
+        response = self.client.get(reverse('instrument-list'), {'search': 'sarangi'})
+        self.assertEqual(response.json()['results'], [])
+
+
+class SearchBackfillMigrationTests(TransactionTestCase):
+    """Migration 0004 indexes the rows that existed before it."""
+
+    before = [('catalog', '0003_tutorial_and_tuner')]
+    after = [('catalog', '0004_searchentry')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def test_existing_rows_are_indexed(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        Category = apps.get_model('catalog', 'Category')
+        HistoricalInstrument = apps.get_model('catalog', 'Instrument')
+        category = Category.objects.create(name='Wind', slug='wind')
+        instrument = HistoricalInstrument.objects.create(
+            name='Murali', category=category, region='Terai', description='A bamboo flute of the Tharu.'
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+
+        hits = search.search('tharu flute')
+        self.assertEqual([(hit.kind, hit.object_id) for hit in hits], [(SearchEntry.INSTRUMENT, instrument.pk)])
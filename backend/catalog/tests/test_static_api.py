@@ -0,0 +1,71 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from catalog import static_api
+from catalog.models import Tutorial
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+class StaticAPITests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.scratch / 'snapshot' / self._testMethodName
+        settings = override_settings(STATIC_API_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        catalog = make_catalog(instruments=3, experts=1)
+        self.instruments, self.expert = catalog['instruments'], catalog['experts'][0]
+        static_api.build()
+        self.build = mock.patch.object(static_api, 'build', wraps=static_api.build)
+
+    def snapshot(self, name: str):
+        return json.loads(static_api.file_path(self.root, name).read_text())
+
+    def rebuilt(self, change) -> set[str]:
+        """The names rebuilt once ``change`` commits."""
+        with self.build as build, self.captureOnCommitCallbacks(execute=True):
+            change()
+        return set().union(*(call.args[0] for call in build.call_args_list))
+
+    def test_full_build_writes_every_file(self):
+        names = {path.relative_to(self.root).as_posix() for path in self.root.rglob('*.json')}
+        self.assertEqual(names, {
+            'categories.json', 'instruments.json', 'experts.json', 'learning.json',
+            *(f'instruments/{instrument.pk}.json' for instrument in self.instruments),
+            f'experts/{self.expert.pk}.json',
+        })
+        self.assertTrue(static_api.file_path(self.root, 'instruments', '.json.gz').exists())
+
+    def test_instrument_save_rebuilds_its_lists_detail_and_experts(self):
+        instrument = self.instruments[0]
+        instrument.name = 'Dhimay'
+        self.assertEqual(self.rebuilt(instrument.save), {
+            'instruments', 'experts', f'instruments/{instrument.pk}', f'experts/{self.expert.pk}',
+        })
+        self.assertEqual(self.snapshot(f'instruments/{instrument.pk}')['name'], 'Dhimay')
+        self.assertIn('Dhimay', [item['name'] for item in self.snapshot('instruments')['results']])
+
+    def test_tutorial_save_rebuilds_only_its_instrument(self):
+        instrument = self.instruments[1]
+        tutorial = Tutorial.objects.get(instrument=instrument)
+        tutorial.title = 'Basic strokes'
+        self.assertEqual(self.rebuilt(tutorial.save), {f'instruments/{instrument.pk}'})
+        titles = [item['title'] for item in self.snapshot(f'instruments/{instrument.pk}')['tutorials']]
+        self.assertEqual(titles, ['Basic strokes'])
+
+    def test_deleted_instrument_file_is_removed(self):
+        instrument = self.instruments[2]
+        name = f'instruments/{instrument.pk}'
+        self.assertIn(name, self.rebuilt(instrument.delete))
+        for suffix in static_api.SUFFIXES:
+            self.assertFalse(static_api.file_path(self.root, name, suffix).exists())
+        self.assertNotIn(instrument.pk, [item['id'] for item in self.snapshot('instruments')['results']])
+
+    def test_nothing_is_computed_before_the_first_build(self):
+        with override_settings(STATIC_API_ROOT=self.scratch / 'snapshot' / 'missing'):
+            with mock.patch.object(static_api, 'affected_by') as affected_by:
+                self.assertEqual(self.rebuilt(self.instruments[0].save), set())
+        affected_by.assert_not_called()
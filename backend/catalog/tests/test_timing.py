@@ -0,0 +1,53 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog import views
+
+from .utils import CatalogTestMixin, make_catalog
+
+
+class TimingTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        make_catalog()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('instrument-list'))
+        metrics = dict(metric.split(';', 1) for metric in response['Server-Timing'].split(', '))
+        self.assertEqual(list(metrics), ['db', 'serialize', 'render', 'app', 'total'])
+        self.assertRegex(metrics['db'], r'^dur=\d+\.\d;desc="[1-9]\d* queries"$')
+        self.assertRegex(metrics['total'], r'^dur=\d+\.\d$')
+
+        with override_settings(SERVER_TIMING_HEADER=False):
+            self.assertNotIn('Server-Timing', self.client.get(reverse('category-list')))
+
+    def test_request_over_its_query_budget_is_a_warning(self):
+        url = reverse('category-list')
+        with self.assertLogs('catalog.timing', 'INFO') as logs:
+            self.client.get(url)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual((entry['view'], entry['query_budget']), ('CategoryViewSet.list', 2))
+        self.assertLessEqual(entry['queries'], 2)
+
+        with mock.patch.object(views.CategoryViewSet, 'query_budgets', {'list': 0}):
+            with self.assertLogs('catalog.timing', 'WARNING') as logs:
+                # Another query string, so the response cache can't answer it.
+                self.client.get(url, {'ordering': 'name'})
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['query_budget'], 0)
+        self.assertGreater(entry['queries'], 0)
+
+    def test_check_query_budgets(self):
+        url = reverse('category-list')
+        output = StringIO()
+        call_command('check_query_budgets', url, stdout=output)
+        self.assertIn('(budget 2)', output.getvalue())
+        with mock.patch.object(views.CategoryViewSet, 'query_budgets', {'list': 0}):
+            with self.assertRaisesMessage(CommandError, f'{url}:'):
+                call_command('check_query_budgets', url, stdout=StringIO())
@@ -0,0 +1,127 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, transaction
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, override_settings
+
+from catalog import transactions
+from catalog.transactions import retrying_atomic
+
+
+class ScratchDatabaseMixin:
+    """A file database on ``nepali_platform.sqlite_backend``, outside the test database."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'scratch.sqlite3'
+
+    def connect(self, **options):
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'nepali_platform.sqlite_backend', 'NAME': self.path, 'OPTIONS': options},
+        })
+        connection = handler['default']
+        self.addCleanup(connection.close)
+        return connection
+
+    def hold_write_lock(self) -> sqlite3.Connection:
+        """Another process's writer, as far as SQLite can tell."""
+        holder = sqlite3.connect(self.path, timeout=0.01, isolation_level=None)
+        self.addCleanup(holder.close)
+        holder.execute('BEGIN IMMEDIATE')
+        return holder
+
+
+class SQLiteBackendTests(ScratchDatabaseMixin, SimpleTestCase):
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        connection = self.connect(pragmas={'cache_size': -1024})
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 20000)
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(connection, 'cache_size'), -1024)
+        self.assertEqual(self.pragma(connection, 'temp_store'), 2)  # MEMORY
+
+    def test_atomic_takes_the_write_lock_up_front(self):
+        connection = self.connect(pragmas={'busy_timeout': 10})
+        connection.cursor().execute('CREATE TABLE note (name TEXT)')
+        statements = []
+        with connection.execute_wrapper(lambda execute, sql, *args: statements.append(sql) or execute(sql, *args)):
+            # What transaction.atomic does on entry (it only takes an alias of
+            # the global connections, so it can't be pointed at this one).
+            connection.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+            try:
+                # Only a read so far, but another writer already has to wait.
+                connection.cursor().execute('SELECT count(*) FROM note')
+                with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                    self.hold_write_lock()
+            finally:
+                connection.rollback()
+                connection.set_autocommit(True)
+        self.assertEqual(statements[0], 'BEGIN IMMEDIATE')
+
+    def test_transaction_mode_option(self):
+        connection = self.connect(transaction_mode='deferred')
+        connection.ensure_connection()
+        self.assertEqual(connection.transaction_mode, 'DEFERRED')
+        with self.assertRaises(ImproperlyConfigured):
+            self.connect(transaction_mode='later').ensure_connection()
+
+
+@override_settings(DATABASE_WRITE_RETRIES=3)
+class RetryingAtomicTests(ScratchDatabaseMixin, SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        super().setUp()
+        self.scratch = self.connect(pragmas={'busy_timeout': 10})
+        self.scratch.cursor().execute('CREATE TABLE note (name TEXT)')
+        self.attempts = 0
+        sleep = mock.patch.object(transactions.time, 'sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    @retrying_atomic
+    def write(self):
+        self.attempts += 1
+        self.scratch.cursor().execute("INSERT INTO note VALUES ('Dhime')")
+
+    def test_gives_up_after_the_last_attempt(self):
+        self.hold_write_lock()
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            self.write()
+        self.assertEqual(self.attempts, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_retries_until_the_lock_is_released(self):
+        holder = self.hold_write_lock()
+        self.sleep.side_effect = lambda seconds: holder.execute('COMMIT')
+        self.write()
+        self.assertEqual(self.attempts, 2)
+        self.assertEqual(self.scratch.cursor().execute('SELECT count(*) FROM note').fetchone()[0], 1)
+
+    def test_other_errors_are_not_retried(self):
+        @retrying_atomic
+        def write():
+            self.attempts += 1
+            self.scratch.cursor().execute('INSERT INTO missing VALUES (1)')
+
+        with self.assertRaisesMessage(OperationalError, 'no such table'):
+            write()
+        self.assertEqual(self.attempts, 1)
+
+    def test_inside_atomic_runs_once_in_a_savepoint(self):
+        self.hold_write_lock()
+        with transaction.atomic(), self.assertRaises(OperationalError):
+            self.write()
+        self.assertEqual(self.attempts, 1)
+        self.sleep.assert_not_called()
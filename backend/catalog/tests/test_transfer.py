@@ -0,0 +1,113 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog import transfer
+from catalog.models import Category, Expert, Instrument, Media, Tutorial, TunerConfiguration
+
+from .utils import CatalogTestMixin, make_catalog
+
+MODELS = (Category, Instrument, Expert, Tutorial, TunerConfiguration, Media)
+
+
+def export() -> list[str]:
+    return list(transfer.export_records())
+
+
+def counts(stats: dict) -> dict:
+    return {
+        name: (stat.created, stat.updated, stat.unchanged, stat.skipped)
+        for name, stat in stats.items()
+        if stat.created or stat.updated or stat.unchanged or stat.skipped
+    }
+
+
+class TransferTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        make_catalog(instruments=3, experts=2)
+        self.lines = export()
+
+    def test_round_trip_into_an_empty_catalog(self):
+        for model in reversed(MODELS):
+            model.objects.all().delete()
+        stats = transfer.import_lines(self.lines, batch_size=2)
+        self.assertEqual(counts(stats), {
+            'category': (1, 0, 0, 0),
+            'instrument': (3, 0, 0, 0),
+            'expert': (2, 0, 0, 0),
+            'tutorial': (3, 0, 0, 0),
+            'tuner_configuration': (3, 0, 0, 0),
+            'media': (9, 0, 0, 0),
+        })
+        self.assertEqual(export(), self.lines)
+        self.assertEqual(Expert.objects.get(name='Hari Gandharva 0').instruments.count(), 3)
+
+    def test_reimport_is_idempotent(self):
+        stamps = dict(Instrument.objects.values_list('pk', 'updated_at'))
+        for _ in range(2):
+            stats = transfer.import_lines(self.lines)
+            self.assertEqual(counts(stats), {
+                'category': (0, 0, 1, 0),
+                'instrument': (0, 0, 3, 0),
+                'expert': (0, 0, 2, 0),
+                'tutorial': (0, 0, 3, 0),
+                'tuner_configuration': (0, 0, 3, 0),
+                'media': (0, 0, 9, 0),
+            })
+        self.assertEqual(dict(Instrument.objects.values_list('pk', 'updated_at')), stamps)
+        self.assertEqual(export(), self.lines)
+
+    def test_reimport_is_idempotent_with_duplicate_keys(self):
+        instrument = Instrument.objects.get(name='Dhime 1')
+        Tutorial.objects.create(instrument=instrument, title=instrument.tutorials.get().title, description='Again')
+        lines = export()
+        for _ in range(2):
+            stats = transfer.import_lines(lines)
+            self.assertEqual((stats['tutorial'].updated, stats['tutorial'].unchanged), (0, 3))
+
+    def test_changed_rows_are_updated_and_restamped(self):
+        records = [json.loads(line) for line in self.lines]
+        instrument = next(record for record in records if record['model'] == 'instrument')
+        instrument['region'] = 'Karnali'
+        expert = next(record for record in records if record['model'] == 'expert')
+        expert['instruments'] = expert['instruments'][:1]
+        before = Instrument.objects.get(name=instrument['name']).updated_at
+
+        stats = transfer.import_lines(json.dumps(record) + '\n' for record in records)
+        self.assertEqual((stats['instrument'].updated, stats['instrument'].unchanged), (1, 2))
+        self.assertEqual((stats['expert'].updated, stats['expert'].unchanged), (0, 2))
+        changed = Instrument.objects.get(name=instrument['name'])
+        self.assertEqual(changed.region, 'Karnali')
+        self.assertGreater(changed.updated_at, before)
+        self.assertEqual(Expert.objects.get(name=expert['name']).instruments.count(), 1)
+
+    def test_unknown_relations_are_skipped(self):
+        line = json.dumps({'model': 'tutorial', 'instrument': 'Nowhere', 'title': 'Lost', 'description': '',
+                           'video_url': '', 'instructor_name': 'Ram', 'duration': '5 min'})
+        stats = transfer.import_lines([line])
+        self.assertEqual(counts(stats), {'tutorial': (0, 0, 0, 1)})
+
+    def test_rejects_lines_that_are_not_records(self):
+        for line in ('not json', json.dumps({'model': 'bogus'}), json.dumps({'name': 'no model'})):
+            with self.subTest(line), self.assertRaises(transfer.TransferError):
+                transfer.import_lines([line])
+
+    def test_commands_round_trip_through_gzip(self):
+        with tempfile.TemporaryDirectory() as scratch:
+            path = str(Path(scratch) / 'catalog.ndjson.gz')
+            call_command('export_catalog', path, stderr=io.StringIO())
+            listed = self.client.get(reverse('instrument-list')).json()['results']
+
+            Instrument.objects.filter(name='Dhime 0').update(region='Karnali')
+            output = io.StringIO()
+            call_command('import_catalog', path, '--skip-recommendations', stdout=output)
+            self.assertIn('instrument: 0 created, 1 updated, 2 unchanged', output.getvalue())
+            self.assertEqual(Instrument.objects.get(name='Dhime 0').region, 'Kathmandu Valley')
+            # The import bumps the response cache generations.
+            self.assertEqual(self.client.get(reverse('instrument-list')).json()['results'], listed)
@@ -0,0 +1,121 @@
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog import audio, synth
+from catalog.models import Media, TunerConfiguration
+
+from .test_audio import wav_bytes
+from .utils import CatalogTestMixin, make_catalog
+
+
+class TuningAnalysisTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.instrument = make_catalog(instruments=1, experts=0)['instruments'][0]
+        self.recording = Media.objects.get(instrument=self.instrument, media_type=Media.AUDIO)
+        self.url = reverse('instrument-tuning-analysis', args=[self.instrument.pk])
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+
+    def upload(self, data: bytes):
+        self.recording.file.save('take.wav', ContentFile(data))
+
+    def test_truncated_recordings_are_rejected(self):
+        valid = wav_bytes()
+        for label, data in {
+            'cut inside the RIFF header': valid[:7],
+            'cut inside the fmt chunk': valid[:30],
+            'zero bits per sample': wav_bytes(bits=0),
+        }.items():
+            with self.subTest(label):
+                self.upload(data)
+                response = self.client.post(self.url)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+        config = TunerConfiguration.objects.get(instrument=self.instrument)
+        self.assertEqual(config.notes, ['C4', 'G4'])
+
+    def test_steady_tone_is_suggested_and_saved(self):
+        rate = 16000
+        tone = np.sin(np.arange(rate) * 2 * np.pi * 440 / rate) * 16000
+        self.upload(wav_bytes(tone.astype('<i2'), rate=rate))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TunerConfiguration.objects.get(instrument=self.instrument).notes, ['C4', 'G4'])
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 200)
+        config = TunerConfiguration.objects.get(instrument=self.instrument)
+        self.assertEqual(config.notes, ['A4'])
+        self.assertAlmostEqual(config.frequencies[0], 440, delta=2)
+
+    def test_requires_staff(self):
+        self.client.logout()
+        self.assertEqual(self.client.post(self.url).status_code, 401)
+
+
+class ReferenceToneTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.instrument = make_catalog(instruments=1, experts=0)['instruments'][0]
+        self.config = TunerConfiguration.objects.get(instrument=self.instrument)
+        self.tones = Path(settings.TONE_CACHE_DIR) / str(self.config.pk)
+
+    def get(self, index, **params):
+        response = self.client.get(reverse('instrument-tuner-tone', args=[self.instrument.pk, index]), params)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_first_request_renders_the_whole_tuning(self):
+        with mock.patch.object(synth, 'render', wraps=synth.render) as render:
+            response, body = self.get(1)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'audio/wav')
+            self.assertEqual(sorted(path.name for path in self.tones.glob('*/*.wav')), ['0.wav', '1.wav'])
+            # Percussion defaults to the struck timbre.
+            render.assert_called_once_with([261.63, 392.0], 'struck')
+
+            self.assertEqual(self.get(0)[0].status_code, 200)
+            self.assertEqual(self.get(1)[1], body)
+            self.assertEqual(render.call_count, 1)
+
+        path = next(self.tones.glob('*/1.wav'))
+        info = audio.read_wav_info(path)
+        self.assertEqual((info.sample_rate, info.channels, info.bits), (synth.SAMPLE_RATE, 1, 16))
+        self.assertEqual(info.frames, int(synth.SAMPLE_RATE * synth.DURATION))
+
+    def test_timbres_are_cached_apart(self):
+        struck = self.get(0)[1]
+        sine = self.get(0, timbre='sine')[1]
+        self.assertNotEqual(struck, sine)
+        self.assertEqual(len(list(self.tones.iterdir())), 2)
+
+    def test_saving_the_tuning_clears_its_tones(self):
+        first, _ = self.get(0)
+        self.config.frequencies = [440.0, 392.0]
+        self.config.save()
+        self.assertFalse(self.tones.exists())
+        second, _ = self.get(0)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+        self.config.delete()
+        self.assertFalse(self.tones.exists())
+        self.assertEqual(self.get(0)[0].status_code, 404)
+
+    def test_errors(self):
+        self.assertEqual(self.get(0, timbre='kazoo')[0].status_code, 400)
+        self.assertEqual(self.get(2)[0].status_code, 404)
+
+    def test_ignores_the_accept_header(self):
+        response = self.client.get(
+            reverse('instrument-tuner-tone', args=[self.instrument.pk, 0]), HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'audio/wav')
@@ -0,0 +1,96 @@
+"""Fixtures shared by the catalog tests."""
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+
+from catalog.models import Category, Expert, Instrument, Media, Tutorial, TunerConfiguration
+
+
+class CatalogTestMixin:
+    """
+    Scratch directories for media, the contact spool and metrics, an empty
+    response cache per test and a quiet ``catalog.timing`` logger.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        scratch = Path(tempfile.mkdtemp(prefix='catalog-tests-'))
+        cls.addClassCleanup(shutil.rmtree, scratch, ignore_errors=True)
+        cls.scratch = scratch
+        media = scratch / 'media'
+        overrides = override_settings(
+            MEDIA_ROOT=media,
+            IMAGE_DERIVATIVE_CACHE_DIR=media / 'derivatives',
+            TONE_CACHE_DIR=media / 'tones',
+            STATIC_API_ROOT=None,
+            METRICS_ENABLED=False,
+            METRICS_DIR=scratch / 'metrics',
+            REQUEST_PROFILE_SLOWEST=0,
+            REQUEST_PROFILE_DIR=scratch / 'profiles',
+            CONTACT_INGEST={**settings.CONTACT_INGEST, 'SPOOL_DIR': scratch / 'spool'},
+        )
+        overrides.enable()
+        cls.addClassCleanup(overrides.disable)
+        logger = logging.getLogger('catalog.timing')
+        cls.addClassCleanup(logger.setLevel, logger.level)
+        logger.setLevel(logging.ERROR)
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')].clear()
+
+
+def make_catalog(instruments: int = 3, experts: int = 2) -> dict:
+    """
+    A small catalog: one category, ``instruments`` instruments (see
+    ``add_instruments``) and ``experts`` experts linked to all of them.
+    """
+    category = Category.objects.create(name='Percussion', slug='percussion', description='Drums and cymbals')
+    created = add_instruments(category, instruments)
+    expert_objects = []
+    for index in range(experts):
+        expert = Expert.objects.create(
+            name=f'Hari Gandharva {index}', expertise='Sarangi', bio='A Gandharva musician from Pokhara.'
+        )
+        expert.instruments.set(created)
+        expert_objects.append(expert)
+    return {'category': category, 'instruments': created, 'experts': expert_objects}
+
+
+def add_instruments(category, count: int) -> list:
+    """
+    ``count`` instruments with an image, an audio clip, a 3D model, a
+    tutorial and a tuner configuration each.  Media rows only name files.
+    """
+    start = Instrument.objects.count()
+    created = []
+    for index in range(start, start + count):
+        instrument = Instrument.objects.create(
+            name=f'Dhime {index}',
+            category=category,
+            region='Kathmandu Valley' if index % 2 == 0 else 'Mustang',
+            description=f'A two-headed Newar festival drum, number {index}.',
+            history='Played in Newar processions.',
+            materials='Wood and goat skin',
+        )
+        Media.objects.create(instrument=instrument, media_type=Media.IMAGE, file=f'instruments/media/{index}.jpg')
+        Media.objects.create(
+            instrument=instrument, media_type=Media.AUDIO, file=f'instruments/media/{index}.mp3', is_primary=True
+        )
+        Media.objects.create(instrument=instrument, media_type=Media.MODEL_3D, file=f'instruments/media/{index}.glb')
+        Tutorial.objects.create(
+            instrument=instrument,
+            title=f'Dhime basics {index}',
+            description='The first rhythm cycles.',
+            video_url='https://example.com/video',
+            instructor_name='Ram Shrestha',
+        )
+        TunerConfiguration.objects.create(instrument=instrument, notes=['C4', 'G4'], frequencies=[261.63, 392.0])
+        created.append(instrument)
+    return created
@@ -0,0 +1,287 @@
+"""
+Per-request performance instrumentation.
+
+``TimingMiddleware`` records four things for every request:
+
+- the number and total time of database queries, through an execute wrapper
+  installed on each connection
+- time in serializer ``to_representation``, minus the queries it runs
+  (``TimingMixin`` on the catalog viewsets)
+- time in the renderer (``TimedContentNegotiation``, the default content
+  negotiation)
+- the response size
+
+They go out as a ``Server-Timing`` header (``SERVER_TIMING_HEADER``), which
+browser dev tools show per request. Each request also gets one JSON line on
+the ``catalog.timing`` logger and an observation in ``catalog.metrics``.
+
+Viewsets declare query budgets per action, e.g. ``query_budgets = {'list': 2}``.
+A request over its budget is logged at WARNING, and ``manage.py
+check_query_budgets`` fails on it.
+
+Profiling is off unless ``REQUEST_PROFILE_SLOWEST`` is set to a percentage.
+A ``REQUEST_PROFILE_RATE`` share of sync requests then runs under cProfile.
+Any of them slower than that percentile of the process's recent requests is
+dumped to ``REQUEST_PROFILE_DIR``. Only the newest ``REQUEST_PROFILE_KEEP``
+dumps are kept; read them with ``python -m pstats``. cProfile only sees its
+own thread, so async requests are never profiled.
+"""
+import cProfile
+import json
+import logging
+import random
+import re
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_timings', default=None)
+
+# Durations (seconds) of this process's recent requests, for the profiling threshold.
+_recent = deque(maxlen=1000)
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        # Span name -> seconds, not counting queries run inside the span.
+        self.spans = defaultdict(float)
+        self.view = None
+        self.query_budget = None
+        # 'hits' or 'misses' when the view looked in the response cache.
+        self.cache = None
+        self.media_bytes = 0
+
+
+def current() -> Timings | None:
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def span(name: str):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started, db_before = time.perf_counter(), timings.db
+    try:
+        yield
+    finally:
+        timings.spans[name] += time.perf_counter() - started - (timings.db - db_before)
+
+
+def timed(name: str, function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+class TimedContentNegotiation(DefaultContentNegotiation):
+    """Times the selected renderer; views get fresh renderer instances per request."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderer, media_type = super().select_renderer(request, renderers, format_suffix)
+        renderer.render = timed('render', renderer.render)
+        return renderer, media_type
+
+
+class TimingMixin:
+    """Names the view in the timings, applies its query budget and times its serializers."""
+    query_budgets = {}
+
+    def initial(self, request, *args, **kwargs):
+        self.start_timing()
+        super().initial(request, *args, **kwargs)
+
+    def start_timing(self) -> None:
+        timings = _current.get()
+        if timings is not None:
+            timings.view = f'{type(self).__name__}.{self.action}'
+            timings.query_budget = self.query_budgets.get(self.action)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        serializer.to_representation = timed('serialize', serializer.to_representation)
+        return serializer
+
+    def get_row_serializer(self):
+        rows = super().get_row_serializer()
+        if rows is not None:
+            rows.to_representation = timed('serialize', rows.to_representation)
+        return rows
+
+
+def response_size(response) -> int | None:
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
+
+
+def server_timing(timings: Timings, total: float) -> str:
+    serialize, render = timings.spans['serialize'], timings.spans['render']
+    metrics = [
+        f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+        f'serialize;dur={serialize * 1000:.1f}',
+        f'render;dur={render * 1000:.1f}',
+        f'app;dur={max(total - timings.db - serialize - render, 0) * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ]
+    return ', '.join(metrics)
+
+
+def get_profile_dir() -> Path:
+    return Path(getattr(settings, 'REQUEST_PROFILE_DIR', Path(settings.BASE_DIR) / 'profiles'))
+
+
+def should_profile() -> bool:
+    return getattr(settings, 'REQUEST_PROFILE_SLOWEST', 0) > 0 and random.random() < getattr(
+        settings, 'REQUEST_PROFILE_RATE', 0.1
+    )
+
+
+def is_slowest(duration: float) -> bool:
+    """Whether ``duration`` is in the slowest ``REQUEST_PROFILE_SLOWEST`` percent of recent requests."""
+    if len(_recent) < 20:
+        return False
+    ranked = sorted(_recent)
+    cutoff = ranked[min(int(len(ranked) * (1 - settings.REQUEST_PROFILE_SLOWEST / 100)), len(ranked) - 1)]
+    return duration >= cutoff
+
+
+def save_profile(profiler: cProfile.Profile, request, duration: float) -> Path:
+    directory = get_profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_')[:80] or 'root'
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    path = directory / f'{stamp}-{duration * 1000:.0f}ms-{request.method}-{slug}.prof'
+    profiler.dump_stats(path)
+    keep = getattr(settings, 'REQUEST_PROFILE_KEEP', 200)
+    # Names start with the time, so they sort oldest first.
+    dumps = sorted(directory.glob('*.prof'))
+    for old in dumps[:max(len(dumps) - keep, 0)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def metric_labels(request, timings: Timings) -> tuple[str, str]:
+    """``(view, action)``: the viewset and action, else the URL name of a plain view."""
+    if timings.view is not None:
+        view, _, action = timings.view.partition('.')
+        return view, action
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved', ''
+    return match.view_name, ''
+
+
+def report(request, response, timings: Timings, profiler: cProfile.Profile | None) -> None:
+    total = time.perf_counter() - timings.started
+    if getattr(settings, 'SERVER_TIMING_HEADER', True):
+        response['Server-Timing'] = server_timing(timings, total)
+
+    over_budget = timings.query_budget is not None and timings.queries > timings.query_budget
+    entry = {
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': timings.view,
+        'status': response.status_code,
+        'total_ms': round(total * 1000, 2),
+        'db_ms': round(timings.db * 1000, 2),
+        'queries': timings.queries,
+        'serialize_ms': round(timings.spans['serialize'] * 1000, 2),
+        'render_ms': round(timings.spans['render'] * 1000, 2),
+        'bytes': response_size(response),
+    }
+    if timings.query_budget is not None:
+        entry['query_budget'] = timings.query_budget
+    if profiler is not None and is_slowest(total):
+        entry['profile'] = save_profile(profiler, request, total).name
+    _recent.append(total)
+    if getattr(settings, 'METRICS_ENABLED', True):
+        view, action = metric_labels(request, timings)
+        metrics.observe(
+            view, action, response.status_code, total, timings.db, timings.cache, timings.media_bytes
+        )
+
+    if over_budget:
+        logger.warning(json.dumps(entry))
+    else:
+        logger.info(json.dumps(entry))
+
+
+class TimingMiddleware:
+    """Outermost middleware, so the totals include every other layer."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = Timings()
+        token = _current.set(timings)
+        profiler = cProfile.Profile() if should_profile() else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _current.reset(token)
+        report(request, response, timings, profiler)
+        return response
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        report(request, response, timings, None)
+        return response
@@ -0,0 +1,46 @@
+"""
+Write transactions that retry when SQLite reports the database as locked.
+
+The busy timeout of ``nepali_platform.sqlite_backend`` absorbs ordinary
+contention; this covers the rest (a checkpoint or a long import holding the
+lock past the timeout) by running the whole transaction again after a short
+randomized backoff.  Only an outermost transaction can be retried, so inside
+another ``atomic`` block the function simply runs in a savepoint.
+"""
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def is_locked(exc: Exception) -> bool:
+    return any(message in str(exc) for message in LOCKED_MESSAGES)
+
+
+def retrying_atomic(func=None, *, using=None):
+    """Decorator: run ``func`` in ``transaction.atomic``, retrying lock errors."""
+    if func is None:
+        return functools.partial(retrying_atomic, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if transaction.get_connection(using).in_atomic_block:
+            with transaction.atomic(using=using):
+                return func(*args, **kwargs)
+        attempts = getattr(settings, 'DATABASE_WRITE_RETRIES', 5)
+        delay = 0.05
+        for attempt in range(1, attempts + 1):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if attempt == attempts or not is_locked(exc):
+                    raise
+            time.sleep(delay * (1 + random.random()))
+            delay *= 2
+
+    return wrapper
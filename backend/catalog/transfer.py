@@ -0,0 +1,276 @@
+"""
+Streaming NDJSON export and import of the catalog.
+
+Each line is one object, tagged with ``model`` and keyed by natural keys
+instead of primary keys, so dumps can move between databases:
+
+    {"model": "category", "slug": "string", "name": "String", ...}
+    {"model": "instrument", "name": "Sarangi", "category": "string", ...}
+    {"model": "expert", "name": "...", "instruments": ["Sarangi"], ...}
+
+Models are written in dependency order.  Imports read a batch of lines of
+one model at a time and upsert it with ``bulk_create`` and a batched UPDATE
+(unchanged rows are skipped) in its own transaction, so memory stays flat and a failure only loses the
+current batch.  Bulk writes bypass model signals; callers should bump the
+response cache and rebuild the search index afterwards (``import_catalog``
+does).  Media rows carry file names only, not file contents.
+"""
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Category, Instrument, Expert, Tutorial, TunerConfiguration, Media
+
+
+class TransferError(ValueError):
+    pass
+
+
+@dataclass
+class Spec:
+    name: str
+    model: type
+    # Natural key, in record terms: relation names stand for the related natural key.
+    key: tuple[str, ...]
+    fields: tuple[str, ...]
+    # Record field -> (related model, its natural key field).
+    relations: dict = field(default_factory=dict)
+    many: dict = field(default_factory=dict)
+
+    def column(self, name: str) -> str:
+        return f'{name}_id' if name in self.relations else name
+
+
+SPECS = [
+    Spec('category', Category, key=('slug',), fields=('name', 'slug', 'description')),
+    Spec(
+        'instrument', Instrument, key=('name',),
+        fields=(
+            'name', 'region', 'description', 'history', 'materials', 'playing_technique',
+            'cultural_significance', 'primary_image', 'is_featured',
+        ),
+        relations={'category': (Category, 'slug')},
+    ),
+    Spec(
+        'expert', Expert, key=('name',),
+        fields=(
+            'name', 'expertise', 'bio', 'detailed_bio', 'contact_email', 'photo', 'achievements',
+            'performance_video', 'teaching_audio',
+        ),
+        many={'instruments': (Instrument, 'name')},
+    ),
+    Spec(
+        'tutorial', Tutorial, key=('instrument', 'title'),
+        fields=('title', 'description', 'video_url', 'instructor_name', 'duration'),
+        relations={'instrument': (Instrument, 'name')},
+    ),
+    Spec(
+        'tuner_configuration', TunerConfiguration, key=('instrument',),
+        fields=('tuning_name', 'notes', 'frequencies', 'is_default'),
+        relations={'instrument': (Instrument, 'name')},
+    ),
+    Spec(
+        'media', Media, key=('instrument', 'file'),
+        fields=('media_type', 'file', 'title', 'is_primary'),
+        relations={'instrument': (Instrument, 'name')},
+    ),
+]
+SPECS_BY_NAME = {spec.name: spec for spec in SPECS}
+
+
+@dataclass
+class Stats:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        total = self.created + self.updated + self.unchanged
+        return total / self.seconds if self.seconds else 0.0
+
+
+def _plain(value):
+    # FieldFile compares by name in natural keys.
+    return value.name if hasattr(value, 'storage') else value
+
+
+def export_records(specs=None, batch_size: int = 2000):
+    """Yield one NDJSON line per object, paging by primary key."""
+    for spec in specs or SPECS:
+        columns = ['id', *spec.fields, *(f'{name}__{key}' for name, (_model, key) in spec.relations.items())]
+        queryset = spec.model.objects.order_by('pk').values(*columns)
+        last = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last)[:batch_size])
+            if not rows:
+                break
+            last = rows[-1]['id']
+
+            many = {}
+            for name, (model, key) in spec.many.items():
+                descriptor = getattr(spec.model, name)
+                source = descriptor.field.m2m_field_name()
+                target = descriptor.field.m2m_reverse_field_name()
+                links = descriptor.through.objects.filter(**{f'{source}_id__in': [row['id'] for row in rows]})
+                values = {}
+                for owner, related in links.order_by(f'{target}__{key}').values_list(f'{source}_id', f'{target}__{key}'):
+                    values.setdefault(owner, []).append(related)
+                many[name] = values
+
+            for row in rows:
+                record = {'model': spec.name}
+                record.update((name, row[name]) for name in spec.fields)
+                record.update((name, row[f'{name}__{key}']) for name, (_model, key) in spec.relations.items())
+                record.update((name, many[name].get(row['id'], [])) for name in spec.many)
+                yield json.dumps(record, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+def import_lines(lines, batch_size: int = 1000) -> dict[str, Stats]:
+    """Upsert NDJSON ``lines`` batch by batch; returns per-model counts."""
+    stats = {spec.name: Stats() for spec in SPECS}
+    spec, batch = None, []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            record_spec = SPECS_BY_NAME[record.pop('model')]
+        except (ValueError, KeyError) as exc:
+            raise TransferError(f'Line {number}: not a catalog record ({exc})')
+        if batch and (record_spec is not spec or len(batch) >= batch_size):
+            _timed_upsert(spec, batch, stats[spec.name])
+            batch = []
+        spec = record_spec
+        batch.append(record)
+    if batch:
+        _timed_upsert(spec, batch, stats[spec.name])
+    return stats
+
+
+def _timed_upsert(spec: Spec, records: list[dict], stats: Stats) -> None:
+    started = time.perf_counter()
+    with transaction.atomic():
+        upsert(spec, records, stats)
+    stats.seconds += time.perf_counter() - started
+
+
+def _lookup(model, key: str, values) -> dict:
+    return dict(model.objects.filter(**{f'{key}__in': set(values)}).values_list(key, 'id'))
+
+
+def upsert(spec: Spec, records: list[dict], stats: Stats) -> None:
+    for name, (model, key) in spec.relations.items():
+        ids = _lookup(model, key, (record.get(name) for record in records))
+        resolved = []
+        for record in records:
+            related = ids.get(record.pop(name, None))
+            if related is None:
+                stats.skipped += 1
+                continue
+            record[f'{name}_id'] = related
+            resolved.append(record)
+        records = resolved
+
+    key_columns = [spec.column(name) for name in spec.key]
+    # The last record for a key wins, as it would with one-by-one saves.
+    by_key = {}
+    for record in records:
+        if all(record.get(column) is not None for column in key_columns):
+            by_key[tuple(record[column] for column in key_columns)] = record
+        else:
+            stats.skipped += 1
+    if not by_key:
+        return
+
+    lookup = Q()
+    for index, column in enumerate(key_columns):
+        lookup &= Q(**{f'{column}__in': {key[index] for key in by_key}})
+    # Rows that share a key pair up with the last record in export (pk) order.
+    existing = {
+        tuple(_plain(getattr(obj, column)) for column in key_columns): obj
+        for obj in spec.model.objects.filter(lookup).order_by('pk')
+    }
+
+    columns = [*spec.fields, *(spec.column(name) for name in spec.relations)]
+    to_create, to_update = [], []
+    for key, record in by_key.items():
+        values = {column: record[column] for column in columns if column in record}
+        obj = existing.get(key)
+        if obj is None:
+            to_create.append(spec.model(**values))
+        elif any(_plain(getattr(obj, column)) != value for column, value in values.items()):
+            for column, value in values.items():
+                setattr(obj, column, value)
+            to_update.append(obj)
+        else:
+            stats.unchanged += 1
+
+    spec.model.objects.bulk_create(to_create)
+    if to_update:
+        update_fields = list(columns)
+        # Like bulk_update this skips auto_now, and conditional GET relies on it.
+        if any(f.name == 'updated_at' for f in spec.model._meta.concrete_fields):
+            now = timezone.now()
+            for obj in to_update:
+                obj.updated_at = now
+            update_fields.append('updated_at')
+        update_rows(spec.model, to_update, update_fields)
+    stats.created += len(to_create)
+    stats.updated += len(to_update)
+
+    for name, (model, related_key) in spec.many.items():
+        _replace_links(spec, name, model, related_key, by_key, key_columns)
+
+
+def update_rows(model, objs: list, fields: list[str]) -> None:
+    """
+    ``bulk_update`` for wide batches: one prepared ``UPDATE ... WHERE pk = %s``
+    run through ``executemany``.  ``bulk_update`` builds a CASE expression per
+    field that takes far longer to compile than the database takes to run it.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    concrete = [model._meta.get_field(name) for name in fields]
+    assignments = ', '.join(f'{quote(field.column)} = %s' for field in concrete)
+    sql = f'UPDATE {quote(model._meta.db_table)} SET {assignments} WHERE {quote(model._meta.pk.column)} = %s'
+    params = [
+        [field.get_db_prep_save(getattr(obj, field.attname), connection) for field in concrete] + [obj.pk]
+        for obj in objs
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _replace_links(spec: Spec, name: str, model, related_key: str, by_key: dict, key_columns: list[str]) -> None:
+    descriptor = getattr(spec.model, name)
+    through = descriptor.through
+    source = descriptor.field.m2m_field_name()
+    target = descriptor.field.m2m_reverse_field_name()
+
+    # Records without the field keep their current links.
+    listed = {key: record[name] for key, record in by_key.items() if name in record}
+    if not listed:
+        return
+    owners = dict(
+        spec.model.objects.filter(**{f'{key_columns[0]}__in': [key[0] for key in listed]})
+        .values_list(key_columns[0], 'id')
+    )
+    related_ids = _lookup(model, related_key, (value for values in listed.values() for value in values))
+
+    links = []
+    for key, values in listed.items():
+        links.extend(
+            through(**{f'{source}_id': owners[key[0]], f'{target}_id': related_ids[value]})
+            for value in values
+            if value in related_ids
+        )
+    through.objects.filter(**{f'{source}_id__in': owners.values()}).delete()
+    through.objects.bulk_create(links, ignore_conflicts=True)
@@ -0,0 +1,93 @@
+"""
+Tuner configurations derived from instrument recordings, and reference
+tones rendered from them.
+
+``catalog.pitch`` and ``catalog.synth`` do the signal work; this module
+picks the recording for an instrument, writes suggestions back to its
+``TunerConfiguration`` and keeps the rendered tones in
+``TONE_CACHE_DIR/<config id>/<content hash>/``.  The hash covers the
+frequencies and synthesis parameters, and ``clear_reference_tones`` drops a
+configuration's directory whenever it changes.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+from django.conf import settings
+
+from . import audio, pitch, synth
+from .models import Instrument, Media, TunerConfiguration
+
+
+def find_recording(instrument: Instrument, media_id: int | None = None) -> Media | None:
+    """The instrument's primary analyzable audio file, or the one with ``media_id``."""
+    recordings = instrument.media.filter(media_type=Media.AUDIO).order_by('-is_primary', 'id')
+    if media_id is not None:
+        recordings = recordings.filter(pk=media_id)
+    return next((media for media in recordings if audio.is_supported(media.file.name)), None)
+
+
+def apply_suggestion(instrument: Instrument, analysis: pitch.PitchAnalysis) -> TunerConfiguration:
+    notes, frequencies = pitch.suggest_tuning(analysis)
+    config, _created = TunerConfiguration.objects.update_or_create(
+        instrument=instrument, defaults={'notes': notes, 'frequencies': frequencies}
+    )
+    return config
+
+
+def describe_analysis(media: Media, analysis: pitch.PitchAnalysis) -> dict:
+    notes, frequencies = pitch.suggest_tuning(analysis)
+    return {
+        'media': media.pk,
+        'voiced_ratio': round(analysis.voiced_ratio, 3),
+        'notes': notes,
+        'frequencies': frequencies,
+        'segments': [asdict(note) for note in analysis.notes],
+    }
+
+
+def get_tone_cache_dir() -> Path:
+    return Path(getattr(settings, 'TONE_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'tones'))
+
+
+def default_timbre(instrument: Instrument) -> str:
+    return synth.CATEGORY_TIMBRES.get(instrument.category.slug, 'sine')
+
+
+def tone_key(frequencies: list[float], timbre: str) -> str:
+    raw = json.dumps({
+        'frequencies': frequencies,
+        'timbre': timbre,
+        'sample_rate': synth.SAMPLE_RATE,
+        'duration': synth.DURATION,
+        'spec': repr(synth.TIMBRES[timbre]),
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+
+def reference_tone(config: TunerConfiguration, index: int, timbre: str) -> Path:
+    """
+    Path of the WAV for note ``index``.  On a miss every note of the
+    configuration is rendered in one pass, since the others are likely next.
+    """
+    frequencies = [float(frequency) for frequency in config.frequencies]
+    directory = get_tone_cache_dir() / str(config.pk) / tone_key(frequencies, timbre)
+    path = directory / f'{index}.wav'
+    if path.exists():
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for number, samples in enumerate(synth.render(frequencies, timbre)):
+        fd, temp_name = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(synth.encode_wav(samples))
+        os.replace(temp_name, directory / f'{number}.wav')
+    return path
+
+
+def clear_reference_tones(config: TunerConfiguration) -> None:
+    shutil.rmtree(get_tone_cache_dir() / str(config.pk), ignore_errors=True)
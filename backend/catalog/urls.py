@@ -1,4 +1,7 @@
+from django.conf import settings
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter
+from . import async_views, delivery
 from .views import (
     CategoryViewSet,
     InstrumentViewSet,
@@ -8,6 +11,9 @@ from .views import (
     ContactViewSet,
     TutorialViewSet,
     TunerConfigurationViewSet,
+    SearchViewSet,
+    CacheStatsViewSet,
+    MetricsViewSet,
 )
 
 router = DefaultRouter()
@@ -19,5 +25,48 @@ router.register('learning', LearningContentViewSet)
 router.register('contact', ContactViewSet)
 router.register('tutorials', TutorialViewSet)
 router.register('tuner-configurations', TunerConfigurationViewSet)
+router.register('search', SearchViewSet, basename='search')
+router.register('cache-stats', CacheStatsViewSet, basename='cache-stats')
+router.register('metrics', MetricsViewSet, basename='metrics')
 
-urlpatterns = router.urls
+# Under ASGI, async GET/HEAD for the public read endpoints in front of the
+# router's routes; other methods fall through to the same viewset views.
+async_reads = []
+if settings.CATALOG_ASYNC_READS:
+    routes = {pattern.name: pattern.callback for pattern in router.urls}
+    for prefix, basename, read_view in (
+        ('categories', 'category', async_views.CategoryReadView),
+        ('instruments', 'instrument', async_views.InstrumentReadView),
+        ('experts', 'expert', async_views.ExpertReadView),
+        ('learning', 'learningcontent', async_views.LearningContentReadView),
+        ('tuner-configurations', 'tunerconfiguration', async_views.TunerConfigurationReadView),
+    ):
+        async_reads += [
+            re_path(rf'^{prefix}/$', read_view.as_view(routes[f'{basename}-list'])),
+            re_path(rf'^{prefix}/(?P<pk>[^/.]+)/$', read_view.as_view(routes[f'{basename}-detail'])),
+        ]
+
+urlpatterns = async_reads + router.urls + [
+    path('files/media/<int:pk>/peaks/', delivery.media_peaks, name='media-peaks'),
+    path('files/media/<int:pk>/<str:name>', delivery.media_file, name='media-file'),
+    path(
+        'files/experts/<int:pk>/performance_video/<str:name>',
+        delivery.expert_performance_video,
+        name='expert-performance-video',
+    ),
+    path(
+        'files/experts/<int:pk>/teaching_audio/<str:name>',
+        delivery.expert_teaching_audio,
+        name='expert-teaching-audio',
+    ),
+    path(
+        'files/experts/<int:pk>/teaching_audio/peaks/',
+        delivery.expert_teaching_audio_peaks,
+        name='expert-teaching-audio-peaks',
+    ),
+    path(
+        'files/images/<str:model>/<int:pk>/<str:digest>/<int:width>.<str:fmt>',
+        delivery.image_derivative,
+        name='image-derivative',
+    ),
+]
@@ -1,13 +1,21 @@
-from rest_framework import viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import status, viewsets
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.decorators import action
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
-from .models import Category, Instrument, Media, Expert, LearningContent, Contact, Tutorial, TunerConfiguration
+from .models import Category, Instrument, Media, Expert, LearningContent, Contact, Tutorial, TunerConfiguration, SearchEntry
 from .serializers import (
     CategorySerializer,
     InstrumentListSerializer,
+    InstrumentListMediaSerializer,
     InstrumentDetailSerializer,
+    InstrumentBulkSerializer,
     MediaSerializer,
+    MediaBulkSerializer,
     ExpertListSerializer,
     ExpertDetailSerializer,
     LearningContentSerializer,
@@ -15,34 +23,151 @@ from .serializers import (
     TutorialSerializer,
     TunerConfigurationSerializer,
 )
-from .permissions import IsAdminOrReadOnly
+from .permissions import IsAdminOrReadOnly, IsStaffOrMetricsToken
 from .filters import InstrumentFilter
+from . import audio, cache, contact, delivery, facets, metrics, pitch, recommendations, search, synth, timing, tuning
+from .bulk import BulkWriteMixin
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .renderers import FastJSONRenderer
+from .rows import ExpertListRows, InstrumentListRows
+from .timing import TimingMixin
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """For actions that stream files: errors are JSON whatever the client accepts."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class FieldProjectionMixin:
+    """Defers the columns a ``?fields=`` list request does not render."""
+
+    def project_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'requested_fields'):
+            return queryset
+        fields = serializer_class.requested_fields(self.request)
+        if fields is None:
+            return queryset
+        # Keep the ordering columns so the pagination cursor needs no extra query.
+        ordering = [name.lstrip('-') for name in self.ordering]
+        return queryset.only(*serializer_class.projected_columns(fields), *ordering)
+
+
+class RowListMixin:
+    """
+    Serves ``list`` from ``row_serializer_class`` (see ``catalog.rows``)
+    whenever the request would use the serializer it reproduces.
+    """
+    row_serializer_class = None
+
+    def get_row_serializer(self):
+        row_serializer_class = self.row_serializer_class
+        if row_serializer_class is None or self.get_serializer_class() is not row_serializer_class.serializer_class:
+            return None
+        return row_serializer_class(self.request)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        rows = self.get_row_serializer()
+        if rows is None:
+            page = self.paginate_queryset(queryset)
+            data = self.get_serializer(queryset if page is None else page, many=True).data
+        else:
+            # The cursor is read from the last row, so its ordering columns are selected too.
+            get_ordering = getattr(self.paginator, 'get_ordering', None)
+            ordering = get_ordering(self.request, queryset, self) if get_ordering is not None else ()
+            queryset = rows.values(queryset, [name.lstrip('-') for name in ordering])
+            page = self.paginate_queryset(queryset)
+            data = rows.to_representation(queryset if page is None else page)
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+
+class CategoryViewSet(TimingMixin, CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_models = [Category]
+    query_budgets = {'list': 2, 'retrieve': 2}
     search_fields = ['name', 'description']
+    ordering = ['name', 'id']
 
 
-class InstrumentViewSet(viewsets.ModelViewSet):
-    queryset = Instrument.objects.select_related('category').prefetch_related('media', 'experts')
+class InstrumentViewSet(
+    TimingMixin, CachedResponseMixin, ConditionalGetMixin, FieldProjectionMixin, RowListMixin, BulkWriteMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Instrument.objects.select_related('category').prefetch_related('media__variants', 'experts')
     permission_classes = [IsAdminOrReadOnly]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    row_serializer_class = InstrumentListRows
+    bulk_serializer_class = InstrumentBulkSerializer
+    cache_models = [Instrument, Category, Media, Expert, Tutorial, TunerConfiguration]
+    # Validators, then the page or object and its prefetches (+1 for ?expand=media,
+    # +1 for ?facets= until the counts are cached, +1 for ?include=tutorials).
+    query_budgets = {'list': 4, 'retrieve': 7, 'tutorials': 2, 'tuner_config': 2}
     filterset_class = InstrumentFilter
+    search_index_kind = SearchEntry.INSTRUMENT
     search_fields = ['name', 'description', 'history', 'materials', 'cultural_significance']
     ordering_fields = ['name', 'region', 'created_at']
+    ordering = ['name', 'id']
+
+    def expand_media(self) -> bool:
+        return 'media' in self.request.query_params.get('expand', '').split(',')
+
+    def get_queryset(self):
+        if self.action == 'list':
+            queryset = Instrument.objects.all()
+            fields = self.get_serializer_class().requested_fields(self.request)
+            if fields is None or 'category' in fields:
+                queryset = queryset.select_related('category')
+            if self.expand_media():
+                primary_types = Media.objects.filter(media_type__in=[Media.AUDIO, Media.MODEL_3D])
+                queryset = queryset.prefetch_related(Prefetch('media', queryset=primary_types))
+            return self.project_queryset(queryset)
+        if self.action in ('tutorials', 'tuner_config'):
+            # Only the lookup: the nested actions don't render the instrument.
+            return Instrument.objects.all()
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(Prefetch('recommendations', queryset=recommendations.served()))
+            includes = InstrumentDetailSerializer.requested_includes(self.request)
+            if 'tutorials' in includes:
+                queryset = queryset.prefetch_related('tutorials')
+            if 'tuner_config' in includes:
+                queryset = queryset.select_related('tuner_config')
+        return queryset
+
+    def list_response(self, queryset):
+        response = super().list_response(queryset)
+        names = facets.requested_facets(self.request)
+        if names and isinstance(response.data, dict):
+            response.data['facets'] = facets.facet_counts(self, names)
+        return response
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return InstrumentDetailSerializer
+        if self.action == 'tutorials':
+            return TutorialSerializer
+        if self.action == 'tuner_config':
+            return TunerConfigurationSerializer
+        if self.action == 'list' and self.expand_media():
+            return InstrumentListMediaSerializer
         return InstrumentListSerializer
-    
+
     @action(detail=True, methods=['get'], permission_classes=[AllowAny])
     def tutorials(self, request, pk=None):
         instrument = self.get_object()
         tutorials = instrument.tutorials.all()
-        serializer = TutorialSerializer(tutorials, many=True)
+        serializer = self.get_serializer(tutorials, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'], permission_classes=[AllowAny])
@@ -50,22 +175,108 @@ class InstrumentViewSet(viewsets.ModelViewSet):
         instrument = self.get_object()
         try:
             config = instrument.tuner_config
-            serializer = TunerConfigurationSerializer(config)
+            serializer = self.get_serializer(config)
             return Response(serializer.data)
         except TunerConfiguration.DoesNotExist:
             return Response(None)
 
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[AllowAny],
+        content_negotiation_class=IgnoreClientContentNegotiation,
+        url_path=r'tuner_config/tones/(?P<index>\d+)',
+    )
+    def tuner_tone(self, request, pk=None, index=None):
+        """
+        WAV reference tone for note ``index`` of the tuner configuration.
+        ``?timbre=`` picks one of ``synth.TIMBRES``; the default follows the
+        instrument's category.
+        """
+        config = get_object_or_404(TunerConfiguration.objects.select_related('instrument__category'), instrument_id=pk)
+        timbre = request.query_params.get('timbre') or tuning.default_timbre(config.instrument)
+        if timbre not in synth.TIMBRES:
+            return Response(
+                {'detail': f"Unknown timbre. Choose from: {', '.join(synth.TIMBRES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        index = int(index)
+        if index >= len(config.frequencies):
+            return Response({'detail': 'No such note.'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            path = tuning.reference_tone(config, index, timbre)
+        except (TypeError, ValueError):
+            return Response({'detail': 'Tuner frequencies must be numbers.'}, status=status.HTTP_400_BAD_REQUEST)
+        return delivery.serve_path(request, path)
 
-class MediaViewSet(viewsets.ModelViewSet):
-    queryset = Media.objects.select_related('instrument')
+    @action(detail=True, methods=['get', 'post'], permission_classes=[IsAdminUser], url_path='tuner_config/analysis')
+    def tuning_analysis(self, request, pk=None):
+        """
+        Suggest notes and frequencies from the instrument's recording
+        (``?media=<id>`` picks another one).  POST also saves them as the
+        instrument's tuner configuration.
+        """
+        instrument = self.get_object()
+        media_id = request.data.get('media') or request.query_params.get('media')
+        try:
+            media = tuning.find_recording(instrument, int(media_id) if media_id else None)
+        except ValueError:
+            return Response({'detail': 'media must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if media is None:
+            return Response({'detail': 'No WAV recording to analyze.'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            analysis = pitch.analyze_file(media.file.path)
+        except (audio.AudioError, OSError) as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = tuning.describe_analysis(media, analysis)
+        if request.method == 'POST':
+            if not analysis.notes:
+                return Response({**data, 'detail': 'No stable pitches found.'}, status=status.HTTP_400_BAD_REQUEST)
+            config = tuning.apply_suggestion(instrument, analysis)
+            data['tuner_config'] = TunerConfigurationSerializer(config).data
+        return Response(data)
+
+
+class MediaViewSet(TimingMixin, ConditionalGetMixin, BulkWriteMixin, viewsets.ModelViewSet):
+    queryset = Media.objects.select_related('instrument').prefetch_related('variants')
     serializer_class = MediaSerializer
     permission_classes = [IsAdminOrReadOnly]
+    bulk_serializer_class = MediaBulkSerializer
+    # New media need a file upload.
+    bulk_methods = ('PATCH',)
+    query_budgets = {'list': 3, 'retrieve': 3}
+    ordering = ['media_type', 'id']
 
 
-class ExpertViewSet(viewsets.ModelViewSet):
+class ExpertViewSet(
+    TimingMixin, CachedResponseMixin, ConditionalGetMixin, FieldProjectionMixin, RowListMixin, viewsets.ModelViewSet
+):
     queryset = Expert.objects.prefetch_related('instruments')
     permission_classes = [IsAdminOrReadOnly]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    row_serializer_class = ExpertListRows
+    cache_models = [Expert, Instrument, Category]
+    query_budgets = {'list': 3, 'retrieve': 4}
     search_fields = ['name', 'expertise']
+    ordering = ['name', 'id']
+
+    def get_queryset(self):
+        if self.action == 'list':
+            queryset = Expert.objects.all()
+            fields = ExpertListSerializer.requested_fields(self.request)
+            if fields is None or 'instruments' in fields:
+                queryset = queryset.prefetch_related(
+                    Prefetch('instruments', queryset=Instrument.objects.only('id', 'name'))
+                )
+            return self.project_queryset(queryset)
+        if self.action == 'retrieve':
+            # The instrument previews render the category name.
+            return Expert.objects.prefetch_related(
+                Prefetch('instruments', queryset=Instrument.objects.select_related('category'))
+            )
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -73,11 +284,14 @@ class ExpertViewSet(viewsets.ModelViewSet):
         return ExpertListSerializer
 
 
-class LearningContentViewSet(viewsets.ModelViewSet):
+class LearningContentViewSet(TimingMixin, CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = LearningContent.objects.all()
     serializer_class = LearningContentSerializer
     permission_classes = [AllowAny]
+    cache_models = [LearningContent]
+    query_budgets = {'list': 2, 'retrieve': 2}
     ordering_fields = ['order', 'title']
+    ordering = ['order', 'id']
 
 
 class ContactViewSet(viewsets.ModelViewSet):
@@ -85,6 +299,7 @@ class ContactViewSet(viewsets.ModelViewSet):
     serializer_class = ContactSerializer
     permission_classes = [AllowAny]
     ordering_fields = ['created_at']
+    ordering = ['-created_at', 'id']
 
     def get_permissions(self):
         # Allow anyone to create contact messages
@@ -93,20 +308,109 @@ class ContactViewSet(viewsets.ModelViewSet):
         # Only admins can view, update, delete
         return [IsAdminOrReadOnly()]
 
-    def perform_create(self, serializer):
-        serializer.save()
+    def get_throttles(self):
+        if self.action == 'create':
+            return [contact.ContactThrottle()]
+        return super().get_throttles()
 
+    def create(self, request, *args, **kwargs):
+        # Messages are spooled and saved in batches by the worker, so a flood
+        # of submissions never becomes a flood of database writes.  Dropped
+        # spam gets the same reply as an accepted message.
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        contact.submit(serializer.validated_data)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
-class TutorialViewSet(viewsets.ModelViewSet):
+
+class TutorialViewSet(TimingMixin, ConditionalGetMixin, BulkWriteMixin, viewsets.ModelViewSet):
     queryset = Tutorial.objects.all()
     serializer_class = TutorialSerializer
     permission_classes = [IsAdminOrReadOnly]
+    bulk_serializer_class = TutorialSerializer
+    query_budgets = {'list': 2, 'retrieve': 2}
     search_fields = ['title', 'instructor_name']
     ordering_fields = ['created_at', 'instructor_name']
+    ordering = ['-created_at', 'id']
 
 
-class TunerConfigurationViewSet(viewsets.ModelViewSet):
+class TunerConfigurationViewSet(TimingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = TunerConfiguration.objects.all()
     serializer_class = TunerConfigurationSerializer
     permission_classes = [IsAdminOrReadOnly]
+    query_budgets = {'list': 2, 'retrieve': 2}
     ordering_fields = ['tuning_name', 'is_default']
+    ordering = ['tuning_name', 'id']
+
+
+class SearchViewSet(TimingMixin, viewsets.ViewSet):
+    """Ranked full-text search across instruments, experts and tutorials."""
+    permission_classes = [AllowAny]
+    # The hits, then one query per kind found (and the experts' instruments).
+    query_budgets = {'list': 5}
+    max_limit = 50
+
+    kinds = {
+        SearchEntry.INSTRUMENT: (Instrument.objects.select_related('category'), InstrumentListSerializer),
+        SearchEntry.EXPERT: (Expert.objects.prefetch_related('instruments'), ExpertListSerializer),
+        SearchEntry.TUTORIAL: (Tutorial.objects.all(), TutorialSerializer),
+    }
+
+    def list(self, request):
+        query = request.query_params.get('q', '').strip()
+        requested = request.query_params.get('type', '')
+        kinds = [kind for kind in requested.split(',') if kind] if requested else list(self.kinds)
+        unknown = [kind for kind in kinds if kind not in self.kinds]
+        if unknown or not kinds:
+            return Response(
+                {'detail': f"Unknown type {', '.join(unknown) or requested!r}; use {', '.join(self.kinds)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'detail': 'limit must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = search.search(query, kinds, limit=min(limit, self.max_limit))
+
+        serialized = {}
+        for kind, (queryset, serializer_class) in self.kinds.items():
+            ids = [hit.object_id for hit in hits if hit.kind == kind]
+            if not ids:
+                continue
+            objects = queryset.in_bulk(ids)
+            serializer_context = {'request': request}
+            with timing.span('serialize'):
+                serialized[kind] = {
+                    pk: serializer_class(obj, context=serializer_context).data
+                    for pk, obj in objects.items()
+                }
+
+        results = [
+            {'type': hit.kind, 'id': hit.object_id, 'rank': hit.rank, 'item': serialized[hit.kind][hit.object_id]}
+            for hit in hits
+            if hit.object_id in serialized.get(hit.kind, {})
+        ]
+        return Response({'query': query, 'count': len(results), 'results': results})
+
+
+class CacheStatsViewSet(viewsets.ViewSet):
+    """Hit, miss and invalidation counters of the response cache."""
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(cache.stats())
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """Request, cache and media metrics of all workers in the Prometheus text format."""
+    permission_classes = [IsStaffOrMetricsToken]
+
+    def list(self, request):
+        totals = metrics.collect()
+        return HttpResponse(
+            metrics.render(totals, cache.stats(totals)),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -2,5 +2,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nepali_platform.settings')
+os.environ.setdefault('CATALOG_ASYNC_READS', 'true')
 
 application = get_asgi_application()
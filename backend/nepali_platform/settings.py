@@ -21,6 +21,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'catalog.timing.TimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -59,9 +60,37 @@ DATABASES = {
         'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
         'HOST': os.environ.get('DJANGO_DB_HOST', ''),
         'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 0)),
     }
 }
 
+# Use a shared backend (file-based or Redis) when running several worker
+# processes, otherwise cache invalidation only reaches the local process.
+# The response cache's generation stamps get an alias of their own: culling
+# in a full 'default' must never evict them (see catalog.cache).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'nepali-platform'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', 10000))},
+    },
+    'catalog-generations': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get(
+            'CATALOG_GENERATION_CACHE_LOCATION',
+            os.environ.get('DJANGO_CACHE_LOCATION', 'nepali-platform') + '-generations',
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_GENERATION_CACHE_ALIAS = 'catalog-generations'
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', 60 * 60 * 24))
+# Route catalog GETs to catalog.async_views.  asgi.py turns this on; under WSGI
+# the coroutines would only add an event loop per request.
+CATALOG_ASYNC_READS = os.environ.get('CATALOG_ASYNC_READS', 'false').lower() == 'true'
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -78,6 +107,102 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hand large media transfers to the front server: 'xsendfile' (Apache
+# mod_xsendfile) or 'nginx' (X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX).
+# With nginx, files outside MEDIA_ROOT (say, a cache directory moved to
+# another disk) need a {directory: internal location} entry in
+# MEDIA_ACCEL_REDIRECT_LOCATIONS, or Django streams them itself.
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+MEDIA_ACCEL_REDIRECT_LOCATIONS = {}
+
+# Pre-rendered catalog JSON (manage.py build_static_api); off unless a root is set.
+# The base URL is the public API root the rendered links point to.
+STATIC_API_ROOT = os.environ.get('STATIC_API_ROOT') or None
+STATIC_API_BASE_URL = os.environ.get('STATIC_API_BASE_URL', 'http://localhost:8000')
+
+# Vertex-clustering grid sizes for the lower-detail 3D model variants.
+MODEL_LOD_GRIDS = (96, 32)
+
+# Resized WebP/AVIF/JPEG copies of instrument and expert photos, kept as an
+# LRU cache capped at IMAGE_DERIVATIVE_CACHE_MAX_BYTES.
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1024)
+IMAGE_DERIVATIVE_CACHE_DIR = MEDIA_ROOT / 'derivatives'
+IMAGE_DERIVATIVE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_DERIVATIVE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Samples per waveform peak for each zoom level (each a multiple of the
+# previous one) and the loudness recordings are levelled to, in dB.
+AUDIO_PEAK_LEVELS = (512, 2048, 8192)
+AUDIO_TARGET_LOUDNESS = -16.0
+
+# YIN pitch analysis used to suggest tuner configurations from recordings.
+PITCH_ANALYSIS = {
+    'FMIN': 50.0,
+    'FMAX': 2000.0,
+    'THRESHOLD': 0.15,
+    'SILENCE_DB': -45.0,
+    'MIN_NOTE_SECONDS': 0.25,
+    'MAX_NOTES': 12,
+}
+
+# Similar instruments and recommended experts on instrument pages
+# (catalog.recommendations): how many of each to keep, the lowest cosine
+# similarity worth showing, and how much each part of an instrument counts.
+RECOMMENDATIONS = {
+    'INSTRUMENTS': 6,
+    'EXPERTS': 4,
+    'MIN_SCORE': 0.05,
+    'MAX_DF': 0.5,
+    'WEIGHTS': {'text': 1.0, 'category': 0.5, 'region': 0.3, 'experts': 0.4},
+}
+
+# Rendered tuner reference tones, one directory per configuration.
+TONE_CACHE_DIR = MEDIA_ROOT / 'tones'
+
+# Public contact form: per-IP token bucket, spam/duplicate filtering and a
+# spool the media worker (or ``flush_contacts``) saves in batches.  The
+# spool must not be web-accessible, so it lives outside MEDIA_ROOT.
+CONTACT_INGEST = {
+    'BURST': 5,
+    'PER_MINUTE': 2,
+    'SPAM_THRESHOLD': 4,
+    'DUPLICATE_WINDOW': 24 * 60 * 60,
+    'SPOOL_DIR': BASE_DIR / 'spool' / 'contact',
+}
+
+# Per-request instrumentation (catalog.timing): a Server-Timing header and a
+# JSON line per request on the catalog.timing logger.  Setting
+# REQUEST_PROFILE_SLOWEST (a percentage) keeps cProfile dumps of the slowest
+# requests among a REQUEST_PROFILE_RATE sample.
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'true').lower() == 'true'
+REQUEST_PROFILE_SLOWEST = float(os.environ.get('REQUEST_PROFILE_SLOWEST', 0))
+REQUEST_PROFILE_RATE = float(os.environ.get('REQUEST_PROFILE_RATE', 0.1))
+REQUEST_PROFILE_DIR = BASE_DIR / 'profiles'
+REQUEST_PROFILE_KEEP = 200
+
+# Prometheus metrics (catalog.metrics) at /metrics/, for staff users or an
+# "Authorization: Token <METRICS_TOKEN>" header.  Each worker process flushes
+# its counters to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_DIR = BASE_DIR / 'metrics'
+METRICS_FLUSH_INTERVAL = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'catalog.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOWED_ORIGINS = [
@@ -113,7 +238,9 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'catalog.filters.FullTextSearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'catalog.pagination.CatalogCursorPagination',
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'catalog.timing.TimedContentNegotiation',
 }
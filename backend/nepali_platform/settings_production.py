@@ -25,12 +25,38 @@ CSRF_TRUSTED_ORIGINS = [
     'https://bajanepal.com',
 ]
 
+# SQLite tuned for Passenger's worker processes: WAL, immediate write
+# transactions and a busy timeout (see nepali_platform/sqlite_backend).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'nepali_platform.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {'busy_timeout': 20000},
+        },
     }
 }
+DATABASE_WRITE_RETRIES = 5
+
+# Passenger runs several worker processes; they share the response cache
+# and its generation stamps through the filesystem.  A full file cache
+# deletes a random third of its files, so the stamps live in a directory of
+# their own that holds a dozen files and never reaches MAX_ENTRIES.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'catalog-generations': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache-generations',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
 
 STATIC_URL = '/api/static/'
 STATIC_ROOT = '/home1/bajanepa/public_html/api/static'
@@ -39,6 +65,10 @@ MEDIA_URL = '/api/media/'
 # Media files stored here and accessed via symlink at /home1/bajanepa/public_html/api/media
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Served by Apache through public/.htaccess; see catalog/static_api.py.
+STATIC_API_ROOT = '/home1/bajanepa/public_html/api/snapshot'
+STATIC_API_BASE_URL = 'https://bajanepal.com/api'
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SECURE_SSL_REDIRECT = False  # cPanel handles SSL
 
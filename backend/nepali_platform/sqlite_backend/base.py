@@ -0,0 +1,59 @@
+"""
+SQLite for several worker processes.
+
+Drop-in for ``django.db.backends.sqlite3`` that tunes every new connection
+for concurrent readers and writers:
+
+* ``journal_mode=WAL`` so readers never block the writer and vice versa;
+* ``synchronous=NORMAL``, which is durable against application crashes in
+  WAL mode and skips an fsync per commit;
+* a memory-mapped database file and a larger page cache;
+* a busy timeout, so a writer waits for the lock instead of failing.
+
+``atomic`` blocks start with ``BEGIN IMMEDIATE``.  A deferred transaction
+that reads and then writes has to upgrade its lock, and when two processes
+try that at once SQLite fails one of them straight away, busy timeout or
+not.  Taking the write lock up front makes writers queue on the timeout.
+
+Extra ``OPTIONS`` (everything else goes to ``sqlite3.connect``):
+
+    'pragmas': {'cache_size': -65536, ...}   merged over PRAGMAS
+    'transaction_mode': 'IMMEDIATE'          or 'DEFERRED' / 'EXCLUSIVE'
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # 256 MiB of the file mapped into memory, shared between processes.
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative values are KiB: a 32 MiB page cache per connection.
+    'cache_size': -32 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 20000,
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', 'IMMEDIATE').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'transaction_mode must be one of {", ".join(TRANSACTION_MODES)}')
+        # sqlite3.connect's own timeout is the busy timeout, in seconds.
+        params.setdefault('timeout', self.pragmas['busy_timeout'] / 1000)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if self.is_in_memory_db() and name == 'journal_mode':
+                continue
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -70,4 +70,4 @@ const api = {
   delete: (path) => request(path, { method: 'DELETE' })
 }
 
-export { api, getAuthToken, setAuthToken, clearAuthToken }
+export { api, buildUrl, getAuthToken, setAuthToken, clearAuthToken }
@@ -1,14 +1,68 @@
 import { useState, useRef, useEffect } from 'react'
 import { Play, Pause, Volume2, VolumeX } from 'lucide-react'
+import { fetchPeaks, pickLevel } from '../utils/waveformPeaks'
 import './AudioPlayer.css'
 
-function AudioPlayer({ audioSrc, title }) {
+function AudioPlayer({ audioSrc, peaksSrc, title }) {
   const [isPlaying, setIsPlaying] = useState(false)
   const [currentTime, setCurrentTime] = useState(0)
   const [duration, setDuration] = useState(0)
   const [volume, setVolume] = useState(1)
   const [isMuted, setIsMuted] = useState(false)
+  const [peaks, setPeaks] = useState(null)
   const audioRef = useRef(null)
+  const canvasRef = useRef(null)
+
+  // Precomputed peaks let the waveform render before the audio is decoded.
+  useEffect(() => {
+    if (!peaksSrc) return
+    const controller = new AbortController()
+    fetchPeaks(peaksSrc, { signal: controller.signal })
+      .then(setPeaks)
+      .catch(() => setPeaks(null))
+    return () => controller.abort()
+  }, [peaksSrc])
+
+  // Levels recordings to a common loudness; volume can only attenuate.
+  const gain = peaks ? Math.min(1, Math.pow(10, peaks.gainDb / 20)) : 1
+
+  useEffect(() => {
+    if (audioRef.current) {
+      audioRef.current.volume = isMuted ? 0 : volume * gain
+    }
+  }, [gain, volume, isMuted])
+
+  useEffect(() => {
+    const canvas = canvasRef.current
+    if (!canvas || !peaks || !peaks.levels.length) return
+
+    const width = canvas.clientWidth * window.devicePixelRatio
+    const height = canvas.clientHeight * window.devicePixelRatio
+    canvas.width = width
+    canvas.height = height
+
+    const { peaks: pairs } = pickLevel(peaks.levels, width)
+    const count = pairs.length / 2
+    const progress = duration ? currentTime / duration : 0
+    const styles = getComputedStyle(canvas)
+    const ctx = canvas.getContext('2d')
+    ctx.clearRect(0, 0, width, height)
+
+    for (let x = 0; x < width; x++) {
+      const start = Math.floor((x / width) * count)
+      const end = Math.max(start + 1, Math.floor(((x + 1) / width) * count))
+      let min = 127
+      let max = -127
+      for (let i = start; i < end && i < count; i++) {
+        min = Math.min(min, pairs[i * 2])
+        max = Math.max(max, pairs[i * 2 + 1])
+      }
+      const top = ((127 - max) / 254) * height
+      const bottom = ((127 - min) / 254) * height
+      ctx.fillStyle = x / width < progress ? styles.getPropertyValue('--primary-maroon') : styles.getPropertyValue('--secondary-beige')
+      ctx.fillRect(x, top, 1, Math.max(1, bottom - top))
+    }
+  }, [peaks, currentTime, duration])
 
   useEffect(() => {
     const audio = audioRef.current
@@ -46,20 +100,25 @@ function AudioPlayer({ audioSrc, title }) {
     setCurrentTime(seekTime)
   }
 
+  const handleWaveformClick = (e) => {
+    const audio = audioRef.current
+    const rect = e.currentTarget.getBoundingClientRect()
+    const seekTime = ((e.clientX - rect.left) / rect.width) * duration
+    audio.currentTime = seekTime
+    setCurrentTime(seekTime)
+  }
+
   const handleVolumeChange = (e) => {
     const newVolume = e.target.value / 100
-    audioRef.current.volume = newVolume
     setVolume(newVolume)
     setIsMuted(newVolume === 0)
   }
 
   const toggleMute = () => {
-    const audio = audioRef.current
     if (isMuted) {
-      audio.volume = volume || 0.5
+      setVolume(volume || 0.5)
       setIsMuted(false)
     } else {
-      audio.volume = 0
       setIsMuted(true)
     }
   }
@@ -76,7 +135,16 @@ function AudioPlayer({ audioSrc, title }) {
       <audio ref={audioRef} src={audioSrc} preload="metadata" />
       
       {title && <div className="audio-title">{title}</div>}
-      
+
+      {peaks && (
+        <canvas
+          ref={canvasRef}
+          className="audio-waveform"
+          onClick={handleWaveformClick}
+          aria-hidden="true"
+        />
+      )}
+
       <div className="audio-controls">
         <button 
           className="play-button" 
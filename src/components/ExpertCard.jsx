@@ -1,16 +1,17 @@
 import { Link } from 'react-router-dom'
 import { User, Music } from 'lucide-react'
+import ResponsiveImage from './ResponsiveImage'
 import './ExpertCard.css'
 
 function ExpertCard({ expert }) {
-  const { id, name, expertise, instruments, photo, bio } = expert
+  const { id, name, expertise, instruments, photo, photo_srcset, bio } = expert
 
   return (
     <div className="expert-card card">
       <div className="expert-card-header">
         <div className="expert-photo">
           {photo ? (
-            <img src={photo} alt={name} />
+            <ResponsiveImage src={photo} srcset={photo_srcset} sizes="120px" alt={name} />
           ) : (
             <User size={60} />
           )}
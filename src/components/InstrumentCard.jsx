@@ -1,14 +1,20 @@
 import { Link } from 'react-router-dom'
 import { Tag } from 'lucide-react'
+import ResponsiveImage from './ResponsiveImage'
 import './InstrumentCard.css'
 
 function InstrumentCard({ instrument }) {
-  const { id, name, category, region, image, description } = instrument
+  const { id, name, category, region, image, image_srcset, description } = instrument
 
   return (
     <div className="instrument-card card">
       <div className="instrument-card-image">
-        <img src={image || '/placeholder-instrument.jpg'} alt={name} />
+        <ResponsiveImage
+          src={image || '/placeholder-instrument.jpg'}
+          srcset={image_srcset}
+          sizes="(max-width: 768px) 100vw, 320px"
+          alt={name}
+        />
         <div className="instrument-card-overlay">
           <Tag size={16} />
           <span>{category}</span>
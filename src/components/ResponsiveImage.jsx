@@ -0,0 +1,20 @@
+// Renders the API's `*_srcset` variants ({ avif, webp, jpeg }) as a <picture>,
+// falling back to the original upload when no variants are available.
+const MIME_TYPES = { avif: 'image/avif', webp: 'image/webp', jpeg: 'image/jpeg' }
+
+function ResponsiveImage({ src, srcset, sizes, alt, ...props }) {
+  if (!srcset) {
+    return <img src={src} alt={alt} {...props} />
+  }
+
+  return (
+    <picture>
+      {Object.entries(srcset).map(([format, candidates]) => (
+        <source key={format} type={MIME_TYPES[format]} srcSet={candidates} sizes={sizes} />
+      ))}
+      <img src={src} alt={alt} loading="lazy" decoding="async" {...props} />
+    </picture>
+  )
+}
+
+export default ResponsiveImage
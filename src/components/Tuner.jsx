@@ -1,6 +1,7 @@
 import { useState, useEffect, useRef } from 'react'
 import { Mic, MicOff, Settings2, ChevronDown, ChevronUp } from 'lucide-react'
 import { PitchDetector } from '../utils/pitchDetection'
+import { buildUrl } from '../api/client'
 import './Tuner.css'
 
 function Tuner({ tunerConfig = null }) {
@@ -15,6 +16,7 @@ function Tuner({ tunerConfig = null }) {
   const pitchDetectorRef = useRef(null)
   const animationFrameRef = useRef(null)
   const streamRef = useRef(null)
+  const referenceRef = useRef(null)
 
   // Default tuning (Guitar standard)
   const defaultTuning = {
@@ -33,6 +35,16 @@ function Tuner({ tunerConfig = null }) {
     }))
   }
 
+  // Reference tones are rendered (and cached) by the backend per configuration.
+  const playReference = (idx) => {
+    if (!tunerConfig?.instrument) return
+    if (referenceRef.current) {
+      referenceRef.current.pause()
+    }
+    referenceRef.current = new Audio(buildUrl(`instruments/${tunerConfig.instrument}/tuner_config/tones/${idx}/`))
+    referenceRef.current.play().catch(() => {})
+  }
+
   const startListening = async () => {
     try {
       setError('')
@@ -135,9 +147,21 @@ function Tuner({ tunerConfig = null }) {
                 <strong>Target Notes:</strong>
                 <span className="notes-list">
                   {activeTuning.notes.map((note, idx) => (
-                    <span key={idx} className="note-badge">
-                      {note}
-                    </span>
+                    tunerConfig?.instrument ? (
+                      <button
+                        key={idx}
+                        type="button"
+                        className="note-badge playable"
+                        onClick={() => playReference(idx)}
+                        title={`Play ${note} reference tone`}
+                      >
+                        {note}
+                      </button>
+                    ) : (
+                      <span key={idx} className="note-badge">
+                        {note}
+                      </span>
+                    )
                   ))}
                 </span>
               </div>
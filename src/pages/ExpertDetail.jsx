@@ -147,7 +147,8 @@ function ExpertDetail() {
           <div className="audio-container">
             {expert.teaching_audio ? (
               <AudioPlayer 
-                audioSrc={expert.teaching_audio} 
+                audioSrc={expert.teaching_audio}
+                peaksSrc={expert.teaching_audio_peaks}
                 title={`${expert.name} - Teaching Excerpt`}
               />
             ) : (
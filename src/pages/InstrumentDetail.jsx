@@ -8,6 +8,18 @@ import Tuner from '../components/Tuner'
 import { api } from '../api/client'
 import './InstrumentDetail.css'
 
+// Pick a lighter level of detail on slow connections (Network Information API).
+const pickModelSource = (instrument) => {
+  const variants = instrument.model_3d_variants || []
+  if (variants.length === 0) {
+    return instrument.model_3d
+  }
+  const connection = navigator.connection || {}
+  const isSlow = connection.saveData || ['slow-2g', '2g', '3g'].includes(connection.effectiveType)
+  const variant = isSlow ? variants[variants.length - 1] : variants[0]
+  return variant.file
+}
+
 function InstrumentDetail() {
   const { id } = useParams()
   const [instrument, setInstrument] = useState(null)
@@ -27,35 +39,11 @@ function InstrumentDetail() {
       setIsLoading(true)
       setError('')
       try {
-        const response = await api.get(`instruments/${id}/`)
+        const response = await api.get(`instruments/${id}/`, { include: 'tutorials,tuner_config' })
         if (isMounted) {
           setInstrument(response)
-        }
-
-        // Load tutorials
-        try {
-          const tutorialsData = await api.get(`instruments/${id}/tutorials/`)
-          if (isMounted) {
-            setTutorials(tutorialsData || [])
-          }
-        } catch (err) {
-          // Tutorials may not exist, this is fine
-          if (isMounted) {
-            setTutorials([])
-          }
-        }
-
-        // Load tuner config
-        try {
-          const configData = await api.get(`instruments/${id}/tuner_config/`)
-          if (isMounted && configData) {
-            setTunerConfig(configData)
-          }
-        } catch (err) {
-          // Tuner config may not exist, this is fine
-          if (isMounted) {
-            setTunerConfig(null)
-          }
+          setTutorials(response.tutorials || [])
+          setTunerConfig(response.tuner_config || null)
         }
       } catch (err) {
         if (isMounted) {
@@ -97,6 +85,8 @@ function InstrumentDetail() {
   }
 
   const relatedExperts = instrument.experts || []
+  const similarInstruments = instrument.similar_instruments || []
+  const recommendedExperts = instrument.recommended_experts || []
 
   return (
     <div className="instrument-detail-page">
@@ -134,12 +124,16 @@ function InstrumentDetail() {
           <div className="viewer-grid">
             <div className="viewer-container">
               <h2>3D Model</h2>
-              <Viewer3D modelSrc={instrument.model_3d} title={instrument.name} />
+              <Viewer3D modelSrc={pickModelSource(instrument)} title={instrument.name} />
             </div>
             <div className="sound-container">
               <h2>Authentic Sound</h2>
               {instrument.audio_sample ? (
-                <AudioPlayer audioSrc={instrument.audio_sample} title={`${instrument.name} Sample`} />
+                <AudioPlayer
+                  audioSrc={instrument.audio_sample}
+                  peaksSrc={instrument.audio_sample_peaks}
+                  title={`${instrument.name} Sample`}
+                />
               ) : (
                 <p>No audio sample available.</p>
               )}
@@ -221,6 +215,64 @@ function InstrumentDetail() {
         </section>
       )}
 
+      {/* Similar Instruments (precomputed on the server) */}
+      {similarInstruments.length > 0 && (
+        <section className="section similar-section">
+          <div className="container">
+            <h2 className="section-title">Similar Instruments</h2>
+            <p className="section-subtitle">
+              Instruments with a related sound, region or tradition
+            </p>
+            <div className="similar-grid">
+              {similarInstruments.map(item => (
+                <Link key={item.id} to={`/instruments/${item.id}`} className="similar-card">
+                  {item.image && <img src={item.image} alt={item.name} loading="lazy" />}
+                  <h3>{item.name}</h3>
+                  <p>
+                    <Tag size={14} /> {item.category}
+                    <MapPin size={14} /> {item.region}
+                  </p>
+                </Link>
+              ))}
+            </div>
+          </div>
+        </section>
+      )}
+
+      {/* Experts You May Like */}
+      {recommendedExperts.length > 0 && (
+        <section className="section experts-section">
+          <div className="container">
+            <h2 className="section-title">Experts You May Like</h2>
+            <p className="section-subtitle">
+              Musicians who play instruments similar to this one
+            </p>
+            <div className="experts-list">
+              {recommendedExperts.map(expert => (
+                <div key={expert.id} className="expert-insight-card">
+                  <div className="expert-info">
+                    <div className="expert-avatar">
+                      {expert.photo ? (
+                        <img src={expert.photo} alt={expert.name} />
+                      ) : (
+                        <User size={40} />
+                      )}
+                    </div>
+                    <div>
+                      <h3>{expert.name}</h3>
+                      <p className="expert-title">{expert.expertise}</p>
+                    </div>
+                  </div>
+                  <Link to={`/experts/${expert.id}`} className="btn btn-outline btn-small">
+                    View Full Profile
+                  </Link>
+                </div>
+              ))}
+            </div>
+          </div>
+        </section>
+      )}
+
       {/* Related Instruments */}
       <section className="section related-section bg-secondary">
         <div className="container">
@@ -10,17 +10,35 @@ function Instruments() {
   const [searchTerm, setSearchTerm] = useState('')
   const [categories, setCategories] = useState([{ slug: 'all', name: 'All' }])
   const [instruments, setInstruments] = useState([])
+  const [facets, setFacets] = useState({})
+  const [nextCursor, setNextCursor] = useState(null)
   const [isLoading, setIsLoading] = useState(true)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [error, setError] = useState('')
 
   useEffect(() => {
     window.scrollTo(0, 0)
   }, [])
 
+  // Facet counts cover the whole catalog, not just the loaded pages.
   const regions = useMemo(() => {
-    const uniqueRegions = Array.from(new Set(instruments.map((item) => item.region))).filter(Boolean)
+    const uniqueRegions = facets.region
+      ? facets.region.map((entry) => entry.value)
+      : Array.from(new Set(instruments.map((item) => item.region))).filter(Boolean)
     return ['All', ...uniqueRegions]
-  }, [instruments])
+  }, [facets, instruments])
+
+  const facetCounts = useMemo(() => {
+    const counts = { category: {}, region: {} }
+    Object.keys(counts).forEach((name) => {
+      (facets[name] || []).forEach((entry) => {
+        counts[name][String(entry.value).toLowerCase()] = entry.count
+      })
+    })
+    return counts
+  }, [facets])
+
+  const withCount = (label, count) => (count === undefined ? label : `${label} (${count})`)
 
   useEffect(() => {
     let isMounted = true
@@ -46,6 +64,16 @@ function Instruments() {
     }
   }, [])
 
+  const filterParams = useMemo(() => ({
+    category: selectedCategory === 'all' ? undefined : selectedCategory,
+    region: selectedRegion === 'all' ? undefined : selectedRegion,
+    search: searchTerm.trim() || undefined
+  }), [selectedCategory, selectedRegion, searchTerm])
+
+  const cursorFrom = (response) => (
+    response?.next ? new URL(response.next).searchParams.get('cursor') : null
+  )
+
   useEffect(() => {
     let isMounted = true
 
@@ -53,19 +81,18 @@ function Instruments() {
       setIsLoading(true)
       setError('')
       try {
-        const response = await api.get('instruments/', {
-          category: selectedCategory === 'all' ? undefined : selectedCategory,
-          region: selectedRegion === 'all' ? undefined : selectedRegion,
-          search: searchTerm.trim() || undefined
-        })
+        const response = await api.get('instruments/', { ...filterParams, facets: 'category,region' })
         const items = Array.isArray(response) ? response : response?.results || []
         if (isMounted) {
           setInstruments(items)
+          setFacets(response?.facets || {})
+          setNextCursor(cursorFrom(response))
         }
       } catch (err) {
         if (isMounted) {
           setError(err.message)
           setInstruments([])
+          setNextCursor(null)
         }
       } finally {
         if (isMounted) {
@@ -79,7 +106,20 @@ function Instruments() {
     return () => {
       isMounted = false
     }
-  }, [selectedCategory, selectedRegion, searchTerm])
+  }, [filterParams])
+
+  const loadMore = async () => {
+    setIsLoadingMore(true)
+    try {
+      const response = await api.get('instruments/', { ...filterParams, cursor: nextCursor })
+      setInstruments((current) => [...current, ...(response?.results || [])])
+      setNextCursor(cursorFrom(response))
+    } catch (err) {
+      setError(err.message)
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }
 
   return (
     <div className="instruments-page">
@@ -121,7 +161,7 @@ function Instruments() {
                     checked={selectedCategory === category.slug}
                     onChange={(e) => setSelectedCategory(e.target.value)}
                   />
-                  <span>{category.name}</span>
+                  <span>{withCount(category.name, facetCounts.category[category.slug])}</span>
                 </label>
               ))}
             </div>
@@ -139,7 +179,7 @@ function Instruments() {
                     checked={selectedRegion === region.toLowerCase()}
                     onChange={(e) => setSelectedRegion(e.target.value.toLowerCase())}
                   />
-                  <span>{region}</span>
+                  <span>{withCount(region, facetCounts.region[region.toLowerCase()])}</span>
                 </label>
               ))}
             </div>
@@ -174,11 +214,24 @@ function Instruments() {
               <p>Unable to load instruments. {error}</p>
             </div>
           ) : instruments.length > 0 ? (
-            <div className="grid grid-3 instruments-grid">
-              {instruments.map(instrument => (
-                <InstrumentCard key={instrument.id} instrument={instrument} />
-              ))}
-            </div>
+            <>
+              <div className="grid grid-3 instruments-grid">
+                {instruments.map(instrument => (
+                  <InstrumentCard key={instrument.id} instrument={instrument} />
+                ))}
+              </div>
+              {nextCursor && (
+                <div className="load-more">
+                  <button
+                    className="btn btn-outline"
+                    onClick={loadMore}
+                    disabled={isLoadingMore}
+                  >
+                    {isLoadingMore ? 'Loading...' : 'Load More'}
+                  </button>
+                </div>
+              )}
+            </>
           ) : (
             <div className="no-results">
               <p>No instruments found matching your filters.</p>
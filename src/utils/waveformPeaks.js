@@ -0,0 +1,45 @@
+// Reader for the waveform peaks sidecars served by the backend
+// (see backend/catalog/audio.py for the layout).
+const MAGIC = 'NPK1'
+const HEADER_SIZE = 40
+
+export async function fetchPeaks(url, options = {}) {
+  const response = await fetch(url, options)
+  if (!response.ok) return null
+  return parsePeaks(await response.arrayBuffer())
+}
+
+export function parsePeaks(buffer) {
+  const view = new DataView(buffer)
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4))
+  if (magic !== MAGIC) return null
+
+  const summary = {
+    sampleRate: view.getUint32(4, true),
+    channels: view.getUint16(8, true),
+    frames: Number(view.getBigUint64(12, true)),
+    peakDb: view.getFloat32(20, true),
+    rmsDb: view.getFloat32(24, true),
+    loudnessDb: view.getFloat32(28, true),
+    gainDb: view.getFloat32(32, true),
+    levels: [],
+  }
+
+  const count = view.getUint32(36, true)
+  let offset = HEADER_SIZE
+  for (let i = 0; i < count; i++) {
+    const samplesPerPeak = view.getUint32(offset, true)
+    const length = view.getUint32(offset + 4, true)
+    offset += 8
+    // Interleaved (min, max) pairs scaled to -127..127.
+    summary.levels.push({ samplesPerPeak, peaks: new Int8Array(buffer, offset, length * 2) })
+    offset += length * 2
+  }
+  return summary
+}
+
+// Coarsest level that still has at least one peak per pixel.
+export function pickLevel(levels, width) {
+  const fine = [...levels].reverse().find((level) => level.peaks.length / 2 >= width)
+  return fine || levels[0]
+}